@@ -0,0 +1,145 @@
+"""
+Abuse Detector - Sentiment and keyword scoring behind bot.py's !scan and the
+"respect" detector of the detection service (importable without the bot)
+"""
+
+import re
+from datetime import datetime
+from typing import Dict
+
+from lazy_imports import lazy_import
+
+TextBlob = lazy_import("textblob", "TextBlob")
+
+
+class AbuseDetector:
+    """Detects abusive content using sentiment analysis and keyword matching."""
+    
+    # Configurable thresholds - MADE MORE SENSITIVE
+    SENTIMENT_THRESHOLD = -0.2  # Negative sentiment threshold (lowered for sensitivity)
+    KEYWORD_WEIGHT = 0.5
+    ABUSE_SCORE_THRESHOLD = 0.3  # Minimum score to classify as abusive (lowered)
+    
+    def __init__(self):
+        # Comprehensive list of abusive keywords/phrases
+        self.abusive_keywords = [
+            # Insults & Slurs
+            'hate', 'kill', 'stupid', 'idiot', 'loser', 'trash', 'garbage',
+            'worthless', 'pathetic', 'disgusting', 'die', 'kys', 'kms',
+            'retard', 'retarded', 'moron', 'dumb', 'dumbass', 'dummy',
+            'ugly', 'fat', 'fatty', 'nazi', 'pig', 'scum', 'filth',
+            'shit', 'crap', 'damn', 'hell', 'bastard', 'bitch',
+            'ass', 'asshole', 'fuck', 'fucking', 'fucked', 'fucker',
+            'motherfucker', 'wtf', 'stfu', 'shut up',
+            
+            # Threats & Violence
+            'hurt', 'harm', 'attack', 'beat', 'punch', 'kick',
+            'stab', 'shoot', 'murder', 'suicide', 'hang yourself',
+            'jump off', 'kll', 'k1ll', 'd1e', 'unalive',
+            
+            # Derogatory Terms
+            'n***a', 'n***er', 'f****t', 'f*g', 'gay' 'queer',
+            'tranny', 'dyke', 'chink', 'spic', 'wetback',
+            'cracker', 'honky', 'gook', 'savage', 'ape',
+            
+            # Bullying Terms
+            'cancer', 'tumor', 'disease', 'waste of space',
+            'nobody likes you', 'everyone hates you', 'useless',
+            'failure', 'embarrassment', 'joke', 'clown',
+            'braindead', 'brainless', 'no brain',
+            
+            # Common Variations & Leetspeak
+            'fuk', 'fck', 'sh1t', 'b1tch', 'a$$', 'a55',
+            'fvck', 'phuck', 'shtty', 'sucks', 'suck',
+            'noob', 'n00b', 'scrub', 'bot', 'trash player',
+            
+            # Toxic Phrases
+            'go die', 'kill yourself', 'end yourself', 'rope yourself',
+            'get cancer', 'get aids', 'neck yourself', 'off yourself',
+            'delete yourself', 'uninstall life', 'your mom', 'yo mama',
+            'ez', 'get rekt', 'trash talk', 'git gud', 'cope',
+            'seethe', 'mald', 'ratio', 'cry about it', 'cope harder',
+            
+            # Additional Offensive Terms
+            'simp', 'incel', 'neckbeard', 'virgin', 'whore',
+            'slut', 'thot', 'hoe', 'prostitute', 'hooker',
+            'cunt', 'twat', 'prick', 'dick', 'cock',
+            'balls', 'deez nuts', 'ligma', 'bofa',
+            
+            # Discriminatory
+            'racist', 'sexist', 'homophobic', 'transphobic',
+            'bigot', 'supremacist', 'fascist', 'terrorist'
+        ]
+        
+        # Patterns for detecting leetspeak and variations
+        self.abusive_patterns = [
+            (r'k+[i1!]l+', 'kill variations'),
+            (r'f+[u*]+c+k+', 'fuck variations'),
+            (r's+h+[i1!]+t+', 'shit variations'),
+            (r'b+[i1!]+t+c+h+', 'bitch variations'),
+            (r'n+[i1!]+g+', 'n-word variations'),
+            (r'f+[a@]+g+', 'slur variations'),
+            (r'st[u*0]+p[i1!]+d+', 'stupid variations'),
+            (r'd[u*0]+m+b*', 'dumb variations'),
+            (r'[i1!]+d+[i1!]+[o0]+t+', 'idiot variations'),
+            (r'go+ d+[i1!]+e+', 'death threats'),
+            (r'kys+', 'suicide encouragement'),
+            (r'u+r+ d+[u0]+m+', 'ur dumb variations'),
+        ]
+        
+    def analyze_message(self, content: str) -> Dict:
+        """
+        Analyze message for abusive content.
+        
+        Returns:
+            Dict containing abuse score, sentiment, detected keywords, and classification
+        """
+        content_lower = content.lower()
+        
+        # Sentiment analysis using TextBlob
+        blob = TextBlob(content)
+        sentiment = blob.sentiment.polarity
+        
+        # Keyword detection with word boundary matching
+        detected_keywords = []
+        for keyword in self.abusive_keywords:
+            # Use word boundaries to match whole words only
+            pattern = r'\b' + re.escape(keyword) + r'\b'
+            if re.search(pattern, content_lower):
+                detected_keywords.append(keyword)
+        
+        # Pattern detection for leetspeak and variations
+        detected_patterns = []
+        for pattern, description in self.abusive_patterns:
+            if re.search(pattern, content_lower, re.IGNORECASE):
+                detected_patterns.append(description)
+                detected_keywords.append(description)  # Count patterns as keywords too
+        
+        # Calculate abuse score
+        keyword_score = len(detected_keywords) * self.KEYWORD_WEIGHT
+        sentiment_score = abs(min(sentiment, 0))
+        
+        abuse_score = keyword_score + sentiment_score
+        
+        # Classification - More aggressive detection
+        is_abusive = (
+            abuse_score > self.ABUSE_SCORE_THRESHOLD or 
+            sentiment < self.SENTIMENT_THRESHOLD or
+            len(detected_keywords) > 0  # ANY keyword match = abusive
+        )
+        
+        severity = "low"
+        if abuse_score > 0.8 or len(detected_keywords) >= 3:
+            severity = "high"
+        elif abuse_score > 0.4 or len(detected_keywords) >= 2:
+            severity = "medium"
+        
+        return {
+            "is_abusive": is_abusive,
+            "abuse_score": round(abuse_score, 3),
+            "sentiment": round(sentiment, 3),
+            "detected_keywords": detected_keywords[:5],  # Limit display
+            "detected_patterns": detected_patterns,
+            "severity": severity,
+            "timestamp": datetime.utcnow().isoformat()
+        }
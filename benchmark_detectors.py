@@ -0,0 +1,426 @@
+"""
+Detector Benchmark - Replay a corpus through every detector and compare against a baseline
+Measures throughput (msgs/sec), time per detection stage, memory and verdicts for
+    respect  - abuse_detector.AbuseDetector.analyze_message (bot.py)
+    guardify - bot_enhanced.AbuseDetector.analyze_message
+    content  - HindiEnglishContentDetector.analyze_content
+
+The default corpus is synthetic and deterministic: English (clean and abusive),
+Hindi in Devanagari and romanized script, leetspeak and long messages. An
+anonymized corpus can be replayed instead (one message per line, or JSONL with
+"content"/"text" and optional "category" fields).
+
+Usage:
+    python benchmark_detectors.py --save-baseline benchmarks/baseline.json
+    python benchmark_detectors.py --baseline benchmarks/baseline.json --max-slowdown 0.2
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+DETECTORS = ["respect", "guardify", "content"]
+DEFAULT_SIZE = 2000
+DEFAULT_SEED = 1337
+DIFF_EXAMPLES = 20
+
+
+# ============= SYNTHETIC CORPUS =============
+
+EN_CLEAN = [
+    "good morning everyone, hope you all have a great day",
+    "has anyone finished the assignment for tomorrow?",
+    "the new update looks really nice, thanks to the devs",
+    "can someone help me set up the voice channel",
+    "lol that meme was hilarious",
+    "I think the match starts at 8pm tonight",
+    "welcome to the server, feel free to introduce yourself",
+    "does anyone know a good book about history",
+]
+EN_INSULTS = ["idiot", "stupid", "loser", "moron", "pathetic", "worthless", "trash", "dumb"]
+EN_ABUSIVE_TEMPLATES = [
+    "you are such a {insult}",
+    "shut up you {insult}, nobody likes you",
+    "I will kill you if you say that again",
+    "go kys you {insult}",
+    "everyone here is a {insult}",
+    "you're a {insult} and a waste of space",
+    "I hate you so much, you {insult}",
+]
+HI_DEVANAGARI_CLEAN = [
+    "आज मौसम बहुत अच्छा है",
+    "कल मिलते हैं दोस्तों",
+    "क्या आपने खाना खाया",
+    "यह गाना बहुत सुंदर है",
+]
+HI_DEVANAGARI_ABUSIVE = [
+    "तुम पागल हो",
+    "मैं तुम्हें मार दूंगा",
+    "तू बेवकूफ है, चुप हो जा",
+    "तुम नालायक और कमीने हो",
+]
+HI_ROMAN_CLEAN = [
+    "kal milte hai bhai",
+    "aaj ka match bahut accha tha",
+    "kya haal hai sab log",
+    "mujhe yeh gaana pasand hai",
+]
+HI_ROMAN_ABUSIVE = [
+    "tu pagal hai kya",
+    "kya bakwas kar raha hai nalayak",
+    "main tujhe maar dunga",
+    "chup kar kamina",
+    "tu bewakoof hai, bhag ja yahan se",
+]
+LEET_MAP = {"a": "4", "e": "3", "i": "1", "o": "0", "s": "5", "t": "7"}
+
+
+def _leetspeak(text: str, rng: random.Random) -> str:
+    return "".join(LEET_MAP[c] if c in LEET_MAP and rng.random() < 0.6 else c for c in text)
+
+
+def generate_corpus(size: int = DEFAULT_SIZE, seed: int = DEFAULT_SEED) -> List[Dict]:
+    """
+    Build a deterministic synthetic corpus
+
+    Args:
+        size: Number of messages
+        seed: Random seed (the same seed always gives the same corpus)
+
+    Returns:
+        List of {"id", "category", "content"} dicts
+    """
+    rng = random.Random(seed)
+
+    def english_abusive():
+        return rng.choice(EN_ABUSIVE_TEMPLATES).format(insult=rng.choice(EN_INSULTS))
+
+    generators = [
+        ("en_clean", 0.30, lambda: rng.choice(EN_CLEAN)),
+        ("en_abusive", 0.20, english_abusive),
+        ("hi_devanagari", 0.12, lambda: rng.choice(HI_DEVANAGARI_CLEAN + HI_DEVANAGARI_ABUSIVE)),
+        ("hi_romanized", 0.15, lambda: rng.choice(HI_ROMAN_CLEAN + HI_ROMAN_ABUSIVE)),
+        ("leetspeak", 0.15, lambda: _leetspeak(english_abusive(), rng)),
+        ("long", 0.08, None),
+    ]
+    all_short = EN_CLEAN + HI_ROMAN_CLEAN + HI_DEVANAGARI_CLEAN + HI_ROMAN_ABUSIVE
+
+    corpus = []
+    weights = [weight for _, weight, _ in generators]
+    for index in range(size):
+        category, _, generate = rng.choices(generators, weights=weights)[0]
+        if category == "long":
+            content = rng.choice(all_short)
+            while len(content) < 1500:
+                content += ". " + (english_abusive() if rng.random() < 0.1 else rng.choice(all_short))
+            content = content[:2000]  # Discord message limit
+        else:
+            content = generate()
+        corpus.append({"id": index, "category": category, "content": content})
+    return corpus
+
+
+def load_corpus(path: str) -> List[Dict]:
+    """Load an anonymized corpus (plain text lines or JSONL)"""
+    corpus = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for index, line in enumerate(f):
+            line = line.rstrip("\n")
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                entry = json.loads(line)
+                content = entry.get("content") or entry.get("text") or ""
+                category = entry.get("category", "unlabeled")
+            else:
+                content, category = line, "unlabeled"
+            corpus.append({"id": index, "category": category, "content": content})
+    return corpus
+
+
+# ============= DETECTORS =============
+
+def load_detector(name: str):
+    """Create a detector instance and its analyze function"""
+    if name == "respect":
+        import abuse_detector
+        detector = abuse_detector.AbuseDetector()
+        return detector, detector.analyze_message
+    if name == "guardify":
+        import bot_enhanced
+        detector = bot_enhanced.AbuseDetector()
+        return detector, detector.analyze_message
+    if name == "content":
+        from content_detector import HindiEnglishContentDetector
+        detector = HindiEnglishContentDetector()
+        return detector, detector.analyze_content
+    raise ValueError(f"unknown detector '{name}'")
+
+
+def stage_targets(name: str, detector) -> List[Tuple[object, str, str, Optional[str]]]:
+    """
+    (owner, attribute, stage name, lazy result attribute) of the callables that make up a detector's stages
+
+    The lazy result attribute is read inside the stage, so work deferred to a
+    cached property (TextBlob.sentiment) is counted in the stage and not in "other".
+    """
+    if name == "content":
+        return [
+            (detector, "detect_language", "language_detection", None),
+            (detector, "check_better_profanity", "better_profanity", None),
+            (detector, "check_keyword_match", "keyword_match", None),
+            (detector, "check_pattern_match", "pattern_match", None),
+        ]
+    if name == "respect":
+        import abuse_detector
+        return [(abuse_detector, "TextBlob", "textblob_sentiment", "sentiment")]
+    if name == "guardify":
+        import bot_enhanced
+        return [
+            (bot_enhanced, "TextBlob", "textblob_sentiment", "sentiment"),
+            (detector.vader, "polarity_scores", "vader_sentiment", None),
+        ]
+    return []
+
+
+@contextmanager
+def timed_stages(targets: List[Tuple[object, str, str, Optional[str]]], totals: Dict[str, float]):
+    """Temporarily wrap stage callables to accumulate their run time"""
+    originals = []
+    for owner, attribute, stage, lazy in targets:
+        original = getattr(owner, attribute)
+        totals.setdefault(stage, 0.0)
+
+        def wrapper(*args, _original=original, _stage=stage, _lazy=lazy, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = _original(*args, **kwargs)
+                if _lazy:
+                    getattr(result, _lazy)
+                return result
+            finally:
+                totals[_stage] += time.perf_counter() - started
+
+        originals.append((owner, attribute, owner.__dict__.get(attribute, None), attribute in owner.__dict__))
+        setattr(owner, attribute, wrapper)
+    try:
+        yield
+    finally:
+        for owner, attribute, value, had_attribute in reversed(originals):
+            if had_attribute:
+                setattr(owner, attribute, value)
+            else:
+                delattr(owner, attribute)
+
+
+def verdict(name: str, result: Dict) -> List:
+    """The parts of a result that define the moderation outcome"""
+    if name == "content":
+        from content_detector import get_severity_level
+        return [result["is_offensive"], result["category"], get_severity_level(result["severity"])]
+    return [result["is_abusive"], result["severity"]]
+
+
+# ============= BENCHMARK =============
+
+def run_detector(name: str, corpus: List[Dict], repeat: int = 1) -> Dict:
+    """
+    Benchmark one detector on a corpus
+
+    Runs three passes: a timed pass for throughput, a pass with stage wrappers
+    for per-stage time, and a tracemalloc pass for memory. Flagged counts per
+    category are from the last throughput pass.
+
+    Returns:
+        Report with throughput, stages, memory, per-category stats and verdicts
+    """
+    detector, analyze = load_detector(name)
+    texts = [entry["content"] for entry in corpus]
+    analyze(texts[0])  # Warm up lazy imports and caches
+
+    # Throughput (per-message timing also gives per-category latency)
+    per_category = {}
+    started = time.perf_counter()
+    for _ in range(repeat):
+        results = []
+        for entry in corpus:
+            item_started = time.perf_counter()
+            results.append(analyze(entry["content"]))
+            stats = per_category.setdefault(entry["category"], {"messages": 0, "seconds": 0.0, "flagged": 0})
+            stats["messages"] += 1
+            stats["seconds"] += time.perf_counter() - item_started
+    elapsed = time.perf_counter() - started
+    messages = len(texts) * repeat
+
+    verdicts = {}
+    for entry, result in zip(corpus, results):
+        outcome = verdict(name, result)
+        per_category[entry["category"]]["flagged"] += bool(outcome[0])
+        verdicts[str(entry["id"])] = outcome
+    for stats in per_category.values():
+        stats["avg_ms"] = round(stats.pop("seconds") / stats["messages"] * 1000, 4)
+
+    # Per-stage time
+    stage_totals = {}
+    with timed_stages(stage_targets(name, detector), stage_totals):
+        stage_started = time.perf_counter()
+        for text in texts:
+            analyze(text)
+        stage_elapsed = time.perf_counter() - stage_started
+    stages = {stage: round(seconds / len(texts) * 1000, 4) for stage, seconds in stage_totals.items()}
+    stages["other"] = round(max(0.0, stage_elapsed - sum(stage_totals.values())) / len(texts) * 1000, 4)
+
+    # Memory
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for text in texts:
+        analyze(text)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "messages": messages,
+        "seconds": round(elapsed, 4),
+        "msgs_per_sec": round(messages / elapsed, 1) if elapsed else None,
+        "avg_ms": round(elapsed / messages * 1000, 4),
+        "stages_avg_ms": stages,
+        "memory": {
+            "peak_kib": round((peak - before) / 1024, 1),
+            "retained_kib": round((after - before) / 1024, 1)
+        },
+        "categories": per_category,
+        "flagged": sum(1 for v in verdicts.values() if v[0]),
+        "verdicts": verdicts
+    }
+
+
+def compare(report: Dict, baseline: Dict, max_slowdown: float = None) -> Dict:
+    """
+    Compare a benchmark report against a baseline report
+
+    Args:
+        report: Current report
+        baseline: Report saved earlier with --save-baseline
+        max_slowdown: Allowed throughput drop as a fraction (e.g. 0.2 = 20%)
+
+    Returns:
+        {"detectors": {name: {"verdict_diffs", "examples", "speedup", "slower"}}, "regression": bool}
+    """
+    result = {"detectors": {}, "regression": False}
+    if baseline.get("corpus") != report.get("corpus"):
+        result["warning"] = "corpus differs from the baseline - verdicts are compared by message id"
+
+    for name, current in report["detectors"].items():
+        previous = baseline.get("detectors", {}).get(name)
+        if previous is None:
+            continue
+
+        diffs = []
+        for message_id, outcome in current["verdicts"].items():
+            old = previous["verdicts"].get(message_id)
+            if old is not None and old != outcome:
+                diffs.append({"id": message_id, "baseline": old, "current": outcome})
+
+        speedup = None
+        if previous.get("msgs_per_sec") and current.get("msgs_per_sec"):
+            speedup = round(current["msgs_per_sec"] / previous["msgs_per_sec"], 3)
+        slower = max_slowdown is not None and speedup is not None and speedup < 1 - max_slowdown
+
+        result["detectors"][name] = {
+            "verdict_diffs": len(diffs),
+            "examples": diffs[:DIFF_EXAMPLES],
+            "speedup": speedup,
+            "slower": slower
+        }
+        if diffs or slower:
+            result["regression"] = True
+    return result
+
+
+def run_benchmark(corpus: List[Dict], detectors: List[str] = None, repeat: int = 1,
+                  corpus_label: Dict = None) -> Dict:
+    """Benchmark several detectors on the same corpus"""
+    report = {
+        "corpus": corpus_label or {"messages": len(corpus)},
+        "categories": dict(Counter(entry["category"] for entry in corpus)),
+        "python": sys.version.split()[0],
+        "detectors": {}
+    }
+    for name in detectors or DETECTORS:
+        report["detectors"][name] = run_detector(name, corpus, repeat)
+    return report
+
+
+def format_report(report: Dict, comparison: Optional[Dict] = None) -> str:
+    """Human readable summary"""
+    lines = [f"Corpus: {report['corpus']} {report['categories']}"]
+    for name, result in report["detectors"].items():
+        lines.append(f"\n[{name}] {result['msgs_per_sec']} msgs/sec, {result['avg_ms']} ms/msg, "
+                     f"flagged {result['flagged']}/{len(result['verdicts'])}, "
+                     f"peak {result['memory']['peak_kib']} KiB")
+        for stage, ms in sorted(result["stages_avg_ms"].items(), key=lambda kv: -kv[1]):
+            lines.append(f"    {stage:<22} {ms:8.4f} ms")
+        for category, stats in sorted(result["categories"].items()):
+            lines.append(f"    {category:<22} {stats['avg_ms']:8.4f} ms  flagged {stats['flagged']}/{stats['messages']}")
+        if comparison and name in comparison["detectors"]:
+            diff = comparison["detectors"][name]
+            lines.append(f"    vs baseline: speedup x{diff['speedup']}, {diff['verdict_diffs']} verdict diffs"
+                         + (" (SLOWER THAN ALLOWED)" if diff["slower"] else ""))
+            for example in diff["examples"][:5]:
+                lines.append(f"      #{example['id']}: {example['baseline']} -> {example['current']}")
+    if comparison:
+        lines.append("\nREGRESSION" if comparison["regression"] else "\nNo regressions against baseline")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    """Run the detector benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark Guardify detectors on a replay corpus")
+    parser.add_argument('--detectors', default=",".join(DETECTORS), help="Comma-separated detectors")
+    parser.add_argument('--corpus', help="Anonymized corpus file (.txt or .jsonl) instead of the synthetic one")
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE, help="Synthetic corpus size")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Synthetic corpus seed")
+    parser.add_argument('--repeat', type=int, default=1, help="Throughput passes over the corpus")
+    parser.add_argument('--baseline', help="Baseline report to compare against")
+    parser.add_argument('--save-baseline', help="Write this run as the new baseline")
+    parser.add_argument('--max-slowdown', type=float, default=None,
+                        help="Fail if throughput drops by more than this fraction vs the baseline")
+    parser.add_argument('--output', help="Write the full JSON report here")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+        label = {"file": os.path.basename(args.corpus), "messages": len(corpus)}
+    else:
+        corpus = generate_corpus(args.size, args.seed)
+        label = {"synthetic": True, "size": args.size, "seed": args.seed}
+
+    report = run_benchmark(corpus, [d.strip() for d in args.detectors.split(',') if d.strip()],
+                           args.repeat, label)
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            comparison = compare(report, json.load(f), args.max_slowdown)
+        report["comparison"] = comparison
+
+    print(format_report(report, comparison))
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    return 1 if comparison and comparison["regression"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,155 +4,44 @@ AI-enabled bot for detecting and logging abusive content in Discord messages.
 Enhanced with multilingual content detection and automatic warning/mute system.
 """
 
+import startup_trace  # Imported first so the startup trace covers the other imports
 import discord
 from discord.ext import commands
 import json
 import os
 from datetime import datetime, timedelta
-from textblob import TextBlob
-import re
 from typing import Dict, List, Optional
 from threading import Thread
-from flask import Flask
+from flask import Flask, Response, request
 import asyncio
+import logging
+import math
+import signal
 
 # Import new content detection and warning systems
-from content_detector import get_content_detector
+from abuse_detector import AbuseDetector
+from content_detector import get_content_detector, get_severity_level
 from warning_system import get_warning_manager, get_mute_role_manager
 from channel_logger import get_channel_logger
+from guild_cache import get_guild_cache
+from permission_rollout import get_rollout_manager
+from sharding import get_shard_config, prepare_state_file, is_sharded
+from detection_service import get_detection_client
+from lazy_imports import start_background_warmup, import_report
+from metrics import get_metrics
+from loop_watchdog import get_loop_watchdog
+from state_containers import BoundedState, get_state_registry, sweep_periodically
+from rollups import get_rollup_store, case_metrics
+from runtime_profiler import (get_runtime_profiler, memory_snapshot, format_memory_report, save_report,
+                              MAX_SECONDS as MAX_PROFILE_SECONDS, UPLOAD_LIMIT as PROFILE_UPLOAD_LIMIT)
+from structured_logging import get_logger, scan_sampler
+from health_server import publish_periodically, start_health_process, SNAPSHOT_FILE as HEALTH_SNAPSHOT_FILE
 
+log = get_logger("bot")
 
-class AbuseDetector:
-    """Detects abusive content using sentiment analysis and keyword matching."""
-    
-    # Configurable thresholds - MADE MORE SENSITIVE
-    SENTIMENT_THRESHOLD = -0.2  # Negative sentiment threshold (lowered for sensitivity)
-    KEYWORD_WEIGHT = 0.5
-    ABUSE_SCORE_THRESHOLD = 0.3  # Minimum score to classify as abusive (lowered)
-    
-    def __init__(self):
-        # Comprehensive list of abusive keywords/phrases
-        self.abusive_keywords = [
-            # Insults & Slurs
-            'hate', 'kill', 'stupid', 'idiot', 'loser', 'trash', 'garbage',
-            'worthless', 'pathetic', 'disgusting', 'die', 'kys', 'kms',
-            'retard', 'retarded', 'moron', 'dumb', 'dumbass', 'dummy',
-            'ugly', 'fat', 'fatty', 'nazi', 'pig', 'scum', 'filth',
-            'shit', 'crap', 'damn', 'hell', 'bastard', 'bitch',
-            'ass', 'asshole', 'fuck', 'fucking', 'fucked', 'fucker',
-            'motherfucker', 'wtf', 'stfu', 'shut up',
-            
-            # Threats & Violence
-            'hurt', 'harm', 'attack', 'beat', 'punch', 'kick',
-            'stab', 'shoot', 'murder', 'suicide', 'hang yourself',
-            'jump off', 'kll', 'k1ll', 'd1e', 'unalive',
-            
-            # Derogatory Terms
-            'n***a', 'n***er', 'f****t', 'f*g', 'gay' 'queer',
-            'tranny', 'dyke', 'chink', 'spic', 'wetback',
-            'cracker', 'honky', 'gook', 'savage', 'ape',
-            
-            # Bullying Terms
-            'cancer', 'tumor', 'disease', 'waste of space',
-            'nobody likes you', 'everyone hates you', 'useless',
-            'failure', 'embarrassment', 'joke', 'clown',
-            'braindead', 'brainless', 'no brain',
-            
-            # Common Variations & Leetspeak
-            'fuk', 'fck', 'sh1t', 'b1tch', 'a$$', 'a55',
-            'fvck', 'phuck', 'shtty', 'sucks', 'suck',
-            'noob', 'n00b', 'scrub', 'bot', 'trash player',
-            
-            # Toxic Phrases
-            'go die', 'kill yourself', 'end yourself', 'rope yourself',
-            'get cancer', 'get aids', 'neck yourself', 'off yourself',
-            'delete yourself', 'uninstall life', 'your mom', 'yo mama',
-            'ez', 'get rekt', 'trash talk', 'git gud', 'cope',
-            'seethe', 'mald', 'ratio', 'cry about it', 'cope harder',
-            
-            # Additional Offensive Terms
-            'simp', 'incel', 'neckbeard', 'virgin', 'whore',
-            'slut', 'thot', 'hoe', 'prostitute', 'hooker',
-            'cunt', 'twat', 'prick', 'dick', 'cock',
-            'balls', 'deez nuts', 'ligma', 'bofa',
-            
-            # Discriminatory
-            'racist', 'sexist', 'homophobic', 'transphobic',
-            'bigot', 'supremacist', 'fascist', 'terrorist'
-        ]
-        
-        # Patterns for detecting leetspeak and variations
-        self.abusive_patterns = [
-            (r'k+[i1!]l+', 'kill variations'),
-            (r'f+[u*]+c+k+', 'fuck variations'),
-            (r's+h+[i1!]+t+', 'shit variations'),
-            (r'b+[i1!]+t+c+h+', 'bitch variations'),
-            (r'n+[i1!]+g+', 'n-word variations'),
-            (r'f+[a@]+g+', 'slur variations'),
-            (r'st[u*0]+p[i1!]+d+', 'stupid variations'),
-            (r'd[u*0]+m+b*', 'dumb variations'),
-            (r'[i1!]+d+[i1!]+[o0]+t+', 'idiot variations'),
-            (r'go+ d+[i1!]+e+', 'death threats'),
-            (r'kys+', 'suicide encouragement'),
-            (r'u+r+ d+[u0]+m+', 'ur dumb variations'),
-        ]
-        
-    def analyze_message(self, content: str) -> Dict:
-        """
-        Analyze message for abusive content.
-        
-        Returns:
-            Dict containing abuse score, sentiment, detected keywords, and classification
-        """
-        content_lower = content.lower()
-        
-        # Sentiment analysis using TextBlob
-        blob = TextBlob(content)
-        sentiment = blob.sentiment.polarity
-        
-        # Keyword detection with word boundary matching
-        detected_keywords = []
-        for keyword in self.abusive_keywords:
-            # Use word boundaries to match whole words only
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            if re.search(pattern, content_lower):
-                detected_keywords.append(keyword)
-        
-        # Pattern detection for leetspeak and variations
-        detected_patterns = []
-        for pattern, description in self.abusive_patterns:
-            if re.search(pattern, content_lower, re.IGNORECASE):
-                detected_patterns.append(description)
-                detected_keywords.append(description)  # Count patterns as keywords too
-        
-        # Calculate abuse score
-        keyword_score = len(detected_keywords) * self.KEYWORD_WEIGHT
-        sentiment_score = abs(min(sentiment, 0))
-        
-        abuse_score = keyword_score + sentiment_score
-        
-        # Classification - More aggressive detection
-        is_abusive = (
-            abuse_score > self.ABUSE_SCORE_THRESHOLD or 
-            sentiment < self.SENTIMENT_THRESHOLD or
-            len(detected_keywords) > 0  # ANY keyword match = abusive
-        )
-        
-        severity = "low"
-        if abuse_score > 0.8 or len(detected_keywords) >= 3:
-            severity = "high"
-        elif abuse_score > 0.4 or len(detected_keywords) >= 2:
-            severity = "medium"
-        
-        return {
-            "is_abusive": is_abusive,
-            "abuse_score": round(abuse_score, 3),
-            "sentiment": round(sentiment, 3),
-            "detected_keywords": detected_keywords[:5],  # Limit display
-            "detected_patterns": detected_patterns,
-            "severity": severity,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+GUILD_METRIC_SERIES = 100  # guilds with their own offense counter and rate on /metrics
+
+startup_trace.checkpoint("imports")
 
 
 class ForensicsLogger:
@@ -300,41 +189,125 @@ class ForensicsLogger:
         return stats
 
 
-class RespectRanger(commands.Bot):
+class RespectRanger(commands.AutoShardedBot):
     """Main bot class for Guardify - Sapphire-like Discord Bot."""
     
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.abuse_detector = AbuseDetector()
+        with startup_trace.phase("discord_client"):
+            super().__init__(*args, **kwargs)
+        with startup_trace.phase("abuse_detector"):
+            self.abuse_detector = AbuseDetector()
         self.forensics_logger = ForensicsLogger()
         
         # Initialize new content detection and warning systems
-        self.content_detector = get_content_detector()
-        self.warning_manager = get_warning_manager()
-        self.mute_role_manager = get_mute_role_manager()
+        # When a shared detection service is configured, the in-process detector
+        # is only loaded if the service becomes unreachable
+        self.detection_client = get_detection_client()
+        if self.detection_client is None:
+            with startup_trace.phase("content_detector"):
+                self.content_detector = get_content_detector()
+        with startup_trace.phase("warning_manager"):
+            self.warning_manager = get_warning_manager()
+        with startup_trace.phase("mute_role_manager"):
+            self.mute_role_manager = get_mute_role_manager()
         self.channel_logger = get_channel_logger()
+        self.guild_cache = get_guild_cache()
+        with startup_trace.phase("permission_rollouts"):
+            self.permission_rollout = get_rollout_manager()
+        self.metrics = get_metrics()
+        self.rollups = get_rollup_store()
+        self.loop_watchdog = get_loop_watchdog(self.metrics)
+        self.scan_sampler = scan_sampler()
+        self.backends_warmed = False
         
         # Auto-mod settings
         self.spam_threshold = 5  # messages per 10 seconds
         self.caps_threshold = 0.7  # 70% caps in message
-        self.user_messages = {}  # Track message timestamps for spam detection
+        # Track message timestamps for spam detection (idle users are dropped after a minute)
+        self.user_messages = BoundedState("user_messages", max_entries=200000, ttl=60)
         
-        # Server configurations (saved per guild)
-        self.guild_configs = self.load_guild_configs()
+        # Server configurations (saved per guild, partitioned per shard)
+        self.guild_configs_file = prepare_state_file('guild_configs.json')
+        with startup_trace.phase("load_guild_configs"):
+            self.guild_configs = self.load_guild_configs()
         
         # Anti-raid protection
-        self.join_tracking = {}  # Track recent joins per guild
-        self.raid_mode = {}  # Track if guild is in raid mode
-        
-        # Verification system
-        self.pending_verifications = {}  # Users awaiting verification
-        
-        # Unmute scheduler - stores tasks for users to be unmuted
-        self.unmute_tasks = {}  # format: {guild_id:user_id: asyncio.Task}
+        self.join_tracking = BoundedState("join_tracking", max_entries=50000, ttl=60)  # Recent joins per guild
+        self.raid_mode = BoundedState("raid_mode", max_entries=50000, ttl=3600)  # Guilds in raid mode
+        
+        # Verification system - users awaiting verification
+        self.pending_verifications = BoundedState("pending_verifications", max_entries=200000, ttl=7 * 24 * 3600)
+        
+        # Unmute scheduler - stores tasks for users to be unmuted (finished tasks remove themselves)
+        self.unmute_tasks = BoundedState("unmute_tasks")  # format: {guild_id:user_id: asyncio.Task}
+        
+        # Link to the shard coordinator (set by shard_launcher.py)
+        self.shard_link = None
+        
+        # Queue depths and cache hit rates exposed on /metrics
+        # (read from the web thread - copy containers before iterating them)
+        self.metrics.register_gauge("pending_unmutes", lambda: len(self.unmute_tasks))
+        self.metrics.register_gauge("write_backlog", self._write_backlog, label="queue")
+        self.metrics.register_gauge("detection_batch_pending",
+                                    lambda: len(self.detection_client.pending) if self.detection_client else 0)
+        self.metrics.register_gauge("cache_hit_rate", self._cache_hit_rates, label="kind")
+        self.metrics.register_gauge("guilds", lambda: len(self.guilds))
+        # Per-guild offense series for the most recently active guilds only (the rest add up under "other")
+        for name in ("guild_offenses_total", "guild_offenses"):
+            self.metrics.bound_label(name, "guild_id", GUILD_METRIC_SERIES)
+        get_state_registry().register_gauges(self.metrics)
+    
+    async def setup_hook(self):
+        """Start the coordinator link when running as a shard process."""
+        startup_trace.checkpoint("login")
+        if self.shard_link:
+            self.shard_link.start(asyncio.get_running_loop())
+        # Measures loop lag and records the call sites of blocking callbacks
+        self.loop_watchdog.start()
+        # Drops expired per-user/per-guild state even when it isn't written to
+        self.state_sweeper = asyncio.create_task(sweep_periodically())
+        # Per-minute/hour/day counts for the dashboard charts
+        self.rollup_saver = asyncio.create_task(self.rollups.save_periodically())
+        # Removes warnings older than each guild's expiry window (!warnexpiry)
+        self.warning_compactor = asyncio.create_task(self.warning_manager.compact_periodically())
+        # Health and metrics for the separate health server process (the coordinator serves them when sharded)
+        if not is_sharded():
+            self.health_publisher = asyncio.create_task(
+                publish_periodically(self.health_snapshot, HEALTH_SNAPSHOT_FILE))
+        # Graceful shutdown on SIGTERM (platform stop/redeploy): flush digests and rollups, then disconnect
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.ensure_future(self.close()))
+        except (NotImplementedError, RuntimeError):
+            pass  # no signal handlers on Windows event loops
+    
+    def health_snapshot(self) -> Dict:
+        """Health and metrics published for the health server process"""
+        return {
+            "health": {
+                "status": "online",
+                "bot": str(self.user) if self.is_ready() else "connecting",
+                "guilds": len(self.guilds),
+                "latency_ms": None if math.isnan(self.latency) else round(self.latency * 1000, 1)
+            },
+            "metrics": self.metrics.snapshot(),
+            "metrics_text": self.metrics.render_prometheus()
+        }
+    
+    def _write_backlog(self) -> Dict[str, int]:
+        """Work queued for later writes, per queue"""
+        return {
+            "log_digest": sum(len(events) for events in list(self.channel_logger.digest_buffers.values())),
+            "permission_rollout": sum(len(r["pending"]) for r in list(self.permission_rollout.rollouts.values()))
+        }
+    
+    def _cache_hit_rates(self) -> Dict[str, float]:
+        """Hit rate per resolve cache kind"""
+        stats = self.guild_cache.get_stats()
+        return {kind: stats[kind]["hit_rate"] for kind in ["channel", "role", "config", "overall"]}
     
     def load_guild_configs(self) -> Dict:
         """Load guild-specific configurations."""
-        config_file = 'guild_configs.json'
+        config_file = self.guild_configs_file
         if os.path.exists(config_file):
             with open(config_file, 'r') as f:
                 return json.load(f)
@@ -342,8 +315,10 @@ class RespectRanger(commands.Bot):
     
     def save_guild_configs(self):
         """Save guild configurations."""
-        with open('guild_configs.json', 'w') as f:
+        with open(self.guild_configs_file, 'w') as f:
             json.dump(self.guild_configs, f, indent=2)
+        # Config values may have changed - re-parse on next lookup
+        self.guild_cache.invalidate_config()
     
     def get_guild_config(self, guild_id: str) -> Dict:
         """Get config for specific guild with defaults."""
@@ -367,15 +342,9 @@ class RespectRanger(commands.Bot):
     
     async def on_ready(self):
         """Called when the bot is ready."""
-        print('=' * 60)
-        print(f'🛡️  {self.user} is now ONLINE!')
-        print('=' * 60)
-        print(f'📊 Active in {len(self.guilds)} servers')
-        print(f'👥 Protecting {sum(g.member_count for g in self.guilds)} members')
-        print(f'🤖 Auto-moderation: ENABLED')
-        print(f'🔒 Anti-raid protection: ENABLED')
-        print(f'📝 Activity logging: ENABLED')
-        print('=' * 60)
+        log.info(f"{self.user} is now ONLINE", guilds=len(self.guilds),
+                 members=sum(g.member_count or 0 for g in self.guilds),
+                 auto_moderation=True, anti_raid=True, activity_logging=True)
         
         # Set bot activity status
         activity = discord.Activity(
@@ -384,6 +353,15 @@ class RespectRanger(commands.Bot):
         )
         await self.change_presence(activity=activity, status=discord.Status.online)
         
+        # Resume mute role permission rollouts interrupted by a restart
+        self.permission_rollout.resume_all(self)
+        
+        # Import NLP backends off the event loop now that the gateway is connected
+        if not self.backends_warmed:
+            self.backends_warmed = True
+            startup_trace.finish("on_ready")
+            start_background_warmup()
+        
         # Log bot startup
         self.forensics_logger.log_activity("bot_startup", {
             "bot_name": str(self.user),
@@ -395,6 +373,7 @@ class RespectRanger(commands.Bot):
         """Handle member joins with welcome, auto-role, verification, and anti-raid."""
         guild_id = str(member.guild.id)
         config = self.get_guild_config(guild_id)
+        config_ids = self.guild_cache.get_config_ids(guild_id, config)
         
         # Log join
         self.forensics_logger.log_activity("member_join", {
@@ -403,9 +382,9 @@ class RespectRanger(commands.Bot):
             "guild_id": guild_id,
             "guild_name": member.guild.name,
             "account_created": member.created_at.isoformat(),
-            "account_age_days": (datetime.utcnow() - member.created_at).days
+            "account_age_days": (discord.utils.utcnow() - member.created_at).days
         })
-        print(f"[MEMBER JOIN] {member} joined {member.guild.name}")
+        log.info("Member joined", user=str(member), guild=member.guild.name, guild_id=guild_id)
         
         # Anti-raid detection
         if config.get('anti_raid', True):
@@ -426,12 +405,13 @@ class RespectRanger(commands.Bot):
             if len(self.join_tracking[guild_id]) > raid_threshold:
                 if not self.raid_mode.get(guild_id, False):
                     self.raid_mode[guild_id] = True
-                    print(f"[RAID DETECTED] {member.guild.name} - {len(self.join_tracking[guild_id])} joins in 10s")
+                    log.warning("Raid detected", guild=member.guild.name, guild_id=guild_id,
+                                joins_in_10s=len(self.join_tracking[guild_id]))
                     
                     # Alert in log channel
-                    if config.get('log_channel'):
+                    if config_ids['log_channel']:
                         try:
-                            log_channel = member.guild.get_channel(int(config['log_channel']))
+                            log_channel = self.guild_cache.get_channel(member.guild, config_ids['log_channel'])
                             if log_channel:
                                 embed = discord.Embed(
                                     title="🚨 RAID DETECTED",
@@ -444,10 +424,10 @@ class RespectRanger(commands.Bot):
                             pass
         
         # Check account age (new accounts might be suspicious)
-        account_age = (datetime.utcnow() - member.created_at).days
-        if account_age < 7 and config.get('log_channel'):
+        account_age = (discord.utils.utcnow() - member.created_at).days
+        if account_age < 7 and config_ids['log_channel']:
             try:
-                log_channel = member.guild.get_channel(int(config['log_channel']))
+                log_channel = self.guild_cache.get_channel(member.guild, config_ids['log_channel'])
                 if log_channel:
                     embed = discord.Embed(
                         title="⚠️ New Account Alert",
@@ -462,18 +442,18 @@ class RespectRanger(commands.Bot):
                 pass
         
         # Auto-role assignment
-        if config.get('autorole'):
+        if config_ids['autorole']:
             try:
-                role = member.guild.get_role(int(config['autorole']))
+                role = self.guild_cache.get_role(member.guild, config_ids['autorole'])
                 if role:
                     await member.add_roles(role, reason="Auto-role on join")
             except:
                 pass
         
         # Verification system
-        if config.get('verification_enabled') and config.get('verification_role'):
+        if config.get('verification_enabled') and config_ids['verification_role']:
             try:
-                verify_role = member.guild.get_role(int(config['verification_role']))
+                verify_role = self.guild_cache.get_role(member.guild, config_ids['verification_role'])
                 if verify_role:
                     await member.add_roles(verify_role, reason="Pending verification")
                     self.pending_verifications[str(member.id)] = {
@@ -493,12 +473,12 @@ class RespectRanger(commands.Bot):
                     except:
                         pass
             except Exception as e:
-                print(f"[ERROR] Verification failed: {e}")
+                log.error(f"Verification failed: {e}", guild_id=guild_id)
         
         # Send welcome message
-        if config.get('welcome_channel'):
+        if config_ids['welcome_channel']:
             try:
-                channel = member.guild.get_channel(int(config['welcome_channel']))
+                channel = self.guild_cache.get_channel(member.guild, config_ids['welcome_channel'])
                 if channel:
                     message = config.get('welcome_message', 'Welcome {user} to {server}! 🎉')
                     message = message.replace('{user}', member.mention)
@@ -513,12 +493,13 @@ class RespectRanger(commands.Bot):
                     embed.set_footer(text=f"Member #{member.guild.member_count}")
                     await channel.send(embed=embed)
             except Exception as e:
-                print(f"[ERROR] Welcome message failed: {e}")
+                log.error(f"Welcome message failed: {e}", guild_id=guild_id)
     
     async def on_member_remove(self, member: discord.Member):
         """Handle member leave with goodbye message and logging."""
         guild_id = str(member.guild.id)
         config = self.get_guild_config(guild_id)
+        config_ids = self.guild_cache.get_config_ids(guild_id, config)
         
         # Log leave
         self.forensics_logger.log_activity("member_leave", {
@@ -528,12 +509,12 @@ class RespectRanger(commands.Bot):
             "guild_name": member.guild.name,
             "roles": [str(role.name) for role in member.roles if role.name != "@everyone"]
         })
-        print(f"[MEMBER LEAVE] {member} left {member.guild.name}")
+        log.info("Member left", user=str(member), guild=member.guild.name, guild_id=guild_id)
         
         # Send goodbye message
-        if config.get('welcome_channel'):
+        if config_ids['welcome_channel']:
             try:
-                channel = member.guild.get_channel(int(config['welcome_channel']))
+                channel = self.guild_cache.get_channel(member.guild, config_ids['welcome_channel'])
                 if channel:
                     message = config.get('goodbye_message', 'Goodbye {user}! We\'ll miss you. 👋')
                     message = message.replace('{user}', str(member))
@@ -546,7 +527,7 @@ class RespectRanger(commands.Bot):
                     embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
                     await channel.send(embed=embed)
             except Exception as e:
-                print(f"[ERROR] Goodbye message failed: {e}")
+                log.error(f"Goodbye message failed: {e}", guild_id=guild_id)
         
         # Remove from verification tracking if pending
         if str(member.id) in self.pending_verifications:
@@ -593,12 +574,37 @@ class RespectRanger(commands.Bot):
     
     async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
         """Log when a channel is deleted."""
+        self.guild_cache.invalidate_channel(channel.guild.id, channel.id)
         self.forensics_logger.log_activity("channel_delete", {
             "channel_id": str(channel.id),
             "channel_name": str(channel),
             "guild_id": str(channel.guild.id)
         })
     
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        """Drop the cached channel when it changes."""
+        self.guild_cache.invalidate_channel(after.guild.id, after.id)
+    
+    async def on_guild_role_create(self, role: discord.Role):
+        """Drop cached roles (name lookups may now resolve differently)."""
+        self.guild_cache.invalidate_roles(role.guild.id)
+    
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        """Drop cached roles when a role changes."""
+        self.guild_cache.invalidate_roles(after.guild.id)
+    
+    async def on_guild_role_delete(self, role: discord.Role):
+        """Drop cached roles when a role is deleted."""
+        self.guild_cache.invalidate_roles(role.guild.id)
+    
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild):
+        """Drop everything cached for a guild when it changes."""
+        self.guild_cache.invalidate_guild(after.id)
+    
+    async def on_guild_remove(self, guild: discord.Guild):
+        """Drop everything cached for a guild the bot left."""
+        self.guild_cache.invalidate_guild(guild.id)
+    
     async def on_member_ban(self, guild: discord.Guild, user: discord.User):
         """Log when a member is banned."""
         self.forensics_logger.log_activity("member_ban", {
@@ -607,7 +613,7 @@ class RespectRanger(commands.Bot):
             "guild_id": str(guild.id),
             "guild_name": guild.name
         })
-        print(f"[BAN] {user} was banned from {guild.name}")
+        log.info("Member banned", user=str(user), guild=guild.name, guild_id=guild.id)
     
     async def on_member_unban(self, guild: discord.Guild, user: discord.User):
         """Log when a member is unbanned."""
@@ -617,7 +623,7 @@ class RespectRanger(commands.Bot):
             "guild_id": str(guild.id),
             "guild_name": guild.name
         })
-        print(f"[UNBAN] {user} was unbanned from {guild.name}")
+        log.info("Member unbanned", user=str(user), guild=guild.name, guild_id=guild.id)
     
     def check_spam(self, user_id: int) -> bool:
         """Check if user is spamming."""
@@ -664,18 +670,30 @@ class RespectRanger(commands.Bot):
         
         guild_id = str(message.guild.id)
         user_id = str(message.author.id)
+        timer = self.metrics.timer("on_message")
+        self.metrics.inc("messages_scanned_total")
+        self.metrics.mark("messages")
         
         # ===== ENHANCED CONTENT DETECTION =====
         # Use the new multilingual content detector
-        advanced_analysis = self.content_detector.analyze_content(message.content)
+        if self.detection_client is not None:
+            advanced_analysis = await self.detection_client.analyze("content", message.content)
+        else:
+            advanced_analysis = self.content_detector.analyze_content(message.content)
+        timer.lap("detection")
         
-        print(f"[MESSAGE SCAN] {message.author} in {message.guild.name}: '{message.content[:60]}' "
-              f"| Offensive: {advanced_analysis['is_offensive']} | "
-              f"Category: {advanced_analysis['category']} | "
-              f"Severity: {advanced_analysis['severity']:.2f}")
+        # Per-message line: DEBUG, plus a sampled share at INFO (GUARDIFY_SCAN_LOG_SAMPLE_RATE)
+        scan_level = logging.INFO if self.scan_sampler() else logging.DEBUG
+        if log.isEnabledFor(scan_level):
+            log.log(scan_level, "Message scanned", user=str(message.author), guild=message.guild.name,
+                    content=message.content[:60], offensive=advanced_analysis['is_offensive'],
+                    category=advanced_analysis['category'], severity=round(advanced_analysis['severity'], 2))
         
         # Check for spam
-        if self.check_spam(message.author.id):
+        is_spam = self.check_spam(message.author.id)
+        timer.lap("spam_check")
+        if is_spam:
+            self.metrics.inc("automod_actions_total", action="spam_timeout")
             try:
                 await message.delete()
                 embed = discord.Embed(
@@ -688,13 +706,18 @@ class RespectRanger(commands.Bot):
                 
                 # Timeout for 2 minutes for spamming
                 await message.author.timeout(timedelta(minutes=2), reason="Auto-mod: Spamming")
-                print(f"[SPAM] {message.author} timed out for spamming")
+                log.info("Spammer timed out", user=str(message.author), guild_id=guild_id)
+                timer.lap("discord_spam_action")
+                timer.finish()
                 return
             except Exception as e:
-                print(f"[ERROR] Spam action failed: {e}")
+                log.error(f"Spam action failed: {e}", guild_id=guild_id)
         
         # Check for excessive caps
-        if self.check_excessive_caps(message.content):
+        is_caps = self.check_excessive_caps(message.content)
+        timer.lap("caps_check")
+        if is_caps:
+            self.metrics.inc("automod_actions_total", action="caps_delete")
             try:
                 await message.delete()
                 embed = discord.Embed(
@@ -704,12 +727,20 @@ class RespectRanger(commands.Bot):
                 )
                 warning_msg = await message.channel.send(embed=embed)
                 await warning_msg.delete(delay=5)
+                timer.lap("discord_caps_action")
+                timer.finish()
                 return
             except Exception as e:
-                print(f"[ERROR] Caps filter action failed: {e}")
+                log.error(f"Caps filter action failed: {e}", guild_id=guild_id)
         
         # ===== ENHANCED ABUSE MODERATION =====
         if advanced_analysis['is_offensive']:
+            self.metrics.inc("detections_total", category=advanced_analysis['category'],
+                             severity=get_severity_level(advanced_analysis['severity']))
+            self.metrics.inc("guild_offenses_total", guild_id=guild_id)
+            self.metrics.mark("guild_offenses", guild_id=guild_id)
+            timer.skip()
+            
             # Log evidence with new system
             self.forensics_logger.log_evidence(message, {
                 "is_abusive": True,
@@ -717,29 +748,38 @@ class RespectRanger(commands.Bot):
                 "sentiment": 0.0,
                 "detected_keywords": advanced_analysis['detected_content'],
                 "detected_patterns": advanced_analysis['pattern_matches'],
-                "severity": self.content_detector.get_severity_level(advanced_analysis['severity']),
+                "severity": get_severity_level(advanced_analysis['severity']),
+                "category": advanced_analysis['category'],
                 "timestamp": datetime.utcnow().isoformat()
             })
+            self.rollups.record(guild_id, case_metrics({"severity": get_severity_level(advanced_analysis['severity'])},
+                                                       advanced_analysis['category']))
+            timer.lap("evidence_log")
             
-            print(f"[OFFENSIVE CONTENT DETECTED] {message.author}: {message.content[:60]}... "
-                  f"Category: {advanced_analysis['category']} | "
-                  f"Severity: {advanced_analysis['severity']:.2f} | "
-                  f"Detected: {advanced_analysis['detected_content']}")
+            log.info("Offensive content detected", user=str(message.author), guild_id=guild_id,
+                     content=message.content[:60], category=advanced_analysis['category'],
+                     severity=round(advanced_analysis['severity'], 2),
+                     detected=advanced_analysis['detected_content'])
             
             try:
                 # Delete the offensive message
                 await message.delete()
+                timer.lap("discord_delete")
                 
                 # Add warning via warning manager
                 warning_count = self.warning_manager.add_warning(
                     user_id=user_id,
                     guild_id=guild_id,
                     reason=f"{advanced_analysis['category'].upper()} detected ({advanced_analysis['detected_content']})",
-                    severity=self.content_detector.get_severity_level(advanced_analysis['severity']),
+                    severity=get_severity_level(advanced_analysis['severity']),
                     content=message.content[:200]
                 )
+                timer.lap("warning_persist")
+                self.metrics.inc("automod_actions_total", action="warning")
+                self.rollups.record(guild_id, {"warnings": 1})
                 
-                print(f"[WARNING ADDED] {message.author} now has {warning_count}/5 warnings in {message.guild.name}")
+                log.info("Warning added", user=str(message.author), guild=message.guild.name,
+                         guild_id=guild_id, warnings=warning_count)
                 
                 # Create warning embed
                 embed = discord.Embed(
@@ -748,7 +788,7 @@ class RespectRanger(commands.Bot):
                     color=discord.Color.orange()
                 )
                 embed.add_field(name="Category", value=advanced_analysis['category'].upper(), inline=True)
-                embed.add_field(name="Severity", value=self.content_detector.get_severity_level(advanced_analysis['severity']), inline=True)
+                embed.add_field(name="Severity", value=get_severity_level(advanced_analysis['severity']), inline=True)
                 embed.add_field(name="Warnings", value=f"**{warning_count}/5**", inline=False)
                 
                 # Check if user should be muted (5 warnings = auto-mute)
@@ -756,6 +796,7 @@ class RespectRanger(commands.Bot):
                     # Create mute record
                     mute_record = self.warning_manager.create_mute(user_id, guild_id, duration_minutes=10,
                                                                    reason="Auto-mod: 5 warnings reached")
+                    self.rollups.record(guild_id, {"mutes": 1})
                     
                     try:
                         # Try to apply timeout via Discord timeout feature
@@ -769,24 +810,26 @@ class RespectRanger(commands.Bot):
                         # Schedule unmute task
                         await self._schedule_unmute(message.guild, message.author, guild_id, 10)
                         
-                        print(f"[AUTO-MUTE] {message.author} muted for 10 minutes (5 warnings)")
+                        log.info("Auto-muted for 10 minutes (5 warnings)", user=str(message.author), guild_id=guild_id)
+                        self.metrics.inc("automod_actions_total", action="mute")
                         
                     except discord.Forbidden:
                         embed.add_field(name="Note", value="⚠️ Unable to mute user (insufficient permissions)", inline=False)
-                        print(f"[ERROR] Cannot mute {message.author} - missing permissions")
+                        log.error("Cannot mute - missing permissions", user=str(message.author), guild_id=guild_id)
                     except Exception as e:
-                        print(f"[ERROR] Auto-mute failed: {e}")
+                        log.error(f"Auto-mute failed: {e}", guild_id=guild_id)
                 else:
                     remaining = 5 - warning_count
                     embed.add_field(name="⚠️ Warning", 
                                   value=f"You will be muted after {remaining} more warning(s)", 
                                   inline=False)
+                timer.lap("mute")
                 
                 # Send warning message in channel (KEEP MESSAGE - don't delete)
                 try:
                     warning_msg = await message.channel.send(embed=embed)
                     # Log to dedicated channel
-                    severity_level = self.content_detector.get_severity_level(advanced_analysis['severity'])
+                    severity_level = get_severity_level(advanced_analysis['severity'])
                     await self.channel_logger.log_warning(
                         message.guild,
                         message.author,
@@ -795,7 +838,8 @@ class RespectRanger(commands.Bot):
                         severity_level
                     )
                 except discord.Forbidden:
-                    print(f"[ERROR] Cannot send warning message - missing permissions")
+                    log.error("Cannot send warning message - missing permissions", guild_id=guild_id)
+                timer.lap("discord_notify")
                 
                 # Try to DM the user
                 try:
@@ -807,7 +851,7 @@ class RespectRanger(commands.Bot):
                     dm_embed.add_field(name="Detected Content", 
                                      value=advanced_analysis['category'].upper(), inline=False)
                     dm_embed.add_field(name="Severity", 
-                                     value=self.content_detector.get_severity_level(advanced_analysis['severity']), 
+                                     value=get_severity_level(advanced_analysis['severity']), 
                                      inline=False)
                     dm_embed.add_field(name="Warnings", value=f"{warning_count}/5", inline=False)
                     if warning_count >= 5:
@@ -816,14 +860,18 @@ class RespectRanger(commands.Bot):
                     await message.author.send(embed=dm_embed)
                 except:
                     pass  # User has DMs disabled
+                timer.lap("discord_dm")
                     
             except discord.Forbidden:
-                print(f"[ERROR] Cannot delete message - missing permissions")
+                log.error("Cannot delete message - missing permissions", guild_id=guild_id)
             except Exception as e:
-                print(f"[ERROR] Auto-mod failed: {e}")
+                log.error(f"Auto-mod failed: {e}", guild_id=guild_id)
+            timer.skip()
         
         # Process commands
         await self.process_commands(message)
+        timer.lap("commands")
+        timer.finish()
     
     async def _assign_mute_role(self, guild: discord.Guild, member: discord.Member, guild_id: str):
         """Assign mute role to a user"""
@@ -832,7 +880,7 @@ class RespectRanger(commands.Bot):
             
             if not mute_role_id:
                 # Try to create or find mute role
-                mute_role = discord.utils.find(lambda r: r.name.lower() == "muted", guild.roles)
+                mute_role = self.guild_cache.find_role(guild, "muted")
                 
                 if not mute_role:
                     # Create mute role
@@ -842,29 +890,21 @@ class RespectRanger(commands.Bot):
                         reason="Auto-mod: Mute role for warnings"
                     )
                     
-                    # Restrict permissions on mute role in all channels
-                    for channel in guild.channels:
-                        try:
-                            await channel.set_permissions(
-                                mute_role,
-                                send_messages=False,
-                                speak=False,
-                                reason="Mute role permissions"
-                            )
-                        except:
-                            pass
+                    # Restrict permissions on mute role in all channels in the background -
+                    # the member is already timed out, so the mute applies immediately
+                    self.permission_rollout.start_rollout(guild, mute_role)
                 
                 # Save mute role
                 self.mute_role_manager.set_mute_role(guild_id, str(mute_role.id))
             else:
-                mute_role = guild.get_role(int(mute_role_id))
+                mute_role = self.guild_cache.get_role(guild, mute_role_id)
             
             if mute_role:
                 await member.add_roles(mute_role, reason="Auto-mod: Warning threshold reached")
                 self.warning_manager.mark_mute_role_assigned(str(member.id), guild_id)
-                print(f"[MUTE ROLE] Assigned mute role to {member} in {guild.name}")
+                log.info("Assigned mute role", user=str(member), guild=guild.name, guild_id=guild_id)
         except Exception as e:
-            print(f"[ERROR] Failed to assign mute role: {e}")
+            log.error(f"Failed to assign mute role: {e}", guild_id=guild_id)
     
     async def _schedule_unmute(self, guild: discord.Guild, member: discord.Member, 
                               guild_id: str, minutes: int):
@@ -891,7 +931,7 @@ class RespectRanger(commands.Bot):
                     try:
                         mute_role_id = self.mute_role_manager.get_mute_role(guild_id)
                         if mute_role_id:
-                            mute_role = guild.get_role(int(mute_role_id))
+                            mute_role = self.guild_cache.get_role(guild, mute_role_id)
                             if mute_role and mute_role in member.roles:
                                 await member.remove_roles(mute_role, reason="Auto-unmute: Warning timeout expired")
                     except:
@@ -900,19 +940,36 @@ class RespectRanger(commands.Bot):
                     # Update mute record
                     self.warning_manager.end_mute(str(member.id), guild_id)
                     
-                    print(f"[AUTO-UNMUTE] {member} has been unmuted in {guild.name}")
+                    log.info("Auto-unmuted", user=str(member), guild=guild.name, guild_id=guild_id)
                     
                 except asyncio.CancelledError:
-                    print(f"[INFO] Unmute task for {member} was cancelled")
+                    log.debug("Unmute task cancelled", user=str(member), guild_id=guild_id)
                 except Exception as e:
-                    print(f"[ERROR] Unmute task failed for {member}: {e}")
+                    log.error(f"Unmute task failed: {e}", user=str(member), guild_id=guild_id)
             
             # Create and store the task
             task = asyncio.create_task(unmute_user())
             self.unmute_tasks[mute_key] = task
+            task.add_done_callback(
+                lambda t: self.unmute_tasks.pop(mute_key, None) if self.unmute_tasks.get(mute_key) is t else None)
             
         except Exception as e:
-            print(f"[ERROR] Failed to schedule unmute: {e}")
+            log.error(f"Failed to schedule unmute: {e}", guild_id=guild_id)
+
+    async def close(self):
+        """Flush pending log digests before disconnecting."""
+        try:
+            await self.channel_logger.flush_all_digests(self.guilds)
+        except Exception as e:
+            log.error(f"Failed to flush log digests: {e}")
+        if self.detection_client is not None:
+            await self.detection_client.close()
+        if self.rollups.dirty:
+            try:
+                self.rollups.save()
+            except Exception as e:
+                log.error(f"Failed to save rollups: {e}")
+        await super().close()
 
 
 
@@ -924,7 +981,13 @@ intents.messages = True
 intents.guilds = True
 intents.members = True
 
-bot = RespectRanger(command_prefix='!', intents=intents)
+# Shard assignment comes from the environment when started by shard_launcher.py
+shard_ids, shard_count = get_shard_config()
+with startup_trace.phase("construct_bot"):
+    if shard_ids is not None:
+        bot = RespectRanger(command_prefix='!', intents=intents, shard_ids=shard_ids, shard_count=shard_count)
+    else:
+        bot = RespectRanger(command_prefix='!', intents=intents)
 
 
 @bot.command(name='scan')
@@ -1022,12 +1085,23 @@ async def statistics(ctx):
 
 @bot.command(name='warnings')
 @commands.has_permissions(manage_messages=True)
-async def check_warnings(ctx, member: discord.Member):
+async def check_warnings(ctx, member: discord.Member = None):
     """
-    Check warnings for a user in this server.
+    Check warnings for a user in this server, or list the most warned users.
     Usage: !warnings @user
+           !warnings
     """
     guild_id = str(ctx.guild.id)
+    if member is None:
+        top = bot.warning_manager.top_warned(guild_id, limit=10)
+        embed = discord.Embed(
+            title="⚠️ Most Warned Users",
+            description="\n".join(f"**{rank}.** <@{entry['user_id']}> - {entry['count']} warning(s)"
+                                  for rank, entry in enumerate(top, 1)) or "No warnings recorded in this server. ✅",
+            color=discord.Color.orange() if top else discord.Color.green()
+        )
+        await ctx.send(embed=embed)
+        return
     user_id = str(member.id)
     warning_count = bot.warning_manager.get_warning_count(user_id, guild_id)
     warnings_list = bot.warning_manager.get_warnings(user_id, guild_id, limit=10)
@@ -1079,6 +1153,7 @@ async def manual_warn(ctx, member: discord.Member, *, reason: str = "No reason p
         severity="medium",
         content=""
     )
+    bot.rollups.record(guild_id, {"warnings": 1})
     
     embed = discord.Embed(
         title="⚠️ Manual Warning Added",
@@ -1105,7 +1180,7 @@ async def manual_warn(ctx, member: discord.Member, *, reason: str = "No reason p
         "MEDIUM"
     )
     
-    print(f"[MANUAL WARNING] {ctx.author} warned {member} in {ctx.guild.name}: {reason}")
+    log.info("Manual warning", moderator=str(ctx.author), user=str(member), guild_id=ctx.guild.id, reason=reason)
 
 
 @bot.command(name='clearwarnings')
@@ -1132,7 +1207,7 @@ async def clear_warnings(ctx, member: discord.Member):
         # Log to channel logger
         await bot.channel_logger.log_clearwarnings(ctx.guild, member, ctx.author)
         
-        print(f"[CLEAR WARNINGS] {ctx.author} cleared warnings for {member} in {ctx.guild.name}")
+        log.info("Warnings cleared", moderator=str(ctx.author), user=str(member), guild_id=ctx.guild.id)
     else:
         await ctx.send(f"⚠️ No warnings found for {member.mention}")
 
@@ -1150,6 +1225,7 @@ async def force_mute(ctx, member: discord.Member, minutes: int = 10, *, reason:
     try:
         # Create mute record
         bot.warning_manager.create_mute(user_id, guild_id, duration_minutes=minutes, reason=reason)
+        bot.rollups.record(guild_id, {"mutes": 1})
         
         # Apply timeout
         await member.timeout(timedelta(minutes=minutes), reason=f"{reason} | Muted by {ctx.author}")
@@ -1173,7 +1249,8 @@ async def force_mute(ctx, member: discord.Member, minutes: int = 10, *, reason:
         # Log to channel logger
         await bot.channel_logger.log_mute(ctx.guild, member, minutes, reason)
         
-        print(f"[FORCE MUTE] {ctx.author} muted {member} for {minutes}min in {ctx.guild.name}: {reason}")
+        log.info("Manual mute", moderator=str(ctx.author), user=str(member), guild_id=ctx.guild.id,
+                 minutes=minutes, reason=reason)
         
     except discord.Forbidden:
         await ctx.send("❌ I don't have permission to mute this member!")
@@ -1198,7 +1275,7 @@ async def manual_unmute(ctx, member: discord.Member):
         # Remove mute role
         mute_role_id = bot.mute_role_manager.get_mute_role(guild_id)
         if mute_role_id:
-            mute_role = ctx.guild.get_role(int(mute_role_id))
+            mute_role = bot.guild_cache.get_role(ctx.guild, mute_role_id)
             if mute_role and mute_role in member.roles:
                 await member.remove_roles(mute_role, reason=f"Unmuted by {ctx.author}")
         
@@ -1216,7 +1293,7 @@ async def manual_unmute(ctx, member: discord.Member):
         # Log to channel logger
         await bot.channel_logger.log_unmute(ctx.guild, member)
         
-        print(f"[MANUAL UNMUTE] {ctx.author} unmuted {member} in {ctx.guild.name}")
+        log.info("Manual unmute", moderator=str(ctx.author), user=str(member), guild_id=ctx.guild.id)
         
     except discord.Forbidden:
         await ctx.send("❌ I don't have permission to unmute this member!")
@@ -1254,9 +1331,54 @@ async def warning_statistics(ctx):
         inline=False
     )
     
+    top = bot.warning_manager.top_warned(guild_id, limit=5)
+    if top:
+        embed.add_field(
+            name="Most Warned Users",
+            value="\n".join(f"<@{entry['user_id']}> - {entry['count']}" for entry in top),
+            inline=False
+        )
+    
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = (today - timedelta(days=6) - datetime(1970, 1, 1)).total_seconds()
+    week = bot.warning_manager.stats.bucket_counts(guild_id, start, start + 7 * 86400 - 1)
+    if any(week['counts']):
+        embed.add_field(
+            name="Last 7 Days",
+            value=" | ".join(f"{datetime.utcfromtimestamp(day):%a}: {count}"
+                             for day, count in zip(week['timestamps'], week['counts'])),
+            inline=False
+        )
+    
     await ctx.send(embed=embed)
 
 
+@bot.command(name='warnexpiry')
+@commands.has_permissions(administrator=True)
+async def warning_expiry(ctx, days: Optional[int] = None):
+    """
+    Set how long warnings count towards the auto-mute.
+    Usage: !warnexpiry [days]
+    
+    Without days, shows the current setting. 0 keeps warnings forever.
+    """
+    guild_id = str(ctx.guild.id)
+    if days is None:
+        current = bot.warning_manager.get_warning_expiry(guild_id)
+        await ctx.send(f"⏳ Warnings expire after **{current} days**." if current
+                       else "⏳ Warnings never expire. Use `!warnexpiry <days>` to set a window.")
+        return
+    if days < 0:
+        await ctx.send("❌ Days must be 0 or more.")
+        return
+    
+    bot.warning_manager.set_warning_expiry(guild_id, days)
+    if days:
+        await ctx.send(f"✅ Warnings now expire after **{days} days** and no longer count towards the auto-mute.")
+    else:
+        await ctx.send("✅ Warnings no longer expire.")
+
+
 @bot.command(name='setmuterole')
 @commands.has_permissions(administrator=True)
 async def set_mute_role(ctx, role: discord.Role):
@@ -1275,7 +1397,42 @@ async def set_mute_role(ctx, role: discord.Role):
         color=discord.Color.green()
     )
     await ctx.send(embed=embed)
-    print(f"[MUTE ROLE] {ctx.author} set mute role to {role.name} in {ctx.guild.name}")
+    log.info("Mute role set", moderator=str(ctx.author), role=role.name, guild_id=ctx.guild.id)
+
+
+@bot.command(name='muterollout')
+@commands.has_permissions(administrator=True)
+async def mute_rollout(ctx, action: str = None):
+    """
+    View or start the mute role channel permission rollout.
+    Usage: !muterollout [start]
+    """
+    guild_id = str(ctx.guild.id)
+
+    if action and action.lower() == 'start':
+        mute_role_id = bot.mute_role_manager.get_mute_role(guild_id)
+        mute_role = bot.guild_cache.get_role(ctx.guild, mute_role_id) if mute_role_id else None
+        if not mute_role:
+            await ctx.send("❌ No mute role configured. Use `!setmuterole @role` first.")
+            return
+        if not bot.permission_rollout.start_rollout(ctx.guild, mute_role):
+            await ctx.send("⚠️ A rollout is already running for this server.")
+            return
+
+    progress = bot.permission_rollout.get_progress(guild_id)
+    if not progress:
+        await ctx.send("✅ No mute role permission rollout pending.")
+        return
+
+    embed = discord.Embed(
+        title="🔇 Mute Role Permission Rollout",
+        description="Running" if progress['running'] else "Paused (will resume on restart)",
+        color=discord.Color.blue()
+    )
+    embed.add_field(name="Updated", value=f"{progress['done']}/{progress['total']}", inline=True)
+    embed.add_field(name="Pending", value=str(progress['pending']), inline=True)
+    embed.add_field(name="Failed", value=str(progress['failed']), inline=True)
+    await ctx.send(embed=embed)
 
 
 # ==================== LOGGING CHANNEL COMMANDS ====================
@@ -1313,7 +1470,7 @@ async def set_log_channel(ctx, channel: discord.TextChannel = None):
         f"Logging channel has been set to {channel.mention}",
         {"Set By": f"{ctx.author.mention}"}
     )
-    print(f"[LOGGING] Log channel set to {channel.name} in {ctx.guild.name}")
+    log.info("Log channel set", channel=channel.name, guild_id=ctx.guild.id)
 
 
 @bot.command(name='disablelogging')
@@ -1332,7 +1489,7 @@ async def disable_logging(ctx):
         color=discord.Color.orange()
     )
     await ctx.send(embed=embed)
-    print(f"[LOGGING] Logging disabled in {ctx.guild.name}")
+    log.info("Channel logging disabled", guild_id=ctx.guild.id)
 
 
 @bot.command(name='enablelogging')
@@ -1364,7 +1521,42 @@ async def enable_logging(ctx):
         "Logging has been re-enabled for this server.",
         {"Enabled By": f"{ctx.author.mention}"}
     )
-    print(f"[LOGGING] Logging enabled in {ctx.guild.name}")
+    log.info("Channel logging enabled", guild_id=ctx.guild.id)
+
+
+@bot.command(name='logdigest')
+@commands.has_permissions(administrator=True)
+async def log_digest(ctx, status: str, seconds: int = None):
+    """
+    Group non-critical log events into periodic digests.
+    Usage: !logdigest on/off [seconds]
+
+    Critical events (mutes, 5th warnings, CRITICAL severity) are still sent immediately.
+    """
+    guild_id = str(ctx.guild.id)
+
+    if status.lower() not in ['on', 'off', 'enable', 'disable']:
+        await ctx.send("❌ Use `!logdigest on [seconds]` or `!logdigest off`")
+        return
+
+    enabled = status.lower() in ['on', 'enable']
+    if not bot.channel_logger.set_digest(guild_id, enabled, seconds):
+        await ctx.send("❌ Please set a log channel first using `!setlogchannel #channel`")
+        return
+
+    if not enabled:
+        # Send anything still buffered right away
+        await bot.channel_logger.flush_digest(ctx.guild)
+
+    window = bot.channel_logger.get_digest_window(guild_id)
+    embed = discord.Embed(
+        title="✅ Log Digest " + ("Enabled" if enabled else "Disabled"),
+        description=f"Non-critical events will be grouped every **{window}s**." if enabled
+                    else "Every event will be sent to the log channel individually.",
+        color=discord.Color.green() if enabled else discord.Color.orange()
+    )
+    await ctx.send(embed=embed)
+    log.info("Log digest updated", enabled=enabled, window=window, guild_id=ctx.guild.id)
 
 
 # ==================== END LOGGING COMMANDS ====================
@@ -1391,7 +1583,7 @@ async def kick(ctx, member: discord.Member, *, reason: str = "No reason provided
         embed.add_field(name="Reason", value=reason, inline=False)
         embed.add_field(name="Moderator", value=ctx.author.mention, inline=False)
         await ctx.send(embed=embed)
-        print(f"[MOD ACTION] {ctx.author} kicked {member} | Reason: {reason}")
+        log.info("Member kicked", moderator=str(ctx.author), user=str(member), guild_id=ctx.guild.id, reason=reason)
     except discord.Forbidden:
         await ctx.send("❌ I don't have permission to kick this member!")
     except Exception as e:
@@ -1419,7 +1611,7 @@ async def ban(ctx, member: discord.Member, *, reason: str = "No reason provided"
         embed.add_field(name="Reason", value=reason, inline=False)
         embed.add_field(name="Moderator", value=ctx.author.mention, inline=False)
         await ctx.send(embed=embed)
-        print(f"[MOD ACTION] {ctx.author} banned {member} | Reason: {reason}")
+        log.info("Member banned", moderator=str(ctx.author), user=str(member), guild_id=ctx.guild.id, reason=reason)
     except discord.Forbidden:
         await ctx.send("❌ I don't have permission to ban this member!")
     except Exception as e:
@@ -1448,7 +1640,7 @@ async def unban(ctx, user_id: int, *, reason: str = "No reason provided"):
         embed.add_field(name="Reason", value=reason, inline=False)
         embed.add_field(name="Moderator", value=ctx.author.mention, inline=False)
         await ctx.send(embed=embed)
-        print(f"[MOD ACTION] {ctx.author} unbanned {user} | Reason: {reason}")
+        log.info("Member unbanned", moderator=str(ctx.author), user=str(user), guild_id=ctx.guild.id, reason=reason)
     except discord.NotFound:
         await ctx.send("❌ User not found or not banned!")
     except Exception as e:
@@ -1476,7 +1668,8 @@ async def timeout(ctx, member: discord.Member, duration: int, *, reason: str = "
         embed.add_field(name="Reason", value=reason, inline=False)
         embed.add_field(name="Moderator", value=ctx.author.mention, inline=False)
         await ctx.send(embed=embed)
-        print(f"[MOD ACTION] {ctx.author} timed out {member} for {duration}min | Reason: {reason}")
+        log.info("Member timed out", moderator=str(ctx.author), user=str(member), guild_id=ctx.guild.id,
+                 minutes=duration, reason=reason)
     except discord.Forbidden:
         await ctx.send("❌ I don't have permission to timeout this member!")
     except Exception as e:
@@ -1674,7 +1867,7 @@ async def help_command(ctx):
     
     embed.add_field(
         name="🔧 Server Setup (Admin)",
-        value="`!setup` - Setup wizard\n`!config` - View config\n`!setwelcome #channel` - Welcome channel\n`!setlog #channel` - Log channel",
+        value="`!setup` - Setup wizard\n`!config` - View config\n`!setwelcome #channel` - Welcome channel\n`!setlog #channel` - Log channel\n`!logdigest on/off [s]` - Group log events",
         inline=False
     )
     
@@ -1989,7 +2182,8 @@ async def mute_member(ctx, member: discord.Member, duration: int = None, *, reas
         embed.add_field(name="Reason", value=reason, inline=False)
         embed.add_field(name="Moderator", value=ctx.author.mention, inline=False)
         await ctx.send(embed=embed)
-        print(f"[MOD ACTION] {ctx.author} muted {member} for {duration}min | Reason: {reason}")
+        log.info("Member muted", moderator=str(ctx.author), user=str(member), guild_id=ctx.guild.id,
+                 minutes=duration, reason=reason)
     except discord.Forbidden:
         await ctx.send("❌ I don't have permission to mute this member!")
     except Exception as e:
@@ -2080,10 +2274,213 @@ async def view_config(ctx):
     await ctx.send(embed=embed)
 
 
+@bot.command(name='cachestats')
+@commands.has_permissions(administrator=True)
+async def cache_statistics(ctx):
+    """View hit rates of the resolved channel/role/config cache."""
+    stats = bot.guild_cache.get_stats()
+
+    embed = discord.Embed(title="🗃️ Resolve Cache Statistics", color=discord.Color.blue())
+    for kind in ['channel', 'role', 'config', 'overall']:
+        counts = stats[kind]
+        embed.add_field(
+            name=kind.capitalize(),
+            value=f"Hits: {counts['hits']}\nMisses: {counts['misses']}\nHit rate: {counts['hit_rate'] * 100:.1f}%",
+            inline=True
+        )
+    embed.set_footer(text=f"{stats['cached_guilds']} guild(s) cached")
+    await ctx.send(embed=embed)
+
+
+@bot.command(name='statestats')
+@commands.has_permissions(administrator=True)
+async def state_statistics(ctx):
+    """View how many entries and how much memory each per-user/per-guild state container holds."""
+    report = get_state_registry().report()
+    total = sum(entry['approx_bytes'] for entry in report)
+
+    embed = discord.Embed(
+        title="🧮 State Containers",
+        description=f"Approximately **{total / 1024:.1f} KiB** held in {len(report)} containers",
+        color=discord.Color.blue()
+    )
+    for entry in report[:25]:
+        limits = []
+        if entry['max_entries']:
+            limits.append(f"cap {entry['max_entries']}")
+        if entry['ttl_seconds']:
+            limits.append(f"idle TTL {entry['ttl_seconds']:.0f}s")
+        embed.add_field(
+            name=entry['name'],
+            value=f"Entries: {entry['entries']}\nMemory: ~{entry['approx_bytes'] / 1024:.1f} KiB\n"
+                  f"Evicted: {entry['evictions']['ttl']} idle, {entry['evictions']['lru']} LRU\n"
+                  f"{', '.join(limits) or 'unbounded'}",
+            inline=True
+        )
+    await ctx.send(embed=embed)
+
+
+@bot.command(name='blocking')
+@commands.has_permissions(administrator=True)
+async def blocking_report(ctx, action: str = None):
+    """View the call sites that blocked the event loop the longest. Usage: !blocking [reset]"""
+    watchdog = bot.loop_watchdog
+    if action and action.lower() == 'reset':
+        watchdog.reset()
+        await ctx.send("✅ Blocking call report cleared.")
+        return
+    
+    report = watchdog.report(limit=5)
+    embed = discord.Embed(
+        title="🐢 Blocking Call Sites",
+        description=f"Stalls over {watchdog.threshold * 1000:.0f} ms: **{watchdog.stalls}** | "
+                    f"Current loop lag: {watchdog.last_lag * 1000:.1f} ms",
+        color=discord.Color.orange() if report else discord.Color.green()
+    )
+    for entry in report:
+        stack_tail = (entry['stack'] or "")[-700:]
+        embed.add_field(
+            name=entry['site'][:256],
+            value=f"{entry['count']}x | total {entry['total_ms']:.0f} ms | worst {entry['max_ms']:.0f} ms\n"
+                  f"```{stack_tail}```",
+            inline=False
+        )
+    if not report:
+        embed.add_field(name="No stalls", value="The event loop has not been blocked past the threshold.", inline=False)
+    await ctx.send(embed=embed)
+
+
+def _report_files(paths: List[str]) -> List[discord.File]:
+    """Attachments for saved reports that fit under Discord's upload limit"""
+    return [discord.File(path) for path in paths if os.path.getsize(path) <= PROFILE_UPLOAD_LIMIT]
+
+
+@bot.command(name='profile')
+@commands.has_permissions(administrator=True)
+async def profile_runtime(ctx, seconds: int = 10):
+    """Sample the event loop's stacks and upload a flamegraph-ready profile. Usage: !profile [seconds]"""
+    profiler = get_runtime_profiler()
+    if profiler.active:
+        await ctx.send("⏳ A profile is already running.")
+        return
+    seconds = max(1, min(seconds, MAX_PROFILE_SECONDS))
+    await ctx.send(f"🔬 Profiling the event loop for {seconds}s...")
+
+    result = await profiler.profile(seconds)
+    paths = save_report("profile", {"folded": result.folded(), "txt": result.format_top()})
+
+    embed = discord.Embed(
+        title="🔬 Runtime Profile",
+        description=f"{result.samples} samples over {result.seconds:.1f}s",
+        color=discord.Color.blue()
+    )
+    for kind, title in [("self", "Hottest functions (self)"), ("total", "Hottest call paths (total)")]:
+        lines = [f"{share * 100:5.1f}% {frame[:60]}" for frame, _, share in result.top(limit=5)[kind]]
+        embed.add_field(name=title, value=f"```{chr(10).join(lines) or 'No samples'}```", inline=False)
+    embed.set_footer(text="Open the .folded file with speedscope.app or flamegraph.pl • "
+                          f"saved to {os.path.dirname(paths[0])}")
+    await ctx.send(embed=embed, files=_report_files(paths))
+
+
+@bot.command(name='memsnapshot')
+@commands.has_permissions(administrator=True)
+async def memory_snapshot_report(ctx, seconds: int = 30):
+    """Trace memory allocations for a while and upload the top allocation sites. Usage: !memsnapshot [seconds]"""
+    seconds = max(1, min(seconds, MAX_PROFILE_SECONDS))
+    await ctx.send(f"🧠 Tracing allocations for {seconds}s...")
+    try:
+        report = await memory_snapshot(seconds)
+    except RuntimeError as e:
+        await ctx.send(f"⏳ {e}.")
+        return
+    paths = save_report("memory", {"txt": format_memory_report(report), "json": json.dumps(report, indent=2)})
+
+    embed = discord.Embed(
+        title="🧠 Memory Snapshot",
+        description=f"Traced **{report['traced_kib']:.0f} KiB** (peak {report['peak_kib']:.0f} KiB) over {seconds}s",
+        color=discord.Color.blue()
+    )
+    growth = [f"{entry['kib_diff']:+8.1f} KiB {entry['site'][-50:]}" for entry in report['growth'][:5]]
+    embed.add_field(name="Fastest growing sites", value=f"```{chr(10).join(growth) or 'No growth'}```", inline=False)
+    embed.set_footer(text=f"Saved to {os.path.dirname(paths[0])}")
+    await ctx.send(embed=embed, files=_report_files(paths))
+
+
+@bot.command(name='imports')
+@commands.has_permissions(administrator=True)
+async def import_statistics(ctx):
+    """View which NLP backends are loaded and what each import cost."""
+    report = import_report()
+    embed = discord.Embed(title="📦 Backend Imports", color=discord.Color.blue())
+    for entry in report[:25]:
+        if entry['error']:
+            value = f"❌ {entry['error'][:200]}"
+        elif entry['loaded']:
+            value = f"✅ {entry['seconds'] * 1000:.0f} ms"
+        else:
+            value = "⏳ Not loaded yet"
+        embed.add_field(name=entry['backend'], value=value, inline=True)
+    if not report:
+        embed.description = "No lazy backends registered."
+    await ctx.send(embed=embed)
+
+
+@bot.command(name='shards')
+@commands.has_permissions(administrator=True)
+async def shard_status(ctx):
+    """View health of all shard processes (sharded deployments only)."""
+    if not bot.shard_link:
+        await ctx.send(f"ℹ️ Running unsharded - {len(bot.guilds)} servers in one process.")
+        return
+
+    health = await bot.shard_link.request("cluster_health")
+    if health is None:
+        await ctx.send("❌ Shard coordinator did not respond.")
+        return
+
+    embed = discord.Embed(
+        title="🧩 Shard Status",
+        description=f"**{health['healthy_shards']}/{health['shard_count']}** shards healthy • "
+                    f"{health['guilds']} servers • {health['members']} members",
+        color=discord.Color.green() if health['status'] == 'online' else discord.Color.orange()
+    )
+    for shard in health['shards'][:25]:
+        state = "✅" if shard['alive'] and shard.get('ready') and not shard['stale'] else "⚠️"
+        embed.add_field(
+            name=f"{state} Shard {shard['shard_id']}",
+            value=f"Servers: {shard.get('guilds', 0)}\nLatency: {shard.get('latency_ms', 'N/A')} ms\n"
+                  f"Restarts: {shard['restarts']}",
+            inline=True
+        )
+    embed.set_footer(text=f"This server is on shard {ctx.guild.shard_id}")
+    await ctx.send(embed=embed)
+
+
+@bot.command(name='clusterstats')
+@commands.has_permissions(administrator=True)
+async def cluster_statistics(ctx):
+    """View warning statistics across all shards (sharded deployments only)."""
+    if not bot.shard_link:
+        await ctx.send("ℹ️ Running unsharded - use `!warningstats` instead.")
+        return
+
+    stats = await bot.shard_link.request("cluster_warning_stats")
+    if stats is None:
+        await ctx.send("❌ Shard coordinator did not respond.")
+        return
+
+    embed = discord.Embed(title="🧩 Cluster Warning Statistics", color=discord.Color.blue())
+    embed.add_field(name="Total Users Warned", value=str(stats['total_users_warned']), inline=True)
+    embed.add_field(name="Total Warnings Issued", value=str(stats['total_warnings']), inline=True)
+    embed.add_field(name="Active Mutes", value=str(stats['total_active_mutes']), inline=True)
+    embed.add_field(name="Servers Affected", value=str(stats['guilds_affected']), inline=True)
+    await ctx.send(embed=embed)
+
+
 # ==================== END SAPPHIRE-LIKE FEATURES ====================
 
 
-# Simple web server for Render.com (keeps service alive)
+# In-process web server for Render.com - only used if the health server process can't be started
 app = Flask('')
 
 @app.route('/')
@@ -2094,6 +2491,13 @@ def home():
 def health():
     return {"status": "online", "bot": str(bot.user) if bot.is_ready() else "connecting"}
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus text format, or JSON with ?format=json"""
+    if request.args.get('format') == 'json':
+        return bot.metrics.snapshot()
+    return Response(bot.metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
 def run_web_server():
     """Run Flask web server in background thread."""
     port = int(os.environ.get('PORT', 10000))
@@ -2101,6 +2505,8 @@ def run_web_server():
 
 def main():
     """Main entry point for the bot."""
+    startup_trace.checkpoint("module_setup")
+    
     # Load bot token from environment variable or config file
     token = os.getenv('DISCORD_BOT_TOKEN')
     
@@ -2113,27 +2519,38 @@ def main():
                 token = config.get('bot_token')
     
     if not token:
-        print("ERROR: Discord bot token not found!")
-        print("Please set DISCORD_BOT_TOKEN environment variable or add it to config.json")
+        log.error("Discord bot token not found! Set the DISCORD_BOT_TOKEN environment variable or add it to config.json")
         return
     
-    # Start web server in background (for Render.com)
-    try:
-        server_thread = Thread(target=run_web_server)
-        server_thread.daemon = True
-        server_thread.start()
-        print("Web server started for health checks")
-    except Exception as e:
-        print(f"Warning: Could not start web server: {e}")
+    # Start web server for health checks (for Render.com)
+    # It runs as its own process serving the snapshots the bot publishes, so
+    # health checks never compete with the bot for the GIL or the event loop.
+    # Sharded deployments serve health checks from shard_launcher.py instead
+    health_process = None
+    if is_sharded():
+        log.info("Running as a shard - health checks are served by the coordinator")
+    else:
+        try:
+            health_process = start_health_process(int(os.environ.get('PORT', 10000)), HEALTH_SNAPSHOT_FILE)
+            log.info("Health server process started", pid=health_process.pid)
+        except Exception as e:
+            log.warning(f"Could not start health server process, serving from a thread: {e}")
+            try:
+                server_thread = Thread(target=run_web_server)
+                server_thread.daemon = True
+                server_thread.start()
+            except Exception as e:
+                log.warning(f"Could not start web server: {e}")
     
     # Run the bot
     try:
-        print("Starting Discord bot...")
+        log.info("Starting Discord bot")
         bot.run(token)
     except Exception as e:
-        print(f"ERROR: Bot failed to start: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"Bot failed to start: {e}")
+    finally:
+        if health_process is not None:
+            health_process.terminate()
 
 
 if __name__ == "__main__":
@@ -7,22 +7,32 @@ Purpose: Empowers users to collect evidence, detect harmful content, and prevent
          through AI-powered analysis and comprehensive forensics logging.
 """
 
+import startup_trace  # Imported first so the startup trace covers the other imports
 import discord
 from discord.ext import commands
 from discord import app_commands
 import json
 import os
 from datetime import datetime, timedelta, timezone
-from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import hashlib
-import pandas as pd
 import re
 from typing import Dict, List, Optional
 import asyncio
-from collections import defaultdict
+from collections import deque
 import csv
 
+from detection_service import get_detection_client
+from lazy_imports import lazy_import, start_background_warmup
+from state_containers import BoundedState
+from structured_logging import get_logger
+from warnings_query import WarningIndex
+
+TextBlob = lazy_import("textblob", "TextBlob")
+SentimentIntensityAnalyzer = lazy_import("vaderSentiment.vaderSentiment", "SentimentIntensityAnalyzer")
+log = get_logger("bot_enhanced")
+
+startup_trace.checkpoint("imports")
+
 
 class AbuseDetector:
     """
@@ -46,8 +56,8 @@ class AbuseDetector:
             'fuck', 'shit', 'bitch', 'ass', 'damn', 'suicide',
             'hurt yourself', 'nobody likes you', 'waste of space'
         ]
-        self.spam_tracker = defaultdict(list)
-        self.vader = SentimentIntensityAnalyzer()
+        self.spam_tracker = BoundedState("spam_tracker", max_entries=200000, ttl=60, default_factory=list)
+        self._vader = None  # Created on first analysis (loads the VADER lexicon)
         
         # Prevention tips database
         self.prevention_tips = {
@@ -68,6 +78,13 @@ class AbuseDetector:
             ]
         }
         
+    @property
+    def vader(self):
+        """VADER analyzer, created on first use"""
+        if self._vader is None:
+            self._vader = SentimentIntensityAnalyzer()
+        return self._vader
+    
     def analyze_message(self, content: str) -> Dict:
         """
         Dual AI Sentiment Analysis for Abuse Detection
@@ -164,7 +181,9 @@ class ForensicsLogger:
         self.warnings_file = os.path.join(log_dir, "warnings.json")
         self.interactions_file = os.path.join(log_dir, "user_interactions.json")
         self.load_warnings()
-        self.user_interactions = defaultdict(list)  # Track user interaction network
+        # Track user interaction network (last 100 interactions per user, idle users dropped after a week)
+        self.user_interactions = BoundedState("user_interactions", max_entries=100000, ttl=7 * 24 * 3600,
+                                              default_factory=lambda: deque(maxlen=100))
         
     def load_warnings(self):
         """Load warning counts from file."""
@@ -173,6 +192,8 @@ class ForensicsLogger:
                 self.warnings = json.load(f)
         else:
             self.warnings = {}
+        self.index = WarningIndex()  # per-guild rankings for /warnings
+        self.index.load(self.warnings)
     
     def save_warnings(self):
         """Save warning counts to file."""
@@ -189,6 +210,7 @@ class ForensicsLogger:
             "reason": reason,
             "timestamp": datetime.utcnow().isoformat()
         })
+        self.index.update(key, self.warnings[key])
         self.save_warnings()
         return len(self.warnings[key])
     
@@ -204,6 +226,7 @@ class ForensicsLogger:
             self.warnings[key].pop(index)
             if len(self.warnings[key]) == 0:
                 del self.warnings[key]
+            self.index.update(key, self.warnings.get(key))
             self.save_warnings()
             return True
         return False
@@ -213,7 +236,12 @@ class ForensicsLogger:
         key = f"{guild_id}:{user_id}"
         if key in self.warnings:
             del self.warnings[key]
+            self.index.update(key, None)
             self.save_warnings()
+    
+    def top_warned(self, guild_id: str, limit: int = 10) -> List[Dict]:
+        """Most warned users in a guild."""
+        return [entry for entry in self.index.top(guild_id, limit) if entry["count"] > 0]
         
     def log_evidence(self, message: discord.Message, analysis: Dict) -> None:
         """
@@ -349,13 +377,20 @@ class Guardify(commands.Bot):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.abuse_detector = AbuseDetector()
+        # Shared detection service (GUARDIFY_DETECTION_SERVICE), falls back to the local detector
+        self.detection_client = get_detection_client(
+            fallbacks={"guardify": self.abuse_detector.analyze_message}
+        )
         self.forensics_logger = ForensicsLogger()
+        self.backends_warmed = False
         self.auto_mod_enabled = {}  # Guild-specific auto-mod settings
         self.log_channels = {}  # Guild-specific log channels
         self.welcome_channels = {}  # Guild-specific welcome channels
         self.welcome_messages = {}  # Guild-specific welcome messages
-        self.load_log_channels()
-        self.load_welcome_config()
+        with startup_trace.phase("load_log_channels"):
+            self.load_log_channels()
+        with startup_trace.phase("load_welcome_config"):
+            self.load_welcome_config()
         
     def load_log_channels(self):
         """Load log channels from file."""
@@ -397,25 +432,20 @@ class Guardify(commands.Bot):
                 if channel:
                     await channel.send(embed=embed)
             except Exception as e:
-                print(f"Failed to send log to channel: {e}")
+                log.error(f"Failed to send log to channel: {e}")
     
     async def setup_hook(self):
         """Setup hook for slash commands."""
+        startup_trace.checkpoint("login")
         try:
             synced = await self.tree.sync()
-            print(f"✅ Synced {len(synced)} slash commands")
+            log.info("Synced slash commands", commands=len(synced))
         except Exception as e:
-            print(f"❌ Failed to sync commands: {e}")
+            log.error(f"Failed to sync commands: {e}")
         
     async def on_ready(self):
         """Called when the bot is ready."""
-        print(f'╔════════════════════════════════════════╗')
-        print(f'║   🛡️  GUARDIFY BOT ONLINE 🛡️           ║')
-        print(f'╠════════════════════════════════════════╣')
-        print(f'║  Bot: {self.user.name:<28} ║')
-        print(f'║  ID: {str(self.user.id):<29} ║')
-        print(f'║  Servers: {len(self.guilds):<27} ║')
-        print(f'╚════════════════════════════════════════╝')
+        log.info("GUARDIFY BOT ONLINE", bot=self.user.name, bot_id=self.user.id, guilds=len(self.guilds))
         
         # Set bot status
         await self.change_presence(
@@ -425,6 +455,12 @@ class Guardify(commands.Bot):
             )
         )
         
+        # Import NLP backends off the event loop now that the gateway is connected
+        if not self.backends_warmed:
+            self.backends_warmed = True
+            startup_trace.finish("on_ready")
+            start_background_warmup()
+        
     async def on_guild_join(self, guild):
         """Send welcome message when bot joins a server."""
         # Find the first text channel bot can send messages in
@@ -497,7 +533,7 @@ class Guardify(commands.Bot):
         try:
             await channel.send(embed=embed)
         except Exception as e:
-            print(f"Failed to send welcome message: {e}")
+            log.error(f"Failed to send welcome message: {e}")
         
     async def on_message(self, message: discord.Message):
         """Process every message for abuse detection."""
@@ -517,7 +553,10 @@ class Guardify(commands.Bot):
                     pass
         
         # Analyze message
-        analysis = self.abuse_detector.analyze_message(message.content)
+        if self.detection_client is not None:
+            analysis = await self.detection_client.analyze("guardify", message.content)
+        else:
+            analysis = self.abuse_detector.analyze_message(message.content)
         
         # Log and handle if abusive
         if analysis['is_abusive']:
@@ -582,7 +621,7 @@ class Guardify(commands.Bot):
             await self.log_to_channel(message.guild.id, log_embed)
             
         except Exception as e:
-            print(f"Error handling abusive message: {e}")
+            log.error(f"Error handling abusive message: {e}")
 
 
 # Setup bot
@@ -592,7 +631,8 @@ intents.messages = True
 intents.guilds = True
 intents.members = True
 
-bot = Guardify(command_prefix='!', intents=intents)
+with startup_trace.phase("construct_bot"):
+    bot = Guardify(command_prefix='!', intents=intents)
 
 
 # ============= MODERATION COMMANDS =============
@@ -649,10 +689,21 @@ async def warn(ctx, member: discord.Member, *, reason: str = "No reason provided
         pass
 
 
-@bot.hybrid_command(name='warnings', description='View warnings for a user')
+@bot.hybrid_command(name='warnings', description='View warnings for a user, or the most warned users')
 @commands.has_permissions(manage_messages=True)
-async def warnings(ctx, member: discord.Member):
-    """View warnings for a user."""
+async def warnings(ctx, member: Optional[discord.Member] = None):
+    """View warnings for a user, or the most warned users without one."""
+    if member is None:
+        top = bot.forensics_logger.top_warned(str(ctx.guild.id))
+        embed = discord.Embed(
+            title="⚠️ Most Warned Users",
+            description="\n".join(f"**{rank}.** <@{entry['user_id']}> - {entry['count']} warning(s)"
+                                  for rank, entry in enumerate(top, 1)) or "No warnings found.",
+            color=discord.Color.orange()
+        )
+        await ctx.send(embed=embed)
+        return
+    
     warns = bot.forensics_logger.get_warnings(str(member.id), str(ctx.guild.id))
     
     embed = discord.Embed(
@@ -1215,6 +1266,7 @@ async def help_command(ctx):
 
 def main():
     """Main entry point."""
+    startup_trace.checkpoint("module_setup")
     token = os.getenv('DISCORD_BOT_TOKEN')
     
     if not token:
@@ -1225,7 +1277,7 @@ def main():
                 token = config.get('bot_token')
     
     if not token:
-        print("ERROR: Discord bot token not found!")
+        log.error("Discord bot token not found!")
         return
     
     bot.run(token)
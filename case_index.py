@@ -0,0 +1,267 @@
+"""
+Case Index - Compact in-memory index over the evidence log for browsing cases
+Each line of abuse_evidence.jsonl becomes one row of small columns (byte
+offset, time, interned guild/user/severity/category codes) plus per-guild and
+per-user posting lists, built incrementally as lines are appended. Queries
+walk the narrowest posting list newest-first, filter on the columns and only
+read the matching records back from disk, so a page costs at most `limit`
+record reads and `MAX_SCAN` row checks (`MAX_READS` reads for keyword
+searches) no matter how large the log or guild is.
+
+Pages are addressed by an opaque cursor naming the log file (its inode) and
+the byte offset of the next row, so any dashboard worker can continue a page
+another worker served; a query that hits the scan budget returns a cursor to
+continue from even if the page isn't full yet.
+"""
+
+import json
+import threading
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+from sharding import file_signature
+
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 100
+MAX_SCAN = 20000  # rows checked per query before returning a continuation cursor
+MAX_READS = 2000  # records read from disk per query (keyword searches read every candidate)
+
+
+class CursorError(ValueError):
+    """Malformed cursor, or a cursor from before the log was replaced"""
+
+
+def parse_time(value) -> float:
+    """Seconds since the epoch for an ISO timestamp (naive times are UTC), 0.0 if missing or invalid"""
+    if not value:
+        return 0.0
+    try:
+        moment = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return 0.0
+    if moment.tzinfo is None:
+        return (moment - datetime(1970, 1, 1)).total_seconds()
+    return moment.timestamp()
+
+
+class _Interner:
+    """Maps strings to small integer codes (code 0 is None/missing)"""
+
+    def __init__(self):
+        self.codes = {None: 0}
+        self.values = [None]
+
+    def code(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value) -> Optional[int]:
+        return self.codes.get(value)
+
+
+class CaseIndex:
+    """Incrementally built index of the evidence JSONL with cursor-paginated, filtered queries"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.signature = None
+        self.offset = 0  # bytes indexed (always at a line boundary)
+        self.offsets = array('q')  # row -> byte offset of the line
+        self.times = array('d')  # row -> logged_at (epoch seconds)
+        self.guild_codes = array('I')
+        self.user_codes = array('I')
+        self.severity_codes = array('I')
+        self.category_codes = array('I')
+        self.guilds = _Interner()
+        self.users = _Interner()
+        self.severities = _Interner()
+        self.categories = _Interner()
+        self.by_guild = {}  # format: {guild code: array of rows}
+        self.by_user = {}  # format: {user code: array of rows}
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def refresh(self):
+        """Index lines appended since the last call (rebuilds if the log was replaced or truncated)"""
+        with self.lock:
+            self._refresh()
+
+    def _refresh(self):
+        signature = file_signature(self.path)
+        if signature == self.signature:
+            return
+        if self.signature is not None and (signature is None or signature[2] != self.signature[2]
+                                           or signature[1] < self.offset):
+            self._reset()
+        if signature is not None:
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                chunk = f.read()
+            end = chunk.rfind(b'\n') + 1  # a partly written last line is indexed next time
+            position = 0
+            while position < end:
+                newline = chunk.index(b'\n', position)
+                self._add_line(self.offset + position, chunk[position:newline])
+                position = newline + 1
+            self.offset += end
+        self.signature = signature
+
+    def _add_line(self, offset: int, raw: bytes):
+        try:
+            record = json.loads(raw.decode('utf-8'))
+            analysis = record.get('analysis') or {}
+            severity = str(analysis.get('severity') or '').lower() or None
+            category = record.get('category') or analysis.get('category')
+        except (ValueError, AttributeError):
+            return
+        row = len(self.offsets)
+        guild = self.guilds.code(str(record['guild_id']) if record.get('guild_id') else None)
+        user = self.users.code(str(record['author_id']) if record.get('author_id') else None)
+        self.offsets.append(offset)
+        self.times.append(parse_time(record.get('logged_at')))
+        self.guild_codes.append(guild)
+        self.user_codes.append(user)
+        self.severity_codes.append(self.severities.code(severity))
+        self.category_codes.append(self.categories.code(category))
+        self.by_guild.setdefault(guild, array('I')).append(row)
+        self.by_user.setdefault(user, array('I')).append(row)
+
+    def _candidates(self, guild_id, user_id, before: int) -> Optional[Iterator[int]]:
+        """Rows below `before`, newest first, from the narrowest posting list (None if nothing can match)"""
+        postings = []
+        if guild_id is not None:
+            code = self.guilds.lookup(str(guild_id))
+            if code is None:
+                return None
+            postings.append(self.by_guild[code])
+        if user_id is not None:
+            code = self.users.lookup(str(user_id))
+            if code is None:
+                return None
+            postings.append(self.by_user[code])
+        if not postings:
+            return iter(range(before - 1, -1, -1))
+        rows = min(postings, key=len)
+        end = bisect_left(rows, before)
+        return (rows[i] for i in range(end - 1, -1, -1))
+
+    def query(self, guild_id=None, user_id=None, severity: Optional[str] = None,
+              category: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+              keyword: Optional[str] = None, cursor: Optional[str] = None,
+              limit: int = DEFAULT_LIMIT, max_scan: int = MAX_SCAN, max_reads: int = MAX_READS) -> Dict:
+        """
+        One page of cases, newest first
+
+        Args:
+            guild_id, user_id: Exact matches
+            severity, category: Exact matches (severity is case-insensitive)
+            since, until: ISO timestamps bounding logged_at (inclusive)
+            keyword: Case-insensitive substring of the message content
+            cursor: next_cursor of the previous page
+            limit: Page size (capped at MAX_LIMIT)
+            max_scan: Rows checked before returning early with a cursor
+            max_reads: Records read from disk before returning early with a cursor
+
+        Returns:
+            {"cases": [...], "next_cursor": str or None, "scanned": rows checked}
+
+        Raises:
+            CursorError: If the cursor is malformed or from a replaced log
+        """
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        with self.lock:
+            self._refresh()
+            if self.signature is None:  # no evidence logged yet
+                return {"cases": [], "next_cursor": None, "scanned": 0}
+            before = self._decode_cursor(cursor)
+            severity_code = self.severities.lookup(severity.lower()) if severity else None
+            category_code = self.categories.lookup(category) if category else None
+            if (severity and severity_code is None) or (category and category_code is None):
+                return {"cases": [], "next_cursor": None, "scanned": 0}
+            since_time = parse_time(since) if since else None
+            until_time = parse_time(until) if until else None
+            needle = keyword.lower() if keyword else None
+            guild_code = self.guilds.lookup(str(guild_id)) if guild_id is not None else None
+            user_code = self.users.lookup(str(user_id)) if user_id is not None else None
+
+            rows = self._candidates(guild_id, user_id, before)
+            cases, scanned, reads, next_row = [], 0, 0, None
+            with open(self.path, 'rb') as f:
+                for row in rows or ():
+                    if scanned >= max_scan or reads >= max_reads or len(cases) >= limit:
+                        next_row = row + 1
+                        break
+                    scanned += 1
+                    if (guild_code is not None and self.guild_codes[row] != guild_code) or \
+                            (user_code is not None and self.user_codes[row] != user_code):
+                        continue  # only the narrower of the two posting lists was walked
+                    if severity_code is not None and self.severity_codes[row] != severity_code:
+                        continue
+                    if category_code is not None and self.category_codes[row] != category_code:
+                        continue
+                    if (since_time is not None and self.times[row] < since_time) or \
+                            (until_time is not None and self.times[row] > until_time):
+                        continue
+                    record = self._read(f, row)
+                    reads += 1
+                    if needle and needle not in str(record.get('content', '')).lower():
+                        continue
+                    cases.append(record)
+
+        return {
+            "cases": cases,
+            "next_cursor": self._encode_cursor(next_row) if next_row is not None else None,
+            "scanned": scanned
+        }
+
+    def _encode_cursor(self, row: int) -> str:
+        """"inode.offset" of a row (the end of the indexed log for the row after the last)"""
+        offset = self.offsets[row] if row < len(self.offsets) else self.offset
+        return f"{self.signature[2]}.{offset}"
+
+    def _decode_cursor(self, cursor: Optional[str]) -> int:
+        """First row the page may not include (rows are returned below it)"""
+        if not cursor:
+            return len(self.offsets)
+        try:
+            inode, offset = (int(part) for part in cursor.split('.'))
+        except ValueError:
+            raise CursorError("Invalid cursor")
+        if offset == self.offset:
+            row = len(self.offsets)
+        else:
+            row = bisect_left(self.offsets, offset)
+            if row == len(self.offsets) or self.offsets[row] != offset:
+                row = None
+        if inode != self.signature[2] or row is None:
+            raise CursorError("Cursor expired, the evidence log was replaced")
+        return row
+
+    def _read(self, f, row: int) -> Dict:
+        f.seek(self.offsets[row])
+        return json.loads(f.readline().decode('utf-8'))
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                "cases": len(self.offsets),
+                "guilds": len(self.by_guild),
+                "users": len(self.by_user),
+                "bytes": sum(column.itemsize * len(column) for column in (
+                    self.offsets, self.times, self.guild_codes, self.user_codes,
+                    self.severity_codes, self.category_codes))
+                    + sum(4 * len(rows) for rows in self.by_guild.values())
+                    + sum(4 * len(rows) for rows in self.by_user.values())
+            }
+
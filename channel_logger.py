@@ -5,19 +5,42 @@ Tracks warnings, mutes, detections, and system events
 
 import discord
 from discord.ext import commands
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
+from collections import Counter
+import asyncio
 import json
 import os
 
+from guild_cache import get_guild_cache
+from sharding import prepare_state_file
+from structured_logging import get_logger
+
+log = get_logger("channel_logger")
+
+
+# Discord embed limits
+MAX_EMBED_FIELDS = 25
+MAX_FIELD_VALUE = 1024
+MAX_EMBED_TOTAL = 6000
+
+# Digest defaults
+DEFAULT_DIGEST_WINDOW = 30  # seconds
+MIN_DIGEST_WINDOW = 5
+MAX_DIGEST_WINDOW = 600
+
 
 class ChannelLogger:
     """Logs bot actions to a dedicated Discord channel"""
     
     def __init__(self, log_dir: str = "forensics_logs"):
         self.log_dir = log_dir
-        self.config_file = os.path.join(log_dir, "logging_config.json")
+        self.config_file = prepare_state_file(os.path.join(log_dir, "logging_config.json"))
         self.config = self.load_config()
+        
+        # Digest mode - buffered events and pending flush tasks per guild
+        self.digest_buffers = {}  # format: {guild_id: [event, ...]}
+        self.digest_tasks = {}  # format: {guild_id: asyncio.Task}
     
     def load_config(self) -> Dict:
         """Load logging configuration"""
@@ -37,11 +60,13 @@ class ChannelLogger:
     
     def set_log_channel(self, guild_id: str, channel_id: str) -> bool:
         """Set the logging channel for a guild"""
-        self.config[guild_id] = {
+        guild_config = self.config.get(guild_id, {})
+        guild_config.update({
             "log_channel_id": channel_id,
             "created_at": datetime.utcnow().isoformat(),
             "enabled": True
-        }
+        })
+        self.config[guild_id] = guild_config
         self.save_config()
         return True
     
@@ -73,20 +98,72 @@ class ChannelLogger:
             return True
         return False
     
+    def set_digest(self, guild_id: str, enabled: bool, window: int = None) -> bool:
+        """
+        Enable or disable digest mode for a guild
+        
+        Args:
+            guild_id: Guild ID
+            enabled: Whether non-critical events are grouped into digests
+            window: Seconds to collect events before sending a digest
+        
+        Returns:
+            True if the settings were saved, False if no log channel is configured
+        """
+        if guild_id not in self.config:
+            return False
+        
+        self.config[guild_id]["digest_enabled"] = enabled
+        if window is not None:
+            window = max(MIN_DIGEST_WINDOW, min(int(window), MAX_DIGEST_WINDOW))
+            self.config[guild_id]["digest_window"] = window
+        self.save_config()
+        return True
+    
+    def is_digest_enabled(self, guild_id: str) -> bool:
+        """Check if digest mode is enabled for a guild"""
+        if guild_id in self.config:
+            return self.config[guild_id].get("digest_enabled", False)
+        return False
+    
+    def get_digest_window(self, guild_id: str) -> int:
+        """Get the digest window in seconds for a guild"""
+        if guild_id in self.config:
+            return self.config[guild_id].get("digest_window", DEFAULT_DIGEST_WINDOW)
+        return DEFAULT_DIGEST_WINDOW
+    
+    def _get_log_channel(self, guild: discord.Guild):
+        """Resolve the log channel for a guild if logging is enabled"""
+        guild_id = str(guild.id)
+        
+        if not self.is_logging_enabled(guild_id):
+            return None
+        
+        channel_id = self.get_log_channel_id(guild_id)
+        if not channel_id:
+            return None
+        
+        return get_guild_cache().get_channel(guild, channel_id)
+    
     async def log_message(self, guild: discord.Guild, title: str, description: str, 
-                         color: discord.Color = None, fields: Dict = None):
-        """Send a log message to the logging channel"""
+                         color: discord.Color = None, fields: Dict = None,
+                         critical: bool = True, category: str = None, user: str = None):
+        """
+        Send a log message to the logging channel
+        
+        Non-critical events are buffered into a digest when digest mode is
+        enabled for the guild. Critical events are always sent immediately.
+        """
         try:
             guild_id = str(guild.id)
             
             if not self.is_logging_enabled(guild_id):
                 return False
             
-            channel_id = self.get_log_channel_id(guild_id)
-            if not channel_id:
-                return False
+            if not critical and self.is_digest_enabled(guild_id):
+                return self._queue_digest_event(guild, title, category or title, user)
             
-            channel = guild.get_channel(int(channel_id))
+            channel = self._get_log_channel(guild)
             if not channel:
                 return False
             
@@ -110,9 +187,138 @@ class ChannelLogger:
             return True
         
         except Exception as e:
-            print(f"[ERROR] Failed to log message: {e}")
+            log.error(f"Failed to log message: {e}", guild_id=guild.id)
+            return False
+    
+    def _queue_digest_event(self, guild: discord.Guild, title: str, category: str,
+                            user: Optional[str]) -> bool:
+        """Buffer an event for the guild digest and schedule a flush"""
+        guild_id = str(guild.id)
+        
+        self.digest_buffers.setdefault(guild_id, []).append({
+            "title": title,
+            "category": category,
+            "user": user,
+            "time": datetime.utcnow()
+        })
+        
+        if guild_id not in self.digest_tasks:
+            window = self.get_digest_window(guild_id)
+            self.digest_tasks[guild_id] = asyncio.create_task(self._flush_after(guild, window))
+        
+        return True
+    
+    async def _flush_after(self, guild: discord.Guild, window: int):
+        """Wait for the digest window to close, then send the digest"""
+        try:
+            await asyncio.sleep(window)
+        except asyncio.CancelledError:
+            return
+        self.digest_tasks.pop(str(guild.id), None)
+        await self.flush_digest(guild)
+    
+    def build_digest_embed(self, events: List[Dict]) -> discord.Embed:
+        """
+        Group buffered events into a single embed
+        
+        Counts are given per category and per user. Individual event lines are
+        added until Discord's field and size limits are reached.
+        """
+        first = events[0]["time"]
+        last = events[-1]["time"]
+        span = max(1, int((last - first).total_seconds()))
+        
+        category_counts = Counter(e["category"] for e in events)
+        user_counts = Counter(e["user"] for e in events if e["user"])
+        
+        embed = discord.Embed(
+            title=f"📋 Log Digest - {len(events)} events",
+            description=f"Events grouped over {span}s "
+                        f"({first.strftime('%H:%M:%S')} - {last.strftime('%H:%M:%S')} UTC)",
+            color=discord.Color.blurple(),
+            timestamp=datetime.utcnow()
+        )
+        embed.set_footer(text="Guardify Logging System • Digest mode")
+        total = len(embed.title) + len(embed.description) + len(embed.footer.text)
+        
+        def add_lines(name: str, lines: List[str]) -> bool:
+            nonlocal total
+            if len(embed.fields) >= MAX_EMBED_FIELDS or not lines:
+                return False
+            value = ""
+            for line in lines:
+                if len(value) + len(line) + 1 > MAX_FIELD_VALUE:
+                    break
+                value += line + "\n"
+            # Leave room for the trailing "and N more" field
+            if total + len(name) + len(value) > MAX_EMBED_TOTAL - 64:
+                return False
+            embed.add_field(name=name, value=value, inline=False)
+            total += len(name) + len(value)
+            return True
+        
+        add_lines("🔍 By Category",
+                  [f"**{cat}**: {count}" for cat, count in category_counts.most_common()])
+        add_lines("👤 By User",
+                  [f"{user}: {count}" for user, count in user_counts.most_common()])
+        
+        # Individual events, oldest first, one field per chunk
+        lines = []
+        for e in events:
+            line = f"`{e['time'].strftime('%H:%M:%S')}` {e['title']}"
+            if e["user"]:
+                line += f" - {e['user']}"
+            lines.append(line)
+        shown = 0
+        chunk_sizes = []
+        while shown < len(lines):
+            chunk = []
+            size = 0
+            for line in lines[shown:]:
+                if size + len(line) + 1 > MAX_FIELD_VALUE:
+                    break
+                chunk.append(line)
+                size += len(line) + 1
+            if not chunk or not add_lines("📝 Events", chunk):
+                break
+            chunk_sizes.append(len(chunk))
+            shown += len(chunk)
+        
+        if shown < len(lines):
+            if len(embed.fields) >= MAX_EMBED_FIELDS and chunk_sizes:
+                # Give up the last events field to make room for the summary
+                embed.remove_field(-1)
+                shown -= chunk_sizes.pop()
+            embed.add_field(name="…", value=f"and {len(lines) - shown} more event(s)", inline=False)
+        
+        return embed
+    
+    async def flush_digest(self, guild: discord.Guild) -> bool:
+        """Send all buffered events for a guild as one digest embed"""
+        guild_id = str(guild.id)
+        events = self.digest_buffers.pop(guild_id, [])
+        if not events:
+            return False
+        
+        try:
+            channel = self._get_log_channel(guild)
+            if not channel:
+                return False
+            
+            await channel.send(embed=self.build_digest_embed(events))
+            return True
+        except Exception as e:
+            log.error(f"Failed to send log digest: {e}", guild_id=guild.id)
             return False
     
+    async def flush_all_digests(self, guilds: List[discord.Guild]):
+        """Flush pending digests immediately (e.g. on shutdown)"""
+        for guild in guilds:
+            task = self.digest_tasks.pop(str(guild.id), None)
+            if task:
+                task.cancel()
+            await self.flush_digest(guild)
+    
     async def log_warning(self, guild: discord.Guild, member: discord.Member, 
                          warning_count: int, reason: str, severity: str):
         """Log a warning to the channel"""
@@ -132,7 +338,10 @@ class ChannelLogger:
             f"{emoji} Warning Issued",
             f"User {member.mention} received a warning.",
             color=color,
-            fields=fields
+            fields=fields,
+            critical=warning_count >= 5 or severity.upper() == "CRITICAL",
+            category=f"Warning ({severity.upper()})",
+            user=str(member)
         )
     
     async def log_mute(self, guild: discord.Guild, member: discord.Member, 
@@ -165,7 +374,10 @@ class ChannelLogger:
             "🔊 User Unmuted",
             f"{member.mention} has been unmuted.",
             color=discord.Color.green(),
-            fields=fields
+            fields=fields,
+            critical=False,
+            category="Unmute",
+            user=str(member)
         )
     
     async def log_detection(self, guild: discord.Guild, member: discord.Member, 
@@ -187,7 +399,10 @@ class ChannelLogger:
             f"🚨 {category.upper()} Detected",
             f"Offensive content detected from {member.mention}.",
             color=discord.Color.dark_red(),
-            fields=fields
+            fields=fields,
+            critical=severity.upper() == "CRITICAL",
+            category=category.upper(),
+            user=str(member)
         )
     
     async def log_clearwarnings(self, guild: discord.Guild, member: discord.Member, 
@@ -204,7 +419,10 @@ class ChannelLogger:
             "✅ Warnings Cleared",
             f"All warnings for {member.mention} have been cleared.",
             color=discord.Color.green(),
-            fields=fields
+            fields=fields,
+            critical=False,
+            category="Warnings Cleared",
+            user=str(member)
         )
     
     async def log_system_event(self, guild: discord.Guild, event_type: str, 
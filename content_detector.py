@@ -10,42 +10,45 @@ from datetime import datetime
 import json
 import os
 
-try:
-    from better_profanity import profanity
-    BETTER_PROFANITY_AVAILABLE = True
-except ImportError:
-    BETTER_PROFANITY_AVAILABLE = False
+from lazy_imports import lazy_import, module_available
+import startup_trace
+from structured_logging import get_logger
 
-try:
-    from langdetect import detect, LangDetectException
-    LANGDETECT_AVAILABLE = True
-except ImportError:
-    LANGDETECT_AVAILABLE = False
+log = get_logger("content_detector")
 
-try:
-    from textblob import TextBlob
-    TEXTBLOB_AVAILABLE = True
-except ImportError:
-    TEXTBLOB_AVAILABLE = False
+# Backends are imported on first use (see lazy_imports.py)
+BETTER_PROFANITY_AVAILABLE = module_available("better_profanity")
+profanity = lazy_import("better_profanity", "profanity")
 
-try:
-    from fuzzywuzzy import fuzz
-    from fuzzywuzzy import process
-    FUZZY_AVAILABLE = True
-except ImportError:
-    FUZZY_AVAILABLE = False
+LANGDETECT_AVAILABLE = module_available("langdetect")
+langdetect = lazy_import("langdetect")
 
-try:
-    from rapidfuzz import fuzz as rapidfuzz_fuzz
-    RAPIDFUZZ_AVAILABLE = True
-except ImportError:
-    RAPIDFUZZ_AVAILABLE = False
+TEXTBLOB_AVAILABLE = module_available("textblob")
+TextBlob = lazy_import("textblob", "TextBlob")
 
-try:
-    from Levenshtein import distance as levenshtein_distance
-    LEVENSHTEIN_AVAILABLE = True
-except ImportError:
-    LEVENSHTEIN_AVAILABLE = False
+FUZZY_AVAILABLE = module_available("fuzzywuzzy")
+fuzz = lazy_import("fuzzywuzzy.fuzz")
+process = lazy_import("fuzzywuzzy.process")
+
+RAPIDFUZZ_AVAILABLE = module_available("rapidfuzz")
+rapidfuzz_fuzz = lazy_import("rapidfuzz.fuzz")
+
+LEVENSHTEIN_AVAILABLE = module_available("Levenshtein")
+levenshtein_distance = lazy_import("Levenshtein", "distance")
+
+
+def get_severity_level(severity_score: float) -> str:
+    """Convert severity score to level (no detector needed; the detector methods use this too)"""
+    if severity_score >= 0.85:
+        return "CRITICAL"
+    elif severity_score >= 0.7:
+        return "HIGH"
+    elif severity_score >= 0.5:
+        return "MEDIUM"
+    elif severity_score >= 0.3:
+        return "LOW"
+    else:
+        return "MINIMAL"
 
 
 class HindiEnglishContentDetector:
@@ -54,7 +57,8 @@ class HindiEnglishContentDetector:
     def __init__(self):
         # Initialize better-profanity
         if BETTER_PROFANITY_AVAILABLE:
-            profanity.load_censor_words()
+            with startup_trace.phase("load_censor_words"):
+                profanity.load_censor_words()
         
         # Extended offensive word lists - ENGLISH with variations
         self.offensive_keywords_en = {
@@ -172,14 +176,14 @@ class HindiEnglishContentDetector:
             return 'en'
         
         try:
-            lang = detect(text)
+            lang = langdetect.detect(text)
             if lang in ['hi', 'en']:
                 return lang
             hindi_pattern = re.compile(r'[\u0900-\u097F]')
             if hindi_pattern.search(text):
                 return 'hi'
             return 'en'
-        except LangDetectException:
+        except langdetect.LangDetectException:
             return 'en'
     
     def fuzzy_match_word(self, word: str, keyword_list: set, threshold: int = 80) -> Tuple[bool, str]:
@@ -251,7 +255,7 @@ class HindiEnglishContentDetector:
                         detected.append(word.strip('.,!?;:'))
                 return True, detected[:5]
         except Exception as e:
-            print(f"[ERROR] Better profanity check failed: {e}")
+            log.error(f"Better profanity check failed: {e}")
         
         return False, []
     
@@ -367,16 +371,7 @@ class HindiEnglishContentDetector:
     
     def get_severity_level(self, severity_score: float) -> str:
         """Convert severity score to level"""
-        if severity_score >= 0.85:
-            return "CRITICAL"
-        elif severity_score >= 0.7:
-            return "HIGH"
-        elif severity_score >= 0.5:
-            return "MEDIUM"
-        elif severity_score >= 0.3:
-            return "LOW"
-        else:
-            return "MINIMAL"
+        return get_severity_level(severity_score)
 
 
 # Singleton instance
@@ -394,7 +389,8 @@ def get_content_detector() -> HindiEnglishContentDetector:
     def __init__(self):
         # Initialize better-profanity
         if BETTER_PROFANITY_AVAILABLE:
-            profanity.load_censor_words()
+            with startup_trace.phase("load_censor_words"):
+                profanity.load_censor_words()
         
         # Extended offensive word lists - ENGLISH
         self.offensive_keywords_en = {
@@ -514,7 +510,7 @@ def get_content_detector() -> HindiEnglishContentDetector:
             return 'en'
         
         try:
-            lang = detect(text)
+            lang = langdetect.detect(text)
             if lang in ['hi', 'en']:
                 return lang
             # Check for Hindi characters as backup
@@ -522,7 +518,7 @@ def get_content_detector() -> HindiEnglishContentDetector:
             if hindi_pattern.search(text):
                 return 'hi'
             return 'en'
-        except LangDetectException:
+        except langdetect.LangDetectException:
             return 'en'  # Default to English on detection failure
     
     def check_better_profanity(self, text: str) -> Tuple[bool, List[str]]:
@@ -539,7 +535,7 @@ def get_content_detector() -> HindiEnglishContentDetector:
                         detected.append(word.strip('.,!?;:'))
                 return True, detected[:5]  # Return up to 5 detected words
         except Exception as e:
-            print(f"[ERROR] Better profanity check failed: {e}")
+            log.error(f"Better profanity check failed: {e}")
         
         return False, []
     
@@ -657,16 +653,7 @@ def get_content_detector() -> HindiEnglishContentDetector:
     
     def get_severity_level(self, severity_score: float) -> str:
         """Convert severity score to level"""
-        if severity_score >= 0.85:
-            return "CRITICAL"
-        elif severity_score >= 0.7:
-            return "HIGH"
-        elif severity_score >= 0.5:
-            return "MEDIUM"
-        elif severity_score >= 0.3:
-            return "LOW"
-        else:
-            return "MINIMAL"
+        return get_severity_level(severity_score)
 
 
 # Singleton instance
@@ -0,0 +1,332 @@
+"""
+Guardify Detection Service
+Loads the abuse detectors once and serves batched analyze requests to any
+number of bot processes over a Unix socket (or localhost TCP).
+
+Protocol (newline-delimited JSON, one request/response per line):
+    -> {"id": 1, "items": [{"detector": "content", "text": "..."}, ...]}
+    <- {"id": 1, "results": [{...analysis...}, {"error": "..."}, ...]}
+    -> {"id": 2, "op": "ping"}
+    <- {"id": 2, "ok": true, "detectors": ["content"]}
+
+Detectors:
+    content  - HindiEnglishContentDetector.analyze_content (bot.py auto-mod)
+    respect  - abuse_detector.AbuseDetector.analyze_message (bot.py !scan)
+    guardify - bot_enhanced.AbuseDetector.analyze_message (TextBlob + VADER)
+
+Usage:
+    python detection_service.py --socket /tmp/guardify-detect.sock
+    python detection_service.py --tcp 127.0.0.1:8765 --preload content,guardify
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import time
+from typing import Callable, Dict, List, Optional
+
+from structured_logging import get_logger
+
+log = get_logger("detection_service")
+
+
+DETECTION_SERVICE_ENV = "GUARDIFY_DETECTION_SERVICE"
+DEFAULT_SOCKET = "/tmp/guardify-detect.sock"
+MAX_BATCH = 64
+
+
+def _load_content():
+    from content_detector import get_content_detector
+    return get_content_detector().analyze_content
+
+
+def _load_respect():
+    from abuse_detector import AbuseDetector
+    return AbuseDetector().analyze_message
+
+
+def _load_guardify():
+    from bot_enhanced import AbuseDetector
+    return AbuseDetector().analyze_message
+
+
+DETECTOR_LOADERS = {
+    "content": _load_content,
+    "respect": _load_respect,
+    "guardify": _load_guardify,
+}
+
+
+class DetectorRegistry:
+    """Creates each detector on first use and keeps it for the process lifetime"""
+
+    def __init__(self):
+        self.detectors = {}  # format: {name: analyze callable}
+
+    def get(self, name: str) -> Callable[[str], Dict]:
+        if name not in self.detectors:
+            if name not in DETECTOR_LOADERS:
+                raise ValueError(f"unknown detector '{name}'")
+            started = time.perf_counter()
+            self.detectors[name] = DETECTOR_LOADERS[name]()
+            log.info("Loaded detector", detector=name, seconds=round(time.perf_counter() - started, 2))
+        return self.detectors[name]
+
+    def analyze_batch(self, items: List[Dict]) -> List[Dict]:
+        """Analyze a batch of {"detector", "text"} items"""
+        results = []
+        for item in items:
+            try:
+                analyze = self.get(item.get("detector", "content"))
+                results.append(analyze(item.get("text", "")))
+            except Exception as e:
+                results.append({"error": str(e)})
+        return results
+
+
+def parse_address(address: str):
+    """Parse "tcp://host:port", "host:port" or a Unix socket path"""
+    if address.startswith("tcp://"):
+        address = address[len("tcp://"):]
+    elif address.startswith("unix://"):
+        return ("unix", address[len("unix://"):])
+    elif os.sep in address or not hasattr(socket, "AF_UNIX"):
+        if ":" not in address:
+            return ("unix", address)
+    host, _, port = address.rpartition(":")
+    return ("tcp", (host or "127.0.0.1", int(port)))
+
+
+class DetectionServer:
+    """Serves batched analyze requests from a shared DetectorRegistry"""
+
+    def __init__(self, registry: DetectorRegistry = None):
+        self.registry = registry or DetectorRegistry()
+        self.requests_served = 0
+        self.items_served = 0
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError:
+                    response = {"id": None, "error": "invalid JSON"}
+                else:
+                    response = {"id": request.get("id")}
+                    if request.get("op") == "ping":
+                        response.update(ok=True, detectors=sorted(self.registry.detectors))
+                    else:
+                        items = request.get("items", [])[:MAX_BATCH]
+                        # Detection is CPU-bound - keep accepting other connections meanwhile
+                        response["results"] = await loop.run_in_executor(
+                            None, self.registry.analyze_batch, items
+                        )
+                        self.requests_served += 1
+                        self.items_served += len(items)
+                writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, address: str):
+        kind, target = parse_address(address)
+        if kind == "unix":
+            if os.path.exists(target):
+                os.unlink(target)
+            server = await asyncio.start_unix_server(self.handle_client, path=target, limit=2 ** 20)
+        else:
+            server = await asyncio.start_server(self.handle_client, host=target[0], port=target[1], limit=2 ** 20)
+        log.info("Detection service listening", address=address)
+        async with server:
+            await server.serve_forever()
+
+
+class DetectionClient:
+    """
+    Client for the detection service
+
+    Concurrent analyze() calls are coalesced into batched requests and sent
+    over a small pool of persistent connections. When the service can't be
+    reached, analysis falls back to the in-process detectors.
+    """
+
+    RETRY_AFTER = 30  # seconds before retrying an unreachable service
+
+    def __init__(self, address: str, pool_size: int = 4, timeout: float = 2.0,
+                 batch_delay: float = 0.002, fallbacks: Dict[str, Callable[[str], Dict]] = None):
+        self.address = address
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.batch_delay = batch_delay
+        self.fallbacks = fallbacks or {}
+        self.local = DetectorRegistry()
+
+        self.idle = []  # idle (reader, writer) connections
+        self.open_connections = 0
+        self.pool_available = None  # asyncio.Condition, created on the running loop
+        self.next_id = 0
+        self.pending = []  # format: [(item, future)]
+        self.flush_handle = None
+        self.down_until = 0.0
+        self.stats = {"remote": 0, "fallback": 0, "batches": 0, "errors": 0}
+
+    def _fallback(self, item: Dict) -> Dict:
+        name = item["detector"]
+        analyze = self.fallbacks.get(name) or self.local.get(name)
+        return analyze(item["text"])
+
+    async def _connect(self):
+        kind, target = parse_address(self.address)
+        if kind == "unix":
+            return await asyncio.open_unix_connection(target, limit=2 ** 20)
+        return await asyncio.open_connection(target[0], target[1], limit=2 ** 20)
+
+    async def _acquire(self):
+        if self.pool_available is None:
+            self.pool_available = asyncio.Condition()
+        async with self.pool_available:
+            while not self.idle and self.open_connections >= self.pool_size:
+                await self.pool_available.wait()
+            if self.idle:
+                return self.idle.pop()
+            self.open_connections += 1
+        try:
+            return await asyncio.wait_for(self._connect(), self.timeout)
+        except Exception:
+            await self._discard()
+            raise
+
+    async def _release(self, connection):
+        async with self.pool_available:
+            self.idle.append(connection)
+            self.pool_available.notify()
+
+    async def _discard(self, connection=None):
+        if connection is not None:
+            connection[1].close()
+        async with self.pool_available:
+            self.open_connections -= 1
+            self.pool_available.notify()
+
+    async def analyze_batch(self, items: List[Dict]) -> List[Dict]:
+        """
+        Analyze a batch of {"detector", "text"} items in one round trip
+
+        Returns:
+            One analysis dict per item, in order
+        """
+        if time.monotonic() >= self.down_until:
+            connection = None
+            try:
+                connection = await self._acquire()
+                reader, writer = connection
+                self.next_id += 1
+                request = {"id": self.next_id, "items": items}
+                writer.write(json.dumps(request, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+                line = await asyncio.wait_for(reader.readline(), self.timeout)
+                if not line:
+                    raise ConnectionError("detection service closed the connection")
+                response = json.loads(line)
+                await self._release(connection)
+
+                results = response["results"]
+                self.stats["remote"] += len(items)
+                self.stats["batches"] += 1
+                # Per-item errors (e.g. detector failed to load remotely) use the local path
+                return [self._fallback(item) if "error" in result else result
+                        for item, result in zip(items, results)]
+            except Exception as e:
+                self.stats["errors"] += 1
+                if connection is not None:
+                    await self._discard(connection)
+                self.down_until = time.monotonic() + self.RETRY_AFTER
+                log.warning(f"Detection service unavailable ({e}), using in-process detectors",
+                            retry_after=self.RETRY_AFTER)
+
+        self.stats["fallback"] += len(items)
+        return [self._fallback(item) for item in items]
+
+    async def analyze(self, detector: str, text: str) -> Dict:
+        """Analyze a single message - batched together with concurrent calls"""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append(({"detector": detector, "text": text}, future))
+
+        if len(self.pending) >= MAX_BATCH:
+            self._flush()
+        elif self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(self.batch_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        batch, self.pending = self.pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._send(batch))
+
+    async def _send(self, batch):
+        try:
+            results = await self.analyze_batch([item for item, _ in batch])
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+        self.open_connections = 0
+
+
+def get_detection_client(fallbacks: Dict[str, Callable[[str], Dict]] = None) -> Optional[DetectionClient]:
+    """Create a client if GUARDIFY_DETECTION_SERVICE is set, otherwise None"""
+    address = os.environ.get(DETECTION_SERVICE_ENV)
+    if not address:
+        return None
+    return DetectionClient(address, fallbacks=fallbacks)
+
+
+def main(argv: List[str] = None):
+    """Run the detection service."""
+    parser = argparse.ArgumentParser(description="Shared Guardify detection service")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--socket', help=f"Unix socket path (default: {DEFAULT_SOCKET})")
+    group.add_argument('--tcp', help="host:port to listen on (e.g. 127.0.0.1:8765)")
+    parser.add_argument('--preload', default="content",
+                        help="Comma-separated detectors to load at startup (default: content)")
+    args = parser.parse_args(argv)
+
+    if args.tcp:
+        address = f"tcp://{args.tcp}"
+    elif args.socket or hasattr(socket, "AF_UNIX"):
+        address = f"unix://{args.socket or DEFAULT_SOCKET}"
+    else:
+        address = "tcp://127.0.0.1:8765"
+
+    server = DetectionServer()
+    for name in filter(None, args.preload.split(',')):
+        server.registry.get(name.strip())
+
+    try:
+        asyncio.run(server.serve(address))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
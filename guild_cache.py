@@ -0,0 +1,175 @@
+"""
+Guild Resolve Cache - Keep resolved channels, roles and parsed config per guild
+Avoids re-resolving IDs on every moderation event and tracks the cache hit rate
+"""
+
+import discord
+from typing import Dict, Optional
+
+
+# Config keys that hold channel/role IDs stored as strings
+CONFIG_ID_KEYS = (
+    'welcome_channel', 'log_channel', 'mod_log_channel',
+    'verification_role', 'verified_role', 'mute_role', 'autorole'
+)
+
+
+class GuildCache:
+    """Per-guild cache of resolved Discord objects and parsed config"""
+
+    def __init__(self):
+        self.channels = {}  # format: {guild_id: {channel_id: channel}}
+        self.roles = {}  # format: {guild_id: {role_id or "name:<name>": role}}
+        self.configs = {}  # format: {guild_id: {config_key: int_id or None}}
+
+        # Hit/miss counters per kind
+        self.stats = {
+            "channel": {"hits": 0, "misses": 0},
+            "role": {"hits": 0, "misses": 0},
+            "config": {"hits": 0, "misses": 0},
+        }
+
+    def _hit(self, kind: str):
+        self.stats[kind]["hits"] += 1
+
+    def _miss(self, kind: str):
+        self.stats[kind]["misses"] += 1
+
+    def get_channel(self, guild: discord.Guild, channel_id) -> Optional[discord.abc.GuildChannel]:
+        """Resolve a channel by ID, using the cache when possible"""
+        if not channel_id:
+            return None
+
+        channel_id = int(channel_id)
+        guild_channels = self.channels.setdefault(guild.id, {})
+
+        channel = guild_channels.get(channel_id)
+        if channel is not None:
+            self._hit("channel")
+            return channel
+
+        self._miss("channel")
+        channel = guild.get_channel(channel_id)
+        if channel is not None:
+            guild_channels[channel_id] = channel
+        return channel
+
+    def get_role(self, guild: discord.Guild, role_id) -> Optional[discord.Role]:
+        """Resolve a role by ID, using the cache when possible"""
+        if not role_id:
+            return None
+
+        role_id = int(role_id)
+        guild_roles = self.roles.setdefault(guild.id, {})
+
+        role = guild_roles.get(role_id)
+        if role is not None:
+            self._hit("role")
+            return role
+
+        self._miss("role")
+        role = guild.get_role(role_id)
+        if role is not None:
+            guild_roles[role_id] = role
+        return role
+
+    def find_role(self, guild: discord.Guild, name: str) -> Optional[discord.Role]:
+        """Find a role by (case-insensitive) name, using the cache when possible"""
+        key = f"name:{name.lower()}"
+        guild_roles = self.roles.setdefault(guild.id, {})
+
+        role = guild_roles.get(key)
+        if role is not None:
+            self._hit("role")
+            return role
+
+        self._miss("role")
+        role = discord.utils.find(lambda r: r.name.lower() == name.lower(), guild.roles)
+        if role is not None:
+            guild_roles[key] = role
+        return role
+
+    def get_config_ids(self, guild_id: str, config: Dict) -> Dict[str, Optional[int]]:
+        """
+        Parse the channel/role IDs of a guild config once
+
+        Args:
+            guild_id: Guild ID
+            config: Guild config as stored in guild_configs.json
+
+        Returns:
+            Dict mapping each ID config key to an int ID (or None if unset)
+        """
+        ids = self.configs.get(guild_id)
+        if ids is not None:
+            self._hit("config")
+            return ids
+
+        self._miss("config")
+        ids = {}
+        for key in CONFIG_ID_KEYS:
+            value = config.get(key)
+            try:
+                ids[key] = int(value) if value else None
+            except (TypeError, ValueError):
+                ids[key] = None
+        self.configs[guild_id] = ids
+        return ids
+
+    def invalidate_guild(self, guild_id):
+        """Drop everything cached for a guild"""
+        self.channels.pop(int(guild_id), None)
+        self.roles.pop(int(guild_id), None)
+        self.configs.pop(str(guild_id), None)
+
+    def invalidate_channel(self, guild_id, channel_id):
+        """Drop a single cached channel"""
+        guild_channels = self.channels.get(int(guild_id))
+        if guild_channels:
+            guild_channels.pop(int(channel_id), None)
+
+    def invalidate_roles(self, guild_id):
+        """Drop cached roles for a guild (IDs and name lookups)"""
+        self.roles.pop(int(guild_id), None)
+
+    def invalidate_config(self, guild_id: str = None):
+        """Drop parsed config for a guild, or for all guilds"""
+        if guild_id is None:
+            self.configs.clear()
+        else:
+            self.configs.pop(str(guild_id), None)
+
+    def get_stats(self) -> Dict:
+        """Get hit/miss counts and hit rate per kind and overall"""
+        report = {}
+        total_hits = total_misses = 0
+
+        for kind, counts in self.stats.items():
+            lookups = counts["hits"] + counts["misses"]
+            report[kind] = {
+                "hits": counts["hits"],
+                "misses": counts["misses"],
+                "hit_rate": round(counts["hits"] / lookups, 4) if lookups else 0.0
+            }
+            total_hits += counts["hits"]
+            total_misses += counts["misses"]
+
+        lookups = total_hits + total_misses
+        report["overall"] = {
+            "hits": total_hits,
+            "misses": total_misses,
+            "hit_rate": round(total_hits / lookups, 4) if lookups else 0.0
+        }
+        report["cached_guilds"] = len(set(self.channels) | set(self.roles))
+        return report
+
+
+# Singleton instance
+_guild_cache = None
+
+def get_guild_cache() -> GuildCache:
+    """Get or create singleton instance"""
+    global _guild_cache
+    if _guild_cache is None:
+        _guild_cache = GuildCache()
+    return _guild_cache
@@ -0,0 +1,49 @@
+"""
+Gunicorn settings for the web dashboard
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Configuration (environment):
+    PORT                        Port to listen on (default: 5000)
+    WEB_CONCURRENCY             Worker processes (default: CPU count, at least 2)
+    GUARDIFY_DASHBOARD_THREADS  Threads per worker (default: 8)
+    GUARDIFY_DASHBOARD_STREAMS  Live /api/stream connections per worker, past which
+                                streams get a 503 (default: half the threads)
+    DASHBOARD_SECRET_KEY        Session key shared by all workers (required for logins to survive restarts)
+"""
+
+import os
+import signal
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Each worker keeps its own stats cache, case index and guild list cache, so
+# scale with threads first: live /api/stream connections each hold a thread, so
+# web_dashboard caps them per worker (GUARDIFY_DASHBOARD_STREAMS) below `threads`
+workers = int(os.environ.get('WEB_CONCURRENCY', max(2, os.cpu_count() or 1)))
+worker_class = "gthread"
+threads = int(os.environ.get('GUARDIFY_DASHBOARD_THREADS', 8))
+
+# Import the app once in the master - workers share the code pages and the session key
+preload_app = True
+
+timeout = 60
+graceful_timeout = 30  # SIGTERM: finish requests in flight for up to this long
+keepalive = 5
+max_requests = 10000  # recycle workers now and then (with jitter so they don't all restart at once)
+max_requests_jitter = 1000
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_worker_init(worker):
+    """End open event streams as soon as a worker is asked to stop, instead of after graceful_timeout"""
+    handle_exit = signal.getsignal(signal.SIGTERM)
+
+    def shutdown(signum, frame):
+        from web_dashboard import event_hub
+        event_hub.close()
+        if callable(handle_exit):
+            handle_exit(signum, frame)
+
+    signal.signal(signal.SIGTERM, shutdown)
@@ -0,0 +1,167 @@
+"""
+Health Server - /health and /metrics served from a separate process
+The bot publishes a snapshot of its health and metrics to a file every few
+seconds (collected on the event loop, written from a worker thread). This small
+stdlib HTTP server runs as its own process and only reads that file, so health
+checks and metric scrapes never wait on the bot's GIL or event loop - and a bot
+whose loop has stalled shows up as a stale snapshot (503) instead of a hang.
+
+Usage (started by bot.py; can also be run by hand):
+    python health_server.py --port 10000 --snapshot forensics_logs/health_snapshot.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+from structured_logging import get_logger
+
+log = get_logger("health_server")
+
+
+SNAPSHOT_FILE = os.path.join("forensics_logs", "health_snapshot.json")
+PUBLISH_INTERVAL = 5.0
+STALE_AFTER = 30.0  # seconds without a new snapshot before /health reports the bot as unhealthy
+
+
+def write_snapshot(path: str, snapshot: Dict):
+    """Replace the snapshot file atomically"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(temp_path, path)
+
+
+def read_snapshot(path: str) -> Optional[Dict]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+async def publish_periodically(collect: Callable[[], Dict], path: str = SNAPSHOT_FILE,
+                               interval: float = PUBLISH_INTERVAL):
+    """
+    Publish collect() every interval seconds (run as a background task)
+
+    The snapshot is collected on the loop (it reads bot state) and written
+    from a worker thread. collect() should return
+    {"health": {...}, "metrics": {...}, "metrics_text": "..."}.
+    """
+    while True:
+        try:
+            snapshot = collect()
+            snapshot["timestamp"] = time.time()
+            snapshot["pid"] = os.getpid()
+            await asyncio.to_thread(write_snapshot, path, snapshot)
+        except Exception as e:
+            log.error(f"Publishing health snapshot failed: {e}")
+        await asyncio.sleep(interval)
+
+
+class HealthRequestHandler(BaseHTTPRequestHandler):
+    """/, /health and /metrics from the published snapshot"""
+
+    server_version = "GuardifyHealth"
+    snapshot_path = SNAPSHOT_FILE
+    stale_after = STALE_AFTER
+
+    def do_GET(self):
+        path, _, query = self.path.partition('?')
+        if path == '/':
+            self.reply(200, "text/plain; charset=utf-8", "Guardify Bot is online! 🛡️")
+        elif path == '/health':
+            status, body = self.health()
+            self.reply(status, "application/json", json.dumps(body))
+        elif path == '/metrics':
+            snapshot = read_snapshot(self.snapshot_path) or {}
+            if 'format=json' in query:
+                self.reply(200, "application/json", json.dumps(snapshot.get("metrics", {})))
+            else:
+                self.reply(200, "text/plain; version=0.0.4", snapshot.get("metrics_text", ""))
+        else:
+            self.reply(404, "application/json", json.dumps({"error": "not found"}))
+
+    def health(self):
+        snapshot = read_snapshot(self.snapshot_path)
+        if snapshot is None:
+            return 200, {"status": "starting", "bot": "connecting"}
+        body = dict(snapshot.get("health", {}))
+        age = time.time() - snapshot.get("timestamp", 0)
+        body["snapshot_age_seconds"] = round(age, 1)
+        if age > self.stale_after:
+            body["status"] = "stale"
+            return 503, body
+        return 200, body
+
+    def reply(self, status: int, content_type: str, body: str):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # health checks arrive every few seconds - don't log each one
+
+
+def create_server(port: int, snapshot_path: str = SNAPSHOT_FILE, host: str = '0.0.0.0',
+                  stale_after: float = STALE_AFTER) -> ThreadingHTTPServer:
+    handler = type("Handler", (HealthRequestHandler,), {"snapshot_path": snapshot_path,
+                                                          "stale_after": stale_after})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = False  # server_close() waits for requests in flight
+    return server
+
+
+def _exit_with_parent(server: ThreadingHTTPServer, parent_pid: int, interval: float = 2.0):
+    """Stop serving once the bot process is gone (even if it was killed without cleanup)"""
+    while True:
+        time.sleep(interval)
+        if os.getppid() != parent_pid:
+            server.shutdown()
+            return
+
+
+def start_health_process(port: int, snapshot_path: str = SNAPSHOT_FILE) -> subprocess.Popen:
+    """Run the health server as a child process of the bot"""
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__), "--port", str(port),
+                             "--snapshot", os.path.abspath(snapshot_path), "--parent-pid", str(os.getpid())])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve /health and /metrics from the bot's published snapshot")
+    parser.add_argument("--port", type=int, default=int(os.environ.get('PORT', 10000)))
+    parser.add_argument("--snapshot", default=SNAPSHOT_FILE)
+    parser.add_argument("--stale-after", type=float, default=STALE_AFTER)
+    parser.add_argument("--parent-pid", type=int, help="Exit when this process (the bot) exits")
+    args = parser.parse_args(argv)
+
+    server = create_server(args.port, args.snapshot, stale_after=args.stale_after)
+    # SIGTERM finishes the requests in flight, then exits
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    if args.parent_pid:
+        threading.Thread(target=_exit_with_parent, args=(server, args.parent_pid), daemon=True).start()
+    log.info("Health server listening", port=args.port, snapshot=args.snapshot)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,207 @@
+"""
+Lazy Imports - Defer heavy NLP backends until first use
+Each backend is imported on first attribute access or call, or warmed up in a
+background thread once the gateway is connected, and its import time is recorded.
+
+Usage:
+    TextBlob = lazy_import("textblob", "TextBlob")
+    blob = TextBlob(text)  # textblob is imported here
+
+    python lazy_imports.py  # cold import cost of every known backend
+"""
+
+import importlib
+import importlib.util
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from structured_logging import get_logger
+
+log = get_logger("lazy_imports")
+
+
+# Heavy optional dependencies from requirements.txt
+KNOWN_BACKENDS = [
+    "textblob", "vaderSentiment.vaderSentiment", "pandas", "langdetect", "better_profanity",
+    "fuzzywuzzy", "rapidfuzz", "Levenshtein", "nltk", "transformers", "torch",
+]
+
+
+class LazyModule:
+    """Proxy for a module (or an attribute of one) that is imported on first use"""
+
+    def __init__(self, module: str, attr: Optional[str] = None):
+        self._module = module
+        self._attr = attr
+        self._value = None
+        self._loaded = False
+        self._error = None
+        self._seconds = None
+        self._lock = threading.Lock()
+
+    @property
+    def _label(self) -> str:
+        return f"{self._module}.{self._attr}" if self._attr else self._module
+
+    def _load(self):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                started = time.perf_counter()
+                try:
+                    value = importlib.import_module(self._module)
+                    if self._attr:
+                        value = getattr(value, self._attr)
+                except Exception as e:
+                    self._error = f"{type(e).__name__}: {e}"
+                    raise
+                finally:
+                    self._seconds = time.perf_counter() - started
+                self._value = value
+                self._loaded = True
+        return self._value
+
+    def __getattr__(self, item):
+        return getattr(self._load(), item)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self):
+        state = "loaded" if self._loaded else "not loaded"
+        return f"<LazyModule {self._label} ({state})>"
+
+
+# Registry of every lazy backend, keyed by label
+_backends: Dict[str, LazyModule] = {}
+_registry_lock = threading.Lock()
+
+
+def lazy_import(module: str, attr: Optional[str] = None) -> LazyModule:
+    """
+    Get a lazy proxy for a module or one of its attributes
+
+    Args:
+        module: Dotted module name (e.g. "vaderSentiment.vaderSentiment")
+        attr: Optional attribute to return instead of the module
+
+    Returns:
+        Shared LazyModule proxy (the same one for repeated calls)
+    """
+    label = f"{module}.{attr}" if attr else module
+    with _registry_lock:
+        if label not in _backends:
+            _backends[label] = LazyModule(module, attr)
+        return _backends[label]
+
+
+def module_available(module: str) -> bool:
+    """Check if a module is installed without importing it"""
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def warm_up(labels: Optional[List[str]] = None) -> Dict[str, float]:
+    """
+    Import registered backends now
+
+    Args:
+        labels: Backends to load (default: all registered)
+
+    Returns:
+        Dict mapping each backend to its import time in seconds
+    """
+    timings = {}
+    for label in labels or list(_backends):
+        proxy = _backends.get(label)
+        if proxy is None:
+            continue
+        try:
+            proxy._load()
+        except Exception:
+            pass  # Recorded in the report, callers fall back on first use
+        timings[label] = proxy._seconds
+    return timings
+
+
+def start_background_warmup(labels: Optional[List[str]] = None) -> threading.Thread:
+    """Warm up backends in a daemon thread so the event loop keeps serving the gateway"""
+
+    def run():
+        import startup_trace
+
+        started = time.perf_counter()
+        with startup_trace.phase("backend_warmup"):
+            warm_up(labels)
+        startup_trace.get_startup_trace().write_report()
+        log.info("Warmed up NLP backends", backends=len(labels or _backends),
+                 seconds=round(time.perf_counter() - started, 2))
+        log.debug(format_import_report())
+
+    thread = threading.Thread(target=run, name="lazy-import-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def import_report() -> List[Dict]:
+    """Import state and cost of every registered backend, slowest first"""
+    report = []
+    for label, proxy in list(_backends.items()):
+        report.append({
+            "backend": label,
+            "loaded": proxy._loaded,
+            "seconds": round(proxy._seconds, 4) if proxy._seconds is not None else None,
+            "error": proxy._error
+        })
+    report.sort(key=lambda r: r["seconds"] or 0, reverse=True)
+    return report
+
+
+def format_import_report() -> str:
+    """Human readable import report"""
+    lines = ["Backend import report:"]
+    for entry in import_report():
+        if entry["error"]:
+            state = f"failed ({entry['error']})"
+        elif entry["loaded"]:
+            state = f"{entry['seconds'] * 1000:.0f} ms"
+        else:
+            state = "not loaded yet"
+        lines.append(f"  {entry['backend']:<45} {state}")
+    return "\n".join(lines)
+
+
+def measure_cold_import(module: str) -> Optional[float]:
+    """Import time of a module in a fresh interpreter (None if not installed)"""
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - t)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Print the cold import cost of every known backend."""
+    print("Cold import cost (fresh interpreter per backend):")
+    total = 0.0
+    for module in KNOWN_BACKENDS:
+        seconds = measure_cold_import(module)
+        if seconds is None:
+            print(f"  {module:<35} not installed")
+            continue
+        total += seconds
+        print(f"  {module:<35} {seconds * 1000:8.0f} ms")
+    print(f"  {'total (upper bound)':<35} {total * 1000:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Live Events - Server-sent event stream of dashboard updates
+A single tailer thread refreshes the shared StatsCache, which reports appended
+evidence, warning count changes and mute changes as events. Each event is
+published once into a short numbered backlog, and every open stream only
+reads the events after the last id it sent - so the work per update is
+proportional to the new events, not to the log size or to the number of
+connected dashboards. The tailer stops when the last stream closes.
+
+Every open stream holds a worker thread, so a hub can cap its streams
+(admit/release) and leave the remaining threads for ordinary requests.
+
+Event payloads carry absolute values (totals, current warning count), so a
+client that sees an event twice, or also re-fetches /api/stats, stays correct.
+"""
+
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+
+from stats_cache import StatsCache
+from structured_logging import get_logger
+
+log = get_logger("live_events")
+
+
+POLL_INTERVAL = 1.0
+BACKLOG = 1000
+HEARTBEAT_SECONDS = 15.0
+STREAM_MAX_SECONDS = 300.0  # streams end so worker threads are recycled; browsers reconnect with Last-Event-ID
+RETRY_MS = 3000
+STREAMS_FULL_RETRY_SECONDS = 30  # Retry-After for streams refused by the cap
+
+
+def format_event(event_id: int, event: str, data: str) -> str:
+    """One text/event-stream message"""
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+
+class EventHub:
+    """Fans out StatsCache changes to any number of SSE streams"""
+
+    def __init__(self, stats_cache: StatsCache, poll_interval: float = POLL_INTERVAL,
+                 backlog: int = BACKLOG, max_streams: Optional[int] = None):
+        self.stats_cache = stats_cache
+        self.poll_interval = poll_interval
+        self.max_streams = max_streams  # None for no cap
+        self.events = deque(maxlen=backlog)  # format: (id, guild_id, event, JSON data)
+        self.last_id = 0
+        self.subscribers = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        self._tailer = None
+        stats_cache.add_listener(self.publish)
+
+    def publish(self, event: str, guild_id: Optional[str], data: dict):
+        """Add an event to the backlog and wake the streams (guild_id None goes to every stream)"""
+        payload = json.dumps(data, ensure_ascii=False)
+        with self.condition:
+            self.last_id += 1
+            self.events.append((self.last_id, guild_id, event, payload))
+            self.condition.notify_all()
+
+    def admit(self) -> bool:
+        """Reserve a stream slot; False if max_streams streams are already open (call release when done)"""
+        with self.condition:
+            if self.max_streams is not None and self.subscribers >= self.max_streams:
+                return False
+            self.subscribers += 1
+            return True
+
+    def release(self):
+        """Free a slot reserved with admit"""
+        with self.condition:
+            self.subscribers -= 1
+
+    def start(self):
+        """Start the tailer thread if it isn't running"""
+        with self.condition:
+            if self._tailer is None:
+                self._tailer = threading.Thread(target=self._tail, name="live-events-tailer", daemon=True)
+                self._tailer.start()
+
+    def close(self):
+        """End every open stream (graceful shutdown - browsers reconnect to another worker)"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def _tail(self):
+        while True:
+            with self.condition:
+                if self.subscribers == 0:
+                    self._tailer = None
+                    return
+            try:
+                self.stats_cache.refresh()
+            except Exception as e:
+                log.error(f"Refreshing live dashboard data failed: {e}")
+            time.sleep(self.poll_interval)
+
+    def events_after(self, last_id: int, guild_id: Optional[str] = None) -> Optional[List[Tuple[int, str, str]]]:
+        """
+        Events newer than last_id for one guild (or all guilds); call with the condition held
+
+        Returns:
+            List of (id, event, JSON data), or None if the stream can't be resumed
+            from last_id because those events already left the backlog
+        """
+        if last_id > self.last_id or (self.events and last_id < self.events[0][0] - 1):
+            return None
+        start = len(self.events) - (self.last_id - last_id)
+        return [(event_id, event, data)
+                for event_id, scope, event, data in itertools.islice(self.events, start, None)
+                if guild_id is None or scope is None or scope == str(guild_id)]
+
+    def wait(self, last_id: int, guild_id: Optional[str] = None,
+             timeout: float = HEARTBEAT_SECONDS) -> Tuple[int, Optional[List[Tuple[int, str, str]]]]:
+        """Block until there are events after last_id or the timeout passes; returns (newest id, events)"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.last_id != last_id or self.closed, timeout)
+            return self.last_id, self.events_after(last_id, guild_id)
+
+    def stream(self, guild_id: Optional[str] = None, last_id: Optional[int] = None,
+               heartbeat: float = HEARTBEAT_SECONDS,
+               max_duration: Optional[float] = STREAM_MAX_SECONDS, admitted: bool = False) -> Iterator[str]:
+        """
+        text/event-stream chunks for one client
+
+        Args:
+            guild_id: Only send this guild's events (None for all guilds)
+            last_id: Resume after this event id (the Last-Event-ID header), None to start now
+            heartbeat: Seconds between keep-alive comments when nothing happens
+            max_duration: End the stream after this many seconds (None to never end)
+            admitted: The caller reserved a slot with admit and releases it itself
+                (a generator that is closed before it starts never runs its finally)
+        """
+        with self.condition:
+            if not admitted:
+                self.subscribers += 1
+            if last_id is None:
+                last_id = self.last_id
+        self.start()
+        started = time.monotonic()
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            yield format_event(last_id, "ready", json.dumps({"guild_id": guild_id}))
+            while not self.closed and (max_duration is None or time.monotonic() - started < max_duration):
+                newest, events = self.wait(last_id, guild_id, heartbeat)
+                if events is None:
+                    yield format_event(newest, "reset", "{}")  # client reloads /api/stats
+                elif events:
+                    yield "".join(format_event(*event) for event in events)
+                elif newest == last_id:
+                    yield ": keep-alive\n\n"
+                last_id = newest
+        finally:
+            if not admitted:
+                self.release()
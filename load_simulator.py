@@ -0,0 +1,581 @@
+"""
+Load Simulator - Drive the moderation pipeline offline with a fake Discord gateway
+Builds fake guilds, channels, members and messages and feeds them to
+RespectRanger.on_message, on_member_join and the prefix commands at a fixed
+arrival rate. Every Discord REST call is replaced by a stub with injected
+latency and per-route rate limits, so no token or network access is needed.
+
+Reports throughput, end-to-end latency percentiles per event kind, pipeline
+stage latencies, REST calls and rate-limit waits, and how the backlog of
+arrived-but-unfinished events grows over the run.
+
+The bot reads and writes its state files in a temporary directory.
+
+Usage:
+    python load_simulator.py --rate 20 --duration 30
+    python load_simulator.py --rate 50 --latency-ms 120 --output load_report.json
+"""
+
+import argparse
+import asyncio
+import functools
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+import discord
+from discord.ext import commands
+
+from benchmark_detectors import generate_corpus
+from metrics import Histogram
+
+
+# Requests allowed per bucket and window (seconds), modelled on Discord's limits
+DEFAULT_ROUTE_LIMITS = {
+    "send_message": (5, 5.0),  # per channel
+    "delete_message": (5, 1.0),  # per channel
+    "dm": (5, 5.0),  # per user
+    "edit_member": (10, 10.0),  # per guild (timeouts)
+    "add_role": (10, 10.0),  # per guild
+    "remove_role": (10, 10.0),  # per guild
+    "create_role": (250, 48 * 3600.0),  # per guild
+    "edit_channel_permissions": (10, 10.0),  # per guild
+}
+GLOBAL_LIMIT = (50, 1.0)
+BACKLOG_SAMPLE_INTERVAL = 0.5
+
+_snowflakes = itertools.count(1_100_000_000_000_000_000)
+
+
+def snowflake() -> int:
+    """Unique 19-digit ID (what discord.py's converters expect)"""
+    return next(_snowflakes)
+
+
+# ============= FAKE REST API =============
+
+class RateLimitBucket:
+    """Fixed-window rate limit like Discord's X-RateLimit-Remaining/Reset"""
+
+    def __init__(self, limit: int, per: float):
+        self.limit = limit
+        self.per = per
+        self.remaining = limit
+        self.reset_at = 0.0
+
+    def acquire(self, now: float) -> float:
+        """Take a request slot; returns 0 or the seconds to wait before retrying"""
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.per
+        if self.remaining > 0:
+            self.remaining -= 1
+            return 0.0
+        return self.reset_at - now
+
+
+class FakeRest:
+    """Stand-in for Discord's HTTP API with injected latency and rate limits"""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.02, route_limits: Dict = None,
+                 global_limit: Tuple[int, float] = GLOBAL_LIMIT, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.route_limits = route_limits if route_limits is not None else DEFAULT_ROUTE_LIMITS
+        self.global_bucket = RateLimitBucket(*global_limit) if global_limit else None
+        self.rng = random.Random(seed)
+        self.buckets = {}  # format: {(route, bucket key): RateLimitBucket}
+        self.calls = Counter()
+        self.rate_limited = Counter()
+        self.waited = defaultdict(float)
+        self.histograms = defaultdict(Histogram)  # request time incl. rate limit waits
+
+    async def call(self, route: str, bucket_key=None):
+        """Simulate one REST request (waits out rate limits like discord.py does on a 429)"""
+        started = time.monotonic()
+        limit = self.route_limits.get(route)
+        bucket = None
+        if limit:
+            bucket = self.buckets.get((route, bucket_key))
+            if bucket is None:
+                bucket = self.buckets[(route, bucket_key)] = RateLimitBucket(*limit)
+
+        while True:
+            now = time.monotonic()
+            wait = self.global_bucket.acquire(now) if self.global_bucket else 0.0
+            if not wait and bucket is not None:
+                wait = bucket.acquire(now)
+            if not wait:
+                break
+            self.rate_limited[route] += 1
+            self.waited[route] += wait
+            await asyncio.sleep(wait)
+
+        await asyncio.sleep(max(0.0, self.rng.gauss(self.latency, self.jitter)))
+        self.calls[route] += 1
+        self.histograms[route].observe(time.monotonic() - started)
+
+    def stats(self) -> Dict:
+        return {
+            route: {
+                "calls": self.calls[route],
+                "rate_limited": self.rate_limited[route],
+                "waited_seconds": round(self.waited[route], 3),
+                "latency": self.histograms[route].snapshot()
+            } for route in sorted(self.calls)
+        }
+
+
+# ============= FAKE DISCORD OBJECTS =============
+
+class FakeAsset:
+    def __init__(self, url: str):
+        self.url = url
+
+
+class FakeRole:
+    def __init__(self, guild: "FakeGuild", name: str):
+        self.id = snowflake()
+        self.guild = guild
+        self.name = name
+        self.mention = f"<@&{self.id}>"
+
+    def __str__(self):
+        return self.name
+
+
+class FakeUser:
+    """A user outside of any guild (the bot itself, DM targets)"""
+
+    def __init__(self, rest: FakeRest, name: str, bot: bool = False, account_age_days: int = 365):
+        self.id = snowflake()
+        self.rest = rest
+        self.name = name
+        self.display_name = name
+        self.discriminator = "0"
+        self.bot = bot
+        self.mention = f"<@{self.id}>"
+        self.created_at = discord.utils.utcnow() - timedelta(days=account_age_days)
+        self.avatar = None
+        self.default_avatar = FakeAsset("https://cdn.discordapp.com/embed/avatars/0.png")
+
+    def __str__(self):
+        return self.name
+
+    async def send(self, content=None, **kwargs):
+        await self.rest.call("dm", self.id)
+
+
+class FakeMember(FakeUser):
+    """Guild member - passes isinstance(x, discord.Member) so command converters accept it"""
+
+    def __init__(self, rest: FakeRest, guild: "FakeGuild", name: str, moderator: bool = False,
+                 account_age_days: int = 365):
+        super().__init__(rest, name, account_age_days=account_age_days)
+        self.guild = guild
+        self.moderator = moderator
+        self.roles = []
+        self.joined_at = discord.utils.utcnow()
+
+    @property
+    def __class__(self):
+        return discord.Member
+
+    async def add_roles(self, *roles, reason: str = None):
+        for role in roles:
+            await self.rest.call("add_role", self.guild.id)
+            self.roles.append(role)
+
+    async def remove_roles(self, *roles, reason: str = None):
+        for role in roles:
+            await self.rest.call("remove_role", self.guild.id)
+            if role in self.roles:
+                self.roles.remove(role)
+
+    async def timeout(self, until, reason: str = None):
+        await self.rest.call("edit_member", self.guild.id)
+
+
+class FakeChannel:
+    def __init__(self, rest: FakeRest, guild: "FakeGuild", name: str):
+        self.id = snowflake()
+        self.rest = rest
+        self.guild = guild
+        self.name = name
+        self.type = discord.ChannelType.text
+        self.mention = f"<#{self.id}>"
+
+    def __str__(self):
+        return self.name
+
+    def permissions_for(self, member) -> discord.Permissions:
+        return discord.Permissions.all() if getattr(member, "moderator", False) else discord.Permissions.text()
+
+    async def send(self, content=None, **kwargs) -> "FakeMessage":
+        await self.rest.call("send_message", self.id)
+        return FakeMessage(self, self.guild.bot_member, content or "")
+
+    async def set_permissions(self, target, **kwargs):
+        await self.rest.call("edit_channel_permissions", self.guild.id)
+
+
+class FakeMessage:
+    def __init__(self, channel: FakeChannel, author: FakeUser, content: str):
+        self.id = snowflake()
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.created_at = discord.utils.utcnow()
+        self.mentions = []
+        self.attachments = []
+        self._state = None
+
+    async def delete(self, delay: float = None):
+        if delay:
+            async def delete_later():
+                await asyncio.sleep(delay)
+                await self.channel.rest.call("delete_message", self.channel.id)
+            asyncio.create_task(delete_later())
+            return
+        await self.channel.rest.call("delete_message", self.channel.id)
+
+
+class FakeGuild:
+    def __init__(self, rest: FakeRest, name: str, bot_user: FakeUser, channels: int = 3):
+        self.id = snowflake()
+        self.rest = rest
+        self.name = name
+        self.owner_id = None
+        self.created_at = discord.utils.utcnow() - timedelta(days=1000)
+        self.members = {}  # format: {member id: FakeMember}
+        self.roles = [FakeRole(self, "@everyone"), FakeRole(self, "Member")]
+        self.channels = [FakeChannel(rest, self, f"channel-{i}") for i in range(channels)]
+        self.bot_member = FakeMember(rest, self, bot_user.name, moderator=True)
+        self.bot_member.id = bot_user.id
+
+    @property
+    def member_count(self) -> int:
+        return len(self.members)
+
+    @property
+    def text_channels(self) -> List[FakeChannel]:
+        return self.channels
+
+    def get_channel(self, channel_id: int) -> Optional[FakeChannel]:
+        return next((c for c in self.channels if c.id == channel_id), None)
+
+    def get_role(self, role_id: int) -> Optional[FakeRole]:
+        return next((r for r in self.roles if r.id == role_id), None)
+
+    def get_member(self, member_id: int) -> Optional[FakeMember]:
+        return self.members.get(member_id)
+
+    def get_member_named(self, name: str) -> Optional[FakeMember]:
+        return next((m for m in self.members.values() if m.name == name), None)
+
+    def add_member(self, name: str, moderator: bool = False, account_age_days: int = 365) -> FakeMember:
+        member = FakeMember(self.rest, self, name, moderator, account_age_days)
+        self.members[member.id] = member
+        return member
+
+    async def create_role(self, name: str, **kwargs) -> FakeRole:
+        await self.rest.call("create_role", self.id)
+        role = FakeRole(self, name)
+        self.roles.append(role)
+        return role
+
+
+class SimContext(commands.Context):
+    """Command context that replies through the fake channel instead of the HTTP client"""
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    async def reply(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+
+# ============= SIMULATOR =============
+
+class LoadSimulator:
+    """Generates gateway events at a fixed rate and measures how the bot keeps up"""
+
+    COMMANDS = ["!stats", "!warningstats", "!scan {text}", "!warnings {mention}"]
+
+    def __init__(self, bot, rest: FakeRest, guilds: int = 2, channels: int = 3, users: int = 100,
+                 join_share: float = 0.05, command_share: float = 0.05, seed: int = 0):
+        """
+        Args:
+            bot: RespectRanger instance (not logged in)
+            rest: Fake REST API shared by every fake object
+            guilds: Number of guilds
+            channels: Text channels per guild
+            users: Members per guild at the start
+            join_share: Share of events that are member joins
+            command_share: Share of events that are moderator commands
+            seed: Random seed for the event mix
+        """
+        self.bot = bot
+        self.rest = rest
+        self.rng = random.Random(seed)
+        self.join_share = join_share
+        self.command_share = command_share
+        self.corpus = [entry["content"] for entry in generate_corpus(2000, seed)]
+
+        self.bot_user = FakeUser(rest, "Guardify", bot=True)
+        self.guilds = [FakeGuild(rest, f"Load Test {i}", self.bot_user, channels) for i in range(guilds)]
+        for guild in self.guilds:
+            guild.moderators = [guild.add_member(f"mod{i}", moderator=True) for i in range(2)]
+            for i in range(users):
+                guild.add_member(f"user{i}", account_age_days=self.rng.choice([1, 30, 365]))
+
+        self.dispatched = Counter()
+        self.completed = Counter()
+        self.errors = Counter()
+        self.error_examples = []
+        self.latency = defaultdict(Histogram)
+        self.backlog = []  # format: [(seconds since start, events due but not finished)]
+        self.in_flight = set()
+
+    async def attach(self):
+        """Prepare the bot for offline use: event loop, bot user, guild configs, command context"""
+        bot = self.bot
+        await bot._async_setup_hook()
+        await bot.setup_hook()
+        bot._connection.user = self.bot_user
+        bot.get_context = functools.partial(type(bot).get_context, bot, cls=SimContext)
+        bot.add_listener(self.on_command_error, "on_command_error")
+
+        for guild in self.guilds:
+            guild_id = str(guild.id)
+            config = bot.get_guild_config(guild_id)
+            config["welcome_channel"] = str(guild.channels[0].id)
+            config["log_channel"] = str(guild.channels[-1].id)
+            config["autorole"] = str(guild.roles[1].id)
+            bot.channel_logger.set_log_channel(guild_id, str(guild.channels[-1].id))
+        bot.save_guild_configs()
+
+    async def on_command_error(self, ctx, error):
+        self.record_error("command", error)
+
+    def record_error(self, kind: str, error: BaseException):
+        self.errors[kind] += 1
+        if len(self.error_examples) < 10:
+            self.error_examples.append(f"{kind}: {type(error).__name__}: {error}")
+
+    def next_event(self) -> Tuple[str, object]:
+        """Pick the next event (kind, coroutine factory argument)"""
+        guild = self.rng.choice(self.guilds)
+        roll = self.rng.random()
+        if roll < self.join_share:
+            return "join", guild
+        if roll < self.join_share + self.command_share:
+            template = self.rng.choice(self.COMMANDS)
+            target = self.rng.choice(list(guild.members.values()))
+            content = template.format(text=self.rng.choice(self.corpus)[:200], mention=target.mention)
+            return "command", FakeMessage(self.rng.choice(guild.channels), self.rng.choice(guild.moderators), content)
+        author = self.rng.choice(list(guild.members.values()))
+        return "message", FakeMessage(self.rng.choice(guild.channels), author, self.rng.choice(self.corpus))
+
+    async def handle(self, kind: str, payload):
+        started = time.monotonic()
+        try:
+            if kind == "join":
+                member = payload.add_member(f"joiner{snowflake() % 100000}", account_age_days=self.rng.choice([1, 400]))
+                await self.bot.on_member_join(member)
+            else:
+                await self.bot.on_message(payload)
+        except Exception as e:
+            self.record_error(kind, e)
+        finally:
+            self.latency[kind].observe(time.monotonic() - started)
+            self.completed[kind] += 1
+
+    async def run(self, rate: float, duration: float, drain: float = 30.0) -> Dict:
+        """
+        Generate events at `rate` per second for `duration` seconds
+
+        Arrivals are open-loop: events are due on a fixed schedule whether or
+        not earlier ones have finished, so a bot that can't keep up shows a
+        growing backlog instead of a lower arrival rate.
+
+        Args:
+            rate: Events per second
+            duration: Seconds to generate events for
+            drain: Seconds to wait for in-flight events after the last arrival
+
+        Returns:
+            Report dict
+        """
+        total = int(rate * duration)
+        started = time.monotonic()
+        sampler = asyncio.create_task(self._sample_backlog(started, rate, total))
+        max_dispatch_lag = 0.0
+
+        for index in range(total):
+            due = started + index / rate
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                max_dispatch_lag = max(max_dispatch_lag, -delay)
+            kind, payload = self.next_event()
+            self.dispatched[kind] += 1
+            task = asyncio.create_task(self.handle(kind, payload))
+            self.in_flight.add(task)
+            task.add_done_callback(self.in_flight.discard)
+
+        generated_at = time.monotonic()
+        if self.in_flight:
+            await asyncio.wait(set(self.in_flight), timeout=drain)
+        finished_at = time.monotonic()
+        sampler.cancel()
+
+        elapsed = finished_at - started
+        completed = sum(self.completed.values())
+        return {
+            "config": {"rate": rate, "duration": duration, "guilds": len(self.guilds),
+                       "members": sum(g.member_count for g in self.guilds)},
+            "events": {kind: {"dispatched": self.dispatched[kind], "completed": self.completed[kind],
+                              "errors": self.errors[kind]} for kind in sorted(self.dispatched)},
+            "throughput_per_sec": round(completed / elapsed, 2) if elapsed else None,
+            "arrival_seconds": round(generated_at - started, 3),
+            "drain_seconds": round(finished_at - generated_at, 3),
+            "unfinished": len(self.in_flight),
+            "max_dispatch_lag_ms": round(max_dispatch_lag * 1000, 1),
+            "latency": {kind: histogram.snapshot() for kind, histogram in sorted(self.latency.items())},
+            "backlog": self._backlog_summary(),
+            "pipeline_stages": {name: h.snapshot() for name, h in sorted(self.bot.metrics.histograms.items())
+                                if name.startswith("on_message.")},
+            "rest": self.rest.stats(),
+            "blocking_call_sites": [{k: v for k, v in site.items() if k != "stack"}
+                                    for site in self.bot.loop_watchdog.report(5)],
+            "error_examples": self.error_examples
+        }
+
+    async def _sample_backlog(self, started: float, rate: float, total: int):
+        while True:
+            elapsed = time.monotonic() - started
+            due = min(total, int(elapsed * rate) + 1)
+            self.backlog.append((round(elapsed, 2), due - sum(self.completed.values())))
+            await asyncio.sleep(BACKLOG_SAMPLE_INTERVAL)
+
+    def _backlog_summary(self) -> Dict:
+        """Max and final backlog plus its growth rate (least squares slope, events/sec)"""
+        if not self.backlog:
+            return {"max": 0, "final": 0, "growth_per_sec": 0.0, "samples": []}
+        xs = [t for t, _ in self.backlog]
+        ys = [b for _, b in self.backlog]
+        mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+        spread = sum((x - mean_x) ** 2 for x in xs)
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread if spread else 0.0
+        return {"max": max(ys), "final": ys[-1], "growth_per_sec": round(slope, 3), "samples": self.backlog}
+
+
+def format_report(report: Dict) -> str:
+    """Human readable summary"""
+    config = report["config"]
+    backlog = report["backlog"]
+    lines = [
+        f"Load: {config['rate']} events/sec for {config['duration']}s "
+        f"({config['guilds']} guilds, {config['members']} members)",
+        f"Throughput: {report['throughput_per_sec']} events/sec, "
+        f"drain {report['drain_seconds']}s, unfinished {report['unfinished']}, "
+        f"max dispatch lag {report['max_dispatch_lag_ms']} ms",
+        f"Backlog: max {backlog['max']}, final {backlog['final']}, growth {backlog['growth_per_sec']} events/sec",
+        "",
+        "Event latency (end to end, incl. REST):"
+    ]
+    for kind, snapshot in report["latency"].items():
+        counts = report["events"][kind]
+        lines.append(f"    {kind:<10} n={snapshot['count']:<6} p50 {snapshot['p50_ms']} ms  "
+                     f"p95 {snapshot['p95_ms']} ms  p99 {snapshot['p99_ms']} ms  errors {counts['errors']}")
+    lines.append("Pipeline stages (on_message):")
+    for name, snapshot in report["pipeline_stages"].items():
+        lines.append(f"    {name.split('.', 1)[1]:<22} p50 {snapshot['p50_ms']} ms  p99 {snapshot['p99_ms']} ms")
+    lines.append("REST:")
+    for route, stats in report["rest"].items():
+        lines.append(f"    {route:<26} calls {stats['calls']:<6} rate limited {stats['rate_limited']:<5} "
+                     f"waited {stats['waited_seconds']}s  p95 {stats['latency']['p95_ms']} ms")
+    if report["blocking_call_sites"]:
+        lines.append("Event loop blocked at:")
+        for site in report["blocking_call_sites"]:
+            lines.append(f"    {site['site']}  x{site['count']}  max {site['max_ms']} ms")
+    for example in report["error_examples"]:
+        lines.append(f"ERROR {example}")
+    return "\n".join(lines)
+
+
+async def run_simulation(bot, args) -> Dict:
+    """Attach a simulator to the bot, run it and clean up leftover tasks"""
+    rest = FakeRest(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                    route_limits={} if args.no_rate_limits else None,
+                    global_limit=None if args.no_rate_limits else GLOBAL_LIMIT, seed=args.seed)
+    simulator = LoadSimulator(bot, rest, guilds=args.guilds, channels=args.channels, users=args.users,
+                              join_share=args.join_share, command_share=args.command_share, seed=args.seed)
+    await simulator.attach()
+    try:
+        return await simulator.run(args.rate, args.duration, args.drain)
+    finally:
+        bot.loop_watchdog.stop()
+        # Scheduled unmutes, permission rollouts and digests would outlive the run
+        for task in asyncio.all_tasks():
+            if task is not asyncio.current_task():
+                task.cancel()
+
+
+def main(argv: List[str] = None) -> int:
+    """Run the load simulation."""
+    parser = argparse.ArgumentParser(description="Offline load test of the Guardify moderation pipeline")
+    parser.add_argument('--rate', type=float, default=20.0, help="Events per second")
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds of event generation")
+    parser.add_argument('--drain', type=float, default=30.0, help="Seconds to wait for in-flight events")
+    parser.add_argument('--guilds', type=int, default=2)
+    parser.add_argument('--channels', type=int, default=3, help="Text channels per guild")
+    parser.add_argument('--users', type=int, default=100, help="Members per guild")
+    parser.add_argument('--join-share', type=float, default=0.05, help="Share of events that are member joins")
+    parser.add_argument('--command-share', type=float, default=0.05, help="Share of events that are commands")
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="Mean injected REST latency")
+    parser.add_argument('--jitter-ms', type=float, default=20.0, help="Standard deviation of REST latency")
+    parser.add_argument('--no-rate-limits', action='store_true', help="Disable simulated rate limits")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--log-level', default="WARNING", help="Bot log level during the run")
+    parser.add_argument('--output', help="Write the JSON report here")
+    parser.add_argument('--keep-state', action='store_true', help="Keep the temporary state directory")
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output) if args.output else None
+    original_dir = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="guardify-load-")
+    os.chdir(work_dir)
+    try:
+        from structured_logging import setup_logging
+        setup_logging(level=args.log_level)
+
+        import bot as bot_module  # constructed here, so its state files live in work_dir
+        report = asyncio.run(run_simulation(bot_module.bot, args))
+    finally:
+        os.chdir(original_dir)
+        if args.keep_state:
+            print(f"State kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(format_report(report))
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+Load Test - Requests/sec and latency of a dashboard endpoint under concurrent clients
+Each client is a thread with its own keep-alive session that requests the URL
+in a loop (revalidating with If-None-Match like a browser, unless --no-etag).
+
+Usage:
+    python load_test.py --url http://localhost:5000/api/stats --clients 32 --duration 10
+    python load_test.py --local --cases 50000        # serve a throwaway dashboard in-process first
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import requests
+
+
+def percentile(sorted_values: List[float], share: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(share * len(sorted_values)))]
+
+
+def _client(url: str, deadline: float, use_etag: bool, latencies: List[float], statuses: Counter, lock):
+    session = requests.Session()
+    etag = None
+    local_latencies, local_statuses = [], Counter()
+    while time.perf_counter() < deadline:
+        headers = {'If-None-Match': etag} if use_etag and etag else {}
+        started = time.perf_counter()
+        try:
+            response = session.get(url, headers=headers, timeout=30)
+            response.content
+            local_statuses[response.status_code] += 1
+            etag = response.headers.get('ETag', etag)
+        except requests.RequestException as e:
+            local_statuses[type(e).__name__] += 1
+            continue
+        local_latencies.append(time.perf_counter() - started)
+    session.close()
+    with lock:
+        latencies.extend(local_latencies)
+        statuses.update(local_statuses)
+
+
+def run_load(url: str, clients: int = 16, duration: float = 10.0, use_etag: bool = True) -> Dict:
+    """
+    Hit url from `clients` threads for `duration` seconds
+
+    Returns:
+        {"requests", "requests_per_second", "latency_ms": {p50, p95, p99, max}, "statuses"}
+    """
+    latencies, statuses, lock = [], Counter(), threading.Lock()
+    started = time.perf_counter()
+    deadline = started + duration
+    threads = [threading.Thread(target=_client, args=(url, deadline, use_etag, latencies, statuses, lock))
+               for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "url": url,
+        "clients": clients,
+        "duration_seconds": round(elapsed, 2),
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "latency_ms": {name: round(percentile(latencies, share) * 1000, 2)
+                       for name, share in [("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0)]},
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)}
+    }
+
+
+def write_sample_logs(directory: str, cases: int, seed: int = 1):
+    """Synthetic evidence and warnings for a local run"""
+    rng = random.Random(seed)
+    logs_dir = os.path.join(directory, "forensics_logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    with open(os.path.join(logs_dir, "abuse_evidence.jsonl"), 'w', encoding='utf-8') as f:
+        for i in range(cases):
+            f.write(json.dumps({
+                "message_id": str(i), "author_id": str(rng.randint(1, 5000)),
+                "author_name": f"user{i % 5000}", "guild_id": str(rng.randint(1, 20)),
+                "content": "sample offensive message " * rng.randint(1, 4),
+                "created_at": f"2026-10-19T12:{i % 60:02d}:00", "logged_at": f"2026-10-19T12:{i % 60:02d}:00",
+                "analysis": {"severity": rng.choice(["low", "medium", "high"]), "category": "profanity"}
+            }) + "\n")
+    with open(os.path.join(logs_dir, "warnings.json"), 'w') as f:
+        json.dump({f"{rng.randint(1, 20)}:{user}": [{"timestamp": "2026-10-19T12:00:00"}] * rng.randint(1, 5)
+                   for user in range(2000)}, f)
+    with open(os.path.join(directory, "config.json"), 'w') as f:
+        json.dump({}, f)
+
+
+class LocalDashboard:
+    """The dashboard on a threaded local server, with throwaway logs"""
+
+    def __init__(self, cases: int = 10000):
+        self.directory = tempfile.mkdtemp(prefix="guardify-load-")
+        write_sample_logs(self.directory, cases)
+        self.original_dir = os.getcwd()
+        os.chdir(self.directory)
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        from werkzeug.serving import WSGIRequestHandler, make_server
+        from web_dashboard import app
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self.server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        os.chdir(self.original_dir)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def format_report(result: Dict) -> str:
+    latency = result["latency_ms"]
+    return (f"{result['url']}: {result['clients']} clients for {result['duration_seconds']} s\n"
+            f"  {result['requests']} requests, {result['requests_per_second']} req/s\n"
+            f"  latency p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms, "
+            f"max {latency['max']} ms\n"
+            f"  statuses {result['statuses']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test a dashboard endpoint")
+    parser.add_argument("--url", help="Endpoint to test (default: /api/stats of --local)")
+    parser.add_argument("--local", action="store_true", help="Serve a throwaway dashboard in-process")
+    parser.add_argument("--cases", type=int, default=10000, help="Evidence records for --local")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--no-etag", action="store_true", help="Always request the full body")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args(argv)
+
+    local: Optional[LocalDashboard] = None
+    if args.local:
+        local = LocalDashboard(args.cases)
+    elif not args.url:
+        parser.error("--url or --local is required")
+    try:
+        url = args.url or f"{local.base_url}/api/stats"
+        if local and args.url and args.url.startswith('/'):
+            url = local.base_url + args.url
+        result = run_load(url, args.clients, args.duration, use_etag=not args.no_etag)
+    finally:
+        if local:
+            local.close()
+    print(json.dumps(result, indent=2) if args.json else format_report(result))
+    errors = sum(count for status, count in result["statuses"].items() if not status.startswith(('2', '3')))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,150 @@
+"""
+Loop Watchdog - Detect callbacks that block the asyncio event loop
+A heartbeat callback on the loop measures its own lateness (loop lag). A
+watchdog thread notices when the heartbeat stops, captures the stack of the
+loop thread while it is still blocked and aggregates stalls by call site.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List
+
+from structured_logging import get_logger
+
+log = get_logger("loop_watchdog")
+
+
+BLOCKING_THRESHOLD_ENV = "GUARDIFY_BLOCKING_THRESHOLD_MS"
+DEFAULT_THRESHOLD = 0.25  # seconds
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _call_site(stack: traceback.StackSummary) -> str:
+    """Deepest frame in this repo (falls back to the deepest frame overall)"""
+    for frame in reversed(stack):
+        if frame.filename.startswith(REPO_DIR) and os.path.basename(frame.filename) != "loop_watchdog.py":
+            return f"{os.path.basename(frame.filename)}:{frame.lineno} in {frame.name}"
+    if stack:
+        frame = stack[-1]
+        return f"{frame.filename}:{frame.lineno} in {frame.name}"
+    return "unknown"
+
+
+class LoopWatchdog:
+    """Measures event loop lag and records the call sites of blocking callbacks"""
+
+    def __init__(self, threshold: float = None, interval: float = 0.1, metrics=None, max_sites: int = 200):
+        if threshold is None:
+            threshold = float(os.environ.get(BLOCKING_THRESHOLD_ENV, DEFAULT_THRESHOLD * 1000)) / 1000
+        self.threshold = threshold
+        self.interval = interval
+        self.metrics = metrics
+        self.max_sites = max_sites
+
+        self.loop = None
+        self.loop_thread_id = None
+        self.last_beat = time.monotonic()
+        self.last_lag = 0.0
+        self.running = False
+        self.handle = None
+        self.thread = None
+
+        self.current = None  # stall in progress: {"started", "stack"}
+        self.sites = {}  # format: {call site: {"count", "total", "max", "stack", "last_seen"}}
+        self.stalls = 0
+
+    def start(self, loop: asyncio.AbstractEventLoop = None):
+        """Start the heartbeat on the loop and the watchdog thread (call from the loop thread)"""
+        if self.running:
+            return
+        self.loop = loop or asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.running = True
+        self.last_beat = time.monotonic()
+        self.handle = self.loop.call_later(self.interval, self._beat, self.last_beat + self.interval)
+        self.thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self.thread.start()
+        if self.metrics is not None:
+            self.metrics.register_gauge("event_loop_lag_seconds", lambda: round(self.last_lag, 6))
+            self.metrics.register_gauge("event_loop_stalls", lambda: self.stalls)
+
+    def stop(self):
+        self.running = False
+        if self.handle is not None:
+            self.handle.cancel()
+
+    def _beat(self, expected: float):
+        now = time.monotonic()
+        self.last_lag = max(0.0, now - expected)
+        self.last_beat = now
+        if self.metrics is not None:
+            self.metrics.observe("event_loop.lag", self.last_lag)
+        if self.running:
+            self.handle = self.loop.call_later(self.interval, self._beat, now + self.interval)
+
+    def _watch(self):
+        """Watchdog thread - samples the loop thread's stack while it is blocked"""
+        while self.running:
+            time.sleep(self.interval / 2)
+            last_beat = self.last_beat
+            blocked_for = time.monotonic() - last_beat - self.interval
+
+            if self.current is not None and last_beat != self.current["started"]:
+                # The loop came back - the gap between heartbeats is the stall
+                self._record(self.current["stack"], last_beat - self.current["started"] - self.interval)
+                self.current = None
+
+            if blocked_for >= self.threshold and self.current is None:
+                # Capture while the loop is still stuck in the offending code
+                frame = sys._current_frames().get(self.loop_thread_id)
+                stack = traceback.extract_stack(frame) if frame is not None else traceback.StackSummary()
+                self.current = {"started": last_beat, "stack": stack}
+
+    def _record(self, stack: traceback.StackSummary, duration: float):
+        self.stalls += 1
+        site = _call_site(stack)
+        entry = self.sites.get(site)
+        if entry is None:
+            if len(self.sites) >= self.max_sites:
+                # Drop the least significant site to keep memory bounded
+                del self.sites[min(self.sites, key=lambda s: self.sites[s]["total"])]
+            entry = self.sites[site] = {"count": 0, "total": 0.0, "max": 0.0, "stack": None, "last_seen": None}
+        entry["count"] += 1
+        entry["total"] += duration
+        entry["last_seen"] = time.time()
+        if duration >= entry["max"]:
+            entry["max"] = duration
+            entry["stack"] = "".join(stack.format()[-12:])
+        log.warning("Event loop blocked", blocked_ms=round(duration * 1000), site=site)
+
+    def report(self, limit: int = 10) -> List[Dict]:
+        """Worst blocking call sites by total blocked time"""
+        sites = sorted(list(self.sites.items()), key=lambda item: item[1]["total"], reverse=True)
+        return [{
+            "site": site,
+            "count": entry["count"],
+            "total_ms": round(entry["total"] * 1000, 1),
+            "max_ms": round(entry["max"] * 1000, 1),
+            "stack": entry["stack"],
+            "last_seen": entry["last_seen"]
+        } for site, entry in sites[:limit]]
+
+    def reset(self):
+        """Clear recorded call sites"""
+        self.sites = {}
+        self.stalls = 0
+
+
+# Singleton instance
+_watchdog = None
+
+def get_loop_watchdog(metrics=None) -> LoopWatchdog:
+    """Get or create singleton instance"""
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = LoopWatchdog(metrics=metrics)
+    return _watchdog
@@ -0,0 +1,332 @@
+"""
+Metrics - Low-overhead latency histograms, counters, rates and gauges for the bot's hot paths
+Samples are kept in fixed-size ring buffers so recording never allocates or
+locks; percentiles are computed only when a snapshot is requested. Snapshots
+only copy data, so scraping /metrics from the web thread never blocks the bot.
+"""
+
+import os
+import random
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+METRICS_SAMPLE_RATE_ENV = "GUARDIFY_METRICS_SAMPLE_RATE"
+HISTOGRAM_SIZE = 1024  # most recent samples kept per histogram
+OTHER_LABEL_VALUE = "other"  # series of label values evicted by bound_label
+
+
+class Histogram:
+    """Latency histogram over the most recent samples"""
+
+    def __init__(self, size: int = HISTOGRAM_SIZE):
+        self.size = size
+        self.samples = [0.0] * size
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.samples[self.count % self.size] = value
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> Dict:
+        """Percentiles in milliseconds (count/sum cover all samples ever recorded)"""
+        count = self.count
+        recent = sorted(self.samples[:min(count, self.size)])
+        if not recent:
+            return {"count": 0, "sum_ms": 0.0, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+
+        def pct(p: float) -> float:
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 3)
+
+        return {
+            "count": count,
+            "sum_ms": round(self.total * 1000, 3),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(self.max * 1000, 3)
+        }
+
+
+class RateMeter:
+    """Events per second over a sliding window of one-second buckets"""
+
+    def __init__(self, window: int = 60):
+        self.window = window
+        self.buckets = [0] * window
+        self.seconds = [0] * window  # which second each bucket currently counts
+
+    def mark(self, amount: int = 1, now: float = None):
+        second = int(now if now is not None else time.time())
+        index = second % self.window
+        if self.seconds[index] != second:
+            self.seconds[index] = second
+            self.buckets[index] = 0
+        self.buckets[index] += amount
+
+    def rate(self, now: float = None) -> float:
+        second = int(now if now is not None else time.time())
+        buckets, seconds = self.buckets[:], self.seconds[:]
+        total = sum(count for count, stamp in zip(buckets, seconds) if 0 <= second - stamp < self.window)
+        return total / self.window
+
+
+class StageTimer:
+    """Times consecutive stages of one unit of work (e.g. one message)"""
+
+    __slots__ = ("metrics", "prefix", "started", "last")
+
+    def __init__(self, metrics: "MetricsRegistry", prefix: str):
+        self.metrics = metrics
+        self.prefix = prefix
+        self.started = self.last = time.perf_counter()
+
+    def lap(self, stage: str):
+        """Record the time since the previous lap as `stage`"""
+        now = time.perf_counter()
+        self.metrics.observe(f"{self.prefix}.{stage}", now - self.last)
+        self.last = now
+
+    def skip(self):
+        """Don't count the time since the previous lap (e.g. an untimed branch)"""
+        self.last = time.perf_counter()
+
+    def finish(self):
+        """Record the total time of the unit of work"""
+        self.metrics.observe(f"{self.prefix}.total", time.perf_counter() - self.started)
+
+
+class _NullTimer:
+    """Stand-in for unsampled work - every call is a no-op"""
+
+    __slots__ = ()
+
+    def lap(self, stage: str):
+        pass
+
+    def skip(self):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """Histograms, labelled counters and gauge callbacks"""
+
+    def __init__(self, sample_rate: float = None):
+        if sample_rate is None:
+            sample_rate = float(os.environ.get(METRICS_SAMPLE_RATE_ENV, 1.0))
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.started = time.time()
+        self.histograms = {}  # format: {name: Histogram}
+        self.counters = {}  # format: {(name, ((label, value), ...)): count}
+        self.rates = {}  # format: {(name, ((label, value), ...)): RateMeter}
+        self.gauges = {}  # format: {name: (callable returning a number or {label value: number}, label name)}
+        self.bounds = {}  # format: {(name, label): (max values, OrderedDict of values, least recently used first)}
+
+    def timer(self, prefix: str):
+        """Stage timer for one unit of work, or a no-op timer if it isn't sampled"""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return NULL_TIMER
+        return StageTimer(self, prefix)
+
+    def observe(self, name: str, seconds: float):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms.setdefault(name, Histogram())
+        histogram.observe(seconds)
+
+    def bound_label(self, name: str, label: str, max_values: int):
+        """
+        Keep at most max_values series per value of one label of a counter or rate
+
+        The least recently used value is evicted past the limit: its counts are
+        added to the label value "other" (so totals stay monotonic) and its rate
+        is dropped. Keeps memory and label cardinality flat for per-guild metrics.
+        """
+        self.bounds[(name, label)] = (max_values, OrderedDict())
+
+    def _bounded(self, name: str, labels: Dict) -> Dict:
+        for label, value in labels.items():
+            bound = self.bounds.get((name, label))
+            if bound is None or value == OTHER_LABEL_VALUE:
+                continue
+            max_values, recent = bound
+            if value in recent:
+                recent.move_to_end(value)
+            else:
+                recent[value] = None
+                if len(recent) > max_values:
+                    self._evict(name, label, recent.popitem(last=False)[0])
+        return labels
+
+    def _evict(self, name: str, label: str, value):
+        for key in [key for key in list(self.counters) if key[0] == name and (label, value) in key[1]]:
+            count = self.counters.pop(key)
+            other = (name, tuple((k, OTHER_LABEL_VALUE if k == label else v) for k, v in key[1]))
+            self.counters[other] = self.counters.get(other, 0) + count
+        for key in [key for key in list(self.rates) if key[0] == name and (label, value) in key[1]]:
+            del self.rates[key]
+
+    def inc(self, name: str, amount: int = 1, **labels):
+        """Increment a counter (counters are never sampled)"""
+        key = (name, tuple(sorted(self._bounded(name, labels).items())))
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def mark(self, name: str, amount: int = 1, **labels):
+        """Record events for a per-second rate (e.g. messages, offenses per guild)"""
+        key = (name, tuple(sorted(self._bounded(name, labels).items())))
+        meter = self.rates.get(key)
+        if meter is None:
+            meter = self.rates.setdefault(key, RateMeter())
+        meter.mark(amount)
+
+    def register_gauge(self, name: str, callback: Callable, label: Optional[str] = None):
+        """
+        Register a callback evaluated at snapshot time (e.g. a queue depth)
+
+        Args:
+            name: Gauge name
+            callback: Returns a number, or a dict of numbers keyed by label value
+            label: Label name for dict results (e.g. "queue")
+        """
+        self.gauges[name] = (callback, label)
+
+    def _read_gauges(self) -> Dict:
+        gauges = {}
+        for name, (callback, _) in list(self.gauges.items()):
+            try:
+                gauges[name] = callback()
+            except Exception as e:
+                gauges[name] = {"error": str(e)}
+        return gauges
+
+    @staticmethod
+    def _format_key(key: Tuple) -> str:
+        name, labels = key
+        if not labels:
+            return name
+        return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+    def snapshot(self) -> Dict:
+        """All metrics as a JSON-serializable dict"""
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "sample_rate": self.sample_rate,
+            "histograms": {name: h.snapshot() for name, h in sorted(list(self.histograms.items()))},
+            "counters": {self._format_key(key): value for key, value in sorted(list(self.counters.items()))},
+            "rates_per_second": {self._format_key(key): round(meter.rate(), 4)
+                                 for key, meter in sorted(list(self.rates.items()), key=lambda kv: kv[0])},
+            "gauges": self._read_gauges()
+        }
+
+    def render_prometheus(self, namespace: str = "guardify", extra_labels: Dict[str, str] = None) -> str:
+        """
+        All metrics in the Prometheus text exposition format
+
+        Histograms are exported as summaries (quantiles over the recent samples),
+        rates as gauges named <name>_per_second.
+
+        Args:
+            namespace: Prefix for every metric name
+            extra_labels: Labels added to every sample (e.g. {"shard": "0"})
+        """
+        extra = tuple(sorted((extra_labels or {}).items()))
+        lines = []
+
+        def sample(name: str, labels: Tuple, value):
+            labels = extra + tuple(labels)
+            if labels:
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(f"{name}{{{label_text}}} {_number(value)}")
+            else:
+                lines.append(f"{name} {_number(value)}")
+
+        lines.append(f"# TYPE {namespace}_uptime_seconds gauge")
+        sample(f"{namespace}_uptime_seconds", (), round(time.time() - self.started, 1))
+
+        families = {}  # format: {metric name: [(labels, histogram)]}
+        for name, histogram in sorted(list(self.histograms.items())):
+            prefix, _, stage = name.rpartition(".")
+            metric = _metric_name(f"{namespace}_{prefix or stage}_latency_seconds")
+            families.setdefault(metric, []).append(((("stage", stage),) if prefix else (), histogram))
+        for metric, members in families.items():
+            lines.append(f"# TYPE {metric} summary")
+            for labels, histogram in members:
+                count = histogram.count
+                recent = sorted(histogram.samples[:min(count, histogram.size)])
+                for quantile in (0.5, 0.95, 0.99):
+                    if recent:
+                        value = recent[min(len(recent) - 1, int(quantile * len(recent)))]
+                        sample(metric, labels + (("quantile", str(quantile)),), value)
+                sample(f"{metric}_sum", labels, histogram.total)
+                sample(f"{metric}_count", labels, count)
+
+        seen = set()
+        for (name, labels), value in sorted(list(self.counters.items())):
+            metric = _metric_name(f"{namespace}_{name}")
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            sample(metric, labels, value)
+
+        for (name, labels), meter in sorted(list(self.rates.items()), key=lambda kv: kv[0]):
+            metric = _metric_name(f"{namespace}_{name}_per_second")
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} gauge")
+            sample(metric, labels, round(meter.rate(), 4))
+
+        values = self._read_gauges()
+        for name, (_, label) in sorted(list(self.gauges.items())):
+            value = values.get(name)
+            metric = _metric_name(f"{namespace}_{name}")
+            if isinstance(value, dict):
+                if "error" in value:
+                    continue
+                lines.append(f"# TYPE {metric} gauge")
+                for key, item in sorted(value.items()):
+                    sample(metric, ((label or "key", key),), item)
+            elif value is not None:
+                lines.append(f"# TYPE {metric} gauge")
+                sample(metric, (), value)
+
+        return "\n".join(lines) + "\n"
+
+
+def _metric_name(name: str) -> str:
+    """Replace characters Prometheus doesn't allow in metric names"""
+    return "".join(c if c.isalnum() or c in "_:" else "_" for c in name)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+# Singleton instance
+_metrics = None
+
+def get_metrics() -> MetricsRegistry:
+    """Get or create singleton instance"""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsRegistry()
+    return _metrics
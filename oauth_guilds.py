@@ -0,0 +1,150 @@
+"""
+OAuth Guilds - Cached Discord guild lists for dashboard sessions
+Each logged-in user's guild list (GET /users/@me/guilds) is kept per access
+token for a short TTL, so page loads and 30 s stats polls don't each cost a
+round trip to Discord. All calls share one pooled keep-alive requests.Session,
+and concurrent refreshes for the same token wait on a single request
+(single-flight) instead of each hitting Discord's rate limit.
+"""
+
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from state_containers import BoundedState
+from structured_logging import get_logger
+
+log = get_logger("oauth_guilds")
+
+
+GUILDS_TTL = 60.0  # seconds a guild list is used before it is fetched again
+IDLE_TTL = 3600.0  # sessions unused this long are dropped from the cache
+MAX_SESSIONS = 10000
+REQUEST_TIMEOUT = 10.0
+POOL_SIZE = 20
+
+
+def create_http_session(pool_size: int = POOL_SIZE) -> requests.Session:
+    """requests.Session with a keep-alive connection pool sized for the dashboard's worker threads"""
+    http = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    http.mount('https://', adapter)
+    http.mount('http://', adapter)
+    return http
+
+
+class _Flight:
+    """A guild list request in progress that other threads can wait on"""
+
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = []
+
+
+class GuildListCache:
+    """Per-session guild lists with a TTL, a shared connection pool and single-flight refreshes"""
+
+    def __init__(self, api_base: str, ttl: float = GUILDS_TTL, http: Optional[requests.Session] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            api_base: Discord API base URL (e.g. https://discord.com/api/v10)
+            ttl: Seconds a fetched guild list stays fresh
+            http: Session to send requests with (default: a new pooled session)
+            clock: Time source (for tests)
+        """
+        self.api_base = api_base
+        self.ttl = ttl
+        self.http = http or create_http_session()
+        self.clock = clock
+        # format: {sha256(access token): {"guilds": [...], "fetched_at": float, "retry_at": float}}
+        self.entries = BoundedState("oauth_guilds", max_entries=MAX_SESSIONS, ttl=IDLE_TTL, clock=clock)
+        self.flights = {}  # format: {token key: _Flight}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.fetches = 0
+
+    @staticmethod
+    def _key(access_token: str) -> str:
+        return hashlib.sha256(access_token.encode('utf-8')).hexdigest()
+
+    def get(self, access_token: str) -> List[Dict]:
+        """
+        Guild list for an access token, fetched from Discord at most once per TTL
+
+        A failed or rate-limited refresh keeps serving the last list it got
+        (or an empty list if there is none yet).
+        """
+        key = self._key(access_token)
+        with self.lock:
+            entry = self.entries.get(key)
+            now = self.clock()
+            if entry is not None and (now - entry["fetched_at"] < self.ttl or now < entry["retry_at"]):
+                self.hits += 1
+                return entry["guilds"]
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait(REQUEST_TIMEOUT * 2)
+            return flight.result
+
+        try:
+            flight.result = self._refresh(key, access_token, entry)
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+        return flight.result
+
+    def _refresh(self, key: str, access_token: str, entry: Optional[Dict]) -> List[Dict]:
+        stale = entry["guilds"] if entry else []
+        self.fetches += 1
+        try:
+            response = self.http.get(f'{self.api_base}/users/@me/guilds',
+                                     headers={'Authorization': f"Bearer {access_token}"},
+                                     timeout=REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            log.warning(f"Fetching guild list failed: {e}")
+            return stale
+
+        now = self.clock()
+        if response.status_code == 200:
+            guilds = response.json()
+            with self.lock:
+                self.entries[key] = {"guilds": guilds, "fetched_at": now, "retry_at": now}
+            return guilds
+
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.json().get('retry_after', 1.0))
+            except (ValueError, AttributeError):
+                retry_after = float(response.headers.get('Retry-After', 1.0))
+            log.warning("Guild list rate limited", retry_after=retry_after)
+            with self.lock:
+                self.entries[key] = {"guilds": stale, "fetched_at": entry["fetched_at"] if entry else now - self.ttl,
+                                     "retry_at": now + retry_after}
+            return stale
+
+        if response.status_code == 401:
+            self.invalidate(access_token)  # revoked or expired token
+            return []
+        log.warning("Fetching guild list failed", status=response.status_code)
+        return stale
+
+    def invalidate(self, access_token: str):
+        """Forget a session's guild list (logout, revoked token)"""
+        with self.lock:
+            self.entries.pop(self._key(access_token), None)
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {"sessions": len(self.entries), "hits": self.hits, "fetches": self.fetches}
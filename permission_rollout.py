@@ -0,0 +1,198 @@
+"""
+Permission Rollout - Apply mute role channel overwrites in the background
+Bounded concurrency, rate-limit aware and resumable after a restart
+"""
+
+import discord
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from sharding import prepare_state_file
+from structured_logging import get_logger
+
+log = get_logger("permission_rollout")
+
+
+class PermissionRolloutManager:
+    """Rolls out mute role permission overwrites to every channel of a guild"""
+
+    MAX_RETRIES = 3
+    SAVE_INTERVAL = 2.0  # seconds between progress saves
+
+    def __init__(self, log_dir: str = "forensics_logs", concurrency: int = 4):
+        self.log_dir = log_dir
+        self.state_file = prepare_state_file(os.path.join(log_dir, "permission_rollouts.json"))
+        self.concurrency = concurrency
+        self.rollouts = self.load_rollouts()
+        self.tasks = {}  # format: {guild_id: asyncio.Task}
+        self._last_save = 0.0
+
+    def load_rollouts(self) -> Dict:
+        """Load rollout progress from persistent storage"""
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r') as f:
+                    return json.load(f)
+            except json.JSONDecodeError:
+                return {}
+        return {}
+
+    def save_rollouts(self):
+        """Save rollout progress to persistent storage"""
+        os.makedirs(self.log_dir, exist_ok=True)
+        with open(self.state_file, 'w') as f:
+            json.dump(self.rollouts, f, indent=2)
+        self._last_save = time.monotonic()
+
+    def _maybe_save(self):
+        """Save progress at most every SAVE_INTERVAL seconds"""
+        if time.monotonic() - self._last_save >= self.SAVE_INTERVAL:
+            self.save_rollouts()
+
+    def is_running(self, guild_id: str) -> bool:
+        """Check if a rollout task is active for a guild"""
+        task = self.tasks.get(guild_id)
+        return task is not None and not task.done()
+
+    def get_progress(self, guild_id: str) -> Optional[Dict]:
+        """Get rollout progress for a guild (None if no rollout is pending)"""
+        rollout = self.rollouts.get(guild_id)
+        if not rollout:
+            return None
+        return {
+            "role_id": rollout["role_id"],
+            "total": rollout["total"],
+            "done": rollout["done"],
+            "pending": len(rollout["pending"]),
+            "failed": len(rollout["failed"]),
+            "running": self.is_running(guild_id),
+            "started_at": rollout["started_at"]
+        }
+
+    def start_rollout(self, guild: discord.Guild, role: discord.Role) -> bool:
+        """
+        Start rolling out mute overwrites for a role without waiting for it
+
+        Args:
+            guild: Guild to update
+            role: Mute role that should be denied send/speak permissions
+
+        Returns:
+            True if a new rollout was started
+        """
+        guild_id = str(guild.id)
+        if self.is_running(guild_id):
+            return False
+
+        channel_ids = [str(channel.id) for channel in guild.channels]
+        self.rollouts[guild_id] = {
+            "role_id": str(role.id),
+            "pending": channel_ids,
+            "failed": [],
+            "done": 0,
+            "total": len(channel_ids),
+            "started_at": datetime.utcnow().isoformat()
+        }
+        self.save_rollouts()
+
+        self.tasks[guild_id] = asyncio.create_task(self._run(guild, role))
+        log.info("Started mute overwrite rollout", guild=guild.name, guild_id=guild_id, channels=len(channel_ids))
+        return True
+
+    def resume_all(self, client: discord.Client) -> int:
+        """Resume rollouts that were interrupted (e.g. by a restart)"""
+        resumed = 0
+
+        for guild_id in list(self.rollouts):
+            if self.is_running(guild_id):
+                continue
+
+            guild = client.get_guild(int(guild_id))
+            if guild is None:
+                continue  # Not on this shard / not in guild anymore
+
+            role = guild.get_role(int(self.rollouts[guild_id]["role_id"]))
+            if role is None:
+                # Role was deleted - nothing left to roll out
+                del self.rollouts[guild_id]
+                self.save_rollouts()
+                continue
+
+            self.tasks[guild_id] = asyncio.create_task(self._run(guild, role))
+            resumed += 1
+            log.info("Resumed mute overwrite rollout", guild=guild.name, guild_id=guild_id,
+                     channels_left=len(self.rollouts[guild_id]['pending']))
+
+        return resumed
+
+    async def _apply(self, guild: discord.Guild, role: discord.Role, channel_id: str) -> bool:
+        """Apply the overwrite to a single channel, retrying on rate limits"""
+        channel = guild.get_channel(int(channel_id))
+        if channel is None:
+            return True  # Channel deleted since the rollout started
+
+        for attempt in range(self.MAX_RETRIES):
+            try:
+                await channel.set_permissions(
+                    role,
+                    send_messages=False,
+                    speak=False,
+                    reason="Mute role permissions"
+                )
+                return True
+            except discord.Forbidden:
+                return False
+            except discord.HTTPException as e:
+                if e.status != 429 and e.status < 500:
+                    return False
+                # discord.py already waits on known buckets; back off on anything left over
+                retry_after = getattr(e, 'retry_after', None) or 2 ** attempt
+                await asyncio.sleep(retry_after)
+        return False
+
+    async def _run(self, guild: discord.Guild, role: discord.Role):
+        """Work through the pending channels with bounded concurrency"""
+        guild_id = str(guild.id)
+        rollout = self.rollouts[guild_id]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def worker(channel_id: str):
+            async with semaphore:
+                ok = await self._apply(guild, role, channel_id)
+            rollout["pending"].remove(channel_id)
+            if ok:
+                rollout["done"] += 1
+            else:
+                rollout["failed"].append(channel_id)
+            self._maybe_save()
+
+        try:
+            await asyncio.gather(*(worker(cid) for cid in list(rollout["pending"])))
+        except asyncio.CancelledError:
+            # Keep progress so the rollout can be resumed later
+            self.save_rollouts()
+            raise
+        except Exception as e:
+            log.error(f"Mute overwrite rollout failed: {e}", guild=guild.name, guild_id=guild_id)
+            self.save_rollouts()
+            return
+
+        log.info("Finished mute overwrite rollout", guild=guild.name, guild_id=guild_id,
+                 updated=rollout['done'], failed=len(rollout['failed']))
+        del self.rollouts[guild_id]
+        self.save_rollouts()
+
+
+# Singleton instance
+_rollout_manager = None
+
+def get_rollout_manager() -> PermissionRolloutManager:
+    """Get or create singleton instance"""
+    global _rollout_manager
+    if _rollout_manager is None:
+        _rollout_manager = PermissionRolloutManager()
+    return _rollout_manager
@@ -0,0 +1,303 @@
+"""
+Rollups - Per-guild event counts by minute, hour and day for dashboard charts
+The bot records every case (with its category and severity), warning and mute
+as it happens. Each event increments one bucket per resolution, so coarser
+series never need the finer ones; finer buckets are dropped as they age out of
+their retention (minutes after 6 hours, hours after 31 days, days after 400
+days). Counts for all guilds together are kept under the "*" guild.
+
+The store is saved to forensics_logs/rollups.json (one file per shard when
+sharded); the dashboard sums every file it finds and answers range queries
+from the buckets without reading the evidence log.
+
+Usage:
+    python rollups.py --rebuild    # backfill from the evidence log, both warnings files and mutes (bot stopped)
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sharding import file_signature, shard_state_path, state_files
+from structured_logging import get_logger
+from warnings_query import WARNINGS_FILES, normalize_warnings
+
+log = get_logger("rollups")
+
+
+ROLLUPS_FILE = os.path.join("forensics_logs", "rollups.json")
+ALL_GUILDS = "*"
+# format: {resolution: (bucket seconds, retention seconds)}
+RESOLUTIONS = {
+    "minute": (60, 6 * 3600),
+    "hour": (3600, 31 * 86400),
+    "day": (86400, 400 * 86400),
+}
+MAX_POINTS = 1500  # finest resolution is picked so a query returns at most this many buckets
+SAVE_INTERVAL = 60.0
+
+
+def _timestamp(value) -> Optional[float]:
+    """Epoch seconds for an ISO timestamp (naive times are UTC), None if missing or invalid"""
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        return (moment - datetime(1970, 1, 1)).total_seconds()
+    return moment.timestamp()
+
+
+def case_metrics(analysis: Dict, category: Optional[str] = None) -> Dict[str, int]:
+    """Counters for one evidence record: the case, its severity and its category"""
+    metrics = {"cases": 1}
+    severity = str(analysis.get('severity') or '').lower()
+    if severity:
+        metrics[f"severity:{severity}"] = 1
+    category = category or analysis.get('category')
+    if category:
+        metrics[f"category:{category}"] = 1
+    return metrics
+
+
+class RollupStore:
+    """Bucketed counters per resolution and guild"""
+
+    def __init__(self, path: Optional[str] = None, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.series = {name: {} for name in RESOLUTIONS}  # format: {resolution: {guild_id: {bucket start: {metric: count}}}}
+        self.dirty = False
+        if path and os.path.exists(path):
+            self.merge(self._read(path))
+
+    @staticmethod
+    def _read(path: str) -> Dict:
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning(f"Could not read rollups: {e}", path=path)
+            return {}
+
+    def merge(self, data: Dict):
+        """Add the counts of a saved store (as written by to_dict) to this one"""
+        for resolution, guilds in data.items():
+            if resolution not in self.series:
+                continue
+            target = self.series[resolution]
+            for guild_id, buckets in guilds.items():
+                guild = target.setdefault(guild_id, {})
+                for start, counts in buckets.items():
+                    bucket = guild.setdefault(int(start), {})
+                    for metric, count in counts.items():
+                        bucket[metric] = bucket.get(metric, 0) + count
+
+    def record(self, guild_id, metrics: Dict[str, int], when: Optional[float] = None):
+        """
+        Count an event for a guild (and for all guilds)
+
+        Args:
+            guild_id: Guild the event happened in
+            metrics: Counters to increment, e.g. {"cases": 1, "severity:high": 1}
+            when: Epoch seconds of the event (default: now)
+        """
+        when = self.clock() if when is None else when
+        scopes = [ALL_GUILDS] if guild_id is None else [str(guild_id), ALL_GUILDS]
+        for name, (step, _) in RESOLUTIONS.items():
+            start = int(when // step * step)
+            for scope in scopes:
+                bucket = self.series[name].setdefault(scope, {}).setdefault(start, {})
+                for metric, count in metrics.items():
+                    bucket[metric] = bucket.get(metric, 0) + count
+        self.dirty = True
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """Drop buckets older than their resolution's retention; returns the number dropped"""
+        now = self.clock() if now is None else now
+        dropped = 0
+        for name, (_, retention) in RESOLUTIONS.items():
+            cutoff = now - retention
+            for guild_id in list(self.series[name]):
+                buckets = self.series[name][guild_id]
+                expired = [start for start in buckets if start < cutoff]
+                for start in expired:
+                    del buckets[start]
+                dropped += len(expired)
+                if not buckets:
+                    del self.series[name][guild_id]
+        if dropped:
+            self.dirty = True
+        return dropped
+
+    def pick_resolution(self, start: float, end: float, now: Optional[float] = None) -> str:
+        """Finest resolution that still holds `start` and fits the range in MAX_POINTS buckets"""
+        now = self.clock() if now is None else now
+        for name, (step, retention) in RESOLUTIONS.items():
+            if start >= now - retention and (end - start) / step <= MAX_POINTS:
+                return name
+        return "day"
+
+    def query(self, guild_id=None, start: Optional[float] = None, end: Optional[float] = None,
+              resolution: Optional[str] = None, metrics: Optional[Iterable[str]] = None) -> Dict:
+        """
+        Counts per bucket over a time range
+
+        Args:
+            guild_id: Guild to query (None for all guilds)
+            start, end: Epoch seconds (default: the last 30 days)
+            resolution: "minute", "hour" or "day" (default: picked from the range)
+            metrics: Counters to return (default: every counter seen in the range)
+
+        Returns:
+            {"resolution", "step", "timestamps": [bucket starts], "series": {metric: [counts]}}
+        """
+        end = self.clock() if end is None else end
+        start = end - 30 * 86400 if start is None else start
+        resolution = resolution or self.pick_resolution(start, end)
+        step = RESOLUTIONS[resolution][0]
+        last = int(end // step * step)
+        first = max(int(start // step * step), last - (MAX_POINTS - 1) * step)  # most recent buckets if too many
+        timestamps = list(range(first, last + 1, step))
+        buckets = self.series[resolution].get(str(guild_id) if guild_id else ALL_GUILDS, {})
+
+        names = set(metrics) if metrics else set()
+        if not metrics:
+            for timestamp in timestamps:
+                names.update(buckets.get(timestamp, ()))
+        series = {name: [buckets.get(timestamp, {}).get(name, 0) for timestamp in timestamps]
+                  for name in sorted(names)}
+        return {"resolution": resolution, "step": step, "timestamps": timestamps, "series": series}
+
+    def to_dict(self) -> Dict:
+        return {name: {guild_id: {str(start): counts for start, counts in buckets.items()}
+                       for guild_id, buckets in guilds.items()}
+                for name, guilds in self.series.items()}
+
+    def save(self):
+        """Write the store to its file (atomically, so readers never see half a file)"""
+        self.compact()
+        self._write(json.dumps(self.to_dict()))
+
+    def _write(self, data: str):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(data)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+    async def save_periodically(self, interval: float = SAVE_INTERVAL):
+        """Save changes in the background (run as a task); serializing stays on the loop, writing doesn't"""
+        while True:
+            await asyncio.sleep(interval)
+            if not self.dirty:
+                continue
+            try:
+                self.compact()
+                self.dirty = False
+                await asyncio.to_thread(self._write, json.dumps(self.to_dict()))
+            except Exception as e:
+                self.dirty = True
+                log.error(f"Saving rollups failed: {e}")
+
+
+class RollupReader:
+    """Dashboard side - sums the saved stores of every shard, reloading when one changes"""
+
+    def __init__(self, path: str = ROLLUPS_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.signatures = None
+        self.store = RollupStore()
+
+    def files(self) -> List[str]:
+        root, ext = os.path.splitext(self.path)
+        return sorted([self.path] + glob.glob(f"{root}.shard*{ext}"))
+
+    def refresh(self) -> RollupStore:
+        with self.lock:
+            files = self.files()
+            signatures = [file_signature(path) for path in files]
+            if signatures != self.signatures:
+                store = RollupStore()
+                for path in files:
+                    if os.path.exists(path):
+                        store.merge(RollupStore._read(path))
+                self.store = store
+                self.signatures = signatures
+            return self.store
+
+    def query(self, *args, **kwargs) -> Dict:
+        return self.refresh().query(*args, **kwargs)
+
+
+def rebuild(logs_dir: str = "forensics_logs", clock=time.time) -> RollupStore:
+    """Backfill a store from the evidence log, warnings and mutes (retention still applies)"""
+    store = RollupStore(clock=clock)
+    evidence = os.path.join(logs_dir, "abuse_evidence.jsonl")
+    if os.path.exists(evidence):
+        with open(evidence, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    when = _timestamp(record.get('logged_at'))
+                    if when is not None:
+                        store.record(record.get('guild_id'), case_metrics(record.get('analysis') or {},
+                                                                          record.get('category')), when)
+                except (ValueError, AttributeError):
+                    continue
+    for name in WARNINGS_FILES:
+        for path in state_files(os.path.join(logs_dir, name)):
+            contents = RollupStore._read(path) if os.path.exists(path) else {}
+            for key, warnings in normalize_warnings(contents).items():
+                for warning in warnings:
+                    when = _timestamp(warning.get('timestamp'))
+                    if when is not None:
+                        store.record(key.split(':', 1)[0], {"warnings": 1}, when)
+    for path in state_files(os.path.join(logs_dir, "user_mutes.json")):
+        for mute in (RollupStore._read(path) if os.path.exists(path) else {}).values():
+            when = _timestamp(mute.get('start_time'))
+            if when is not None:
+                store.record(mute.get('guild_id'), {"mutes": 1}, when)
+    store.compact()
+    return store
+
+
+# Singleton instance
+_rollup_store = None
+
+def get_rollup_store() -> RollupStore:
+    """Get or create singleton instance"""
+    global _rollup_store
+    if _rollup_store is None:
+        _rollup_store = RollupStore(shard_state_path(ROLLUPS_FILE))
+    return _rollup_store
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain the dashboard's time-series rollups")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Recreate rollups.json from the evidence log, warnings and mutes "
+                             "(stop the bot first, it saves its own counts over the file)")
+    parser.add_argument("--logs-dir", default="forensics_logs")
+    args = parser.parse_args(argv)
+    if not args.rebuild:
+        parser.print_help()
+        return 1
+    store = rebuild(args.logs_dir)
+    store.path = os.path.join(args.logs_dir, "rollups.json")
+    store.save()
+    print(f"Wrote {store.path} ({sum(len(guilds) for guilds in store.series.values())} guild series)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
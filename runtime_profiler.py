@@ -0,0 +1,227 @@
+"""
+Runtime Profiler - On-demand sampling profiler and memory snapshots for a running bot
+A background thread samples the event loop thread's stack at a fixed interval
+for a limited time and aggregates the samples into folded stacks (the input
+format of flamegraph.pl and speedscope) plus a top-N report. Memory snapshots
+trace allocations with tracemalloc for a limited window.
+
+Nothing runs while no profile is being taken: there is no sampling thread,
+no trace or profile hook and tracemalloc is stopped again afterwards.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List
+
+from structured_logging import get_logger
+
+log = get_logger("runtime_profiler")
+
+
+PROFILE_DIR = os.path.join("forensics_logs", "profiles")
+DEFAULT_INTERVAL = 0.005  # seconds between samples
+MAX_SECONDS = 120
+MAX_STACK_DEPTH = 64
+UPLOAD_LIMIT = 8 * 1024 * 1024  # Discord attachment limit (bytes)
+
+
+class ProfileResult:
+    """Samples collected by one profiling run"""
+
+    def __init__(self, stacks: Counter, samples: int, seconds: float, interval: float):
+        self.stacks = stacks  # format: {"outer;...;inner": samples}
+        self.samples = samples
+        self.seconds = seconds
+        self.interval = interval
+
+    def folded(self) -> str:
+        """Folded stacks, one "frame;frame;frame count" line per unique stack"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def top(self, limit: int = 20) -> Dict[str, List]:
+        """
+        Functions with the most samples
+
+        Returns:
+            {"self": [(function, samples, share)], "total": [(function, samples, share)]}
+            where "self" counts samples in the function itself and "total"
+            samples anywhere below it
+        """
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        samples = self.samples or 1
+        return {
+            "self": [(frame, count, round(count / samples, 4)) for frame, count in own.most_common(limit)],
+            "total": [(frame, count, round(count / samples, 4)) for frame, count in total.most_common(limit)]
+        }
+
+    def format_top(self, limit: int = 20) -> str:
+        """Plain text top-N report"""
+        top = self.top(limit)
+        lines = [f"{self.samples} samples over {self.seconds:.1f}s (interval {self.interval * 1000:.1f} ms)", ""]
+        for kind in ["self", "total"]:
+            lines.append(f"Top {limit} by {kind} samples:")
+            for frame, count, share in top[kind]:
+                lines.append(f"  {share * 100:6.2f}%  {count:7d}  {frame}")
+            lines.append("")
+        return "\n".join(lines)
+
+
+class SamplingProfiler:
+    """Samples one thread's stack from a background thread for a limited time"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.active = False
+        self.labels = {}  # format: {code object: "function (file:line)"}
+
+    def _label(self, code) -> str:
+        label = self.labels.get(code)
+        if label is None:
+            label = self.labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _sample(self, thread_id: int, stop: threading.Event, stacks: Counter, counter: List[int]):
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            frames = []
+            while frame is not None and len(frames) < MAX_STACK_DEPTH:
+                frames.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if frames:
+                stacks[";".join(reversed(frames))] += 1
+                counter[0] += 1
+
+    def run(self, seconds: float, thread_id: int = None) -> ProfileResult:
+        """Profile a thread for `seconds` (blocks the calling thread)"""
+        if self.active:
+            raise RuntimeError("a profile is already running")
+        thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        seconds = max(0.1, min(float(seconds), MAX_SECONDS))
+
+        self.active = True
+        stacks, counter, stop = Counter(), [0], threading.Event()
+        sampler = threading.Thread(target=self._sample, args=(thread_id, stop, stacks, counter),
+                                   name="runtime-profiler", daemon=True)
+        started = time.perf_counter()
+        try:
+            sampler.start()
+            time.sleep(seconds)
+        finally:
+            stop.set()
+            sampler.join()
+            self.active = False
+        self.labels.clear()
+        return ProfileResult(stacks, counter[0], time.perf_counter() - started, self.interval)
+
+    async def profile(self, seconds: float) -> ProfileResult:
+        """Profile the event loop thread while the loop keeps running"""
+        thread_id = threading.get_ident()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.run, seconds, thread_id)
+
+
+_memory_snapshot_running = False
+
+
+async def memory_snapshot(seconds: float = 30, limit: int = 25, frames: int = 1) -> Dict:
+    """
+    Trace allocations for a while and report the largest and fastest growing sites
+
+    tracemalloc only sees allocations made while tracing, so tracing is
+    started for the window (unless already running) and stopped afterwards.
+
+    Args:
+        seconds: Tracing window
+        limit: Number of allocation sites per list
+        frames: Stack frames stored per allocation
+
+    Returns:
+        {"seconds", "traced_kib", "peak_kib", "largest": [...], "growth": [...]}
+    """
+    global _memory_snapshot_running
+    if _memory_snapshot_running:
+        raise RuntimeError("a memory snapshot is already running")
+    _memory_snapshot_running = True
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(frames)
+    try:
+        before = tracemalloc.take_snapshot()
+        await asyncio.sleep(max(0.0, min(float(seconds), MAX_SECONDS)))
+        after = tracemalloc.take_snapshot()
+        traced, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+        _memory_snapshot_running = False
+
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>")]
+    after = after.filter_traces(filters)
+    largest = after.statistics("lineno")[:limit]
+    growth = [stat for stat in after.compare_to(before.filter_traces(filters), "lineno") if stat.size_diff > 0][:limit]
+    return {
+        "seconds": seconds,
+        "traced_kib": round(traced / 1024, 1),
+        "peak_kib": round(peak / 1024, 1),
+        "largest": [{"site": str(stat.traceback), "kib": round(stat.size / 1024, 1), "count": stat.count}
+                    for stat in largest],
+        "growth": [{"site": str(stat.traceback), "kib_diff": round(stat.size_diff / 1024, 1),
+                    "count_diff": stat.count_diff} for stat in growth]
+    }
+
+
+def format_memory_report(report: Dict) -> str:
+    """Plain text memory snapshot report"""
+    lines = [f"Traced {report['traced_kib']} KiB (peak {report['peak_kib']} KiB) "
+             f"over {report['seconds']}s", "", "Largest allocation sites:"]
+    lines += [f"  {entry['kib']:10.1f} KiB  {entry['count']:7d} blocks  {entry['site']}" for entry in report["largest"]]
+    lines += ["", "Growth during the window:"]
+    lines += [f"  {entry['kib_diff']:+10.1f} KiB  {entry['count_diff']:+7d} blocks  {entry['site']}"
+              for entry in report["growth"]]
+    return "\n".join(lines) + "\n"
+
+
+def save_report(name: str, contents: Dict[str, str], directory: str = PROFILE_DIR) -> List[str]:
+    """
+    Write report files under forensics_logs/profiles
+
+    Args:
+        name: File name prefix (e.g. "profile")
+        contents: {file extension: text}
+
+    Returns:
+        Paths of the written files
+    """
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    paths = []
+    for extension, text in contents.items():
+        path = os.path.join(directory, f"{name}_{stamp}.{extension}")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        paths.append(path)
+    log.info("Profile report saved", paths=paths)
+    return paths
+
+
+# Singleton instance
+_profiler = None
+
+def get_runtime_profiler() -> SamplingProfiler:
+    """Get or create singleton instance"""
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler()
+    return _profiler
@@ -0,0 +1,314 @@
+"""
+Guardify Shard Launcher
+Runs the RespectRanger bot as N shard processes with a local coordinator that
+supervises the shards, aggregates their health and routes cross-shard commands.
+
+Usage:
+    python shard_launcher.py --shards 4
+    GUARDIFY_SHARDS=4 python shard_launcher.py
+    python shard_launcher.py --shards 4 --detection-service
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from flask import Flask, Response, jsonify, request
+
+from sharding import SHARD_IDS_ENV, SHARD_COUNT_ENV, HEARTBEAT_INTERVAL
+from detection_service import DETECTION_SERVICE_ENV, DEFAULT_SOCKET
+from structured_logging import get_logger
+
+log = get_logger("shard_launcher")
+
+
+RESTART_BACKOFF = [5, 15, 60]  # seconds between restarts of a crashed shard
+
+
+def load_token() -> Optional[str]:
+    """Load the bot token the same way bot.py does"""
+    token = os.getenv('DISCORD_BOT_TOKEN')
+    if not token and os.path.exists('config.json'):
+        with open('config.json', 'r') as f:
+            token = json.load(f).get('bot_token')
+    return token
+
+
+def run_detection_service(address: str):
+    """Entry point of the shared detection service process"""
+    import detection_service
+    if address.startswith("tcp://"):
+        detection_service.main(["--tcp", address[len("tcp://"):]])
+    else:
+        detection_service.main(["--socket", address.replace("unix://", "", 1)])
+
+
+def run_shard(shard_id: int, shard_count: int, token: str, inbox, outbox):
+    """Entry point of a shard process"""
+    # bot.py reads its shard assignment at import time
+    os.environ[SHARD_IDS_ENV] = str(shard_id)
+    os.environ[SHARD_COUNT_ENV] = str(shard_count)
+
+    import bot as bot_module
+    from sharding import ShardLink
+
+    bot_module.bot.shard_link = ShardLink(bot_module.bot, shard_id, inbox, outbox)
+    log.info("Starting shard", shard_id=shard_id, pid=os.getpid())
+    bot_module.bot.run(token)
+
+
+class ShardCoordinator:
+    """Supervises shard processes and routes messages between them"""
+
+    def __init__(self, shard_count: int, token: str):
+        self.shard_count = shard_count
+        self.token = token
+        self.ctx = multiprocessing.get_context("spawn")
+        self.outbox = self.ctx.Queue()  # shards -> coordinator
+        self.inboxes = {}  # format: {shard_id: Queue}  coordinator -> shard
+        self.processes = {}  # format: {shard_id: Process}
+        self.restarts = {}  # format: {shard_id: restart count}
+        self.health = {}  # format: {shard_id: last heartbeat payload}
+        self.replies = {}  # format: {request_id: {shard_id: result}}
+        self.reply_events = {}  # format: {request_id: threading.Event}
+        self.lock = threading.Lock()
+        self.running = True
+
+    def start_shard(self, shard_id: int):
+        """Start (or restart) a single shard process"""
+        inbox = self.ctx.Queue()
+        self.inboxes[shard_id] = inbox
+        process = self.ctx.Process(
+            target=run_shard,
+            args=(shard_id, self.shard_count, self.token, inbox, self.outbox),
+            name=f"guardify-shard-{shard_id}",
+            daemon=True
+        )
+        process.start()
+        self.processes[shard_id] = process
+
+    def start(self):
+        """Start all shards and the coordinator threads"""
+        threading.Thread(target=self._read_outbox, name="coordinator-outbox", daemon=True).start()
+        for shard_id in range(self.shard_count):
+            self.start_shard(shard_id)
+            time.sleep(5)  # Discord allows one IDENTIFY per 5 seconds
+        threading.Thread(target=self._supervise, name="coordinator-supervisor", daemon=True).start()
+
+    def stop(self):
+        """Stop all shard processes"""
+        self.running = False
+        for shard_id, process in self.processes.items():
+            try:
+                self.inboxes[shard_id].put(None)
+            except Exception:
+                pass
+            process.terminate()
+        for process in self.processes.values():
+            process.join(timeout=10)
+
+    def _supervise(self):
+        """Restart shards that exited unexpectedly"""
+        while self.running:
+            for shard_id, process in list(self.processes.items()):
+                if process.is_alive() or not self.running:
+                    continue
+                count = self.restarts.get(shard_id, 0)
+                delay = RESTART_BACKOFF[min(count, len(RESTART_BACKOFF) - 1)]
+                log.warning("Shard exited, restarting", shard_id=shard_id, exitcode=process.exitcode, delay=delay)
+                time.sleep(delay)
+                self.restarts[shard_id] = count + 1
+                self.start_shard(shard_id)
+            time.sleep(HEARTBEAT_INTERVAL)
+
+    def _read_outbox(self):
+        """Handle heartbeats, replies and requests sent by shards"""
+        while self.running:
+            try:
+                message = self.outbox.get()
+            except (EOFError, OSError):
+                return
+
+            kind = message.get("type")
+            if kind == "heartbeat":
+                self.health[message["shard_id"]] = message["health"]
+            elif kind == "reply":
+                with self.lock:
+                    results = self.replies.get(message["request_id"])
+                    if results is not None:
+                        results[message["shard_id"]] = message["result"]
+                        if len(results) >= self.shard_count:
+                            self.reply_events[message["request_id"]].set()
+            elif kind == "request":
+                # Requests may broadcast and wait for replies - don't block this reader
+                threading.Thread(target=self._handle_request, args=(message,), daemon=True).start()
+
+    def broadcast(self, op: str, timeout: float = 10.0, **payload) -> Dict[int, Dict]:
+        """
+        Run a command on every shard and collect the results
+
+        Args:
+            op: Shard command ("health", "metrics", "warning_stats", "reload_configs")
+            timeout: Seconds to wait for all shards to reply
+
+        Returns:
+            Dict mapping shard ID to that shard's result (missing shards omitted)
+        """
+        request_id = uuid.uuid4().hex
+        with self.lock:
+            self.replies[request_id] = {}
+            self.reply_events[request_id] = threading.Event()
+
+        for inbox in self.inboxes.values():
+            inbox.put({"type": "command", "op": op, "request_id": request_id, **payload})
+
+        self.reply_events[request_id].wait(timeout)
+        with self.lock:
+            self.reply_events.pop(request_id, None)
+            return self.replies.pop(request_id, {})
+
+    def aggregated_health(self) -> Dict:
+        """Cluster health from the latest shard heartbeats"""
+        now = time.time()
+        shards = []
+        for shard_id in range(self.shard_count):
+            health = dict(self.health.get(shard_id, {"shard_id": shard_id, "ready": False}))
+            process = self.processes.get(shard_id)
+            health["alive"] = bool(process and process.is_alive())
+            health["stale"] = now - health.get("timestamp", 0) > HEARTBEAT_INTERVAL * 3
+            health["restarts"] = self.restarts.get(shard_id, 0)
+            shards.append(health)
+
+        healthy = [s for s in shards if s["alive"] and s.get("ready") and not s["stale"]]
+        return {
+            "status": "online" if len(healthy) == self.shard_count else "degraded",
+            "shard_count": self.shard_count,
+            "healthy_shards": len(healthy),
+            "guilds": sum(s.get("guilds", 0) for s in shards),
+            "members": sum(s.get("members", 0) for s in shards),
+            "shards": shards
+        }
+
+    def merged_warning_stats(self, guild_id: str = None) -> Dict:
+        """Warning statistics summed across all shards"""
+        merged = {
+            "total_users_warned": 0,
+            "total_warnings": 0,
+            "total_active_mutes": 0,
+            "severity_breakdown": {},
+            "guilds_affected": 0
+        }
+        for result in self.broadcast("warning_stats", guild_id=guild_id).values():
+            if "error" in result:
+                continue
+            for key in ["total_users_warned", "total_warnings", "total_active_mutes", "guilds_affected"]:
+                merged[key] += result.get(key, 0)
+            for severity, count in result.get("severity_breakdown", {}).items():
+                merged["severity_breakdown"][severity] = merged["severity_breakdown"].get(severity, 0) + count
+        return merged
+
+    def _handle_request(self, message: Dict):
+        op = message.get("op")
+        payload = message.get("payload", {})
+        if op == "cluster_health":
+            result = self.aggregated_health()
+        elif op == "cluster_warning_stats":
+            result = self.merged_warning_stats(payload.get("guild_id"))
+        elif op == "reload_configs":
+            result = self.broadcast("reload_configs")
+        else:
+            result = {"error": f"unknown op {op}"}
+
+        inbox = self.inboxes.get(message["shard_id"])
+        if inbox is not None:
+            inbox.put({"type": "reply", "request_id": message["request_id"], "result": result})
+
+
+def create_health_app(coordinator: ShardCoordinator) -> Flask:
+    """Health server for the whole cluster (replaces the per-process one in bot.py)"""
+    app = Flask('guardify-coordinator')
+
+    @app.route('/')
+    def home():
+        return "Guardify Bot is online! 🛡️"
+
+    @app.route('/health')
+    def health():
+        return jsonify(coordinator.aggregated_health())
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus text for all shards (labelled by shard), or JSON with ?format=json"""
+        if request.args.get('format') == 'json':
+            shards = coordinator.broadcast("metrics", timeout=5.0)
+            return jsonify({"shards": {str(shard_id): result for shard_id, result in sorted(shards.items())}})
+
+        shards = coordinator.broadcast("metrics", timeout=5.0, format="prometheus")
+        families = {}  # format: {"# TYPE" line: [sample lines]} - one TYPE line per family
+        order = []
+        for _, result in sorted(shards.items()):
+            current = None
+            for line in result.get("text", "").splitlines():
+                if line.startswith("# TYPE"):
+                    current = line
+                    if current not in families:
+                        families[current] = []
+                        order.append(current)
+                elif current is not None:
+                    families[current].append(line)
+        text = "".join(f"{header}\n" + "".join(f"{line}\n" for line in families[header]) for header in order)
+        return Response(text, mimetype='text/plain; version=0.0.4')
+
+    return app
+
+
+def main(argv: List[str] = None):
+    """Main entry point for the sharded bot."""
+    parser = argparse.ArgumentParser(description="Run Guardify as multiple shard processes")
+    parser.add_argument('--shards', type=int, default=int(os.environ.get('GUARDIFY_SHARDS', os.cpu_count() or 1)),
+                        help="Number of shard processes (default: GUARDIFY_SHARDS or CPU count)")
+    parser.add_argument('--detection-service', nargs='?', const=f"unix://{DEFAULT_SOCKET}",
+                        help="Run one shared detection service for all shards (optional address)")
+    args = parser.parse_args(argv)
+
+    token = load_token()
+    if not token:
+        log.error("Discord bot token not found! Set the DISCORD_BOT_TOKEN environment variable or add it to config.json")
+        return
+
+    detection_process = None
+    if args.detection_service:
+        # Shards inherit the address and connect instead of loading their own detectors
+        os.environ[DETECTION_SERVICE_ENV] = args.detection_service
+        detection_process = multiprocessing.get_context("spawn").Process(
+            target=run_detection_service,
+            args=(args.detection_service,),
+            name="guardify-detection",
+            daemon=True
+        )
+        detection_process.start()
+        log.info("Detection service started", address=args.detection_service)
+
+    coordinator = ShardCoordinator(args.shards, token)
+    log.info("Launching shard processes", shards=args.shards)
+    coordinator.start()
+
+    try:
+        port = int(os.environ.get('PORT', 10000))
+        create_health_app(coordinator).run(host='0.0.0.0', port=port)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        log.info("Stopping shards")
+        coordinator.stop()
+        if detection_process is not None:
+            detection_process.terminate()
+
+
+if __name__ == "__main__":
+    main()
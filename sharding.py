@@ -0,0 +1,286 @@
+"""
+Sharding Support - Shard configuration, guild-partitioned state and the shard side
+of the link to the local shard coordinator (see shard_launcher.py)
+"""
+
+import asyncio
+import glob
+import json
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from structured_logging import get_logger
+
+log = get_logger("sharding")
+
+
+SHARD_IDS_ENV = "GUARDIFY_SHARD_IDS"
+SHARD_COUNT_ENV = "GUARDIFY_SHARD_COUNT"
+
+HEARTBEAT_INTERVAL = 10  # seconds
+
+
+def get_shard_config() -> Tuple[Optional[List[int]], Optional[int]]:
+    """
+    Read the shard assignment of this process from the environment
+
+    Returns:
+        (shard_ids, shard_count), or (None, None) when running unsharded
+    """
+    shard_ids = os.environ.get(SHARD_IDS_ENV)
+    shard_count = os.environ.get(SHARD_COUNT_ENV)
+    if not shard_ids or not shard_count:
+        return None, None
+    return [int(s) for s in shard_ids.split(',')], int(shard_count)
+
+
+def is_sharded() -> bool:
+    """Check if this process runs as one shard of a sharded deployment"""
+    return get_shard_config()[0] is not None
+
+
+def shard_for_guild(guild_id, shard_count: int) -> int:
+    """Get the shard a guild belongs to (Discord's sharding formula)"""
+    return (int(guild_id) >> 22) % shard_count
+
+
+def owns_guild(guild_id) -> bool:
+    """Check if a guild is handled by this process"""
+    shard_ids, shard_count = get_shard_config()
+    if shard_ids is None:
+        return True
+    return shard_for_guild(guild_id, shard_count) in shard_ids
+
+
+def _guild_of_key(key: str) -> str:
+    """State is keyed by "guild_id" or "guild_id:user_id" - get the guild part"""
+    return key.split(':', 1)[0]
+
+
+def shard_state_path(path: str) -> str:
+    """
+    Get the per-shard file name for a state file
+
+    Example: forensics_logs/user_warnings.json -> forensics_logs/user_warnings.shard0-of-4.json
+    Unsharded processes keep using the original path.
+    """
+    shard_ids, shard_count = get_shard_config()
+    if shard_ids is None:
+        return path
+    root, ext = os.path.splitext(path)
+    suffix = "-".join(str(s) for s in shard_ids)
+    return f"{root}.shard{suffix}-of-{shard_count}{ext}"
+
+
+def prepare_state_file(path: str) -> str:
+    """
+    Get the state file this process should use, seeding it on first start
+
+    When a shard starts without its own file yet, it takes the entries for
+    the guilds it owns from the unsharded file and from any shard files of a
+    previous shard layout, so switching to (or resizing) sharding keeps state.
+
+    Args:
+        path: Unsharded path of a JSON state file keyed by guild
+
+    Returns:
+        Path to read and write for this process
+    """
+    shard_path = shard_state_path(path)
+    if shard_path == path or os.path.exists(shard_path):
+        return shard_path
+
+    root, ext = os.path.splitext(path)
+    sources = [path] + sorted(glob.glob(f"{root}.shard*{ext}"), key=_modified)  # newer layouts win
+
+    seeded = {}
+    for source in sources:
+        if not os.path.exists(source):
+            continue
+        try:
+            with open(source, 'r') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            continue
+        for key, value in data.items():
+            if owns_guild(_guild_of_key(key)):
+                seeded[key] = value
+
+    if seeded:
+        os.makedirs(os.path.dirname(shard_path) or '.', exist_ok=True)
+        with open(shard_path, 'w') as f:
+            json.dump(seeded, f, indent=2)
+        log.info("Seeded shard state file", path=shard_path, entries=len(seeded))
+
+    return shard_path
+
+
+def _modified(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def _shard_layout(path: str) -> Optional[Tuple[int, List[int]]]:
+    """(shard count, shard ids) of a file named by shard_state_path, None for other names"""
+    match = re.search(r"\.shard([\d-]+)-of-(\d+)\.[^.]*$", path)
+    if match is None:
+        return None
+    return int(match.group(2)), [int(s) for s in match.group(1).split('-')]
+
+
+def state_files(path: str) -> List[str]:
+    """
+    Every file holding a state file's current entries
+
+    The shard files of the newest shard layout if there are any, else the
+    unsharded file itself. prepare_state_file seeds a new layout's files from
+    the older ones and leaves those in place, so the unsharded file and the
+    files of earlier layouts hold stale copies of the same entries. A layout
+    is the most recently written shard file plus the other files with the
+    same shard count whose shards don't overlap it.
+    """
+    root, ext = os.path.splitext(path)
+    current, count, shards = [], None, set()
+    for shard_path in sorted(glob.glob(f"{root}.shard*{ext}"), key=_modified, reverse=True):
+        layout = _shard_layout(shard_path)
+        if layout is None:
+            continue
+        if count is None:
+            count = layout[0]
+        if layout[0] == count and shards.isdisjoint(layout[1]):
+            current.append(shard_path)
+            shards.update(layout[1])
+    return sorted(current) or [path]
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """(mtime_ns, size, inode) of a file, or None if it doesn't exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class ShardLink:
+    """Shard side of the connection to the local shard coordinator"""
+
+    def __init__(self, bot, shard_id: int, inbox, outbox):
+        self.bot = bot
+        self.shard_id = shard_id
+        self.inbox = inbox  # coordinator -> shard
+        self.outbox = outbox  # shard -> coordinator
+        self.loop = None
+        self.pending = {}  # format: {request_id: asyncio.Future}
+        self.heartbeat_task = None
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """Start the inbox reader thread and heartbeat task"""
+        self.loop = loop
+        reader = threading.Thread(target=self._read_inbox, name=f"shard-{self.shard_id}-link", daemon=True)
+        reader.start()
+        self.heartbeat_task = loop.create_task(self._heartbeat())
+
+    def health(self) -> Dict:
+        """Health snapshot of this shard"""
+        bot = self.bot
+        return {
+            "shard_id": self.shard_id,
+            "pid": os.getpid(),
+            "ready": bot.is_ready(),
+            "guilds": len(bot.guilds),
+            "members": sum(g.member_count or 0 for g in bot.guilds),
+            "latency_ms": None if math.isnan(bot.latency) else round(bot.latency * 1000, 1),
+            "pending_unmutes": len(getattr(bot, 'unmute_tasks', {})),
+            "timestamp": time.time()
+        }
+
+    async def _heartbeat(self):
+        while True:
+            try:
+                self.outbox.put({"type": "heartbeat", "shard_id": self.shard_id, "health": self.health()})
+            except Exception as e:
+                log.warning(f"Heartbeat failed: {e}", shard_id=self.shard_id)
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    def _read_inbox(self):
+        """Blocking reader - hands messages over to the event loop"""
+        while True:
+            try:
+                message = self.inbox.get()
+            except (EOFError, OSError):
+                return
+            if message is None:
+                return
+            self.loop.call_soon_threadsafe(self._dispatch, message)
+
+    def _dispatch(self, message: Dict):
+        if message.get("type") == "reply":
+            future = self.pending.pop(message.get("request_id"), None)
+            if future and not future.done():
+                future.set_result(message.get("result"))
+        elif message.get("type") == "command":
+            self.loop.create_task(self._run_command(message))
+
+    async def _run_command(self, message: Dict):
+        """Run a command broadcast by the coordinator and send back the result"""
+        op = message.get("op")
+        try:
+            if op == "health":
+                result = self.health()
+            elif op == "metrics":
+                if message.get("format") == "prometheus":
+                    result = {"text": self.bot.metrics.render_prometheus(extra_labels={"shard": str(self.shard_id)})}
+                else:
+                    result = self.bot.metrics.snapshot()
+            elif op == "warning_stats":
+                result = self.bot.warning_manager.get_statistics(message.get("guild_id"))
+            elif op == "reload_configs":
+                self.bot.guild_configs = self.bot.load_guild_configs()
+                self.bot.guild_cache.invalidate_config()
+                result = {"guild_configs": len(self.bot.guild_configs)}
+            else:
+                result = {"error": f"unknown op {op}"}
+        except Exception as e:
+            result = {"error": str(e)}
+
+        self.outbox.put({
+            "type": "reply",
+            "shard_id": self.shard_id,
+            "request_id": message.get("request_id"),
+            "result": result
+        })
+
+    async def request(self, op: str, timeout: float = 10.0, **payload):
+        """
+        Ask the coordinator for a cluster-wide result
+
+        Args:
+            op: Coordinator operation (e.g. "cluster_health", "cluster_warning_stats")
+            timeout: Seconds to wait for the reply
+
+        Returns:
+            The coordinator's result, or None on timeout
+        """
+        request_id = uuid.uuid4().hex
+        future = self.loop.create_future()
+        self.pending[request_id] = future
+        self.outbox.put({
+            "type": "request",
+            "shard_id": self.shard_id,
+            "request_id": request_id,
+            "op": op,
+            "payload": payload
+        })
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.pending.pop(request_id, None)
+            return None
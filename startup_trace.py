@@ -0,0 +1,233 @@
+"""
+Startup Trace - Opt-in timing of the bot's cold start
+Records how long each startup phase takes (imports, detector construction,
+JSON state loads, login, gateway connect) and writes a report when the bot is ready.
+
+Enable with GUARDIFY_STARTUP_TRACE=1 (report in forensics_logs/startup_trace.json)
+or GUARDIFY_STARTUP_TRACE=/path/to/report.json.
+
+Cold start benchmark:
+    python startup_trace.py --entry bot --budget 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from structured_logging import get_logger
+
+log = get_logger("startup_trace")
+
+
+STARTUP_TRACE_ENV = "GUARDIFY_STARTUP_TRACE"
+STARTUP_BUDGET_ENV = "GUARDIFY_STARTUP_BUDGET"
+DEFAULT_REPORT = os.path.join("forensics_logs", "startup_trace.json")
+DEFAULT_BUDGET = 5.0  # seconds from first import to ready
+
+
+class StartupTrace:
+    """Collects startup phases relative to the time this module was imported"""
+
+    def __init__(self, enabled: bool = False, report_path: str = DEFAULT_REPORT):
+        self.enabled = enabled
+        self.report_path = report_path
+        self.started = time.perf_counter()
+        self.last_checkpoint = self.started
+        self.phases = []  # format: [{"name", "start", "duration", "depth", "thread"}]
+        self.finished_at = None
+        self.ready_label = None
+        self.local = threading.local()
+
+    def _record(self, name: str, start: float, end: float, depth: int):
+        self.phases.append({
+            "name": name,
+            "start": round(start - self.started, 4),
+            "duration": round(end - start, 4),
+            "depth": depth,
+            "thread": threading.current_thread().name
+        })
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block of startup work (phases may nest)"""
+        if not self.enabled:
+            yield
+            return
+        depth = getattr(self.local, "depth", 0)
+        self.local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.local.depth = depth
+            self._record(name, start, time.perf_counter(), depth)
+
+    def checkpoint(self, name: str):
+        """Record everything since the previous checkpoint as one phase"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._record(name, self.last_checkpoint, now, 0)
+        self.last_checkpoint = now
+
+    def report(self) -> Dict:
+        """Startup report with phases sorted by start time"""
+        from lazy_imports import import_report
+
+        end = self.finished_at or time.perf_counter()
+        return {
+            "pid": os.getpid(),
+            "entry": os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else None,
+            "ready_label": self.ready_label,
+            "total_seconds": round(end - self.started, 4),
+            "phases": sorted(self.phases, key=lambda p: (p["start"], p["depth"])),
+            "backends": import_report(),
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+        }
+
+    def write_report(self) -> Optional[str]:
+        """Write the report to disk (no-op when tracing is disabled)"""
+        if not self.enabled:
+            return None
+        directory = os.path.dirname(self.report_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.report_path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        return self.report_path
+
+    def finish(self, label: str = "ready") -> Optional[str]:
+        """Mark the bot as ready and write the report (only the first call counts)"""
+        if not self.enabled or self.finished_at is not None:
+            return None
+        self.checkpoint(label)
+        self.finished_at = time.perf_counter()
+        self.ready_label = label
+        path = self.write_report()
+        log.info("Startup trace written", ready_after=round(self.finished_at - self.started, 2), path=path)
+        return path
+
+
+def _from_env() -> StartupTrace:
+    value = os.environ.get(STARTUP_TRACE_ENV, "")
+    if not value or value == "0":
+        return StartupTrace(enabled=False)
+    path = value if value.endswith(".json") else DEFAULT_REPORT
+    return StartupTrace(enabled=True, report_path=path)
+
+
+# Process-wide trace, started when the entry point imports this module
+_trace = _from_env()
+
+
+def get_startup_trace() -> StartupTrace:
+    """Get the process-wide startup trace"""
+    return _trace
+
+
+def phase(name: str):
+    """Time a block of startup work on the process-wide trace"""
+    return _trace.phase(name)
+
+
+def checkpoint(name: str):
+    """Record the time since the previous checkpoint on the process-wide trace"""
+    _trace.checkpoint(name)
+
+
+def finish(label: str = "ready") -> Optional[str]:
+    """Mark the process as ready and write the startup report"""
+    return _trace.finish(label)
+
+
+def format_report(report: Dict) -> str:
+    """Human readable startup report"""
+    lines = [f"Cold start: {report['total_seconds']:.2f}s"]
+    for entry in report["phases"]:
+        indent = "  " * (entry["depth"] + 1)
+        lines.append(f"{indent}{entry['name']:<{40 - len(indent)}} "
+                     f"{entry['duration'] * 1000:8.0f} ms  (at {entry['start']:.2f}s)")
+    return "\n".join(lines)
+
+
+def measure_cold_start(entry: str = "bot", warm_backends: bool = True) -> Dict:
+    """
+    Import a bot entry point in a fresh interpreter and trace its startup
+
+    The gateway connection is not made; "ready" is simulated right after the
+    bot object is constructed (and its NLP backends warmed, if requested).
+    Runs in a temporary working directory so no state files are touched.
+
+    Args:
+        entry: Module to import ("bot" or "bot_enhanced")
+        warm_backends: Also time the lazy backend warm-up and a first analysis
+
+    Returns:
+        Startup report of the child process
+    """
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as work_dir:
+        report_path = os.path.join(work_dir, "startup_trace.json")
+        lines = [
+            "import startup_trace",
+            f"import {entry}",
+            f"startup_trace.checkpoint('import {entry}')",
+        ]
+        if warm_backends:
+            lines += [
+                "import lazy_imports",
+                "with startup_trace.phase('backend_warmup'):",
+                "    lazy_imports.warm_up()",
+                f"    {entry}.bot.abuse_detector.analyze_message('warm up')",
+            ]
+        lines.append("startup_trace.finish('simulated_ready')")
+        code = "\n".join(lines)
+        env = dict(os.environ)
+        env[STARTUP_TRACE_ENV] = report_path
+        env["PYTHONPATH"] = repo_dir + os.pathsep + env.get("PYTHONPATH", "")
+        result = subprocess.run([sys.executable, "-c", code], cwd=work_dir, env=env,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"cold start of {entry} failed:\n{result.stderr[-2000:]}")
+        with open(report_path, 'r') as f:
+            return json.load(f)
+
+
+def get_budget() -> float:
+    """Cold start budget in seconds (GUARDIFY_STARTUP_BUDGET or the default)"""
+    return float(os.environ.get(STARTUP_BUDGET_ENV, DEFAULT_BUDGET))
+
+
+def main(argv: List[str] = None) -> int:
+    """Run the cold start benchmark and compare it against the budget."""
+    parser = argparse.ArgumentParser(description="Guardify cold start benchmark")
+    parser.add_argument('--entry', default="bot", choices=["bot", "bot_enhanced"])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--budget', type=float, default=get_budget(),
+                        help=f"Seconds allowed from first import to ready (default: {DEFAULT_BUDGET})")
+    parser.add_argument('--no-warmup', action='store_true', help="Skip the backend warm-up phase")
+    args = parser.parse_args(argv)
+
+    reports = [measure_cold_start(args.entry, not args.no_warmup) for _ in range(args.runs)]
+    median = statistics.median(r["total_seconds"] for r in reports)
+    fastest = min(reports, key=lambda r: r["total_seconds"])
+
+    print(format_report(fastest))
+    print(f"\nMedian of {args.runs} runs: {median:.2f}s (budget {args.budget:.2f}s)")
+    if median > args.budget:
+        print("FAIL: cold start is over budget")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
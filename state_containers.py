@@ -0,0 +1,233 @@
+"""
+State Containers - Memory-bounded per-user and per-guild state
+Dict-like containers that evict entries idle for longer than a TTL and the
+least recently used entries above a size cap, and can estimate how much memory
+they hold. Every container registers itself so the bot can report on all of them.
+"""
+
+import asyncio
+import sys
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Callable, Dict, List, Optional
+
+
+SWEEP_EVERY = 256  # writes between sweeps of expired entries
+SIZE_SAMPLE = 64  # entries measured when estimating memory
+
+
+def deep_size(obj, seen: set = None, depth: int = 4) -> int:
+    """Approximate memory of an object and the containers/strings it holds (bytes)"""
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if depth <= 0:
+        return size
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen, depth - 1) + deep_size(v, seen, depth - 1) for k, v in list(obj.items()))
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_size(item, seen, depth - 1) for item in list(obj))
+    return size
+
+
+class BoundedState:
+    """
+    Dict with idle-time (TTL) and LRU eviction
+
+    Reads and writes refresh an entry. Expired entries are treated as missing
+    and are swept from the least recently used end every SWEEP_EVERY writes.
+    """
+
+    def __init__(self, name: str, max_entries: Optional[int] = None, ttl: Optional[float] = None,
+                 default_factory: Callable = None, evictable: Callable = None,
+                 clock: Callable[[], float] = time.monotonic, register: bool = True):
+        """
+        Args:
+            name: Name in the state report
+            max_entries: Size cap (None = unbounded)
+            ttl: Seconds an entry may stay unused (None = no expiry)
+            default_factory: Creates missing entries on item access, like defaultdict
+            evictable: Returns False for values that must not be evicted (e.g. running tasks)
+            clock: Time source (for tests)
+            register: Add to the process-wide state registry
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.default_factory = default_factory
+        self.evictable = evictable
+        self.clock = clock
+        self.data = OrderedDict()  # format: {key: (value, last used)}, least recently used first
+        self.evictions = {"ttl": 0, "lru": 0}
+        self.writes = 0
+        if register:
+            get_state_registry().register(self)
+
+    def _expired(self, used: float, now: float) -> bool:
+        return self.ttl is not None and now - used > self.ttl
+
+    def _can_evict(self, value) -> bool:
+        return self.evictable is None or self.evictable(value)
+
+    def _lookup(self, key):
+        """Value for key (refreshing it), or raises KeyError if missing or expired"""
+        value, used = self.data[key]
+        now = self.clock()
+        if self._expired(used, now) and self._can_evict(value):
+            del self.data[key]
+            self.evictions["ttl"] += 1
+            raise KeyError(key)
+        self.data[key] = (value, now)
+        self.data.move_to_end(key)
+        return value
+
+    def __getitem__(self, key):
+        try:
+            return self._lookup(key)
+        except KeyError:
+            if self.default_factory is None:
+                raise
+        value = self.default_factory()
+        self[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self.data[key] = (value, self.clock())
+        self.data.move_to_end(key)
+        self.writes += 1
+        if self.writes % SWEEP_EVERY == 0:
+            self.sweep()
+        if self.max_entries is not None and len(self.data) > self.max_entries:
+            self._evict_lru()
+
+    def __delitem__(self, key):
+        del self.data[key]
+
+    def __contains__(self, key) -> bool:
+        try:
+            self._lookup(key)
+            return True
+        except KeyError:
+            return False
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(list(self.data))
+
+    def get(self, key, default=None):
+        try:
+            return self._lookup(key)
+        except KeyError:
+            return default
+
+    def pop(self, key, *default):
+        if key not in self.data and default:
+            return default[0]
+        return self.data.pop(key)[0]
+
+    def keys(self) -> List:
+        return list(self.data)
+
+    def values(self) -> List:
+        return [value for value, _ in list(self.data.values())]
+
+    def items(self) -> List:
+        return [(key, value) for key, (value, _) in list(self.data.items())]
+
+    def clear(self):
+        self.data.clear()
+
+    def _evict_lru(self):
+        excess = len(self.data) - self.max_entries
+        victims = []
+        for key, (value, _) in self.data.items():
+            if len(victims) >= excess:
+                break
+            if self._can_evict(value):
+                victims.append(key)
+        for key in victims:
+            del self.data[key]
+        self.evictions["lru"] += len(victims)
+
+    def sweep(self) -> int:
+        """Remove expired entries; returns how many were removed"""
+        if self.ttl is None:
+            return 0
+        now = self.clock()
+        expired = []
+        for key, (value, used) in self.data.items():
+            if not self._expired(used, now):
+                break  # ordered by last use - the rest are newer
+            if self._can_evict(value):
+                expired.append(key)
+        for key in expired:
+            del self.data[key]
+        self.evictions["ttl"] += len(expired)
+        return len(expired)
+
+    def approx_bytes(self) -> int:
+        """Estimated memory of keys and values, extrapolated from a sample of entries"""
+        count = len(self.data)
+        if not count:
+            return sys.getsizeof(self.data)
+        sample = list(islice(list(self.data.items()), SIZE_SAMPLE))
+        sampled = sum(deep_size(key) + deep_size(value) for key, (value, _) in sample)
+        return sys.getsizeof(self.data) + int(sampled / len(sample) * count)
+
+    def stats(self) -> Dict:
+        return {
+            "name": self.name,
+            "entries": len(self.data),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "evictions": dict(self.evictions),
+            "approx_bytes": self.approx_bytes()
+        }
+
+
+class StateRegistry:
+    """All state containers of the process"""
+
+    def __init__(self):
+        self.containers = {}  # format: {name: BoundedState}
+
+    def register(self, container: BoundedState):
+        self.containers[container.name] = container
+
+    def sweep_all(self) -> int:
+        return sum(container.sweep() for container in list(self.containers.values()))
+
+    def report(self) -> List[Dict]:
+        """Stats per container, largest first"""
+        return sorted((c.stats() for c in list(self.containers.values())),
+                      key=lambda s: s["approx_bytes"], reverse=True)
+
+    def register_gauges(self, metrics):
+        """Expose entries and memory per container on /metrics"""
+        metrics.register_gauge("state_entries", lambda: {n: len(c) for n, c in list(self.containers.items())},
+                               label="container")
+        metrics.register_gauge("state_bytes", lambda: {s["name"]: s["approx_bytes"] for s in self.report()},
+                               label="container")
+
+
+# Singleton instance
+_registry = None
+
+def get_state_registry() -> StateRegistry:
+    """Get or create singleton instance"""
+    global _registry
+    if _registry is None:
+        _registry = StateRegistry()
+    return _registry
+
+
+async def sweep_periodically(interval: float = 60.0):
+    """Sweep expired entries of every container (run as a background task)"""
+    while True:
+        await asyncio.sleep(interval)
+        get_state_registry().sweep_all()
@@ -0,0 +1,281 @@
+"""
+Stats Cache - Precomputed dashboard statistics that are refreshed only when the logs change
+The evidence log is append-only, so new lines are folded into per-guild
+aggregates incrementally instead of re-parsing the whole file. The warnings
+files are re-read only when their signature (mtime, size, inode) changes, and
+only the users they touched are re-ranked (see warnings_query). Serialized /api/stats responses are cached per guild
+with an ETag, so unchanged polls can be answered with 304 Not Modified.
+
+Listeners added with StatsCache.add_listener receive the changes found while
+refreshing (new cases, warning count changes, mutes) as listener(event,
+guild_id, data) - the live dashboard stream is built on these.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sharding import file_signature
+from state_containers import BoundedState
+from warnings_query import WARNINGS_FILES, WarningsReader
+
+
+RECENT_CASES = 10
+TOP_WARNED = 10
+SEVERITIES = ("low", "medium", "high")
+
+Emit = Callable[[str, Optional[str], Dict], None]
+
+
+class _CaseAggregate:
+    """Statistics for one scope (a guild, or all guilds)"""
+
+    __slots__ = ("total", "users", "guilds", "severity", "recent")
+
+    def __init__(self):
+        self.total = 0
+        self.users = set()
+        self.guilds = set()
+        self.severity = {severity: 0 for severity in SEVERITIES}
+        self.recent = []  # min-heap of (logged_at, -line number, record), newest RECENT_CASES kept
+
+    def add(self, record: Dict, line_number: int):
+        self.total += 1
+        self.users.add(record.get('author_id'))
+        if record.get('guild_id'):
+            self.guilds.add(record.get('guild_id'))
+        entry = (record.get('logged_at', ''), -line_number, record)
+        if len(self.recent) < RECENT_CASES:
+            heapq.heappush(self.recent, entry)
+        elif entry[:2] > self.recent[0][:2]:
+            heapq.heapreplace(self.recent, entry)
+        try:
+            severity = record.get('analysis', {}).get('severity', 'low')
+            self.severity[severity] += 1  # unknown severities are counted as cases only
+        except (AttributeError, KeyError, TypeError):
+            pass
+
+    def totals(self) -> Dict:
+        return {
+            "total_cases": self.total,
+            "severity_breakdown": dict(self.severity),
+            "unique_users": len(self.users),
+            "unique_guilds": len(self.guilds)
+        }
+
+    def to_dict(self) -> Dict:
+        recent = sorted(self.recent, key=lambda entry: entry[:2], reverse=True)
+        stats = self.totals()
+        stats["recent_cases"] = [record for _, _, record in recent]
+        return stats
+
+
+class EvidenceStats:
+    """Per-guild statistics over the evidence JSONL, updated incrementally as lines are appended"""
+
+    def __init__(self, path: str, emit: Optional[Emit] = None):
+        self.path = path
+        self.emit = emit
+        self.version = 0
+        self.loaded = False
+        self.stale = False  # set by an append notification
+        self._reset()
+
+    def _reset(self):
+        self.signature = None
+        self.offset = 0  # bytes consumed (always at a line boundary)
+        self.lines = 0
+        self.all = _CaseAggregate()
+        self.guilds = {}  # format: {str(guild_id): _CaseAggregate}
+
+    def refresh(self) -> int:
+        """Fold in appended lines (or rebuild if the file was replaced); returns the data version"""
+        signature = file_signature(self.path)
+        if self.loaded and signature == self.signature and not self.stale:
+            return self.version
+        self.stale = False
+        replaced = self.signature is not None and (
+            signature is None or signature[2] != self.signature[2] or signature[1] < self.offset)
+        if replaced:
+            self._reset()  # rotated, removed or truncated - rebuild silently and tell listeners to resync
+            if self.emit:
+                self.emit("reset", None, {})
+        announce = self.emit is not None and self.loaded and not replaced
+        if signature is not None:
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                chunk = f.read()
+            complete = chunk[:chunk.rfind(b'\n') + 1]  # a partly written last line is read next time
+            for raw in complete.splitlines():
+                added = self._add_line(raw)
+                if announce and added is not None:
+                    record, aggregate = added
+                    self.emit("case", str(record.get('guild_id')), {
+                        "case": record,
+                        "totals": aggregate.totals(),
+                        "all_totals": self.all.totals()
+                    })
+            self.offset += len(complete)
+        self.signature = signature
+        self.loaded = True
+        self.version += 1
+        return self.version
+
+    def _add_line(self, raw: bytes) -> Optional[Tuple[Dict, _CaseAggregate]]:
+        self.lines += 1
+        try:
+            record = json.loads(raw.decode('utf-8'))
+            scope = str(record.get('guild_id'))
+        except (ValueError, AttributeError):
+            return None
+        self.all.add(record, self.lines)
+        aggregate = self.guilds.get(scope)
+        if aggregate is None:
+            aggregate = self.guilds[scope] = _CaseAggregate()
+        aggregate.add(record, self.lines)
+        return record, aggregate
+
+    def get(self, guild_id=None) -> Dict:
+        """Statistics for one guild (or all guilds), same shape as web_dashboard.get_statistics"""
+        if not guild_id:
+            return self.all.to_dict()
+        return self.guilds.get(str(guild_id), _CaseAggregate()).to_dict()
+
+
+class WarningStats:
+    """Warned users per guild from both bots' warnings files (see warnings_query), most warnings first"""
+
+    def __init__(self, paths: List[str], emit: Optional[Emit] = None):
+        self.reader = WarningsReader(paths)
+        self.index = self.reader.index
+        self.emit = emit
+        self.loaded = False
+        self.stale = False  # set by an append notification
+
+    @property
+    def version(self) -> int:
+        return self.index.version
+
+    def refresh(self) -> int:
+        changes = self.reader.refresh(force=self.stale)
+        self.stale = False
+        if self.emit is not None and self.loaded:
+            for previous, entry in changes:
+                if entry['count'] != previous:
+                    self.emit("warnings", entry['guild_id'], dict(entry, previous=previous))
+        self.loaded = True
+        return self.version
+
+    def get(self, guild_id=None) -> List[Dict]:
+        return self.index.top(guild_id, limit=None)
+
+    def top(self, guild_id=None, limit: int = TOP_WARNED) -> List[Dict]:
+        return self.index.top(guild_id, limit)
+
+
+class MuteStats:
+    """Mute state per user from the bot's user_mutes.json, announcing changes to listeners"""
+
+    def __init__(self, path: str, emit: Optional[Emit] = None):
+        self.path = path
+        self.emit = emit
+        self.loaded = False
+        self.signature = None
+        self.states = {}  # format: {"guild_id:user_id": (is_active, end_time)}
+
+    def refresh(self):
+        signature = file_signature(self.path)
+        if self.loaded and signature == self.signature:
+            return
+        mutes = {}
+        if signature is not None:
+            try:
+                with open(self.path, 'r') as f:
+                    mutes = json.load(f)
+            except ValueError:
+                return
+        states = {}
+        for key, mute in mutes.items():
+            states[key] = (bool(mute.get('is_active')), mute.get('end_time'))
+            if self.emit is not None and self.loaded and states[key] != self.states.get(key, (False, None)):
+                self.emit("mute", mute.get('guild_id'), {
+                    "user_id": mute.get('user_id'),
+                    "guild_id": mute.get('guild_id'),
+                    "active": states[key][0],
+                    "start_time": mute.get('start_time'),
+                    "end_time": mute.get('end_time'),
+                    "reason": mute.get('reason', '')
+                })
+        self.states = states
+        self.signature = signature
+        self.loaded = True
+
+
+class StatsCache:
+    """Cached /api/stats responses per guild"""
+
+    def __init__(self, logs_dir: str = "forensics_logs"):
+        self.listeners = []
+        self.evidence = EvidenceStats(os.path.join(logs_dir, "abuse_evidence.jsonl"), self._emit)
+        self.warnings = WarningStats([os.path.join(logs_dir, name) for name in WARNINGS_FILES], self._emit)
+        self.mutes = MuteStats(os.path.join(logs_dir, "user_mutes.json"), self._emit)
+        self.responses = BoundedState("stats_responses", max_entries=1024)  # format: {guild: (versions, body, etag)}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def add_listener(self, listener: Emit):
+        """Call listener(event, guild_id, data) for every change found while refreshing"""
+        self.listeners.append(listener)
+
+    def _emit(self, event: str, guild_id, data: Dict):
+        guild_id = str(guild_id) if guild_id is not None else None
+        for listener in self.listeners:
+            listener(event, guild_id, data)
+
+    def refresh(self) -> Tuple[int, int]:
+        """Bring the aggregates up to date with the files (cheap when nothing changed)"""
+        with self.lock:
+            if self.listeners:
+                self.mutes.refresh()  # only needed for the live stream
+            return self.evidence.refresh(), self.warnings.refresh()
+
+    def get_statistics(self, guild_id=None) -> Dict:
+        self.refresh()
+        return self.evidence.get(guild_id)
+
+    def get_warnings(self, guild_id=None) -> List[Dict]:
+        self.refresh()
+        return self.warnings.get(guild_id)
+
+    def get_response(self, guild_id=None) -> Tuple[str, str]:
+        """
+        Serialized /api/stats payload and its ETag
+
+        Returns:
+            (JSON body, ETag value without quotes)
+        """
+        with self.lock:
+            versions = (self.evidence.refresh(), self.warnings.refresh())
+            key = str(guild_id or "")
+            cached = self.responses.get(key)
+            if cached is not None and cached[0] == versions:
+                self.hits += 1
+                return cached[1], cached[2]
+            self.misses += 1
+            body = json.dumps({
+                "stats": self.evidence.get(guild_id),
+                "warnings": self.warnings.top(guild_id)
+            })
+            etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+            self.responses[key] = (versions, body, etag)
+            return body, etag
+
+    def invalidate(self):
+        """Append notification - re-read both files on the next request even if their signatures match"""
+        with self.lock:
+            self.evidence.stale = True
+            self.warnings.stale = True
@@ -0,0 +1,185 @@
+"""
+Structured Logging - Leveled, non-blocking logging with optional JSON output
+Records are handed to a queue on the calling thread and formatted and written
+by a background listener, so logging never blocks the event loop on stdout.
+
+Configuration (environment):
+    GUARDIFY_LOG_LEVEL             DEBUG / INFO / WARNING / ERROR (default: INFO)
+    GUARDIFY_LOG_FORMAT            text / json (default: text)
+    GUARDIFY_SCAN_LOG_SAMPLE_RATE  share of per-message scan lines logged (default: 0.01)
+
+Usage:
+    log = get_logger("bot")
+    log.info("Member joined", guild_id=guild.id, user=str(member))
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+
+LOG_LEVEL_ENV = "GUARDIFY_LOG_LEVEL"
+LOG_FORMAT_ENV = "GUARDIFY_LOG_FORMAT"
+SCAN_SAMPLE_RATE_ENV = "GUARDIFY_SCAN_LOG_SAMPLE_RATE"
+ROOT_LOGGER = "guardify"
+QUEUE_SIZE = 10000
+
+# LogRecord attributes that are not user fields
+_RESERVED = {"exc_info", "stack_info", "stacklevel", "extra"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human readable lines with key=value fields"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " | " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge args here - formatting (and JSON encoding) happens on the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """Logger that takes structured fields as keyword arguments"""
+
+    def process(self, msg, kwargs):
+        fields = {key: kwargs.pop(key) for key in list(kwargs) if key not in _RESERVED}
+        if fields:
+            kwargs["extra"] = {**kwargs.get("extra", {}), "fields": fields}
+        return msg, kwargs
+
+
+class Sampler:
+    """Lets through every n-th call (deterministic and cheaper than random sampling)"""
+
+    def __init__(self, rate: float):
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self.calls = 0
+
+    def __call__(self) -> bool:
+        if not self.every:
+            return False
+        self.calls += 1
+        return (self.calls - 1) % self.every == 0
+
+
+_setup_lock = threading.Lock()
+_listener = None
+_queue_handler = None
+
+
+def setup_logging(level: Optional[str] = None, fmt: Optional[str] = None, stream=None) -> logging.Logger:
+    """
+    Configure the guardify logger tree (safe to call more than once)
+
+    Args:
+        level: Log level name (default: GUARDIFY_LOG_LEVEL or INFO)
+        fmt: "text" or "json" (default: GUARDIFY_LOG_FORMAT or text)
+        stream: Output stream (default: stdout)
+
+    Returns:
+        The root guardify logger
+    """
+    global _listener, _queue_handler
+    with _setup_lock:
+        root = logging.getLogger(ROOT_LOGGER)
+        level = (level or os.environ.get(LOG_LEVEL_ENV, "INFO")).upper()
+        fmt = (fmt or os.environ.get(LOG_FORMAT_ENV, "text")).lower()
+
+        if _listener is not None:
+            _listener.stop()
+        if _queue_handler is not None:
+            root.removeHandler(_queue_handler)
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+        log_queue = queue.Queue(QUEUE_SIZE)
+        _queue_handler = DroppingQueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+        _listener.start()
+
+        root.addHandler(_queue_handler)
+        root.setLevel(getattr(logging, level, logging.INFO))
+        root.propagate = False
+        return root
+
+
+def flush_logging():
+    """Write out queued records and stop the listener thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(flush_logging)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """Get a structured logger below the guardify logger (sets up logging on first use)"""
+    if _listener is None:
+        setup_logging()
+    return StructuredLogger(logging.getLogger(f"{ROOT_LOGGER}.{name}"), {})
+
+
+def dropped_records() -> int:
+    """Records dropped because the log queue was full"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def scan_sampler() -> Sampler:
+    """Sampler for the per-message scan line (GUARDIFY_SCAN_LOG_SAMPLE_RATE)"""
+    return Sampler(float(os.environ.get(SCAN_SAMPLE_RATE_ENV, 0.01)))
@@ -0,0 +1,119 @@
+"""
+Unit tests for the detector benchmark
+"""
+
+import unittest
+import os
+import tempfile
+import shutil
+from unittest.mock import patch
+import benchmark_detectors
+from benchmark_detectors import generate_corpus, load_corpus, run_benchmark, compare, timed_stages
+
+
+class FakeDetector:
+    """Flags messages containing 'idiot' (or everything when strict)"""
+
+    def __init__(self, strict=False):
+        self.strict = strict
+
+    def score(self, text):
+        return 1.0 if self.strict or 'idiot' in text else 0.0
+
+    def analyze_message(self, text):
+        flagged = self.score(text) > 0.5
+        return {'is_abusive': flagged, 'severity': 'high' if flagged else 'none'}
+
+
+class TestBenchmarkDetectors(unittest.TestCase):
+    """Test cases for the corpus, the benchmark run and baseline comparison"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def run_fake(self, corpus, strict=False):
+        detector = FakeDetector(strict)
+        with patch.object(benchmark_detectors, 'load_detector',
+                          return_value=(detector, detector.analyze_message)), \
+             patch.object(benchmark_detectors, 'stage_targets',
+                          return_value=[(detector, 'score', 'scoring', None)]):
+            return run_benchmark(corpus, ['respect'])
+
+    def test_corpus_is_deterministic_and_covers_categories(self):
+        """Test that the same seed gives the same corpus with every language category"""
+        corpus = generate_corpus(500, seed=7)
+        self.assertEqual(corpus, generate_corpus(500, seed=7))
+        self.assertNotEqual(corpus, generate_corpus(500, seed=8))
+
+        categories = {entry['category'] for entry in corpus}
+        self.assertEqual(categories, {'en_clean', 'en_abusive', 'hi_devanagari',
+                                      'hi_romanized', 'leetspeak', 'long'})
+        long_messages = [e['content'] for e in corpus if e['category'] == 'long']
+        self.assertTrue(all(1500 <= len(text) <= 2000 for text in long_messages))
+        self.assertTrue(any('ऀ' <= c <= 'ॿ'
+                            for e in corpus if e['category'] == 'hi_devanagari' for c in e['content']))
+
+    def test_load_corpus_formats(self):
+        """Test plain text and JSONL corpora"""
+        text_path = os.path.join(self.test_dir, 'corpus.txt')
+        with open(text_path, 'w', encoding='utf-8') as f:
+            f.write("hello there\n\nyou idiot\n")
+        self.assertEqual([e['content'] for e in load_corpus(text_path)], ['hello there', 'you idiot'])
+
+        jsonl_path = os.path.join(self.test_dir, 'corpus.jsonl')
+        with open(jsonl_path, 'w', encoding='utf-8') as f:
+            f.write('{"text": "tu pagal hai", "category": "hi_romanized"}\n')
+        self.assertEqual(load_corpus(jsonl_path)[0]['category'], 'hi_romanized')
+
+    def test_report_contents(self):
+        """Test throughput, stages, memory and verdicts in the report"""
+        corpus = generate_corpus(50)
+        result = self.run_fake(corpus)['detectors']['respect']
+
+        self.assertEqual(result['messages'], 50)
+        self.assertGreater(result['msgs_per_sec'], 0)
+        self.assertIn('scoring', result['stages_avg_ms'])
+        self.assertIn('other', result['stages_avg_ms'])
+        self.assertIn('peak_kib', result['memory'])
+        self.assertEqual(len(result['verdicts']), 50)
+        expected = sum(1 for e in corpus if 'idiot' in e['content'])
+        self.assertEqual(result['flagged'], expected)
+
+    def test_timed_stages_restores_originals(self):
+        """Test that stage wrappers are removed after the pass"""
+        detector = FakeDetector()
+        totals = {}
+        with timed_stages([(detector, 'score', 'scoring', None)], totals):
+            detector.score('idiot')
+        self.assertNotIn('score', detector.__dict__)
+        self.assertGreaterEqual(totals['scoring'], 0.0)
+
+    def test_compare_detects_verdict_diffs(self):
+        """Test that changed verdicts are reported as a regression"""
+        corpus = generate_corpus(50)
+        baseline = self.run_fake(corpus)
+
+        same = compare(self.run_fake(corpus), baseline)
+        self.assertFalse(same['regression'])
+        self.assertEqual(same['detectors']['respect']['verdict_diffs'], 0)
+
+        changed = compare(self.run_fake(corpus, strict=True), baseline)
+        self.assertTrue(changed['regression'])
+        diff = changed['detectors']['respect']
+        self.assertEqual(diff['verdict_diffs'], 50 - baseline['detectors']['respect']['flagged'])
+        self.assertEqual(diff['examples'][0]['current'], [True, 'high'])
+
+    def test_compare_slowdown(self):
+        """Test the throughput tolerance"""
+        report = {'corpus': {}, 'detectors': {'respect': {'verdicts': {}, 'msgs_per_sec': 50.0}}}
+        baseline = {'corpus': {}, 'detectors': {'respect': {'verdicts': {}, 'msgs_per_sec': 100.0}}}
+        self.assertTrue(compare(report, baseline, max_slowdown=0.2)['regression'])
+        self.assertFalse(compare(report, baseline, max_slowdown=0.6)['regression'])
+        self.assertFalse(compare(report, baseline)['regression'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+"""
+Unit tests for the evidence case index and /api/cases
+"""
+
+import unittest
+import importlib
+import json
+import os
+import random
+import sys
+import tempfile
+import shutil
+from case_index import CaseIndex, CursorError, MAX_LIMIT, parse_time
+
+
+def make_cases(count, seed=3, start=0):
+    rng = random.Random(seed)
+    cases = []
+    for i in range(start, start + count):
+        cases.append({
+            "message_id": str(i),
+            "author_id": str(rng.randint(1, 30)),
+            "guild_id": rng.choice(["100", "200", "300", None]),
+            "content": rng.choice(["you idiot", "I will find you", "spam spam", "Stupid bot"]) + f" #{i}",
+            "logged_at": f"2026-10-{10 + i // 100:02d}T12:{i % 60:02d}:00",
+            "analysis": {"severity": rng.choice(["LOW", "MEDIUM", "HIGH", "CRITICAL", "high"]),
+                         "category": rng.choice(["profanity", "threat_violence", "hate_speech"])}
+        })
+    return cases
+
+
+def brute_force(cases, guild_id=None, user_id=None, severity=None, category=None,
+                since=None, until=None, keyword=None):
+    """Message ids matching the filters by checking every case, newest first"""
+    matches = []
+    for case in reversed(cases):
+        if guild_id and case['guild_id'] != guild_id:
+            continue
+        if user_id and case['author_id'] != user_id:
+            continue
+        if severity and case['analysis']['severity'].lower() != severity.lower():
+            continue
+        if category and case['analysis']['category'] != category:
+            continue
+        if since and parse_time(case['logged_at']) < parse_time(since):
+            continue
+        if until and parse_time(case['logged_at']) > parse_time(until):
+            continue
+        if keyword and keyword.lower() not in case['content'].lower():
+            continue
+        matches.append(case['message_id'])
+    return matches
+
+
+class TestCaseIndex(unittest.TestCase):
+    """Test cases for CaseIndex"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "abuse_evidence.jsonl")
+        self.cases = make_cases(600)
+        self.write(self.cases)
+        self.index = CaseIndex(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write(self, cases, mode='a'):
+        with open(self.path, mode, encoding='utf-8') as f:
+            for case in cases:
+                f.write(json.dumps(case) + "\n")
+
+    def all_pages(self, limit=37, **filters):
+        ids, cursor = [], None
+        while True:
+            page = self.index.query(cursor=cursor, limit=limit, **filters)
+            self.assertLessEqual(len(page['cases']), limit)
+            ids.extend(case['message_id'] for case in page['cases'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                return ids
+
+    def test_filters_match_brute_force(self):
+        """Test every filter (and combinations) against a full scan"""
+        queries = [
+            {},
+            {"guild_id": "100"},
+            {"user_id": "7"},
+            {"guild_id": "200", "user_id": "7"},
+            {"severity": "high"},
+            {"severity": "Critical", "guild_id": "300"},
+            {"category": "hate_speech"},
+            {"since": "2026-10-12T00:00:00", "until": "2026-10-14T12:30:00"},
+            {"keyword": "IDIOT", "guild_id": "100"},
+            {"guild_id": "999"},
+            {"category": "unknown"},
+        ]
+        for filters in queries:
+            with self.subTest(filters=filters):
+                self.assertEqual(self.all_pages(**filters), brute_force(self.cases, **filters))
+
+    def test_page_size_is_capped(self):
+        """Test that the limit can't exceed MAX_LIMIT"""
+        page = self.index.query(limit=10000)
+        self.assertEqual(len(page['cases']), MAX_LIMIT)
+        self.assertEqual(page['cases'][0]['message_id'], "599")
+
+    def test_scan_budget(self):
+        """Test that a sparse filter stops at the scan budget and continues from the cursor"""
+        page = self.index.query(category="threat_violence", keyword="#1", max_scan=50)
+        self.assertEqual(page['scanned'], 50)
+        self.assertIsNotNone(page['next_cursor'])
+        rest = self.index.query(category="threat_violence", keyword="#1", cursor=page['next_cursor'], limit=100)
+        ids = [case['message_id'] for case in page['cases'] + rest['cases']]
+        self.assertEqual(ids, brute_force(self.cases, category="threat_violence", keyword="#1")[:len(ids)])
+
+    def test_appends_are_indexed(self):
+        """Test that new lines are indexed incrementally and cursors stay valid"""
+        first = self.index.query(guild_id="100", limit=5)
+        more = make_cases(50, seed=9, start=600)
+        self.write(more)
+        with open(self.path, 'a') as f:
+            f.write('{"partial": ')
+
+        self.index.refresh()
+        self.assertEqual(len(self.index), 650)
+        self.assertEqual(self.index.query(limit=1)['cases'][0]['message_id'], "649")
+        second = self.index.query(guild_id="100", limit=5, cursor=first['next_cursor'])
+        ids = [case['message_id'] for case in first['cases'] + second['cases']]
+        self.assertEqual(ids, brute_force(self.cases, guild_id="100")[:10])
+
+    def test_replaced_log(self):
+        """Test that a rotated log is re-indexed and old cursors are rejected"""
+        page = self.index.query(limit=5)
+        os.remove(self.path)
+        self.write(make_cases(3, seed=1), mode='w')
+
+        self.assertEqual(len(self.index.query()['cases']), 3)
+        with self.assertRaises(CursorError):
+            self.index.query(cursor=page['next_cursor'])
+        with self.assertRaises(CursorError):
+            self.index.query(cursor="garbage")
+
+    def test_cursor_from_another_process(self):
+        """Test that a cursor works on a separately built index of the same log (another dashboard worker)"""
+        first = self.index.query(guild_id="100", limit=5)
+        self.write(make_cases(20, seed=9, start=600))
+        other = CaseIndex(self.path)
+        second = other.query(guild_id="100", limit=5, cursor=first['next_cursor'])
+        ids = [case['message_id'] for case in first['cases'] + second['cases']]
+        self.assertEqual(ids, brute_force(self.cases, guild_id="100")[:10])
+        with self.assertRaises(CursorError):
+            other.query(cursor=first['next_cursor'].split('.')[0] + ".3")  # not a line start
+
+    def test_missing_log(self):
+        """Test an empty page before anything has been logged"""
+        index = CaseIndex(os.path.join(self.test_dir, "missing.jsonl"))
+        self.assertEqual(index.query(), {"cases": [], "next_cursor": None, "scanned": 0})
+
+    def test_compact_columns(self):
+        """Test that the index holds columns, not records"""
+        self.index.refresh()
+        stats = self.index.stats()
+        self.assertEqual(stats['cases'], 600)
+        self.assertLess(stats['bytes'], 600 * 64)
+
+
+class TestCasesEndpoint(unittest.TestCase):
+    """Test cases for /api/cases"""
+
+    def setUp(self):
+        self.original_dir = os.getcwd()
+        self.test_dir = tempfile.mkdtemp()
+        os.chdir(self.test_dir)
+        with open('config.json', 'w') as f:
+            json.dump({}, f)
+        os.makedirs('forensics_logs')
+        self.cases = make_cases(120)
+        with open(os.path.join('forensics_logs', 'abuse_evidence.jsonl'), 'w') as f:
+            for case in self.cases:
+                f.write(json.dumps(case) + "\n")
+        sys.modules.pop('web_dashboard', None)
+        self.web_dashboard = importlib.import_module('web_dashboard')
+        self.client = self.web_dashboard.app.test_client()
+        self.web_dashboard.get_user_guilds = lambda: [{"id": "100", "name": "Test"}]
+
+    def login(self):
+        with self.client.session_transaction() as session:
+            session['user'] = {"id": "1"}
+            session['access_token'] = "token"
+
+    def tearDown(self):
+        sys.modules.pop('web_dashboard', None)
+        os.chdir(self.original_dir)
+        shutil.rmtree(self.test_dir)
+
+    def test_pagination(self):
+        """Test following next_cursor through a filtered result"""
+        self.login()
+        ids, cursor = [], ''
+        while cursor is not None:
+            data = self.client.get(f'/api/cases?guild=100&severity=high&limit=4&cursor={cursor}').get_json()
+            ids.extend(case['message_id'] for case in data['cases'])
+            cursor = data['next_cursor']
+        self.assertEqual(ids, brute_force(self.cases, guild_id="100", severity="high"))
+
+    def test_bad_cursor(self):
+        """Test a 400 for an invalid cursor"""
+        self.login()
+        self.assertEqual(self.client.get('/api/cases?guild=100&cursor=x').status_code, 400)
+
+    def test_access(self):
+        """Test that cases need a login and a guild the user is in"""
+        self.assertEqual(self.client.get('/api/cases?guild=100').status_code, 401)
+        self.login()
+        self.assertEqual(self.client.get('/api/cases').status_code, 400)
+        self.assertEqual(self.client.get('/api/cases?guild=200').status_code, 403)
+        self.assertEqual(self.client.get('/api/cases?guild=100').status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Unit tests for the ChannelLogger digest mode
+"""
+
+import unittest
+import tempfile
+import shutil
+from datetime import datetime
+from channel_logger import ChannelLogger, MAX_EMBED_FIELDS
+from guild_cache import get_guild_cache
+
+
+class MockChannel:
+    """Log channel that records sent embeds."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, embed=None):
+        self.sent.append(embed)
+
+
+class MockGuild:
+    """Guild with a single log channel."""
+
+    def __init__(self, guild_id, channel_id, channel):
+        self.id = guild_id
+        self.name = "Test Server"
+        self._channels = {channel_id: channel}
+
+    def get_channel(self, channel_id):
+        return self._channels.get(channel_id)
+
+
+class MockMember:
+    """Minimal member used by the log_* helpers."""
+
+    def __init__(self, member_id, name):
+        self.id = member_id
+        self.mention = f"<@{member_id}>"
+        self._name = name
+
+    def __str__(self):
+        return self._name
+
+
+class TestDigestMode(unittest.IsolatedAsyncioTestCase):
+    """Test cases for digest buffering and flushing."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.logger = ChannelLogger(log_dir=self.temp_dir)
+        self.channel = MockChannel()
+        self.guild = MockGuild(444555666, 111222333, self.channel)
+        self.member = MockMember(987654321, "TestUser#1234")
+        self.logger.set_log_channel("444555666", "111222333")
+        get_guild_cache().invalidate_guild(self.guild.id)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    async def test_events_sent_immediately_without_digest(self):
+        """Test that every event is sent when digest mode is off."""
+        await self.logger.log_warning(self.guild, self.member, 1, "spam", "low")
+        await self.logger.log_warning(self.guild, self.member, 2, "spam", "low")
+        self.assertEqual(len(self.channel.sent), 2)
+
+    async def test_events_grouped_into_digest(self):
+        """Test that non-critical events are coalesced into one embed."""
+        self.logger.set_digest("444555666", True, 60)
+        for count in range(1, 4):
+            await self.logger.log_warning(self.guild, self.member, count, "spam", "low")
+        await self.logger.log_detection(self.guild, self.member, "text", "profanity", "low", ["x"])
+
+        self.assertEqual(len(self.channel.sent), 0)
+        self.assertEqual(len(self.logger.digest_buffers["444555666"]), 4)
+
+        await self.logger.flush_all_digests([self.guild])
+        self.assertEqual(len(self.channel.sent), 1)
+        self.assertIn("4 events", self.channel.sent[0].title)
+        self.assertNotIn("444555666", self.logger.digest_tasks)
+
+    async def test_critical_events_bypass_digest(self):
+        """Test that mutes and 5th warnings are sent immediately."""
+        self.logger.set_digest("444555666", True, 60)
+        await self.logger.log_warning(self.guild, self.member, 5, "spam", "medium")
+        await self.logger.log_mute(self.guild, self.member, 10, "spam")
+        self.assertEqual(len(self.channel.sent), 2)
+        await self.logger.flush_all_digests([self.guild])
+
+    def test_digest_embed_respects_limits(self):
+        """Test that large digests stay within Discord's embed limits."""
+        self.logger.set_digest("444555666", True, 60)
+        events = [{
+            "title": "⚠️ Warning Issued " + "x" * 80,
+            "category": f"cat{i % 7}",
+            "user": f"user{i}",
+            "time": datetime.utcnow()
+        } for i in range(2000)]
+        embed = self.logger.build_digest_embed(events)
+        self.assertLessEqual(len(embed.fields), MAX_EMBED_FIELDS)
+        self.assertLessEqual(len(embed), 6000)
+        for field in embed.fields:
+            self.assertLessEqual(len(field.value), 1024)
+
+    def test_digest_requires_log_channel(self):
+        """Test that digest settings need a configured log channel."""
+        self.assertFalse(self.logger.set_digest("999", True))
+        self.assertTrue(self.logger.set_digest("444555666", True, 1))
+        self.assertEqual(self.logger.get_digest_window("444555666"), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
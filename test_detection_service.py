@@ -0,0 +1,96 @@
+"""
+Unit tests for the shared detection service and its client
+"""
+
+import unittest
+import asyncio
+import os
+import tempfile
+import shutil
+from detection_service import DetectionServer, DetectionClient, DetectorRegistry, parse_address
+
+
+class FakeRegistry(DetectorRegistry):
+    """Registry with a cheap detector instead of the real word lists"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+        self.detectors["content"] = lambda text: {"is_offensive": "bad" in text, "text": text}
+
+    def analyze_batch(self, items):
+        self.batches.append(len(items))
+        return super().analyze_batch(items)
+
+
+class TestDetectionService(unittest.IsolatedAsyncioTestCase):
+    """Test cases for DetectionServer and DetectionClient"""
+
+    async def asyncSetUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.address = f"unix://{os.path.join(self.test_dir, 'detect.sock')}"
+        self.registry = FakeRegistry()
+        self.server_task = asyncio.create_task(DetectionServer(self.registry).serve(self.address))
+        for _ in range(50):
+            if os.path.exists(os.path.join(self.test_dir, 'detect.sock')):
+                break
+            await asyncio.sleep(0.01)
+
+    async def asyncTearDown(self):
+        self.server_task.cancel()
+        try:
+            await self.server_task
+        except asyncio.CancelledError:
+            pass
+        shutil.rmtree(self.test_dir)
+
+    def test_parse_address(self):
+        """Test Unix and TCP addresses"""
+        self.assertEqual(parse_address("unix:///tmp/x.sock"), ("unix", "/tmp/x.sock"))
+        self.assertEqual(parse_address("/tmp/x.sock"), ("unix", "/tmp/x.sock"))
+        self.assertEqual(parse_address("tcp://127.0.0.1:8765"), ("tcp", ("127.0.0.1", 8765)))
+
+    async def test_concurrent_calls_are_batched(self):
+        """Test that concurrent analyze calls share one round trip"""
+        client = DetectionClient(self.address)
+        results = await asyncio.gather(*(client.analyze("content", f"msg {i} bad") for i in range(10)))
+
+        self.assertEqual([r["text"] for r in results], [f"msg {i} bad" for i in range(10)])
+        self.assertTrue(all(r["is_offensive"] for r in results))
+        self.assertEqual(self.registry.batches, [10])
+        self.assertEqual(client.stats["remote"], 10)
+        await client.close()
+
+    async def test_connections_are_reused(self):
+        """Test that sequential calls reuse a pooled connection"""
+        client = DetectionClient(self.address)
+        for text in ["one", "two", "three"]:
+            await client.analyze("content", text)
+
+        self.assertEqual(client.open_connections, 1)
+        self.assertEqual(len(client.idle), 1)
+        await client.close()
+
+    async def test_fallback_when_service_unreachable(self):
+        """Test that analysis runs in-process when the service is down"""
+        client = DetectionClient(
+            f"unix://{os.path.join(self.test_dir, 'missing.sock')}",
+            fallbacks={"content": lambda text: {"local": True}}
+        )
+        result = await client.analyze("content", "hello")
+
+        self.assertEqual(result, {"local": True})
+        self.assertEqual(client.stats["fallback"], 1)
+        self.assertEqual(client.open_connections, 0)
+
+    async def test_unknown_detector_falls_back_per_item(self):
+        """Test that per-item service errors use the local detector"""
+        client = DetectionClient(self.address, fallbacks={"other": lambda text: {"local": text}})
+        result = await client.analyze("other", "hi")
+
+        self.assertEqual(result, {"local": "hi"})
+        await client.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
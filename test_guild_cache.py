@@ -0,0 +1,84 @@
+"""
+Unit tests for the guild resolve cache
+"""
+
+import unittest
+from guild_cache import GuildCache
+
+
+class MockRole:
+    def __init__(self, role_id, name):
+        self.id = role_id
+        self.name = name
+
+
+class MockGuild:
+    """Guild that counts how often it is asked to resolve objects."""
+
+    def __init__(self):
+        self.id = 444555666
+        self.channels = {111: object()}
+        self.roles = [MockRole(222, "Muted")]
+        self.lookups = 0
+
+    def get_channel(self, channel_id):
+        self.lookups += 1
+        return self.channels.get(channel_id)
+
+    def get_role(self, role_id):
+        self.lookups += 1
+        return next((r for r in self.roles if r.id == role_id), None)
+
+
+class TestGuildCache(unittest.TestCase):
+    """Test cases for GuildCache."""
+
+    def setUp(self):
+        self.cache = GuildCache()
+        self.guild = MockGuild()
+
+    def test_channel_resolved_once(self):
+        """Test that repeated lookups hit the cache."""
+        for _ in range(5):
+            self.assertIs(self.cache.get_channel(self.guild, "111"), self.guild.channels[111])
+        self.assertEqual(self.guild.lookups, 1)
+        stats = self.cache.get_stats()
+        self.assertEqual(stats["channel"]["hits"], 4)
+        self.assertEqual(stats["channel"]["misses"], 1)
+        self.assertAlmostEqual(stats["overall"]["hit_rate"], 0.8)
+
+    def test_missing_objects_not_cached(self):
+        """Test that failed lookups are retried."""
+        self.assertIsNone(self.cache.get_channel(self.guild, 999))
+        self.assertIsNone(self.cache.get_channel(self.guild, 999))
+        self.assertEqual(self.guild.lookups, 2)
+
+    def test_invalidation(self):
+        """Test that channel and role invalidation forces a re-resolve."""
+        self.cache.get_channel(self.guild, 111)
+        self.cache.invalidate_channel(self.guild.id, 111)
+        self.cache.get_channel(self.guild, 111)
+        self.assertEqual(self.guild.lookups, 2)
+
+        role = self.cache.find_role(self.guild, "muted")
+        self.assertEqual(role.id, 222)
+        self.cache.invalidate_roles(self.guild.id)
+        self.guild.roles = []
+        self.assertIsNone(self.cache.find_role(self.guild, "muted"))
+
+    def test_config_ids_parsed_once(self):
+        """Test that config IDs are parsed to ints and cached."""
+        config = {"log_channel": "111", "autorole": None, "mute_role": "bad"}
+        ids = self.cache.get_config_ids("444555666", config)
+        self.assertEqual(ids["log_channel"], 111)
+        self.assertIsNone(ids["autorole"])
+        self.assertIsNone(ids["mute_role"])
+
+        config["log_channel"] = "333"
+        self.assertEqual(self.cache.get_config_ids("444555666", config)["log_channel"], 111)
+        self.cache.invalidate_config()
+        self.assertEqual(self.cache.get_config_ids("444555666", config)["log_channel"], 333)
+
+
+if __name__ == '__main__':
+    unittest.main()
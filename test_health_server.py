@@ -0,0 +1,99 @@
+"""
+Unit tests for the out-of-process health server
+"""
+
+import unittest
+import asyncio
+import os
+import tempfile
+import shutil
+import threading
+import time
+import requests
+from health_server import create_server, publish_periodically, read_snapshot, write_snapshot
+
+
+class TestHealthServer(unittest.TestCase):
+    """Test cases for /health and /metrics served from a snapshot file"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "health_snapshot.json")
+        self.server = create_server(0, self.path, host='127.0.0.1', stale_after=30)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.test_dir)
+
+    def publish(self, age=0.0):
+        write_snapshot(self.path, {"timestamp": time.time() - age,
+                                   "health": {"status": "healthy", "guilds": 3},
+                                   "metrics": {"messages_total": 7},
+                                   "metrics_text": "messages_total 7\n"})
+
+    def test_starting(self):
+        """Test that no snapshot yet is reported as starting, not as a failure"""
+        response = requests.get(f"{self.url}/health")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "starting")
+
+    def test_healthy(self):
+        """Test a fresh snapshot"""
+        self.publish()
+        data = requests.get(f"{self.url}/health").json()
+        self.assertEqual(data["status"], "healthy")
+        self.assertEqual(data["guilds"], 3)
+
+    def test_stale(self):
+        """Test that a bot that stopped publishing fails the health check"""
+        self.publish(age=60)
+        response = requests.get(f"{self.url}/health")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "stale")
+
+    def test_metrics(self):
+        """Test the text and JSON metrics"""
+        self.publish()
+        self.assertEqual(requests.get(f"{self.url}/metrics").text, "messages_total 7\n")
+        self.assertEqual(requests.get(f"{self.url}/metrics?format=json").json(), {"messages_total": 7})
+        self.assertEqual(requests.get(f"{self.url}/missing").status_code, 404)
+
+
+class TestPublisher(unittest.TestCase):
+    """Test cases for the bot-side publisher"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "health_snapshot.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_publish_periodically(self):
+        """Test that snapshots are written with a timestamp and a bad collect() doesn't stop the task"""
+        calls = []
+
+        def collect():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("not ready")
+            return {"health": {"status": "healthy"}}
+
+        async def run():
+            task = asyncio.create_task(publish_periodically(collect, self.path, interval=0.01))
+            await asyncio.sleep(0.1)
+            task.cancel()
+
+        asyncio.run(run())
+        snapshot = read_snapshot(self.path)
+        self.assertEqual(snapshot["health"], {"status": "healthy"})
+        self.assertIn("timestamp", snapshot)
+        self.assertIsNone(read_snapshot(os.path.join(self.test_dir, "missing.json")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Unit tests for lazy backend imports
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import lazy_imports
+from lazy_imports import lazy_import, module_available, warm_up, import_report
+
+
+class TestLazyImports(unittest.TestCase):
+    """Test cases for LazyModule and the import report"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.test_dir, 'fake_backend.py'), 'w') as f:
+            f.write("LOADS = 1\n\ndef analyze(text):\n    return text.upper()\n")
+        sys.path.insert(0, self.test_dir)
+        sys.modules.pop('fake_backend', None)
+        lazy_imports._backends.clear()
+
+    def tearDown(self):
+        sys.path.remove(self.test_dir)
+        sys.modules.pop('fake_backend', None)
+        lazy_imports._backends.clear()
+        shutil.rmtree(self.test_dir)
+
+    def test_import_deferred_until_first_use(self):
+        """Test that the module is only imported when used"""
+        analyze = lazy_import('fake_backend', 'analyze')
+        self.assertNotIn('fake_backend', sys.modules)
+
+        self.assertEqual(analyze('hi'), 'HI')
+        self.assertIn('fake_backend', sys.modules)
+
+    def test_module_attribute_access(self):
+        """Test attribute access through a module proxy"""
+        module = lazy_import('fake_backend')
+        self.assertEqual(module.LOADS, 1)
+        self.assertIs(lazy_import('fake_backend'), module)
+
+    def test_module_available_does_not_import(self):
+        """Test availability checks without importing"""
+        self.assertTrue(module_available('fake_backend'))
+        self.assertNotIn('fake_backend', sys.modules)
+        self.assertFalse(module_available('definitely_not_installed_backend'))
+
+    def test_report_and_warm_up(self):
+        """Test import report entries for loaded, pending and missing backends"""
+        lazy_import('fake_backend')
+        lazy_import('definitely_not_installed_backend')
+
+        pending = {r['backend']: r for r in import_report()}
+        self.assertFalse(pending['fake_backend']['loaded'])
+
+        timings = warm_up()
+        self.assertIn('fake_backend', timings)
+
+        report = {r['backend']: r for r in import_report()}
+        self.assertTrue(report['fake_backend']['loaded'])
+        self.assertIsNotNone(report['fake_backend']['seconds'])
+        self.assertFalse(report['definitely_not_installed_backend']['loaded'])
+        self.assertIn('ModuleNotFoundError', report['definitely_not_installed_backend']['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
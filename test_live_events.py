@@ -0,0 +1,252 @@
+"""
+Unit tests for the live dashboard event stream
+"""
+
+import unittest
+import importlib
+import json
+import os
+import sys
+import tempfile
+import shutil
+from stats_cache import StatsCache
+from live_events import EventHub
+
+
+def parse_stream(chunks):
+    """(event, data) pairs from text/event-stream chunks"""
+    events = []
+    for message in "".join(chunks).split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.splitlines() if ": " in line and line[0] != ":")
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestEventHub(unittest.TestCase):
+    """Test cases for EventHub"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache = StatsCache(self.test_dir)
+        self.hub = EventHub(self.cache, backlog=5)
+        self.cache.refresh()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def path(self, name):
+        return os.path.join(self.test_dir, name)
+
+    def append_case(self, guild_id, severity="high", author_id="1"):
+        with open(self.path("abuse_evidence.jsonl"), 'a') as f:
+            f.write(json.dumps({"author_id": author_id, "guild_id": guild_id, "logged_at": "2026-10-19",
+                                "analysis": {"severity": severity}}) + "\n")
+
+    def write_json(self, name, data):
+        with open(self.path(name), 'w') as f:
+            json.dump(data, f)
+        self.cache.invalidate()
+
+    def test_new_cases_are_published(self):
+        """Test one event per appended case with the guild's totals"""
+        self.append_case("100")
+        self.append_case("200", author_id="2")
+        self.cache.refresh()
+
+        newest, events = self.hub.wait(0, timeout=0)
+        self.assertEqual(newest, 2)
+        self.assertEqual([event for _, event, _ in events], ["case", "case"])
+        data = json.loads(events[1][2])
+        self.assertEqual(data["case"]["guild_id"], "200")
+        self.assertEqual(data["totals"]["total_cases"], 1)
+        self.assertEqual(data["all_totals"]["total_cases"], 2)
+        self.assertEqual(data["all_totals"]["unique_users"], 2)
+
+    def test_initial_contents_are_not_replayed(self):
+        """Test that cases already in the log when the hub starts are not events"""
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        with open(os.path.join(test_dir, "abuse_evidence.jsonl"), 'w') as f:
+            f.write(json.dumps({"author_id": "1", "guild_id": "100"}) + "\n")
+        cache = StatsCache(test_dir)
+        hub = EventHub(cache)
+        cache.refresh()
+        self.assertEqual(hub.last_id, 0)
+
+    def test_guild_filter(self):
+        """Test that a guild stream only gets that guild's events"""
+        for guild_id in ["100", "200", "100"]:
+            self.append_case(guild_id)
+        self.cache.refresh()
+
+        _, events = self.hub.wait(0, "100", timeout=0)
+        self.assertEqual([event_id for event_id, _, _ in events], [1, 3])
+        self.assertEqual(len(self.hub.wait(0, None, timeout=0)[1]), 3)
+
+    def test_warning_count_changes(self):
+        """Test events for changed, new and cleared warning counts"""
+        self.write_json("warnings.json", {"100:1": [{"timestamp": "a"}], "100:2": [{"timestamp": "b"}]})
+        self.cache.refresh()
+        self.write_json("warnings.json", {"100:1": [{"timestamp": "a"}, {"timestamp": "c"}],
+                                          "100:2": [{"timestamp": "b"}]})
+        self.cache.refresh()
+        self.write_json("warnings.json", {"100:2": [{"timestamp": "b"}]})
+        self.cache.refresh()
+
+        _, events = self.hub.wait(0, "100", timeout=0)
+        data = [json.loads(payload) for _, _, payload in events]
+        self.assertEqual([(d["user_id"], d["previous"], d["count"]) for d in data],
+                         [("1", 0, 1), ("2", 0, 1), ("1", 1, 2), ("1", 2, 0)])
+
+    def test_mute_events(self):
+        """Test mute and unmute events from the mute file"""
+        mute = {"user_id": "1", "guild_id": "100", "start_time": "2026-10-19T10:00:00",
+                "end_time": "2026-10-19T10:10:00", "reason": "5 warnings", "is_active": True}
+        self.write_json("user_mutes.json", {"100:1": mute})
+        self.cache.refresh()
+        self.write_json("user_mutes.json", {"100:1": dict(mute, is_active=False)})
+        self.cache.refresh()
+
+        _, events = self.hub.wait(0, "100", timeout=0)
+        self.assertEqual([(event, json.loads(data)["active"]) for _, event, data in events],
+                         [("mute", True), ("mute", False)])
+
+    def test_half_written_warnings_file(self):
+        """Test that a warnings file caught mid-write is read on the next refresh"""
+        with open(self.path("warnings.json"), 'w') as f:
+            f.write('{"100:1": [')
+        self.cache.refresh()
+        self.write_json("warnings.json", {"100:1": [{"timestamp": "a"}]})
+        self.cache.refresh()
+        self.assertEqual(self.cache.get_warnings("100")[0]["count"], 1)
+
+    def test_resume_beyond_backlog(self):
+        """Test that a client too far behind is told to resync"""
+        for _ in range(8):
+            self.append_case("100")
+        self.cache.refresh()
+
+        self.assertIsNone(self.hub.wait(1, timeout=0)[1])
+        self.assertEqual(len(self.hub.wait(3, timeout=0)[1]), 5)
+        self.assertIsNone(self.hub.wait(99, timeout=0)[1])
+
+    def test_replaced_log_resets_clients(self):
+        """Test a reset event when the evidence log is rotated"""
+        self.append_case("100")
+        self.cache.refresh()
+        os.remove(self.path("abuse_evidence.jsonl"))
+        self.cache.refresh()
+
+        _, events = self.hub.wait(1, "100", timeout=0)
+        self.assertEqual([event for _, event, _ in events], ["reset"])
+
+    def test_stream(self):
+        """Test the event-stream output, resuming after a Last-Event-ID"""
+        self.append_case("100")
+        self.append_case("100", severity="low")
+        self.cache.refresh()
+
+        chunks = list(self.hub.stream("100", last_id=1, heartbeat=0.01, max_duration=0.05))
+        self.assertTrue(chunks[0].startswith("retry: "))
+        events = parse_stream(chunks)
+        self.assertEqual([event for event, _ in events], ["ready", "case"])
+        self.assertEqual(events[1][1]["case"]["analysis"]["severity"], "low")
+        self.assertIn(": keep-alive\n\n", chunks)
+        self.assertEqual(self.hub.subscribers, 0)
+
+    def test_close_ends_streams(self):
+        """Test that close() ends an open stream without waiting for max_duration"""
+        stream = self.hub.stream("100", heartbeat=10, max_duration=None)
+        self.assertTrue(next(stream).startswith("retry: "))
+        next(stream)
+        self.hub.close()
+        self.assertEqual(list(stream), [])
+        self.assertEqual(self.hub.subscribers, 0)
+
+    def test_tailer_publishes_appends(self):
+        """Test that an open stream picks up new lines through the tailer thread"""
+        self.hub.poll_interval = 0.01
+        stream = self.hub.stream("100", heartbeat=5)
+        self.assertEqual(next(stream)[:6], "retry:")
+        self.assertEqual(parse_stream([next(stream)])[0][0], "ready")
+        self.append_case("100")
+        self.assertEqual(parse_stream([next(stream)])[0][0], "case")
+        stream.close()
+        self.assertEqual(self.hub.subscribers, 0)
+
+
+class TestStreamEndpoint(unittest.TestCase):
+    """Test cases for /api/stream"""
+
+    def setUp(self):
+        self.original_dir = os.getcwd()
+        self.test_dir = tempfile.mkdtemp()
+        os.chdir(self.test_dir)
+        with open('config.json', 'w') as f:
+            json.dump({}, f)
+        os.makedirs('forensics_logs')
+        sys.modules.pop('web_dashboard', None)
+        self.web_dashboard = importlib.import_module('web_dashboard')
+        self.client = self.web_dashboard.app.test_client()
+        self.web_dashboard.get_user_guilds = lambda: [{"id": "100", "name": "Test"}]
+
+    def login(self):
+        with self.client.session_transaction() as session:
+            session['user'] = {"id": "1"}
+            session['access_token'] = "token"
+
+    def tearDown(self):
+        sys.modules.pop('web_dashboard', None)
+        os.chdir(self.original_dir)
+        shutil.rmtree(self.test_dir)
+
+    def test_event_stream(self):
+        """Test the stream headers and the first messages"""
+        self.web_dashboard.stats_cache.refresh()
+        with open(os.path.join('forensics_logs', 'abuse_evidence.jsonl'), 'a') as f:
+            f.write(json.dumps({"author_id": "1", "guild_id": "100"}) + "\n")
+        self.web_dashboard.stats_cache.refresh()
+
+        self.login()
+        response = self.client.get('/api/stream/100', headers={'Last-Event-ID': '0'}, buffered=False)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        chunks = response.response
+        events = parse_stream([next(chunks).decode() for _ in range(3)])
+        response.close()
+        self.assertEqual([event for event, _ in events], ["ready", "case"])
+
+    def test_access(self):
+        """Test that streams need a login and a guild the user is in"""
+        self.assertEqual(self.client.get('/api/stream/100').status_code, 401)
+        self.assertEqual(self.client.get('/api/stream').status_code, 401)
+        self.login()
+        self.assertEqual(self.client.get('/api/stream').status_code, 400)
+        self.assertEqual(self.client.get('/api/stream/200').status_code, 403)
+        self.assertEqual(self.web_dashboard.event_hub.subscribers, 0)
+
+    def test_stream_cap(self):
+        """Test that streams past the per-worker cap get a 503 and closed streams free their slot"""
+        hub = self.web_dashboard.event_hub
+        hub.max_streams = 2
+        self.login()
+        first = self.client.get('/api/stream/100', buffered=False)
+        second = self.client.get('/api/stream/100', buffered=False)
+        refused = self.client.get('/api/stream/100', buffered=False)
+        self.assertEqual(refused.status_code, 503)
+        self.assertIn('Retry-After', refused.headers)
+        self.assertIn('retry', refused.get_json())
+        self.assertEqual(self.client.get('/api/stats').status_code, 200)
+
+        first.close()
+        self.assertEqual(hub.subscribers, 1)
+        third = self.client.get('/api/stream/100', buffered=False)
+        self.assertEqual(third.status_code, 200)
+        second.close()
+        third.close()
+        self.assertEqual(hub.subscribers, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Unit tests for the offline load simulator
+"""
+
+import unittest
+import asyncio
+import os
+import tempfile
+import shutil
+import time
+from load_simulator import RateLimitBucket, FakeRest, FakeMessage, LoadSimulator
+
+
+class TestFakeRest(unittest.TestCase):
+    """Test cases for the REST stub"""
+
+    def test_rate_limit_bucket(self):
+        """Test fixed-window rate limiting"""
+        bucket = RateLimitBucket(2, 1.0)
+        self.assertEqual(bucket.acquire(100.0), 0.0)
+        self.assertEqual(bucket.acquire(100.1), 0.0)
+        self.assertAlmostEqual(bucket.acquire(100.5), 0.5)
+        self.assertEqual(bucket.acquire(101.0), 0.0)
+
+    def test_rate_limited_calls_wait(self):
+        """Test that calls over the limit wait for the bucket to reset"""
+        rest = FakeRest(latency=0.0, jitter=0.0, route_limits={"send_message": (2, 0.2)}, global_limit=None)
+
+        async def send_three():
+            started = time.monotonic()
+            await asyncio.gather(*(rest.call("send_message", 1) for _ in range(3)))
+            return time.monotonic() - started
+
+        elapsed = asyncio.run(send_three())
+        self.assertGreaterEqual(elapsed, 0.15)
+        self.assertEqual(rest.calls["send_message"], 3)
+        self.assertEqual(rest.rate_limited["send_message"], 1)
+
+
+class TestLoadSimulator(unittest.TestCase):
+    """Test cases for driving the bot with fake gateway events"""
+
+    @classmethod
+    def setUpClass(cls):
+        import bot
+        cls.bot = bot.bot
+
+    def setUp(self):
+        # The bot writes its guild config and warnings relative to the working directory
+        self.original_dir = os.getcwd()
+        self.test_dir = tempfile.mkdtemp()
+        os.chdir(self.test_dir)
+        self.rest = FakeRest(latency=0.001, jitter=0.0, route_limits={}, global_limit=None)
+        self.simulator = LoadSimulator(self.bot, self.rest, guilds=1, users=10)
+
+    def tearDown(self):
+        self.bot.loop_watchdog.stop()
+        os.chdir(self.original_dir)
+        shutil.rmtree(self.test_dir)
+
+    def run_attached(self, coro_factory):
+        async def runner():
+            await self.simulator.attach()
+            return await coro_factory()
+        return asyncio.run(runner())
+
+    def test_commands_reply_through_fake_channel(self):
+        """Test that prefix commands run, including member conversion"""
+        guild = self.simulator.guilds[0]
+        moderator = guild.moderators[0]
+        target = next(m for m in guild.members.values() if not m.moderator)
+
+        async def commands():
+            for content in ["!stats", "!warningstats", f"!warnings {target.mention}"]:
+                await self.simulator.handle("command", FakeMessage(guild.channels[0], moderator, content))
+            await asyncio.sleep(0.05)  # let command_error listeners run
+
+        self.run_attached(commands)
+        self.assertEqual(self.simulator.error_examples, [])
+        self.assertEqual(self.rest.calls["send_message"], 3)
+
+    def test_member_join(self):
+        """Test the join path (welcome message and auto-role) with aware account timestamps"""
+        guild = self.simulator.guilds[0]
+        self.run_attached(lambda: self.simulator.handle("join", guild))
+
+        self.assertEqual(self.simulator.errors["join"], 0)
+        self.assertEqual(self.rest.calls["add_role"], 1)
+        self.assertGreaterEqual(self.rest.calls["send_message"], 1)
+
+    def test_short_run_report(self):
+        """Test that every dispatched event completes and is reported"""
+        report = self.run_attached(lambda: self.simulator.run(rate=10, duration=1, drain=30))
+
+        dispatched = sum(e["dispatched"] for e in report["events"].values())
+        completed = sum(e["completed"] for e in report["events"].values())
+        self.assertEqual(dispatched, 10)
+        self.assertEqual(completed, 10)
+        self.assertEqual(report["unfinished"], 0)
+        self.assertIn("message", report["latency"])
+        self.assertIn("max", report["backlog"])
+        self.assertTrue(report["backlog"]["samples"])
+
+
+if __name__ == '__main__':
+    unittest.main()
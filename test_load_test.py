@@ -0,0 +1,33 @@
+"""
+Unit tests for the dashboard load test
+"""
+
+import unittest
+from load_test import LocalDashboard, format_report, percentile, run_load
+
+
+class TestLoadTest(unittest.TestCase):
+    """Test cases for run_load against a local dashboard"""
+
+    def test_percentile(self):
+        """Test percentiles of sorted latencies"""
+        values = [float(i) for i in range(100)]
+        self.assertEqual(percentile(values, 0.5), 50.0)
+        self.assertEqual(percentile(values, 1.0), 99.0)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_run_load(self):
+        """Test a short run against the in-process dashboard"""
+        local = LocalDashboard(cases=200)
+        try:
+            result = run_load(f"{local.base_url}/api/stats", clients=2, duration=0.3)
+        finally:
+            local.close()
+        self.assertGreater(result["requests"], 0)
+        self.assertEqual(set(result["statuses"]) - {"200", "304"}, set())
+        self.assertIn("304", result["statuses"])  # clients revalidate with the ETag
+        self.assertIn("req/s", format_report(result))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Unit tests for the event loop watchdog
+"""
+
+import unittest
+import asyncio
+import time
+from loop_watchdog import LoopWatchdog
+from metrics import MetricsRegistry
+
+
+def blocking_handler():
+    time.sleep(0.3)
+
+
+class TestLoopWatchdog(unittest.IsolatedAsyncioTestCase):
+    """Test cases for LoopWatchdog"""
+
+    async def test_blocking_call_site_is_recorded(self):
+        """Test that a blocking call is attributed to its call site"""
+        metrics = MetricsRegistry()
+        watchdog = LoopWatchdog(threshold=0.1, interval=0.02, metrics=metrics)
+        watchdog.start()
+        await asyncio.sleep(0.05)
+
+        blocking_handler()
+        await asyncio.sleep(0.1)
+        watchdog.stop()
+
+        report = watchdog.report()
+        self.assertEqual(len(report), 1)
+        self.assertIn("blocking_handler", report[0]["site"])
+        self.assertEqual(report[0]["count"], 1)
+        self.assertGreaterEqual(report[0]["max_ms"], 150)
+        self.assertIn("time.sleep(0.3)", report[0]["stack"])
+        self.assertGreaterEqual(metrics.snapshot()["histograms"]["event_loop.lag"]["max_ms"], 150)
+
+    async def test_no_stalls_without_blocking(self):
+        """Test that a responsive loop records nothing"""
+        watchdog = LoopWatchdog(threshold=0.1, interval=0.02)
+        watchdog.start()
+        await asyncio.sleep(0.2)
+        watchdog.stop()
+
+        self.assertEqual(watchdog.report(), [])
+        self.assertEqual(watchdog.stalls, 0)
+
+    async def test_reset(self):
+        """Test clearing the report"""
+        watchdog = LoopWatchdog(threshold=0.05, interval=0.02)
+        watchdog.start()
+        await asyncio.sleep(0.03)
+        time.sleep(0.15)
+        await asyncio.sleep(0.1)
+        watchdog.stop()
+
+        self.assertEqual(watchdog.stalls, 1)
+        watchdog.reset()
+        self.assertEqual(watchdog.report(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Unit tests for hot-path metrics
+"""
+
+import unittest
+from metrics import MetricsRegistry, Histogram, RateMeter, NULL_TIMER
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for MetricsRegistry"""
+
+    def test_histogram_percentiles(self):
+        """Test p50/p95/p99 over recorded samples"""
+        histogram = Histogram(size=1000)
+        for i in range(1, 1001):
+            histogram.observe(i / 1000)  # 1ms .. 1000ms
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 1000)
+        self.assertAlmostEqual(snapshot["p50_ms"], 501, delta=1)
+        self.assertAlmostEqual(snapshot["p95_ms"], 951, delta=1)
+        self.assertAlmostEqual(snapshot["p99_ms"], 991, delta=1)
+        self.assertEqual(snapshot["max_ms"], 1000)
+
+    def test_histogram_ring_buffer(self):
+        """Test that percentiles cover only the most recent samples"""
+        histogram = Histogram(size=10)
+        for _ in range(10):
+            histogram.observe(1.0)
+        for _ in range(10):
+            histogram.observe(0.001)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 20)
+        self.assertEqual(snapshot["p99_ms"], 1.0)
+        self.assertEqual(snapshot["max_ms"], 1000)
+
+    def test_stage_timer(self):
+        """Test that laps and totals land in prefixed histograms"""
+        metrics = MetricsRegistry(sample_rate=1.0)
+        timer = metrics.timer("on_message")
+        timer.lap("detection")
+        timer.skip()
+        timer.lap("commands")
+        timer.finish()
+
+        histograms = metrics.snapshot()["histograms"]
+        self.assertEqual(set(histograms), {"on_message.detection", "on_message.commands", "on_message.total"})
+
+    def test_sampling_keeps_counters_exact(self):
+        """Test that unsampled work is skipped but counters still count"""
+        metrics = MetricsRegistry(sample_rate=0.0)
+        for _ in range(5):
+            timer = metrics.timer("on_message")
+            timer.lap("detection")
+            metrics.inc("detections_total", category="profanity", severity="LOW")
+
+        self.assertIs(metrics.timer("on_message"), NULL_TIMER)
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["histograms"], {})
+        self.assertEqual(snapshot["counters"], {"detections_total{category=profanity,severity=LOW}": 5})
+
+    def test_gauges(self):
+        """Test gauge callbacks and failing gauges"""
+        metrics = MetricsRegistry()
+        queue = [1, 2, 3]
+        metrics.register_gauge("queue_depth", lambda: len(queue))
+        metrics.register_gauge("broken", lambda: 1 / 0)
+
+        gauges = metrics.snapshot()["gauges"]
+        self.assertEqual(gauges["queue_depth"], 3)
+        self.assertIn("error", gauges["broken"])
+
+    def test_rate_meter_window(self):
+        """Test that old buckets fall out of the sliding window"""
+        meter = RateMeter(window=10)
+        meter.mark(5, now=100)
+        meter.mark(5, now=105)
+        self.assertEqual(meter.rate(now=105), 1.0)
+        self.assertEqual(meter.rate(now=112), 0.5)
+        self.assertEqual(meter.rate(now=200), 0.0)
+
+    def test_prometheus_format(self):
+        """Test the text exposition of every metric type"""
+        metrics = MetricsRegistry(sample_rate=1.0)
+        metrics.observe("on_message.detection", 0.002)
+        metrics.inc("detections_total", category="threat_violence", severity="HIGH")
+        metrics.mark("guild_offenses", guild_id="42")
+        metrics.register_gauge("pending_unmutes", lambda: 2)
+        metrics.register_gauge("write_backlog", lambda: {"log_digest": 3}, label="queue")
+
+        text = metrics.render_prometheus(extra_labels={"shard": "0"})
+        self.assertIn("# TYPE guardify_on_message_latency_seconds summary", text)
+        self.assertIn('guardify_on_message_latency_seconds{shard="0",stage="detection",quantile="0.5"} 0.002', text)
+        self.assertIn('guardify_on_message_latency_seconds_count{shard="0",stage="detection"} 1', text)
+        self.assertIn('guardify_detections_total{shard="0",category="threat_violence",severity="HIGH"} 1', text)
+        self.assertIn('guardify_guild_offenses_per_second{shard="0",guild_id="42"}', text)
+        self.assertIn('guardify_pending_unmutes{shard="0"} 2', text)
+        self.assertIn('guardify_write_backlog{shard="0",queue="log_digest"} 3', text)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_bounded_label(self):
+        """Test that evicted label values fold into "other" and totals are kept"""
+        metrics = MetricsRegistry(sample_rate=1.0)
+        metrics.bound_label("guild_offenses_total", "guild_id", 2)
+        metrics.bound_label("guild_offenses", "guild_id", 2)
+        for guild_id in ["1", "2", "1", "3", "1", "4"]:
+            metrics.inc("guild_offenses_total", guild_id=guild_id)
+            metrics.mark("guild_offenses", guild_id=guild_id)
+        counters = metrics.snapshot()["counters"]
+        self.assertEqual(counters, {"guild_offenses_total{guild_id=1}": 3,
+                                    "guild_offenses_total{guild_id=4}": 1,
+                                    "guild_offenses_total{guild_id=other}": 2})
+        self.assertEqual(len(metrics.rates), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
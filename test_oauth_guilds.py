@@ -0,0 +1,191 @@
+"""
+Unit tests for the cached OAuth guild lists (against a local stand-in for the Discord API)
+"""
+
+import unittest
+import importlib
+import json
+import os
+import sys
+import tempfile
+import shutil
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from oauth_guilds import GuildListCache
+
+
+class FakeDiscordAPI:
+    """Serves /users/@me/guilds on localhost and records what it was asked"""
+
+    def __init__(self):
+        self.requests = []  # format: [(path, token)]
+        self.connections = set()
+        self.delay = 0.0
+        self.status = 200
+        self.guilds = {"token-a": [{"id": "100", "name": "Alpha"}], "token-b": [{"id": "200", "name": "Beta"}]}
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_GET(self):
+                token = self.headers.get('Authorization', '').replace('Bearer ', '')
+                api.requests.append((self.path, token))
+                api.connections.add(self.client_address)
+                time.sleep(api.delay)
+                if api.status == 429:
+                    self.reply(429, {"message": "You are being rate limited.", "retry_after": 30})
+                elif token not in api.guilds:
+                    self.reply(401, {"message": "401: Unauthorized"})
+                else:
+                    self.reply(api.status, api.guilds[token])
+
+            def reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}/api/v10"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestGuildListCache(unittest.TestCase):
+    """Test cases for GuildListCache"""
+
+    def setUp(self):
+        self.api = FakeDiscordAPI()
+        self.clock = FakeClock()
+        self.cache = GuildListCache(self.api.base, ttl=60, clock=self.clock)
+
+    def tearDown(self):
+        self.cache.http.close()
+        self.api.close()
+
+    def test_cached_per_session_until_ttl(self):
+        """Test one request per token per TTL"""
+        for _ in range(5):
+            self.assertEqual(self.cache.get("token-a")[0]["name"], "Alpha")
+        self.assertEqual(self.cache.get("token-b")[0]["name"], "Beta")
+        self.assertEqual(self.api.requests, [("/api/v10/users/@me/guilds", "token-a"),
+                                             ("/api/v10/users/@me/guilds", "token-b")])
+
+        self.clock.now += 61
+        self.api.guilds["token-a"].append({"id": "300", "name": "Gamma"})
+        self.assertEqual(len(self.cache.get("token-a")), 2)
+        self.assertEqual(len(self.api.requests), 3)
+
+    def test_keep_alive(self):
+        """Test that refreshes reuse one pooled connection"""
+        for _ in range(3):
+            self.cache.get("token-a")
+            self.cache.get("token-b")
+            self.clock.now += 61
+        self.assertEqual(len(self.api.requests), 6)
+        self.assertEqual(len(self.api.connections), 1)
+
+    def test_single_flight(self):
+        """Test that concurrent refreshes for a token make one request"""
+        self.api.delay = 0.2
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.get("token-a"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.api.requests), 1)
+        self.assertEqual(results, [[{"id": "100", "name": "Alpha"}]] * 8)
+
+    def test_rate_limited_serves_stale(self):
+        """Test that a 429 keeps the last list and backs off for retry_after"""
+        self.cache.get("token-a")
+        self.clock.now += 61
+        self.api.status = 429
+        self.assertEqual(self.cache.get("token-a")[0]["id"], "100")
+        self.clock.now += 10
+        self.assertEqual(self.cache.get("token-a")[0]["id"], "100")
+        self.assertEqual(len(self.api.requests), 2)
+
+        self.clock.now += 25
+        self.api.status = 200
+        self.cache.get("token-a")
+        self.assertEqual(len(self.api.requests), 3)
+
+    def test_revoked_token(self):
+        """Test that a 401 drops the session's list"""
+        self.api.guilds["token-c"] = [{"id": "1", "name": "C"}]
+        self.cache.get("token-c")
+        del self.api.guilds["token-c"]
+        self.clock.now += 61
+        self.assertEqual(self.cache.get("token-c"), [])
+        self.assertEqual(self.cache.stats()["sessions"], 0)
+
+    def test_unreachable_api(self):
+        """Test that a connection error serves the last list"""
+        self.cache.get("token-a")
+        self.api.close()
+        self.clock.now += 61
+        self.assertEqual(self.cache.get("token-a")[0]["id"], "100")
+
+
+class TestDashboardGuildAccess(unittest.TestCase):
+    """Test cases for guild checks in web_dashboard going through the cache"""
+
+    def setUp(self):
+        self.api = FakeDiscordAPI()
+        self.original_dir = os.getcwd()
+        self.test_dir = tempfile.mkdtemp()
+        os.chdir(self.test_dir)
+        with open('config.json', 'w') as f:
+            json.dump({}, f)
+        sys.modules.pop('web_dashboard', None)
+        self.web_dashboard = importlib.import_module('web_dashboard')
+        self.web_dashboard.guild_lists.api_base = self.api.base
+        self.client = self.web_dashboard.app.test_client()
+        with self.client.session_transaction() as session:
+            session['user'] = {"id": "1", "username": "mod"}
+            session['access_token'] = "token-a"
+
+    def tearDown(self):
+        sys.modules.pop('web_dashboard', None)
+        os.chdir(self.original_dir)
+        shutil.rmtree(self.test_dir)
+        self.api.close()
+
+    def test_polls_use_cached_guilds(self):
+        """Test that repeated stats polls cost one Discord request"""
+        for _ in range(5):
+            self.assertEqual(self.client.get('/api/stats/100').status_code, 200)
+        self.assertEqual(self.client.get('/api/stats/200').status_code, 403)
+        self.assertEqual(len(self.api.requests), 1)
+
+    def test_logout_forgets_guilds(self):
+        """Test that logging out drops the cached list"""
+        self.client.get('/api/stats/100')
+        self.client.get('/logout')
+        self.assertEqual(self.web_dashboard.guild_lists.stats()["sessions"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Unit tests for the background mute role permission rollout
+"""
+
+import unittest
+import asyncio
+import tempfile
+import shutil
+from permission_rollout import PermissionRolloutManager
+
+
+class MockChannel:
+    def __init__(self, channel_id, delay=0.0):
+        self.id = channel_id
+        self.delay = delay
+        self.overwrites = {}
+
+    async def set_permissions(self, role, **kwargs):
+        await asyncio.sleep(self.delay)
+        self.overwrites[role.id] = kwargs
+
+
+class MockRole:
+    def __init__(self, role_id):
+        self.id = role_id
+
+
+class MockGuild:
+    def __init__(self, channels, role):
+        self.id = 444555666
+        self.name = "Test Server"
+        self.channels = channels
+        self.role = role
+
+    def get_channel(self, channel_id):
+        return next((c for c in self.channels if c.id == channel_id), None)
+
+    def get_role(self, role_id):
+        return self.role if role_id == self.role.id else None
+
+
+class MockClient:
+    def __init__(self, guild):
+        self.guild = guild
+
+    def get_guild(self, guild_id):
+        return self.guild if guild_id == self.guild.id else None
+
+
+class TestPermissionRollout(unittest.IsolatedAsyncioTestCase):
+    """Test cases for PermissionRolloutManager."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.role = MockRole(222)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    async def test_rollout_updates_all_channels(self):
+        """Test that every channel gets the overwrite and the record is removed."""
+        guild = MockGuild([MockChannel(i) for i in range(20)], self.role)
+        manager = PermissionRolloutManager(log_dir=self.temp_dir, concurrency=3)
+
+        self.assertTrue(manager.start_rollout(guild, self.role))
+        self.assertFalse(manager.start_rollout(guild, self.role))
+        await manager.tasks["444555666"]
+
+        self.assertTrue(all(222 in c.overwrites for c in guild.channels))
+        self.assertIsNone(manager.get_progress("444555666"))
+        self.assertEqual(PermissionRolloutManager(log_dir=self.temp_dir).rollouts, {})
+
+    async def test_interrupted_rollout_resumes(self):
+        """Test that progress survives cancellation and is resumed."""
+        guild = MockGuild([MockChannel(i, delay=0.01) for i in range(10)], self.role)
+        manager = PermissionRolloutManager(log_dir=self.temp_dir, concurrency=2)
+        manager.start_rollout(guild, self.role)
+
+        await asyncio.sleep(0.025)
+        manager.tasks["444555666"].cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await manager.tasks["444555666"]
+
+        # A fresh manager (e.g. after restart) picks up the saved progress
+        restarted = PermissionRolloutManager(log_dir=self.temp_dir, concurrency=2)
+        progress = restarted.get_progress("444555666")
+        self.assertGreater(progress["pending"], 0)
+        self.assertLess(progress["pending"], 10)
+
+        self.assertEqual(restarted.resume_all(MockClient(guild)), 1)
+        await restarted.tasks["444555666"]
+        self.assertTrue(all(222 in c.overwrites for c in guild.channels))
+        self.assertIsNone(restarted.get_progress("444555666"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+"""
+Unit tests for the time-series rollups
+"""
+
+import unittest
+import asyncio
+import importlib
+import json
+import os
+import sys
+import tempfile
+import shutil
+from rollups import RollupStore, RollupReader, case_metrics, rebuild, MAX_POINTS
+
+DAY = 86400
+NOW = 1_790_000_000.0  # 2026-09-21 UTC
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = NOW
+
+    def __call__(self):
+        return self.now
+
+
+class TestRollupStore(unittest.TestCase):
+    """Test cases for RollupStore"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "rollups.json")
+        self.clock = FakeClock()
+        self.store = RollupStore(self.path, clock=self.clock)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_counts_per_resolution(self):
+        """Test that one event lands in a bucket of every resolution"""
+        self.store.record("100", case_metrics({"severity": "HIGH", "category": "threat_violence"}))
+        self.store.record("100", {"warnings": 1}, when=NOW - 120)
+        self.store.record("200", {"cases": 1})
+
+        hour = self.store.query("100", start=NOW - 3600, end=NOW, resolution="minute")
+        self.assertEqual(len(hour["timestamps"]), 61)
+        self.assertEqual(hour["series"]["cases"][-1], 1)
+        self.assertEqual(hour["series"]["severity:high"][-1], 1)
+        self.assertEqual(hour["series"]["category:threat_violence"][-1], 1)
+        self.assertEqual(sum(hour["series"]["warnings"]), 1)
+
+        days = self.store.query(None, start=NOW - 7 * DAY, end=NOW, resolution="day", metrics=["cases"])
+        self.assertEqual(list(days["series"]), ["cases"])
+        self.assertEqual(days["series"]["cases"][-1], 2)
+
+    def test_resolution_picked_from_range(self):
+        """Test that a 30 day chart uses hourly buckets and a year uses days"""
+        self.assertEqual(self.store.query(start=NOW - 3 * 3600, end=NOW)["resolution"], "minute")
+        month = self.store.query(start=NOW - 30 * DAY, end=NOW)
+        self.assertEqual(month["resolution"], "hour")
+        self.assertEqual(month["step"], 3600)
+        self.assertEqual(self.store.query(start=NOW - 365 * DAY, end=NOW)["resolution"], "day")
+
+    def test_point_cap(self):
+        """Test that a forced fine resolution returns the most recent MAX_POINTS buckets"""
+        result = self.store.query(start=NOW - 30 * DAY, end=NOW, resolution="minute")
+        self.assertEqual(len(result["timestamps"]), MAX_POINTS)
+        self.assertEqual(result["timestamps"][-1], int(NOW // 60 * 60))
+
+    def test_compaction(self):
+        """Test that fine buckets age out while coarse ones keep the counts"""
+        self.store.record("100", {"cases": 1}, when=NOW - 40 * DAY)
+        self.store.record("100", {"cases": 1}, when=NOW - 2 * DAY)
+        self.store.record("100", {"cases": 1}, when=NOW)
+        # two old minute buckets and one old hour bucket, for "100" and for "*"
+        self.assertEqual(self.store.compact(), 2 * (2 + 1))
+
+        month = self.store.query("100", start=NOW - 30 * DAY, end=NOW)
+        self.assertEqual(sum(month["series"]["cases"]), 2)
+        year = self.store.query("100", start=NOW - 60 * DAY, end=NOW)
+        self.assertEqual(year["resolution"], "day")
+        self.assertEqual(sum(year["series"]["cases"]), 3)
+
+    def test_save_and_reload(self):
+        """Test persistence through the JSON file"""
+        self.store.record("100", {"mutes": 1})
+        self.store.save()
+        self.assertFalse(self.store.dirty)
+        reloaded = RollupStore(self.path, clock=self.clock)
+        self.assertEqual(reloaded.series, self.store.series)
+
+    def test_save_periodically(self):
+        """Test that the background saver writes only when something changed"""
+        async def run():
+            task = asyncio.create_task(self.store.save_periodically(interval=0.01))
+            await asyncio.sleep(0.05)
+            self.assertFalse(os.path.exists(self.path))
+            self.store.record("100", {"cases": 1})
+            await asyncio.sleep(0.05)
+            task.cancel()
+
+        asyncio.run(run())
+        self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(self.store.dirty)
+
+    def test_reader_sums_shards(self):
+        """Test that the dashboard reader adds up the shard files"""
+        for name, guild_id in [("rollups.shard0-of-2.json", "100"), ("rollups.shard1-of-2.json", "200")]:
+            store = RollupStore(os.path.join(self.test_dir, name), clock=self.clock)
+            store.record(guild_id, {"cases": 2})
+            store.save()
+        reader = RollupReader(self.path)
+        result = reader.query(None, start=NOW - 3600, end=NOW, resolution="hour")
+        self.assertEqual(result["series"]["cases"][-1], 4)
+        self.assertIs(reader.refresh(), reader.refresh())
+
+
+class TestRebuild(unittest.TestCase):
+    """Test cases for backfilling rollups from the logs"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_rebuild(self):
+        """Test that cases, warnings and mutes are counted from the existing files"""
+        with open(os.path.join(self.test_dir, "abuse_evidence.jsonl"), 'w') as f:
+            f.write(json.dumps({"guild_id": "100", "logged_at": "2026-10-19T10:00:00",
+                                "analysis": {"severity": "HIGH", "category": "profanity"}}) + "\n")
+            f.write("not json\n")
+        with open(os.path.join(self.test_dir, "user_warnings.json"), 'w') as f:
+            json.dump({"100:1": {"guild_id": "100", "warnings": [{"timestamp": "2026-10-19T10:05:00"}] * 3}}, f)
+        with open(os.path.join(self.test_dir, "user_mutes.json"), 'w') as f:
+            json.dump({"100:1": {"guild_id": "100", "start_time": "2026-10-19T10:06:00"}}, f)
+
+        store = rebuild(self.test_dir, clock=lambda: 1792454400.0)  # 2026-10-20
+        result = store.query("100", start=1792400000, end=1792454400, resolution="day")
+        totals = {metric: sum(counts) for metric, counts in result["series"].items()}
+        self.assertEqual(totals, {"cases": 1, "severity:high": 1, "category:profanity": 1,
+                                  "warnings": 3, "mutes": 1})
+
+
+class TestTimeseriesEndpoint(unittest.TestCase):
+    """Test cases for /api/timeseries"""
+
+    def setUp(self):
+        self.original_dir = os.getcwd()
+        self.test_dir = tempfile.mkdtemp()
+        os.chdir(self.test_dir)
+        with open('config.json', 'w') as f:
+            json.dump({}, f)
+        os.makedirs('forensics_logs')
+        store = RollupStore(os.path.join('forensics_logs', 'rollups.json'))
+        store.record("100", {"cases": 1})
+        store.save()
+        sys.modules.pop('web_dashboard', None)
+        self.web_dashboard = importlib.import_module('web_dashboard')
+        self.client = self.web_dashboard.app.test_client()
+
+    def tearDown(self):
+        sys.modules.pop('web_dashboard', None)
+        os.chdir(self.original_dir)
+        shutil.rmtree(self.test_dir)
+
+    def test_thirty_days(self):
+        """Test the default 30 day hourly series"""
+        data = self.client.get('/api/timeseries?guild=100&metric=cases').get_json()
+        self.assertEqual(data["resolution"], "hour")
+        self.assertEqual(sum(data["series"]["cases"]), 1)
+
+    def test_bad_resolution(self):
+        """Test a 400 for an unknown resolution"""
+        self.assertEqual(self.client.get('/api/timeseries?resolution=week').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
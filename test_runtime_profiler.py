@@ -0,0 +1,99 @@
+"""
+Unit tests for the runtime profiler
+"""
+
+import unittest
+import asyncio
+import tempfile
+import shutil
+import threading
+import time
+import tracemalloc
+from runtime_profiler import SamplingProfiler, memory_snapshot, format_memory_report, save_report
+
+
+def busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+class TestRuntimeProfiler(unittest.TestCase):
+    """Test cases for SamplingProfiler and memory snapshots"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_profile_finds_hot_function(self):
+        """Test that a busy function dominates the samples of its thread"""
+        profiler = SamplingProfiler(interval=0.002)
+        worker = threading.Thread(target=busy_loop, args=(0.6,))
+        worker.start()
+        result = profiler.run(0.4, thread_id=worker.ident)
+        worker.join()
+
+        self.assertGreater(result.samples, 10)
+        hottest = result.top(limit=1)["self"][0][0]
+        self.assertTrue(hottest.startswith("busy_loop (test_runtime_profiler.py:"), hottest)
+
+        line = result.folded().splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        self.assertIn(";", stack)
+        self.assertGreater(int(count), 0)
+        self.assertFalse(profiler.active)
+
+    def test_profile_event_loop(self):
+        """Test profiling the event loop thread while it keeps running"""
+        profiler = SamplingProfiler(interval=0.002)
+
+        async def main():
+            task = asyncio.create_task(profiler.profile(0.3))
+            await asyncio.sleep(0.05)
+            busy_loop(0.15)
+            return await task
+
+        result = asyncio.run(main())
+        self.assertIn("busy_loop", result.format_top())
+
+    def test_no_threads_when_off(self):
+        """Test that nothing keeps running after a profile"""
+        profiler = SamplingProfiler(interval=0.002)
+        profiler.run(0.1)
+        self.assertNotIn("runtime-profiler", [t.name for t in threading.enumerate()])
+
+    def test_memory_snapshot(self):
+        """Test that allocations during the window show up as growth"""
+        retained = []
+
+        async def main():
+            async def allocate():
+                await asyncio.sleep(0.05)
+                retained.append([bytearray(1024) for _ in range(2000)])
+
+            allocation = asyncio.create_task(allocate())
+            report = await memory_snapshot(0.2, limit=10)
+            await allocation
+            return report
+
+        report = asyncio.run(main())
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertTrue(any('test_runtime_profiler.py' in entry['site'] and entry['kib_diff'] > 1000
+                            for entry in report['growth']))
+        self.assertIn("Growth during the window", format_memory_report(report))
+
+    def test_save_report(self):
+        """Test report files under the profile directory"""
+        paths = save_report("profile", {"folded": "a;b 1\n", "txt": "top"}, directory=self.test_dir)
+        self.assertEqual(len(paths), 2)
+        self.assertTrue(paths[0].endswith(".folded"))
+        with open(paths[0]) as f:
+            self.assertEqual(f.read(), "a;b 1\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
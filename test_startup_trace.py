@@ -0,0 +1,73 @@
+"""
+Unit tests for the startup trace and the cold start budget
+"""
+
+import unittest
+import json
+import os
+import tempfile
+import shutil
+import time
+from startup_trace import StartupTrace, measure_cold_start, get_budget, format_report
+
+
+class TestStartupTrace(unittest.TestCase):
+    """Test cases for StartupTrace"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.report_path = os.path.join(self.test_dir, 'trace.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_disabled_trace_records_nothing(self):
+        """Test that tracing is a no-op unless enabled"""
+        trace = StartupTrace(enabled=False, report_path=self.report_path)
+        with trace.phase('load'):
+            pass
+        trace.checkpoint('imports')
+
+        self.assertEqual(trace.phases, [])
+        self.assertIsNone(trace.finish())
+        self.assertFalse(os.path.exists(self.report_path))
+
+    def test_phases_and_checkpoints(self):
+        """Test nested phases, checkpoints and the written report"""
+        trace = StartupTrace(enabled=True, report_path=self.report_path)
+        trace.checkpoint('imports')
+        with trace.phase('construct_bot'):
+            with trace.phase('load_warnings'):
+                time.sleep(0.01)
+        path = trace.finish('on_ready')
+
+        with open(path, 'r') as f:
+            report = json.load(f)
+        phases = {p['name']: p for p in report['phases']}
+        self.assertEqual(set(phases), {'imports', 'construct_bot', 'load_warnings', 'on_ready'})
+        self.assertEqual(phases['load_warnings']['depth'], 1)
+        self.assertGreaterEqual(phases['construct_bot']['duration'], phases['load_warnings']['duration'])
+        self.assertEqual(report['ready_label'], 'on_ready')
+        self.assertIn('construct_bot', format_report(report))
+
+        # Only the first ready counts
+        self.assertIsNone(trace.finish('on_ready'))
+
+
+class TestColdStartBudget(unittest.TestCase):
+    """Regression benchmark - fails when cold start exceeds GUARDIFY_STARTUP_BUDGET"""
+
+    def test_bot_cold_start_within_budget(self):
+        """Test that bot.py reaches (simulated) ready within the budget"""
+        report = measure_cold_start('bot')
+        names = [p['name'] for p in report['phases']]
+        self.assertIn('imports', names)
+        self.assertIn('construct_bot', names)
+        self.assertLessEqual(
+            report['total_seconds'], get_budget(),
+            f"Cold start took {report['total_seconds']:.2f}s:\n{format_report(report)}"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
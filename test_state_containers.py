@@ -0,0 +1,122 @@
+"""
+Unit tests for memory-bounded state containers
+"""
+
+import unittest
+from collections import deque
+from state_containers import BoundedState, StateRegistry, deep_size
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestBoundedState(unittest.TestCase):
+    """Test cases for BoundedState"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def make(self, **kwargs):
+        return BoundedState("test", clock=self.clock, register=False, **kwargs)
+
+    def test_dict_behaviour(self):
+        """Test the dict operations the bot uses"""
+        state = self.make()
+        state['a'] = [1]
+        state['a'].append(2)
+        self.assertEqual(state['a'], [1, 2])
+        self.assertIn('a', state)
+        self.assertEqual(state.get('b', 'default'), 'default')
+        del state['a']
+        self.assertNotIn('a', state)
+        self.assertEqual(state.pop('a', None), None)
+        with self.assertRaises(KeyError):
+            state['a']
+
+    def test_default_factory(self):
+        """Test defaultdict-style creation of missing entries"""
+        state = self.make(default_factory=lambda: deque(maxlen=2))
+        for i in range(5):
+            state['user'].append(i)
+        self.assertEqual(list(state['user']), [3, 4])
+
+    def test_idle_entries_expire(self):
+        """Test that entries unused for longer than the TTL are dropped"""
+        state = self.make(ttl=60)
+        state['idle'] = 1
+        state['active'] = 2
+        self.clock.now += 40
+        state['active']  # reading refreshes the entry
+        self.clock.now += 30
+
+        self.assertNotIn('idle', state)
+        self.assertEqual(state['active'], 2)
+        self.assertEqual(state.evictions['ttl'], 1)
+
+    def test_sweep(self):
+        """Test sweeping expired entries without reading them"""
+        state = self.make(ttl=10)
+        for i in range(5):
+            state[i] = i
+        self.clock.now += 5
+        state[5] = 5
+        self.clock.now += 6
+
+        self.assertEqual(state.sweep(), 5)
+        self.assertEqual(state.keys(), [5])
+
+    def test_lru_cap(self):
+        """Test that the least recently used entries go first above the cap"""
+        state = self.make(max_entries=3)
+        for key in ['a', 'b', 'c']:
+            state[key] = key
+        state['a']  # a is now the most recently used
+        state['d'] = 'd'
+
+        self.assertEqual(len(state), 3)
+        self.assertNotIn('b', state)
+        self.assertIn('a', state)
+        self.assertEqual(state.evictions['lru'], 1)
+
+    def test_pinned_values_are_kept(self):
+        """Test that values marked as not evictable survive TTL and cap"""
+        state = self.make(max_entries=1, ttl=10, evictable=lambda value: value != 'running')
+        state['task'] = 'running'
+        state['other'] = 'done'
+        self.clock.now += 20
+
+        self.assertIn('task', state)
+        self.assertNotIn('other', state)
+
+    def test_memory_accounting(self):
+        """Test that the memory estimate grows with the contents"""
+        state = self.make()
+        empty = state.approx_bytes()
+        for i in range(100):
+            state[str(i)] = ['x' * 100] * 10
+        self.assertGreater(state.approx_bytes(), empty + 100 * deep_size(['x' * 100] * 10) // 2)
+
+    def test_registry_report(self):
+        """Test the per-container report"""
+        registry = StateRegistry()
+        small = BoundedState("small", register=False)
+        large = BoundedState("large", max_entries=10, ttl=5, register=False)
+        registry.register(small)
+        registry.register(large)
+        for i in range(10):
+            large[i] = list(range(50))
+
+        report = registry.report()
+        self.assertEqual([entry['name'] for entry in report], ['large', 'small'])
+        self.assertEqual(report[0]['entries'], 10)
+        self.assertEqual(report[0]['max_entries'], 10)
+        self.assertEqual(report[0]['ttl_seconds'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
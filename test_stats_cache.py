@@ -0,0 +1,182 @@
+"""
+Unit tests for the dashboard stats cache
+"""
+
+import unittest
+import importlib
+import json
+import os
+import random
+import sys
+import tempfile
+import shutil
+from stats_cache import StatsCache
+
+
+def scan_statistics(log_file, guild_id=None):
+    """Uncached full scan (the dashboard's previous implementation)"""
+    if not os.path.exists(log_file):
+        return {"total_cases": 0, "severity_breakdown": {"low": 0, "medium": 0, "high": 0},
+                "unique_users": 0, "unique_guilds": 0, "recent_cases": []}
+    cases, users, guilds = [], set(), set()
+    severity_count = {"low": 0, "medium": 0, "high": 0}
+    with open(log_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if guild_id and str(record.get('guild_id')) != str(guild_id):
+                    continue
+                cases.append(record)
+                users.add(record.get('author_id'))
+                if record.get('guild_id'):
+                    guilds.add(record.get('guild_id'))
+                severity = record.get('analysis', {}).get('severity', 'low')
+                severity_count[severity] += 1
+            except:
+                continue
+    recent_cases = sorted(cases, key=lambda x: x.get('logged_at', ''), reverse=True)[:10]
+    return {"total_cases": len(cases), "severity_breakdown": severity_count, "unique_users": len(users),
+            "unique_guilds": len(guilds), "recent_cases": recent_cases}
+
+
+class TestStatsCache(unittest.TestCase):
+    """Test cases for StatsCache"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.test_dir, "abuse_evidence.jsonl")
+        self.warnings_file = os.path.join(self.test_dir, "warnings.json")
+        self.rng = random.Random(5)
+        self.cache = StatsCache(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def append_cases(self, count):
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            for _ in range(count):
+                record = {
+                    "author_id": str(self.rng.randint(1, 20)),
+                    "guild_id": self.rng.choice(["100", "200", "300", None]),
+                    "logged_at": f"2026-10-{self.rng.randint(10, 19)}T12:00:00",
+                    "analysis": {"severity": self.rng.choice(["low", "medium", "high", "critical"])}
+                }
+                f.write(json.dumps(record) + "\n")
+            f.write("not json\n")
+
+    def assert_matches_scan(self):
+        for guild_id in [None, "100", "200", "300", "999"]:
+            self.assertEqual(self.cache.get_statistics(guild_id), scan_statistics(self.log_file, guild_id))
+
+    def test_matches_full_scan(self):
+        """Test identical results to a full scan, including after appends"""
+        self.assert_matches_scan()
+        self.append_cases(200)
+        self.assert_matches_scan()
+        self.append_cases(50)
+        self.assert_matches_scan()
+
+    def test_incremental_append(self):
+        """Test that only appended lines are parsed"""
+        self.append_cases(100)
+        self.cache.refresh()
+        offset = self.cache.evidence.offset
+        self.append_cases(5)
+        self.cache.refresh()
+        self.assertEqual(self.cache.evidence.lines, 101 + 6)
+        self.assertGreater(self.cache.evidence.offset, offset)
+
+    def test_partial_line_read_later(self):
+        """Test that a half-written last line is picked up once complete"""
+        self.append_cases(10)
+        with open(self.log_file, 'a') as f:
+            f.write('{"author_id": "1", "guild_id": "100", ')
+        self.assertEqual(self.cache.get_statistics()['total_cases'], 10)
+        with open(self.log_file, 'a') as f:
+            f.write('"logged_at": "2026-10-20", "analysis": {"severity": "high"}}\n')
+        self.assertEqual(self.cache.get_statistics()['total_cases'], 11)
+        self.assert_matches_scan()
+
+    def test_replaced_file_is_rebuilt(self):
+        """Test a rotated/truncated evidence log"""
+        self.append_cases(100)
+        self.cache.refresh()
+        os.remove(self.log_file)
+        self.append_cases(3)
+        self.assert_matches_scan()
+
+    def test_warnings_grouped_per_guild(self):
+        """Test warned users per guild, most warnings first"""
+        with open(self.warnings_file, 'w') as f:
+            json.dump({"100:1": [{"timestamp": "a"}], "100:2": [{"timestamp": "b"}, {"timestamp": "c"}],
+                       "200:3": []}, f)
+        self.assertEqual([w['user_id'] for w in self.cache.get_warnings("100")], ["2", "1"])
+        self.assertEqual(self.cache.get_warnings("200")[0]['last_warning'], None)
+        self.assertEqual(len(self.cache.get_warnings()), 3)
+        self.assertEqual(self.cache.get_warnings("999"), [])
+
+    def test_response_etag(self):
+        """Test that unchanged data reuses the cached body and ETag"""
+        self.append_cases(20)
+        body, etag = self.cache.get_response("100")
+        self.assertEqual(self.cache.get_response("100"), (body, etag))
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(json.loads(body)['stats'], scan_statistics(self.log_file, "100"))
+
+        _, all_etag = self.cache.get_response()
+        self.append_cases(1)
+        _, new_etag = self.cache.get_response()
+        self.assertNotEqual(new_etag, all_etag)
+
+    def test_invalidate(self):
+        """Test that an append notification forces a re-read"""
+        self.append_cases(5)
+        self.cache.refresh()
+        version = self.cache.evidence.version
+        self.cache.invalidate()
+        self.cache.refresh()
+        self.assertGreater(self.cache.evidence.version, version)
+
+
+class TestStatsEndpoint(unittest.TestCase):
+    """Test cases for ETag / 304 handling on /api/stats"""
+
+    def setUp(self):
+        self.original_dir = os.getcwd()
+        self.test_dir = tempfile.mkdtemp()
+        os.chdir(self.test_dir)
+        with open('config.json', 'w') as f:
+            json.dump({}, f)
+        os.makedirs('forensics_logs')
+        with open(os.path.join('forensics_logs', 'abuse_evidence.jsonl'), 'w') as f:
+            f.write(json.dumps({"author_id": "1", "guild_id": "100", "logged_at": "x",
+                                "analysis": {"severity": "high"}}) + "\n")
+        sys.modules.pop('web_dashboard', None)
+        self.web_dashboard = importlib.import_module('web_dashboard')
+        self.client = self.web_dashboard.app.test_client()
+
+    def tearDown(self):
+        sys.modules.pop('web_dashboard', None)
+        os.chdir(self.original_dir)
+        shutil.rmtree(self.test_dir)
+
+    def test_not_modified(self):
+        """Test 304 for an unchanged poll and 200 after new evidence"""
+        first = self.client.get('/api/stats')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.get_json()['stats']['total_cases'], 1)
+        etag = first.headers['ETag']
+
+        second = self.client.get('/api/stats', headers={'If-None-Match': etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b'')
+
+        with open(os.path.join('forensics_logs', 'abuse_evidence.jsonl'), 'a') as f:
+            f.write(json.dumps({"author_id": "2", "guild_id": "100"}) + "\n")
+        third = self.client.get('/api/stats', headers={'If-None-Match': etag})
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual(third.get_json()['stats']['total_cases'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Unit tests for structured, queue-based logging
+"""
+
+import unittest
+import io
+import json
+from structured_logging import setup_logging, flush_logging, get_logger, Sampler
+
+
+class TestStructuredLogging(unittest.TestCase):
+    """Test cases for the logging subsystem"""
+
+    def tearDown(self):
+        flush_logging()
+        setup_logging()
+
+    def test_json_output_with_fields(self):
+        """Test that records are written as JSON with structured fields"""
+        stream = io.StringIO()
+        setup_logging(level="INFO", fmt="json", stream=stream)
+        get_logger("test").info("Warning added", guild_id="1", warnings=3)
+        flush_logging()
+
+        entry = json.loads(stream.getvalue().strip())
+        self.assertEqual(entry["msg"], "Warning added")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["logger"], "guardify.test")
+        self.assertEqual(entry["guild_id"], "1")
+        self.assertEqual(entry["warnings"], 3)
+
+    def test_text_output_and_levels(self):
+        """Test text output and that records below the level are skipped"""
+        stream = io.StringIO()
+        setup_logging(level="INFO", fmt="text", stream=stream)
+        log = get_logger("test")
+        log.debug("Message scanned", content="hi")
+        log.error("Auto-mod failed", guild_id="1")
+        flush_logging()
+
+        output = stream.getvalue()
+        self.assertNotIn("Message scanned", output)
+        self.assertIn("ERROR", output)
+        self.assertIn("guardify.test: Auto-mod failed | guild_id=1", output)
+
+    def test_exception_is_formatted(self):
+        """Test that exception tracebacks survive the queue"""
+        stream = io.StringIO()
+        setup_logging(fmt="json", stream=stream)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            get_logger("test").exception("Bot failed to start")
+        flush_logging()
+
+        entry = json.loads(stream.getvalue().strip())
+        self.assertIn("ValueError: boom", entry["exc"])
+
+    def test_sampler(self):
+        """Test deterministic 1-in-N sampling"""
+        sampler = Sampler(0.25)
+        self.assertEqual([sampler() for _ in range(8)], [True, False, False, False, True, False, False, False])
+        self.assertTrue(all(Sampler(1.0)() for _ in range(3)))
+        self.assertFalse(Sampler(0)())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,236 @@
+"""
+Unit tests for the compact warning and mute records
+"""
+
+import unittest
+import io
+import json
+import os
+import random
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+from warning_records import MuteRecord, WarningStore, format_time, parse_time
+from warning_system import WarningManager
+
+
+def sample_warnings(users=200, seed=4):
+    """user_warnings.json contents as the dict-based WarningManager wrote them"""
+    rng = random.Random(seed)
+    base = datetime(2026, 1, 1)
+    data = {}
+    for user in range(users):
+        guild_id = rng.choice(["1100000000000000001", "1100000000000000002"])
+        user_id = str(900000000000000000 + user)
+        warnings = []
+        for i in range(rng.randint(0, 6)):
+            moment = base + timedelta(seconds=rng.randint(0, 10 ** 7), microseconds=rng.choice([0, rng.randint(1, 999999)]))
+            warnings.append({"id": i + 1, "reason": rng.choice(["PROFANITY detected (x)", "Manual"]),
+                             "severity": rng.choice(["LOW", "MEDIUM", "HIGH", "medium"]),
+                             "content": rng.choice(["", "bad words", "naïve – ünïcode \"quoted\"\n"]),
+                             "timestamp": moment.isoformat()})
+        data[f"{guild_id}:{user_id}"] = {"user_id": user_id, "guild_id": guild_id, "warnings": warnings,
+                                         "created_at": base.isoformat()}
+    return data
+
+
+class TestWarningStore(unittest.TestCase):
+    """Test cases for WarningStore"""
+
+    def dump(self, store):
+        out = io.StringIO()
+        store.dump(out)
+        return out.getvalue()
+
+    def test_round_trip(self):
+        """Test that the file contents come back unchanged"""
+        data = sample_warnings()
+        store = WarningStore.from_dict(json.loads(json.dumps(data)))
+        self.assertEqual(json.loads(self.dump(store)), data)
+        self.assertEqual(dict(store), data)
+        self.assertEqual(len(store), len(data))
+
+    def test_dump_matches_json_dump(self):
+        """Test that dump writes what json.dump(indent=2) would for the same (guild-grouped) dict"""
+        store = WarningStore.from_dict(sample_warnings(50))
+        self.assertEqual(self.dump(store), json.dumps(dict(store), indent=2))
+        self.assertEqual(self.dump(WarningStore()), json.dumps({}, indent=2))
+
+    def test_compact_fields(self):
+        """Test integer ids and timestamps and out-of-line content"""
+        store = WarningStore.from_dict(sample_warnings(20))
+        guild_id, user_id, user = next((g, u, w) for g, u, w in store.users() if w.records)
+        self.assertIsInstance(guild_id, int)
+        self.assertIsInstance(user_id, int)
+        self.assertIsInstance(user.records[0].timestamp, int)
+        self.assertIsInstance(user.records[0].content, int)
+
+    def test_unusual_records_are_kept(self):
+        """Test that entries and warnings outside the usual layout are written back as loaded"""
+        data = {
+            "abc:42": {"guild_id": "abc", "user_id": "42", "warnings": [
+                {"reason": "legacy", "timestamp": "2026-01-01T00:00:00+00:00", "extra": [1, 2]},
+                {"id": 2, "reason": "r", "severity": "low", "content": "c", "timestamp": "yesterday"}
+            ], "created_at": "2026-01-01T00:00:00", "note": "hand edited"},
+            "1:007": {"user_id": "007", "guild_id": "1", "warnings": [], "created_at": "2026-01-01T00:00:00"}
+        }
+        store = WarningStore.from_dict(json.loads(json.dumps(data)))
+        self.assertEqual(json.loads(self.dump(store)), data)
+        self.assertIn("1:007", store)
+
+    def test_remove_and_compact(self):
+        """Test that removed users' content is reclaimed by compact()"""
+        store = WarningStore.from_dict(sample_warnings(100))
+        for key in list(store)[:50]:
+            store.remove_user(*store.split_key(key))
+        kept = dict(store)
+        self.assertGreater(store.pool.garbage_bytes, 0)
+        store.compact()
+        self.assertEqual(store.pool.garbage_bytes, 0)
+        self.assertEqual(dict(store), kept)
+
+    def test_times(self):
+        """Test that only timestamps that round-trip exactly are compacted"""
+        self.assertIsInstance(parse_time("2026-10-19T10:00:00.000100"), int)
+        self.assertEqual(format_time(parse_time("2026-10-19T10:00:00")), "2026-10-19T10:00:00")
+        self.assertEqual(parse_time("2026-10-19T10:00:00Z"), "2026-10-19T10:00:00Z")
+        self.assertEqual(parse_time("2026-10-19 10:00:00"), "2026-10-19 10:00:00")
+
+    def test_mute_round_trip(self):
+        """Test that mute records convert back to the same dicts"""
+        mute = {"user_id": "1", "guild_id": "2", "start_time": "2026-10-19T10:00:00",
+                "end_time": "2026-10-19T10:10:00.500000", "duration_minutes": 10, "reason": "5 warnings",
+                "is_active": True, "mute_role_assigned": False}
+        self.assertEqual(MuteRecord.from_dict(mute).to_dict(), mute)
+        odd = dict(mute, end_time="2026-10-19T10:10:00+00:00", source="manual")
+        self.assertEqual(MuteRecord.from_dict(odd).to_dict(), odd)
+
+
+class TestWarningManagerFile(unittest.TestCase):
+    """Test cases for WarningManager on the compact records"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "user_warnings.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_existing_file(self):
+        """Test that a file written by the dict-based manager loads and saves unchanged"""
+        data = sample_warnings()
+        with open(self.path, 'w') as f:
+            json.dump(data, f, indent=2)
+        manager = WarningManager(self.test_dir)
+        key = next(key for key, entry in data.items() if entry["warnings"])
+        guild_id, user_id = key.split(':')
+        self.assertEqual(manager.get_warnings(user_id, guild_id), data[key]["warnings"][-10:])
+        self.assertEqual(manager.get_warning_count(user_id, guild_id), len(data[key]["warnings"]))
+        manager.save_warnings()
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), data)
+
+    def test_add_remove_clear(self):
+        """Test the manager API against the saved file"""
+        manager = WarningManager(self.test_dir)
+        self.assertEqual(manager.add_warning("1", "100", "spam", "HIGH", "x" * 300), 1)
+        self.assertEqual(manager.add_warning("1", "100", "spam"), 2)
+        warning = manager.get_warnings("1", "100")[0]
+        self.assertEqual((warning["severity"], len(warning["content"])), ("HIGH", 200))
+        self.assertTrue(manager.remove_warning("1", "100", 1))
+        self.assertEqual([w["id"] for w in manager.get_warnings("1", "100")], [2])
+
+        reloaded = WarningManager(self.test_dir)
+        self.assertEqual(reloaded.warnings["100:1"], manager.warnings["100:1"])
+        self.assertEqual(reloaded.top_warned("100")[0]["count"], 1)
+        self.assertTrue(reloaded.clear_warnings("1", "100"))
+        self.assertEqual(WarningManager(self.test_dir).get_warning_count("1", "100"), 0)
+
+    def test_mutes(self):
+        """Test mute records through the manager"""
+        manager = WarningManager(self.test_dir)
+        record = manager.create_mute("1", "100", duration_minutes=10, reason="test")
+        self.assertEqual(manager.get_mute("1", "100"), record)
+        self.assertTrue(manager.mark_mute_role_assigned("1", "100"))
+        reloaded = WarningManager(self.test_dir)
+        self.assertTrue(reloaded.get_mute("1", "100")["mute_role_assigned"])
+        self.assertEqual(reloaded.get_statistics("100")["total_active_mutes"], 1)
+        reloaded.end_mute("1", "100")
+        self.assertEqual(len(reloaded.get_expired_mutes()), 0)
+        self.assertFalse(reloaded.is_user_muted("1", "100"))
+
+
+class TestWarningExpiry(unittest.TestCase):
+    """Test cases for per-guild warning expiry"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.manager = WarningManager(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def age(self, user_id, guild_id, days):
+        """Move all of a user's warnings `days` days into the past"""
+        for record in self.manager.warnings.get_user(guild_id, user_id).records:
+            record.timestamp -= days * 86400 * 10 ** 6
+
+    def test_expired_warnings_stop_counting(self):
+        """Test that only warnings inside the window count, and that the window can change"""
+        for _ in range(4):
+            self.manager.add_warning("1", "100", "spam")
+        self.age("1", "100", 40)
+        self.assertEqual(self.manager.add_warning("1", "100", "spam"), 5)
+        self.manager.set_warning_expiry("100", 30)
+        self.assertEqual(self.manager.get_warning_count("1", "100"), 1)
+        self.assertEqual([w["id"] for w in self.manager.get_warnings("1", "100")], [5])
+        self.assertEqual(self.manager.add_warning("1", "100", "spam"), 2)
+        self.assertEqual(self.manager.add_warning("1", "200", "spam"), 1)  # other guilds keep everything
+
+        self.manager.set_warning_expiry("100", 60)  # expired warnings were removed when the window was set
+        self.assertEqual(self.manager.get_warning_count("1", "100"), 2)
+        self.manager.set_warning_expiry("100", 0)
+        self.assertIsNone(WarningManager(self.test_dir).get_warning_expiry("100"))
+
+    def test_compaction_removes_expired(self):
+        """Test that the compactor drops expired warnings, and users left without any, from storage"""
+        self.manager.set_warning_expiry("100", 30)
+        for user_id in ["1", "2"]:
+            for _ in range(3):
+                self.manager.add_warning(user_id, "100", "spam")
+        self.manager.add_warning("3", "200", "spam")
+        self.age("1", "100", 31)
+        self.age("3", "200", 31)
+        self.assertEqual(self.manager.get_statistics("100")["total_warnings"], 6)
+
+        self.assertEqual(self.manager.compact_expired(), 3)
+        self.assertNotIn("100:1", self.manager.warnings)
+        self.assertEqual(self.manager.get_statistics("100")["total_warnings"], 3)
+        self.assertEqual([e["user_id"] for e in self.manager.top_warned("100")], ["2"])
+        reloaded = WarningManager(self.test_dir)
+        self.assertEqual(reloaded.get_warning_count("3", "200"), 1)
+        self.assertEqual(reloaded.compact_expired(), 0)
+        self.assertEqual(self.manager.add_warning("2", "100", "spam"), 4)
+        self.assertEqual(self.manager.get_warnings("2", "100")[-1]["id"], 4)
+
+    def test_counts_agree(self):
+        """Test that rankings and statistics drop expired warnings as soon as get_warning_count does"""
+        for _ in range(3):
+            self.manager.add_warning("1", "100", "spam")
+        self.manager.get_statistics("100")  # columns built before the warnings expire
+        for record in self.manager.warnings.get_user("100", "1").records[:2]:
+            record.timestamp -= 40 * 86400 * 10 ** 6
+        self.manager.set_warning_expiry("100", 30)
+        self.assertEqual(self.manager.get_warning_count("1", "100"), 1)
+        self.assertEqual(self.manager.top_warned("100")[0]["count"], 1)
+        self.assertEqual(self.manager.get_statistics("100")["total_warnings"], 1)
+
+        self.age("1", "100", 31)  # the last one expires later, without a compaction run
+        self.manager.next_expiry["100"] = 0
+        self.assertEqual(self.manager.get_warning_count("1", "100"), 0)
+        self.assertEqual(self.manager.top_warned("100"), [])
+        self.assertEqual(self.manager.get_statistics("100")["total_warnings"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Unit tests for the columnar warning statistics
+"""
+
+import unittest
+import json
+import random
+import tempfile
+import shutil
+from datetime import datetime
+from test_warning_records import sample_warnings
+from warning_records import WarningStore
+from warning_stats import WarningStatsEngine, NUMPY_AVAILABLE
+from warning_system import WarningManager
+
+
+def legacy_statistics(data, guild_id=None):
+    """get_statistics' loop over the file's dicts, with an exact guild match"""
+    stats = {"total_users_warned": 0, "total_warnings": 0,
+             "severity_breakdown": {"low": 0, "medium": 0, "high": 0, "critical": 0}, "guilds_affected": set()}
+    for key, entry in data.items():
+        if guild_id and key.split(':')[0] != guild_id:
+            continue
+        stats["total_users_warned"] += 1
+        stats["guilds_affected"].add(entry["guild_id"])
+        for warning in entry["warnings"]:
+            stats["total_warnings"] += 1
+            severity = warning.get("severity", "medium")
+            stats["severity_breakdown"][severity] = stats["severity_breakdown"].get(severity, 0) + 1
+    stats["guilds_affected"] = len(stats["guilds_affected"])
+    return stats
+
+
+def engines(store):
+    """The numpy engine (when available) and the pure-Python fallback over one store"""
+    found = [WarningStatsEngine(store, use_numpy=False)]
+    if NUMPY_AVAILABLE:
+        found.append(WarningStatsEngine(store, use_numpy=True))
+    return found
+
+
+class TestWarningStatsEngine(unittest.TestCase):
+    """Test cases for WarningStatsEngine"""
+
+    def test_matches_legacy_statistics(self):
+        """Test that both engines agree with the old loop for every guild and for all guilds"""
+        data = sample_warnings(300)
+        store = WarningStore.from_dict(json.loads(json.dumps(data)))
+        for engine in engines(store):
+            for guild_id in [None, "1100000000000000001", "1100000000000000002", "42"]:
+                self.assertEqual(engine.statistics(guild_id), legacy_statistics(data, guild_id))
+
+    def test_guild_match_is_exact(self):
+        """Test that guild 1 no longer counts guild 12's warnings"""
+        data = {"1:5": {"user_id": "5", "guild_id": "1", "created_at": "2026-01-01T00:00:00",
+                        "warnings": [{"id": 1, "severity": "high", "timestamp": "2026-01-01T00:00:00"}]},
+                "12:5": {"user_id": "5", "guild_id": "12", "created_at": "2026-01-01T00:00:00",
+                         "warnings": [{"id": 1, "severity": "low", "timestamp": "2026-01-01T00:00:00"}] * 2}}
+        for engine in engines(WarningStore.from_dict(data)):
+            stats = engine.statistics("1")
+            self.assertEqual((stats["total_warnings"], stats["severity_breakdown"]["low"]), (1, 0))
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy not installed")
+    def test_updates_match_rebuild(self):
+        """Test that columns kept up to date through the manager match freshly built ones"""
+        test_dir = tempfile.mkdtemp()
+        try:
+            manager = WarningManager(test_dir)
+            manager.save_warnings = lambda: None
+            manager.get_statistics()  # build the columns, then update them
+            rng = random.Random(9)
+            for _ in range(400):
+                user_id, guild_id = str(rng.randint(1, 30)), rng.choice(["1", "12", "300"])
+                action = rng.random()
+                if action < 0.8:
+                    manager.add_warning(user_id, guild_id, "spam", rng.choice(["low", "HIGH", "odd"]))
+                elif action < 0.9:
+                    manager.remove_warning(user_id, guild_id, rng.randint(1, 4))
+                else:
+                    manager.clear_warnings(user_id, guild_id)
+            fresh = WarningStatsEngine(manager.warnings)
+            for guild_id in [None, "1", "12", "300"]:
+                self.assertEqual(manager.stats.statistics(guild_id), fresh.statistics(guild_id))
+                ranked = [sorted(e.items()) for e in manager.stats.top_offenders(guild_id, limit=None)]
+                self.assertEqual(sorted(ranked), sorted(sorted(e.items()) for e in fresh.top_offenders(guild_id, limit=None)))
+                self.assertEqual(manager.stats.statistics(guild_id),
+                                 WarningStatsEngine(manager.warnings, use_numpy=False).statistics(guild_id))
+        finally:
+            shutil.rmtree(test_dir)
+
+    def test_top_offenders_and_buckets(self):
+        """Test that rankings and time buckets agree between the engines"""
+        data = sample_warnings(300)
+        store = WarningStore.from_dict(data)
+        start = (datetime(2026, 1, 1) - datetime(1970, 1, 1)).total_seconds()
+        results = []
+        for engine in engines(store):
+            results.append((engine.top_offenders("1100000000000000001", limit=5),
+                            engine.top_offenders(None, limit=5, since=start + 50 * 86400),
+                            engine.bucket_counts("1100000000000000002", start, start + 120 * 86400, step=7 * 86400)))
+        top, _, buckets = results[0]
+        self.assertEqual(len(top), 5)
+        self.assertTrue(all(a["count"] >= b["count"] for a, b in zip(top, top[1:])))
+        self.assertEqual(len(buckets["counts"]), len(buckets["timestamps"]))
+        self.assertEqual(sum(buckets["counts"]), legacy_statistics(data, "1100000000000000002")["total_warnings"])
+        for other in results[1:]:
+            self.assertEqual(other, results[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Unit tests for the shared warnings query module
+"""
+
+import unittest
+import json
+import os
+import random
+import tempfile
+import shutil
+import time
+from unittest import mock
+from sharding import SHARD_COUNT_ENV, SHARD_IDS_ENV, prepare_state_file, state_files
+from stats_cache import StatsCache
+from warning_system import WarningManager
+from warnings_query import WarningIndex, WarningsReader, normalize_warnings
+
+
+def manager_entry(guild_id, user_id, count):
+    """An entry in WarningManager's user_warnings.json layout"""
+    return {"user_id": user_id, "guild_id": guild_id, "created_at": "2026-10-19T10:00:00",
+            "warnings": [{"id": i + 1, "reason": "r", "severity": "medium",
+                          "timestamp": f"2026-10-19T10:{i:02d}:00"} for i in range(count)]}
+
+
+class TestWarningIndex(unittest.TestCase):
+    """Test cases for WarningIndex"""
+
+    def test_both_layouts(self):
+        """Test that both bots' layouts normalize to the same warnings"""
+        enhanced = {"100:1": [{"timestamp": "a"}, {"timestamp": "b"}]}
+        manager = {"100:1": {"user_id": "1", "guild_id": "100", "warnings": [{"timestamp": "a"}, {"timestamp": "b"}]}}
+        self.assertEqual(normalize_warnings(enhanced), normalize_warnings(manager))
+
+    def test_incremental_ranking_matches_sort(self):
+        """Test that random updates keep every guild's ranking equal to a full sort"""
+        rng = random.Random(3)
+        index = WarningIndex()
+        state = {}
+        for _ in range(2000):
+            key = f"{rng.randint(1, 3)}:{rng.randint(1, 40)}"
+            if rng.random() < 0.1:
+                state.pop(key, None)
+                index.update(key, None)
+            else:
+                state[key] = [{"timestamp": str(n)} for n in range(rng.randint(0, 8))]
+                index.update(key, state[key])
+
+        for guild_id in ["1", "2", "3", None]:
+            keys = [key for key in state if guild_id is None or key.startswith(f"{guild_id}:")]
+            counts = [(-len(state[key]), key) for key in keys]
+            ranked = index.top(guild_id, limit=None)
+            self.assertEqual([-entry["count"] for entry in ranked], sorted(count for count, _ in counts))
+            self.assertEqual(index.users(guild_id), len(keys))
+        self.assertEqual(len(index.top("1", limit=5)), 5)
+
+    def test_ties_keep_first_seen_order(self):
+        """Test that users with equal counts stay in the order they were added"""
+        index = WarningIndex()
+        index.load({"100:1": [{}], "100:2": [{}, {}], "100:3": [{}]})
+        self.assertEqual([entry["user_id"] for entry in index.top("100")], ["2", "1", "3"])
+        index.update("100:1", [{}, {}, {}])
+        self.assertEqual([entry["user_id"] for entry in index.top("100")], ["1", "2", "3"])
+
+    def test_update_reports_changes(self):
+        """Test the (previous count, summary) result of an update"""
+        index = WarningIndex()
+        self.assertEqual(index.update("100:1", [{"timestamp": "a"}])[0], 0)
+        self.assertIsNone(index.update("100:1", [{"timestamp": "a"}]))
+        previous, entry = index.update("100:1", None)
+        self.assertEqual((previous, entry["count"]), (1, 0))
+        self.assertEqual(index.top("100"), [])
+
+
+class TestWarningsReader(unittest.TestCase):
+    """Test cases for reading both bots' warnings files"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def path(self, name):
+        return os.path.join(self.test_dir, name)
+
+    def write_json(self, name, data):
+        with open(self.path(name), 'w') as f:
+            json.dump(data, f)
+
+    def test_both_files_and_shards(self):
+        """Test that WarningManager's shard files and bot_enhanced's file are combined"""
+        self.write_json("user_warnings.json", {"100:1": manager_entry("100", "1", 1)})  # stale once shards exist
+        self.write_json("user_warnings.shard0-of-2.json", {"100:1": manager_entry("100", "1", 3)})
+        self.write_json("user_warnings.shard1-of-2.json", {"200:5": manager_entry("200", "5", 2)})
+        self.write_json("warnings.json", {"100:2": [{"timestamp": "2026-10-19T11:00:00"}]})
+
+        reader = WarningsReader([self.path("user_warnings.json"), self.path("warnings.json")])
+        reader.refresh()
+        self.assertEqual([(e["user_id"], e["count"]) for e in reader.index.top("100")], [("1", 3), ("2", 1)])
+        self.assertEqual(reader.index.top("200")[0]["last_warning"], "2026-10-19T10:01:00")
+        self.assertEqual(reader.index.users(), 3)
+
+    def test_reshard_is_not_counted_twice(self):
+        """Test that files of an earlier shard layout are ignored once a new layout is seeded from them"""
+        path = self.path("user_warnings.json")
+        self.write_json("user_warnings.json", {"100:1": manager_entry("100", "1", 1),
+                                               "4194304:2": manager_entry("4194304", "2", 2)})  # shards 0 and 1
+        layouts = [("0,1", "2"), ("0,1,2,3", "4")]
+        for moment, (shard_ids, shard_count) in enumerate(layouts):
+            with mock.patch.dict(os.environ, {SHARD_IDS_ENV: shard_ids, SHARD_COUNT_ENV: shard_count}):
+                seeded = prepare_state_file(path)
+            os.utime(seeded, (time.time() + moment, time.time() + moment))
+        self.assertEqual(state_files(path), [seeded])
+
+        reader = WarningsReader([path])
+        reader.refresh()
+        self.assertEqual([(e["user_id"], e["count"]) for e in reader.index.top(None)], [("2", 2), ("1", 1)])
+
+    def test_layout_split_across_processes(self):
+        """Test that one layout's files written by several processes are all read"""
+        for name in ["user_warnings.shard0-of-2.json", "user_warnings.shard1-of-2.json"]:
+            self.write_json(name, {})
+        old = self.path("user_warnings.shard0-1-2-of-3.json")
+        self.write_json("user_warnings.shard0-1-2-of-3.json", {})
+        os.utime(old, (0, 0))
+        self.assertEqual([os.path.basename(p) for p in state_files(self.path("user_warnings.json"))],
+                         ["user_warnings.shard0-of-2.json", "user_warnings.shard1-of-2.json"])
+
+    def test_only_changed_users_are_reported(self):
+        """Test that a rewrite of one file reports only the users whose warnings changed"""
+        self.write_json("warnings.json", {"100:1": [{"timestamp": "a"}], "100:2": [{"timestamp": "b"}]})
+        reader = WarningsReader([self.path("warnings.json")])
+        self.assertEqual(len(reader.refresh()), 2)
+        self.assertEqual(reader.refresh(), [])
+
+        self.write_json("warnings.json", {"100:1": [{"timestamp": "a"}, {"timestamp": "c"}],
+                                          "100:2": [{"timestamp": "b"}]})
+        changes = reader.refresh(force=True)
+        self.assertEqual([(previous, entry["user_id"], entry["count"]) for previous, entry in changes],
+                         [(1, "1", 2)])
+
+    def test_dashboard_reads_warning_manager(self):
+        """Test that the dashboard stats include warnings written by bot.py's WarningManager"""
+        manager = WarningManager(self.test_dir)
+        for _ in range(3):
+            manager.add_warning("1", "100", "spam")
+        manager.add_warning("2", "100", "spam")
+        self.assertEqual([(e["user_id"], e["count"]) for e in manager.top_warned("100")], [("1", 3), ("2", 1)])
+
+        cache = StatsCache(self.test_dir)
+        body, _ = cache.get_response("100")
+        self.assertEqual([(w["user_id"], w["count"]) for w in json.loads(body)["warnings"]], [("1", 3), ("2", 1)])
+
+        manager.clear_warnings("1", "100")
+        cache.invalidate()
+        self.assertEqual([w["user_id"] for w in cache.get_warnings("100")], ["2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
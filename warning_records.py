@@ -0,0 +1,350 @@
+"""
+Warning Records - Compact in-memory warning and mute records
+WarningManager used to hold user_warnings.json as parsed: a dict of strings
+per warning under a dict per user keyed "guild_id:user_id", several hundred
+bytes per warning before its content. Here a warning is a __slots__ record
+with integer snowflake ids, epoch-microsecond timestamps, a small integer
+severity code and an interned reason, and message content lives out-of-line
+in one UTF-8 buffer. Users are grouped by guild, so per-guild work never
+looks at other guilds.
+
+The JSON files keep their layout: records are built from those dicts when
+loading, and to_dict() gives the same dicts back (WarningStore is a read-only
+mapping of "guild_id:user_id" to them), so anything that wants the old dict
+view still has one. Records that don't fit the compact form (unexpected keys
+or types) keep their original dict and are written back unchanged.
+"""
+
+import json
+import sys
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+Id = Union[int, str]  # snowflakes as int; anything that doesn't round-trip through int() stays a string
+Timestamp = Union[int, str, None]  # epoch microseconds (naive UTC), or the original value if it can't round-trip
+
+WARNING_FIELDS = ("id", "reason", "severity", "content", "timestamp")
+USER_FIELDS = ("user_id", "guild_id", "warnings", "created_at")
+MUTE_FIELDS = ("user_id", "guild_id", "start_time", "end_time", "duration_minutes", "reason",
+               "is_active", "mute_role_assigned")
+
+
+def parse_id(value) -> Id:
+    text = str(value)
+    return int(text) if text.isdigit() and str(int(text)) == text else text
+
+
+def to_micros(moment: datetime) -> int:
+    """Epoch microseconds of a naive UTC datetime"""
+    return (moment - EPOCH) // MICROSECOND
+
+
+def parse_time(value) -> Timestamp:
+    """Compact form of an ISO timestamp string (kept as is unless it round-trips exactly)"""
+    if not isinstance(value, str):
+        return value
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    if moment.tzinfo is not None or moment.isoformat() != value:
+        return value
+    return to_micros(moment)
+
+
+def format_time(value: Timestamp):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return (EPOCH + timedelta(0, 0, value)).isoformat()
+    return value
+
+
+def time_micros(value: Timestamp) -> Optional[int]:
+    """Epoch microseconds for comparisons, None if the value isn't a timestamp"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is not None:
+        moment = moment.replace(tzinfo=None) - moment.utcoffset()
+    return to_micros(moment)
+
+
+class _Severities:
+    """Small integer codes for severity names"""
+
+    def __init__(self, names=()):
+        self.codes = {}
+        self.names = []
+        for name in names:
+            self.code(name)
+
+    def code(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def name(self, code: int) -> str:
+        return self.names[code]
+
+
+SEVERITIES = _Severities(["low", "medium", "high", "critical", "LOW", "MEDIUM", "HIGH", "CRITICAL"])
+
+
+class ContentPool:
+    """Message content out-of-line in one UTF-8 buffer, referenced by integer handles (-1 is "")"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array('q', [0])  # handle -> start offset; handle + 1 -> end offset
+        self.live_bytes = 0
+
+    def add(self, text: str) -> int:
+        if not text:
+            return -1
+        encoded = text.encode('utf-8')
+        self.data += encoded
+        self.offsets.append(len(self.data))
+        self.live_bytes += len(encoded)
+        return len(self.offsets) - 2
+
+    def get(self, handle: int) -> str:
+        if handle < 0:
+            return ""
+        return self.data[self.offsets[handle]:self.offsets[handle + 1]].decode('utf-8')
+
+    def release(self, handle: int):
+        """Content no longer referenced (the bytes are reclaimed by compact)"""
+        if handle >= 0:
+            self.live_bytes -= self.offsets[handle + 1] - self.offsets[handle]
+
+    @property
+    def garbage_bytes(self) -> int:
+        return len(self.data) - self.live_bytes
+
+
+class WarningRecord:
+    """One warning"""
+
+    __slots__ = ("id", "reason", "severity", "content", "timestamp", "original")
+
+    def __init__(self, warning_id, reason: str, severity: int, content: int, timestamp: Timestamp,
+                 original: Optional[Dict] = None):
+        self.id = warning_id
+        self.reason = reason
+        self.severity = severity  # SEVERITIES code
+        self.content = content  # ContentPool handle
+        self.timestamp = timestamp
+        self.original = original  # the dict itself, for warnings that don't fit the compact form
+
+    @classmethod
+    def from_dict(cls, data: Dict, pool: ContentPool) -> "WarningRecord":
+        compact = (tuple(data) == WARNING_FIELDS and isinstance(data["reason"], str)
+                   and isinstance(data["severity"], str) and isinstance(data["content"], str)
+                   and isinstance(data["timestamp"], str))
+        if not compact:
+            severity = data.get("severity", "medium")
+            return cls(data.get("id"), None, SEVERITIES.code(severity if isinstance(severity, str) else "medium"),
+                       -1, parse_time(data.get("timestamp")), original=data)
+        return cls(data["id"], sys.intern(data["reason"]), SEVERITIES.code(data["severity"]),
+                   pool.add(data["content"]), parse_time(data["timestamp"]))
+
+    @property
+    def severity_name(self) -> str:
+        return SEVERITIES.name(self.severity)
+
+    def to_dict(self, pool: ContentPool) -> Dict:
+        if self.original is not None:
+            return dict(self.original)
+        return {
+            "id": self.id,
+            "reason": self.reason,
+            "severity": SEVERITIES.name(self.severity),
+            "content": pool.get(self.content),
+            "timestamp": format_time(self.timestamp)
+        }
+
+
+class UserWarnings:
+    """One user's warnings in one guild"""
+
+    __slots__ = ("created_at", "records", "original", "expired")
+
+    def __init__(self, created_at: Timestamp, records: Optional[List[WarningRecord]] = None,
+                 original: Optional[Dict] = None):
+        self.created_at = created_at
+        self.records = records if records is not None else []  # oldest first
+        self.original = original  # the entry (minus its warnings), for entries that don't fit the compact form
+        self.expired = 0  # leading records past the guild's expiry window, not yet compacted away
+
+    @property
+    def last_timestamp(self):
+        return format_time(self.records[-1].timestamp) if self.records else None
+
+    def to_dict(self, guild_id: Id, user_id: Id, pool: ContentPool) -> Dict:
+        warnings = [record.to_dict(pool) for record in self.records]
+        if self.original is not None:
+            return dict(self.original, warnings=warnings)
+        return {"user_id": str(user_id), "guild_id": str(guild_id), "warnings": warnings,
+                "created_at": format_time(self.created_at)}
+
+
+class WarningStore(Mapping):
+    """
+    Every user's warnings, grouped by guild
+
+    Read as a mapping it is the old layout - {"guild_id:user_id": {"user_id",
+    "guild_id", "warnings": [...], "created_at"}} - with each value built on access.
+    """
+
+    def __init__(self):
+        self.guilds = {}  # format: {guild_id: {user_id: UserWarnings}}
+        self.pool = ContentPool()
+        self.size = 0
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "WarningStore":
+        store = cls()
+        for key, entry in data.items():
+            guild_part, _, user_part = key.partition(':')
+            guild_id, user_id = parse_id(guild_part), parse_id(user_part)
+            records = [WarningRecord.from_dict(warning, store.pool) for warning in entry.get("warnings", [])]
+            compact = (tuple(entry) == USER_FIELDS and entry["user_id"] == user_part
+                       and entry["guild_id"] == guild_part and isinstance(entry["created_at"], str))
+            if compact:
+                user = UserWarnings(parse_time(entry["created_at"]), records)
+            else:
+                user = UserWarnings(None, records, original=dict(entry, warnings=None))  # keeps the key order
+            store.put(guild_id, user_id, user)
+        return store
+
+    @staticmethod
+    def split_key(key: str) -> Tuple[Id, Id]:
+        guild_part, _, user_part = key.partition(':')
+        return parse_id(guild_part), parse_id(user_part)
+
+    def get_user(self, guild_id, user_id) -> Optional[UserWarnings]:
+        users = self.guilds.get(parse_id(guild_id))
+        return users.get(parse_id(user_id)) if users is not None else None
+
+    def put(self, guild_id, user_id, user: UserWarnings):
+        users = self.guilds.setdefault(parse_id(guild_id), {})
+        if parse_id(user_id) not in users:
+            self.size += 1
+        users[parse_id(user_id)] = user
+
+    def remove_user(self, guild_id, user_id) -> Optional[UserWarnings]:
+        users = self.guilds.get(parse_id(guild_id))
+        user = users.pop(parse_id(user_id), None) if users is not None else None
+        if user is None:
+            return None
+        self.size -= 1
+        if not users:
+            del self.guilds[parse_id(guild_id)]
+        for record in user.records:
+            self.pool.release(record.content)
+        return user
+
+    def users(self, guild_id=None) -> Iterator[Tuple[Id, Id, UserWarnings]]:
+        """(guild_id, user_id, UserWarnings) for one guild, or for every guild"""
+        if guild_id is not None:
+            guilds = [(parse_id(guild_id), self.guilds.get(parse_id(guild_id), {}))]
+        else:
+            guilds = self.guilds.items()
+        for g_id, users in guilds:
+            for user_id, user in users.items():
+                yield g_id, user_id, user
+
+    def compact(self):
+        """Rewrite the content buffer without the content of removed warnings"""
+        pool = ContentPool()
+        for _, _, user in self.users():
+            for record in user.records:
+                if record.original is None:
+                    record.content = pool.add(self.pool.get(record.content))
+        self.pool = pool
+
+    def dump(self, f, indent: int = 2):
+        """Write the JSON file, one user at a time (same output as json.dump(dict(self), f, indent=2))"""
+        pad = " " * indent
+        separator = "\n" + pad
+        f.write("{")
+        first = True
+        for guild_id, user_id, user in self.users():
+            body = json.dumps(user.to_dict(guild_id, user_id, self.pool), indent=indent).replace("\n", separator)
+            f.write(("\n" if first else ",\n") + pad + json.dumps(f"{guild_id}:{user_id}") + ": " + body)
+            first = False
+        f.write("}" if first else "\n}")
+
+    # Mapping view in the file's layout
+    def __getitem__(self, key: str) -> Dict:
+        guild_id, user_id = self.split_key(key)
+        user = self.get_user(guild_id, user_id)
+        if user is None:
+            raise KeyError(key)
+        return user.to_dict(guild_id, user_id, self.pool)
+
+    def __iter__(self) -> Iterator[str]:
+        for guild_id, user_id, _ in self.users():
+            yield f"{guild_id}:{user_id}"
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self.get_user(*self.split_key(key)) is not None
+
+
+class MuteRecord:
+    """One mute"""
+
+    __slots__ = ("user_id", "guild_id", "start_time", "end_time", "duration_minutes", "reason",
+                 "is_active", "mute_role_assigned", "original")
+
+    def __init__(self, user_id, guild_id, start_time: Timestamp, end_time: Timestamp, duration_minutes,
+                 reason: str = "", is_active: bool = True, mute_role_assigned: bool = False,
+                 original: Optional[Dict] = None):
+        self.user_id = parse_id(user_id)
+        self.guild_id = parse_id(guild_id)
+        self.start_time = start_time
+        self.end_time = end_time
+        self.duration_minutes = duration_minutes
+        self.reason = reason
+        self.is_active = is_active
+        self.mute_role_assigned = mute_role_assigned
+        self.original = original  # keys beyond MUTE_FIELDS, or a record that doesn't fit the compact form
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MuteRecord":
+        compact = (tuple(data) == MUTE_FIELDS and isinstance(data["user_id"], str)
+                   and isinstance(data["guild_id"], str) and isinstance(data["reason"], str))
+        record = cls(data.get("user_id"), data.get("guild_id"), parse_time(data.get("start_time")),
+                     parse_time(data.get("end_time")), data.get("duration_minutes"), data.get("reason", ""),
+                     data.get("is_active", False), data.get("mute_role_assigned", False),
+                     original=None if compact else dict(data))
+        return record
+
+    def to_dict(self) -> Dict:
+        values = {
+            "user_id": str(self.user_id),
+            "guild_id": str(self.guild_id),
+            "start_time": format_time(self.start_time),
+            "end_time": format_time(self.end_time),
+            "duration_minutes": self.duration_minutes,
+            "reason": self.reason,
+            "is_active": self.is_active,
+            "mute_role_assigned": self.mute_role_assigned
+        }
+        if self.original is None:
+            return values
+        # fields the manager changes are kept current; everything else stays as loaded
+        return dict(self.original, is_active=self.is_active, end_time=format_time(self.end_time),
+                    mute_role_assigned=self.mute_role_assigned)
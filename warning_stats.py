@@ -0,0 +1,269 @@
+"""
+Warning Stats - Columnar warning statistics for !warningstats and the shard coordinator
+Every warning is one row of typed numpy columns (guild code, user row,
+severity code, time), and every warned user one row of (guild code, alive).
+Severity breakdowns, top offenders and counts per time bucket are then a
+mask and a bincount over the columns instead of a Python loop over every
+user and warning. Guilds are matched exactly (get_statistics used a prefix
+match on "guild_id:user_id", so guild 12 also counted guild 123's warnings).
+
+Columns are built from the WarningStore on the first query, then kept up to
+date as warnings are added and removed; removed rows are masked out and the
+columns are rebuilt once most rows are dead. Without numpy, the same results
+are computed in Python from the store.
+"""
+
+from typing import Dict, List, Optional
+
+from lazy_imports import lazy_import, module_available
+from warning_records import SEVERITIES, WarningStore, parse_id, time_micros
+
+NUMPY_AVAILABLE = module_available("numpy")
+np = lazy_import("numpy")
+
+BASE_SEVERITIES = ("low", "medium", "high", "critical")  # always in the breakdown, even at 0
+MICROS = 1_000_000
+
+
+def _breakdown(counts: Dict[int, int]) -> Dict[str, int]:
+    """Severity names for {severity code: count}, in get_statistics' order"""
+    breakdown = {name: 0 for name in BASE_SEVERITIES}
+    for code, count in counts.items():
+        if count:
+            name = SEVERITIES.name(code)
+            breakdown[name] = breakdown.get(name, 0) + count
+    return breakdown
+
+
+class _Column:
+    """Growable typed numpy array"""
+
+    def __init__(self, dtype, values=()):
+        self.data = np.array(values, dtype=dtype)
+        self.size = len(self.data)
+
+    def append(self, value):
+        if self.size == len(self.data):
+            grown = np.empty(max(16, 2 * len(self.data)), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+
+    @property
+    def values(self):
+        return self.data[:self.size]
+
+
+class WarningStatsEngine:
+    """Per-guild warning statistics over a WarningStore"""
+
+    def __init__(self, store: WarningStore, use_numpy: bool = NUMPY_AVAILABLE):
+        self.store = store
+        self.use_numpy = use_numpy
+        self.built = False
+
+    # -- columns --
+
+    def _build(self):
+        self.guild_codes = {}  # format: {guild_id: code}
+        self.user_rows = {}  # format: {(guild_id, user_id): row}
+        self.user_ids = []  # row -> user_id
+        guilds, users_alive, rows, severities, times = [], [], [], [], []
+        for guild_id, user_id, user in self.store.users():
+            row = len(self.user_ids)
+            self.user_rows[(guild_id, user_id)] = row
+            self.user_ids.append(user_id)
+            guilds.append(self._guild_code(guild_id))
+            users_alive.append(True)
+            for record in user.records:
+                rows.append(row)
+                severities.append(record.severity)
+                times.append(self._micros(record.timestamp))
+        self.user_guild = _Column(np.int32, guilds)
+        self.user_alive = _Column(np.bool_, users_alive)
+        self.row = _Column(np.int32, rows)
+        self.severity = _Column(np.int16, severities)
+        self.time = _Column(np.int64, times)
+        self.alive = _Column(np.bool_, [True] * len(rows))
+        self.dead = 0
+        self.built = True
+
+    def _guild_code(self, guild_id) -> int:
+        code = self.guild_codes.get(guild_id)
+        if code is None:
+            code = self.guild_codes[guild_id] = len(self.guild_codes)
+        return code
+
+    @staticmethod
+    def _micros(timestamp) -> int:
+        micros = time_micros(timestamp)
+        return -1 if micros is None else micros
+
+    def _ready(self) -> bool:
+        """Columns are usable (built on first use; False when computing in Python)"""
+        if not self.use_numpy:
+            return False
+        if not self.built or self.dead > max(1024, self.alive.size // 2):
+            self._build()
+        return True
+
+    def _user_row(self, guild_id, user_id) -> int:
+        key = (parse_id(guild_id), parse_id(user_id))
+        row = self.user_rows.get(key)
+        if row is None:
+            row = self.user_rows[key] = len(self.user_ids)
+            self.user_ids.append(key[1])
+            self.user_guild.append(self._guild_code(key[0]))
+            self.user_alive.append(True)
+        return row
+
+    def _kill_rows(self, row: int):
+        dying = self.alive.values & (self.row.values == row)
+        self.dead += int(dying.sum())
+        self.alive.values[dying] = False
+
+    # -- updates from WarningManager (no-ops until the columns are built) --
+
+    def invalidate(self):
+        """Rebuild the columns on the next query (after bulk changes to the store)"""
+        self.built = False
+
+    def warning_added(self, guild_id, user_id, severity: int, timestamp):
+        if not (self.use_numpy and self.built):
+            return
+        row = self._user_row(guild_id, user_id)
+        self.user_alive.values[row] = True  # a cleared user warned again
+        self.row.append(row)
+        self.severity.append(severity)
+        self.time.append(self._micros(timestamp))
+        self.alive.append(True)
+
+    def user_changed(self, guild_id, user_id):
+        """A user's warnings were removed or cleared - reload that user's rows from the store"""
+        if not (self.use_numpy and self.built):
+            return
+        row = self._user_row(guild_id, user_id)
+        self._kill_rows(row)
+        user = self.store.get_user(guild_id, user_id)
+        self.user_alive.values[row] = user is not None
+        for record in user.records if user is not None else ():
+            self.row.append(row)
+            self.severity.append(record.severity)
+            self.time.append(self._micros(record.timestamp))
+            self.alive.append(True)
+
+    # -- queries --
+
+    def _masks(self, guild_id):
+        """(warning rows mask, user rows mask) for a guild or all guilds; None if the guild has no rows"""
+        if guild_id is None:
+            return self.alive.values, self.user_alive.values
+        code = self.guild_codes.get(parse_id(guild_id))
+        if code is None:
+            return None
+        users = self.user_alive.values & (self.user_guild.values == code)
+        return self.alive.values & users[self.row.values], users
+
+    def statistics(self, guild_id=None) -> Dict:
+        """
+        Warning counts for a guild (or all guilds), as in WarningManager.get_statistics
+
+        Returns:
+            {"total_users_warned", "total_warnings", "severity_breakdown", "guilds_affected"}
+        """
+        guild_id = guild_id or None
+        if not self._ready():
+            return self._statistics_python(guild_id)
+        masks = self._masks(guild_id)
+        if masks is None:
+            return {"total_users_warned": 0, "total_warnings": 0,
+                    "severity_breakdown": _breakdown({}), "guilds_affected": 0}
+        warnings, users = masks
+        severity_counts = np.bincount(self.severity.values[warnings], minlength=len(SEVERITIES.names))
+        return {
+            "total_users_warned": int(users.sum()),
+            "total_warnings": int(warnings.sum()),
+            "severity_breakdown": _breakdown(dict(enumerate(severity_counts.tolist()))),
+            "guilds_affected": int(np.unique(self.user_guild.values[users]).size)
+        }
+
+    def _statistics_python(self, guild_id) -> Dict:
+        users = warnings = 0
+        guilds = set()
+        counts = {}
+        for g_id, _, user in self.store.users(guild_id):
+            users += 1
+            guilds.add(g_id)
+            warnings += len(user.records)
+            for record in user.records:
+                counts[record.severity] = counts.get(record.severity, 0) + 1
+        return {"total_users_warned": users, "total_warnings": warnings,
+                "severity_breakdown": _breakdown(counts), "guilds_affected": len(guilds)}
+
+    def top_offenders(self, guild_id=None, limit: Optional[int] = 10, since: Optional[float] = None) -> List[Dict]:
+        """
+        Users with the most warnings (ties in the order they were first warned)
+
+        Args:
+            guild_id: Guild to rank (None for all guilds)
+            limit: Number of users (None for all)
+            since: Only count warnings from this epoch second on
+
+        Returns:
+            [{"user_id", "guild_id", "count"}]
+        """
+        guild_id = guild_id or None
+        if not self._ready():
+            return self._top_offenders_python(guild_id, limit, since)
+        masks = self._masks(guild_id)
+        if masks is None:
+            return []
+        warnings = masks[0]
+        if since is not None:
+            warnings = warnings & (self.time.values >= since * MICROS)
+        counts = np.bincount(self.row.values[warnings], minlength=len(self.user_ids))
+        order = np.argsort(-counts, kind="stable")[:limit]
+        codes = {code: g_id for g_id, code in self.guild_codes.items()}
+        return [{"user_id": str(self.user_ids[row]), "guild_id": str(codes[int(self.user_guild.values[row])]),
+                 "count": int(counts[row])} for row in order.tolist() if counts[row] > 0]
+
+    def _top_offenders_python(self, guild_id, limit: Optional[int], since: Optional[float]) -> List[Dict]:
+        ranked = []
+        for g_id, user_id, user in self.store.users(guild_id):
+            count = sum(1 for record in user.records
+                        if since is None or self._micros(record.timestamp) >= since * MICROS)
+            if count:
+                ranked.append({"user_id": str(user_id), "guild_id": str(g_id), "count": count})
+        return sorted(ranked, key=lambda entry: entry["count"], reverse=True)[:limit]
+
+    def bucket_counts(self, guild_id=None, start: float = 0, end: float = 0, step: int = 86400) -> Dict:
+        """
+        Warnings per time bucket
+
+        Args:
+            guild_id: Guild to count (None for all guilds)
+            start, end: Epoch seconds (buckets start at `start`)
+            step: Bucket size in seconds
+
+        Returns:
+            {"step", "timestamps": [bucket starts], "counts": [warnings]}
+        """
+        guild_id = guild_id or None
+        buckets = max(0, int((end - start) // step) + 1)
+        timestamps = [int(start + i * step) for i in range(buckets)]
+        if not self._ready():
+            counts = [0] * buckets
+            for _, _, user in self.store.users(guild_id):
+                for record in user.records:
+                    micros = self._micros(record.timestamp)
+                    if start * MICROS <= micros <= end * MICROS:
+                        counts[int((micros - start * MICROS) // (step * MICROS))] += 1
+            return {"step": step, "timestamps": timestamps, "counts": counts}
+        masks = self._masks(guild_id)
+        if masks is None or not buckets:
+            return {"step": step, "timestamps": timestamps, "counts": [0] * buckets}
+        times = self.time.values[masks[0]]
+        times = times[(times >= start * MICROS) & (times <= end * MICROS)]
+        counts = np.bincount((times - int(start * MICROS)) // (step * MICROS), minlength=buckets)
+        return {"step": step, "timestamps": timestamps, "counts": counts[:buckets].tolist()}
@@ -5,10 +5,24 @@ Handles persistent warning storage, tracking, and automatic muting
 
 import json
 import os
+import sys
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import asyncio
 
+from sharding import prepare_state_file
+from warning_records import (MuteRecord, SEVERITIES, UserWarnings, WarningRecord, WarningStore,
+                             time_micros, to_micros)
+from warning_stats import WarningStatsEngine
+from warnings_query import WarningIndex
+from structured_logging import get_logger
+import startup_trace
+
+log = get_logger("warning_system")
+
+EXPIRY_SWEEP_INTERVAL = 3600  # seconds between compactions of expired warnings
+DAY_MICROS = 86400 * 1_000_000
+
 
 class WarningManager:
     """Manages user warnings, tracking, and automatic muting"""
@@ -16,34 +30,45 @@ class WarningManager:
     def __init__(self, log_dir: str = "forensics_logs"):
         self.log_dir = log_dir
         os.makedirs(log_dir, exist_ok=True)
-        self.warnings_file = os.path.join(log_dir, "user_warnings.json")
-        self.mutes_file = os.path.join(log_dir, "user_mutes.json")
+        self.warnings_file = prepare_state_file(os.path.join(log_dir, "user_warnings.json"))
+        self.mutes_file = prepare_state_file(os.path.join(log_dir, "user_mutes.json"))
+        self.expiry_file = prepare_state_file(os.path.join(log_dir, "warning_expiry.json"))
         
-        # Load existing data
-        self.warnings = self.load_warnings()
-        self.active_mutes = self.load_mutes()
+        # Load existing data (compact records - self.warnings still reads like the file's dicts)
+        with startup_trace.phase("load_warnings"):
+            self.warnings = self.load_warnings()
+            self.index = WarningIndex()  # per-guild rankings for !warnings / !warningstats
+            for guild_id, user_id, user in self.warnings.users():
+                self.index.set(f"{guild_id}:{user_id}", len(user.records), user.last_timestamp)
+            self.stats = WarningStatsEngine(self.warnings)  # columns for get_statistics, built on first use
+        with startup_trace.phase("load_mutes"):
+            self.active_mutes = self.load_mutes()
+        self.expiry_days = self.load_expiry()  # format: {guild_id: days} - guilds without an entry never expire
+        self.next_expiry = {}  # format: {guild_id: epoch micros when its oldest stored warning expires}
     
-    def load_warnings(self) -> Dict:
+    def load_warnings(self) -> WarningStore:
         """Load warnings from persistent storage"""
         if os.path.exists(self.warnings_file):
             try:
                 with open(self.warnings_file, 'r') as f:
-                    return json.load(f)
+                    return WarningStore.from_dict(json.load(f))
             except json.JSONDecodeError:
-                return {}
-        return {}
+                return WarningStore()
+        return WarningStore()
     
     def save_warnings(self):
         """Save warnings to persistent storage"""
+        if self.warnings.pool.garbage_bytes > max(self.warnings.pool.live_bytes, 1 << 20):
+            self.warnings.compact()
         with open(self.warnings_file, 'w') as f:
-            json.dump(self.warnings, f, indent=2)
+            self.warnings.dump(f)
     
-    def load_mutes(self) -> Dict:
+    def load_mutes(self) -> Dict[str, MuteRecord]:
         """Load active mutes from persistent storage"""
         if os.path.exists(self.mutes_file):
             try:
                 with open(self.mutes_file, 'r') as f:
-                    return json.load(f)
+                    return {key: MuteRecord.from_dict(mute) for key, mute in json.load(f).items()}
             except json.JSONDecodeError:
                 return {}
         return {}
@@ -51,7 +76,137 @@ class WarningManager:
     def save_mutes(self):
         """Save mutes to persistent storage"""
         with open(self.mutes_file, 'w') as f:
-            json.dump(self.active_mutes, f, indent=2)
+            json.dump({key: mute.to_dict() for key, mute in self.active_mutes.items()}, f, indent=2)
+    
+    def load_expiry(self) -> Dict[str, int]:
+        """Load per-guild warning expiry windows"""
+        if os.path.exists(self.expiry_file):
+            try:
+                with open(self.expiry_file, 'r') as f:
+                    return json.load(f)
+            except json.JSONDecodeError:
+                return {}
+        return {}
+    
+    def save_expiry(self):
+        """Save per-guild warning expiry windows"""
+        with open(self.expiry_file, 'w') as f:
+            json.dump(self.expiry_days, f, indent=2)
+    
+    def get_warning_expiry(self, guild_id: str) -> Optional[int]:
+        """Days after which a guild's warnings expire (None if they never do)"""
+        return self.expiry_days.get(str(guild_id))
+    
+    def set_warning_expiry(self, guild_id: str, days: Optional[int]):
+        """Expire a guild's warnings after `days` days (None or 0 to keep them forever)"""
+        if days:
+            self.expiry_days[str(guild_id)] = int(days)
+        else:
+            self.expiry_days.pop(str(guild_id), None)
+        self.save_expiry()
+        # The window may have grown - recount from each user's first warning
+        for _, _, user in self.warnings.users(guild_id):
+            user.expired = 0
+        self.next_expiry.pop(str(guild_id), None)
+        self.expire_due(guild_id)
+    
+    def _first_active(self, guild_id, user: UserWarnings) -> int:
+        """
+        Index of a user's first warning inside the guild's expiry window
+        
+        Warnings are kept oldest first and the cutoff only moves forward, so the
+        user's cursor only ever advances - counting is amortized O(1) per call.
+        """
+        days = self.expiry_days.get(str(guild_id))
+        if not days:
+            return 0
+        cutoff = to_micros(datetime.utcnow()) - days * DAY_MICROS
+        records = user.records
+        position = user.expired
+        while position < len(records):
+            moment = time_micros(records[position].timestamp)
+            if moment is None or moment >= cutoff:
+                break
+            position += 1
+        user.expired = position
+        return position
+    
+    def _compact_guild(self, guild_id: str) -> int:
+        """Remove one guild's expired warnings and note when its oldest remaining one expires"""
+        window = self.expiry_days[guild_id] * DAY_MICROS
+        removed, changed, oldest = 0, [], None
+        for g_id, user_id, user in list(self.warnings.users(guild_id)):
+            start = self._first_active(g_id, user)
+            if start:
+                for record in user.records[:start]:
+                    self.warnings.pool.release(record.content)
+                del user.records[:start]
+                user.expired = 0
+                removed += start
+                if not user.records:
+                    self.warnings.remove_user(g_id, user_id)
+                self._update_index(g_id, user_id)
+                changed.append((g_id, user_id))
+            moment = time_micros(user.records[0].timestamp) if user.records else None
+            if moment is not None and (oldest is None or moment < oldest):
+                oldest = moment
+        # New warnings can only expire later than now + window
+        self.next_expiry[guild_id] = (oldest if oldest is not None else to_micros(datetime.utcnow())) + window
+        if len(changed) > 64:
+            self.stats.invalidate()
+        else:
+            for g_id, user_id in changed:
+                self.stats.user_changed(g_id, user_id)
+        return removed
+    
+    def expire_due(self, guild_id: str = None) -> int:
+        """
+        Remove expired warnings of a guild (or all guilds) if any are due
+        
+        Called before counts are read, so rankings and statistics agree with
+        get_warning_count; costs nothing until a stored warning has expired.
+        
+        Returns:
+            Number of warnings removed
+        """
+        now = to_micros(datetime.utcnow())
+        guilds = [str(guild_id)] if guild_id else list(self.expiry_days)
+        removed = 0
+        for g_id in guilds:
+            if g_id in self.expiry_days and now >= self.next_expiry.get(g_id, 0):
+                removed += self._compact_guild(g_id)
+        if removed:
+            self.save_warnings()
+        return removed
+    
+    def compact_expired(self) -> int:
+        """
+        Remove expired warnings from storage, for every guild with an expiry window
+        
+        Returns:
+            Number of warnings removed
+        """
+        self.next_expiry.clear()
+        return self.expire_due()
+    
+    async def compact_periodically(self, interval: float = EXPIRY_SWEEP_INTERVAL):
+        """Remove expired warnings in the background (run as a task)"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = self.compact_expired()
+                if removed:
+                    log.info("Expired warnings removed", warnings=removed)
+            except Exception as e:
+                log.error(f"Compacting expired warnings failed: {e}")
+    
+    def _update_index(self, guild_id: str, user_id: str):
+        user = self.warnings.get_user(guild_id, user_id)
+        key = f"{guild_id}:{user_id}"
+        if user is None:
+            self.index.remove(key)
+        else:
+            self.index.set(key, len(user.records), user.last_timestamp)
     
     def add_warning(self, user_id: str, guild_id: str, reason: str, 
                    severity: str = "medium", content: str = "") -> int:
@@ -66,61 +221,69 @@ class WarningManager:
             content: The offensive content
         
         Returns:
-            Total warning count for the user in this guild
+            Warning count for the user in this guild (within the guild's expiry window)
         """
-        key = f"{guild_id}:{user_id}"
-        
-        if key not in self.warnings:
-            self.warnings[key] = {
-                "user_id": user_id,
-                "guild_id": guild_id,
-                "warnings": [],
-                "created_at": datetime.utcnow().isoformat()
-            }
+        self.expire_due(guild_id)
+        user = self.warnings.get_user(guild_id, user_id)
+        if user is None:
+            user = UserWarnings(to_micros(datetime.utcnow()))
+            self.warnings.put(guild_id, user_id, user)
         
-        warning = {
-            "id": len(self.warnings[key]["warnings"]) + 1,
-            "reason": reason,
-            "severity": severity,
-            "content": content[:200],  # Limit content length
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-        self.warnings[key]["warnings"].append(warning)
+        last_id = user.records[-1].id if user.records else 0
+        user.records.append(WarningRecord(
+            last_id + 1 if isinstance(last_id, int) else len(user.records) + 1,  # ids stay unique once old ones expire
+            sys.intern(reason),
+            SEVERITIES.code(severity),
+            self.warnings.pool.add(content[:200]),  # Limit content length
+            to_micros(datetime.utcnow())
+        ))
+        self._update_index(guild_id, user_id)
+        self.stats.warning_added(guild_id, user_id, user.records[-1].severity, user.records[-1].timestamp)
         self.save_warnings()
         
-        return len(self.warnings[key]["warnings"])
+        return len(user.records) - self._first_active(guild_id, user)
     
     def get_warning_count(self, user_id: str, guild_id: str) -> int:
-        """Get total warnings for a user in a guild"""
-        key = f"{guild_id}:{user_id}"
-        if key in self.warnings:
-            return len(self.warnings[key]["warnings"])
-        return 0
+        """Get a user's warnings in a guild (within the guild's expiry window)"""
+        user = self.warnings.get_user(guild_id, user_id)
+        return len(user.records) - self._first_active(guild_id, user) if user is not None else 0
     
     def get_warnings(self, user_id: str, guild_id: str, limit: int = 10) -> List[Dict]:
-        """Get warnings for a user in a guild"""
-        key = f"{guild_id}:{user_id}"
-        if key in self.warnings:
-            return self.warnings[key]["warnings"][-limit:]
-        return []
+        """Get warnings for a user in a guild (within the guild's expiry window)"""
+        user = self.warnings.get_user(guild_id, user_id)
+        if user is None:
+            return []
+        active = user.records[self._first_active(guild_id, user):]
+        return [record.to_dict(self.warnings.pool) for record in active[-limit:]]
+    
+    def top_warned(self, guild_id: str, limit: int = 10) -> List[Dict]:
+        """Most warned users in a guild: [{"user_id", "guild_id", "count", "last_warning"}]"""
+        self.expire_due(guild_id)
+        return [entry for entry in self.index.top(guild_id, limit) if entry["count"] > 0]
     
     def clear_warnings(self, user_id: str, guild_id: str) -> bool:
         """Clear all warnings for a user in a guild"""
-        key = f"{guild_id}:{user_id}"
-        if key in self.warnings:
-            del self.warnings[key]
+        if self.warnings.remove_user(guild_id, user_id) is not None:
+            self._update_index(guild_id, user_id)
+            self.stats.user_changed(guild_id, user_id)
             self.save_warnings()
             return True
         return False
     
     def remove_warning(self, user_id: str, guild_id: str, warning_id: int) -> bool:
         """Remove a specific warning"""
-        key = f"{guild_id}:{user_id}"
-        if key in self.warnings:
-            self.warnings[key]["warnings"] = [
-                w for w in self.warnings[key]["warnings"] if w.get("id") != warning_id
-            ]
+        user = self.warnings.get_user(guild_id, user_id)
+        if user is not None:
+            kept = []
+            for record in user.records:
+                if record.id != warning_id:
+                    kept.append(record)
+                else:
+                    self.warnings.pool.release(record.content)
+            user.records = kept
+            user.expired = 0
+            self._update_index(guild_id, user_id)
+            self.stats.user_changed(guild_id, user_id)
             self.save_warnings()
             return True
         return False
@@ -144,21 +307,13 @@ class WarningManager:
         start_time = datetime.utcnow()
         end_time = start_time + timedelta(minutes=duration_minutes)
         
-        mute_record = {
-            "user_id": user_id,
-            "guild_id": guild_id,
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-            "duration_minutes": duration_minutes,
-            "reason": reason,
-            "is_active": True,
-            "mute_role_assigned": False
-        }
+        mute_record = MuteRecord(user_id, guild_id, to_micros(start_time), to_micros(end_time),
+                                 duration_minutes, reason)
         
         self.active_mutes[mute_key] = mute_record
         self.save_mutes()
         
-        return mute_record
+        return mute_record.to_dict()
     
     def get_mute(self, user_id: str, guild_id: str) -> Optional[Dict]:
         """Get active mute record for a user"""
@@ -168,13 +323,12 @@ class WarningManager:
             mute = self.active_mutes[mute_key]
             
             # Check if mute has expired
-            end_time = datetime.fromisoformat(mute["end_time"])
-            if datetime.utcnow() > end_time:
-                mute["is_active"] = False
+            if to_micros(datetime.utcnow()) > time_micros(mute.end_time):
+                mute.is_active = False
                 self.save_mutes()
                 return None
             
-            return mute
+            return mute.to_dict()
         
         return None
     
@@ -187,8 +341,8 @@ class WarningManager:
         mute_key = f"{guild_id}:{user_id}"
         
         if mute_key in self.active_mutes:
-            self.active_mutes[mute_key]["is_active"] = False
-            self.active_mutes[mute_key]["end_time"] = datetime.utcnow().isoformat()
+            self.active_mutes[mute_key].is_active = False
+            self.active_mutes[mute_key].end_time = to_micros(datetime.utcnow())
             self.save_mutes()
             return True
         
@@ -199,7 +353,7 @@ class WarningManager:
         mute_key = f"{guild_id}:{user_id}"
         
         if mute_key in self.active_mutes:
-            self.active_mutes[mute_key]["mute_role_assigned"] = True
+            self.active_mutes[mute_key].mute_role_assigned = True
             self.save_mutes()
             return True
         
@@ -208,60 +362,36 @@ class WarningManager:
     def get_expired_mutes(self) -> List[Dict]:
         """Get all mutes that have expired"""
         expired = []
-        now = datetime.utcnow()
+        now = to_micros(datetime.utcnow())
         
         for key, mute in self.active_mutes.items():
-            if mute.get("is_active"):
-                end_time = datetime.fromisoformat(mute["end_time"])
-                if now > end_time:
-                    expired.append(mute)
+            if mute.is_active and now > time_micros(mute.end_time):
+                expired.append(mute.to_dict())
         
         return expired
     
     def get_statistics(self, guild_id: str = None) -> Dict:
-        """Get warning and mute statistics"""
-        stats = {
-            "total_users_warned": 0,
-            "total_warnings": 0,
-            "total_active_mutes": 0,
-            "severity_breakdown": {"low": 0, "medium": 0, "high": 0, "critical": 0},
-            "guilds_affected": set()
-        }
-        
-        for key, user_data in self.warnings.items():
-            if guild_id and not key.startswith(guild_id):
-                continue
-                
-            stats["total_users_warned"] += 1
-            stats["guilds_affected"].add(user_data["guild_id"])
-            
-            for warning in user_data["warnings"]:
-                stats["total_warnings"] += 1
-                severity = warning.get("severity", "medium")
-                stats["severity_breakdown"][severity] = stats["severity_breakdown"].get(severity, 0) + 1
+        """Get warning and mute statistics (for one guild, or all guilds)"""
+        self.expire_due(guild_id)
+        stats = self.stats.statistics(guild_id)
         
         # Count active mutes
-        now = datetime.utcnow()
+        stats["total_active_mutes"] = 0
+        now = to_micros(datetime.utcnow())
         for mute in self.active_mutes.values():
-            if mute.get("is_active"):
-                end_time = datetime.fromisoformat(mute["end_time"])
-                if now < end_time:
-                    stats["total_active_mutes"] += 1
-        
-        stats["guilds_affected"] = len(stats["guilds_affected"])
+            if mute.is_active and now < time_micros(mute.end_time):
+                stats["total_active_mutes"] += 1
         
         return stats
     
     def cleanup_expired_mutes(self):
         """Clean up expired mute records"""
-        now = datetime.utcnow()
+        now = to_micros(datetime.utcnow())
         expired_keys = []
         
         for key, mute in self.active_mutes.items():
-            if mute.get("is_active"):
-                end_time = datetime.fromisoformat(mute["end_time"])
-                if now > end_time:
-                    expired_keys.append(key)
+            if mute.is_active and now > time_micros(mute.end_time):
+                expired_keys.append(key)
         
         for key in expired_keys:
             del self.active_mutes[key]
@@ -277,7 +407,7 @@ class MuteRoleManager:
     
     def __init__(self, log_dir: str = "forensics_logs"):
         self.log_dir = log_dir
-        self.role_config_file = os.path.join(log_dir, "mute_roles.json")
+        self.role_config_file = prepare_state_file(os.path.join(log_dir, "mute_roles.json"))
         self.role_config = self.load_role_config()
     
     def load_role_config(self) -> Dict:
@@ -0,0 +1,242 @@
+"""
+Warnings Query - One read-optimized view of the warnings both bots write
+bot.py's WarningManager keeps forensics_logs/user_warnings.json (one file per
+shard when sharded) as {"guild_id:user_id": {"user_id", "guild_id", "warnings":
+[...]}}, while bot_enhanced.py keeps forensics_logs/warnings.json as
+{"guild_id:user_id": [...]}. Both layouts are read here, so the dashboard and
+the bots' commands agree on the same numbers.
+
+WarningIndex holds a summary per warned user and keeps every guild's users
+ranked by warning count as single users change, so "top warned users" is a
+slice of a ranking instead of a load, sort and slice per request.
+WarningsReader feeds an index from the files, re-reading only the files whose
+signature changed and updating only the users those files touched.
+"""
+
+import bisect
+import itertools
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sharding import file_signature, state_files
+
+
+WARNINGS_FILES = ("user_warnings.json", "warnings.json")  # WarningManager (bot.py), ForensicsLogger (bot_enhanced.py)
+ALL_GUILDS = "*"
+
+
+def warning_list(value) -> List[Dict]:
+    """The warnings of one entry in either layout"""
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        return value.get('warnings') or []
+    return []
+
+
+def normalize_warnings(data: Dict) -> Dict[str, List[Dict]]:
+    """{"guild_id:user_id": [warnings]} for the contents of a warnings file in either layout"""
+    return {key: warning_list(value) for key, value in data.items()
+            if isinstance(key, str) and ':' in key}
+
+
+def read_warnings_file(path: str) -> Dict[str, List[Dict]]:
+    """
+    Read and normalize one warnings file
+
+    Raises:
+        OSError, ValueError: The file is missing or caught mid-write
+    """
+    with open(path, 'r') as f:
+        return normalize_warnings(json.load(f))
+
+
+def summarize(key: str, count: int, last_warning: Optional[str]) -> Dict:
+    """Dashboard summary of one user's warnings"""
+    guild_id, user_id = key.split(':', 1)
+    return {
+        "user_id": user_id,
+        "guild_id": guild_id,
+        "count": count,
+        "last_warning": last_warning
+    }
+
+
+class Ranking:
+    """Users of one scope, most warnings first (ties keep the order they were first seen)"""
+
+    __slots__ = ("order", "pending")
+
+    def __init__(self):
+        self.order = []  # sorted list of (-count, first seen, key)
+        self.pending = []  # added since the last read - merged with one sort, so bulk loads aren't quadratic
+
+    def add(self, item: Tuple[int, int, str]):
+        self.pending.append(item)
+
+    def _merge(self):
+        if len(self.pending) <= 8:
+            for item in self.pending:
+                bisect.insort(self.order, item)
+        else:
+            self.order.extend(self.pending)
+            self.order.sort()  # two sorted runs - timsort merges them in linear time
+        self.pending = []
+
+    def discard(self, item: Tuple[int, int, str]):
+        position = bisect.bisect_left(self.order, item)
+        if position < len(self.order) and self.order[position] == item:
+            del self.order[position]
+        elif item in self.pending:
+            self.pending.remove(item)
+
+    def keys(self, limit: Optional[int] = None) -> List[str]:
+        if self.pending:
+            self._merge()
+        items = self.order if limit is None else self.order[:limit]
+        return [key for _, _, key in items]
+
+    def __len__(self) -> int:
+        return len(self.order) + len(self.pending)
+
+
+class WarningIndex:
+    """Per-user warning summaries with a ranking per guild, updated one user at a time"""
+
+    def __init__(self):
+        self.entries = {}  # format: {"guild_id:user_id": summary} (summaries are replaced, never mutated)
+        self.rankings = {}  # format: {guild_id or ALL_GUILDS: Ranking}
+        self.first_seen = {}  # format: {"guild_id:user_id": sequence number}
+        self.sequence = itertools.count()
+        self.version = 0
+
+    def _scopes(self, entry: Dict) -> Tuple[str, str]:
+        return entry['guild_id'], ALL_GUILDS
+
+    def _rank_item(self, key: str, entry: Dict) -> Tuple[int, int, str]:
+        return (-entry['count'], self.first_seen[key], key)
+
+    def update(self, key: str, warnings: Optional[List[Dict]]) -> Optional[Tuple[int, Dict]]:
+        """
+        Set one user's warnings
+
+        Args:
+            key: "guild_id:user_id"
+            warnings: The user's warnings, or None to remove the user
+
+        Returns:
+            (previous count, new summary) if the summary changed, else None
+        """
+        if warnings is None:
+            return self.remove(key)
+        return self.set(key, len(warnings), warnings[-1].get('timestamp') if warnings else None)
+
+    def set(self, key: str, count: int, last_warning: Optional[str]) -> Optional[Tuple[int, Dict]]:
+        """Set one user's warning count and latest warning time (see update)"""
+        old = self.entries.get(key)
+        entry = summarize(key, count, last_warning)
+        if entry == old:
+            return None
+        if old is None:
+            self.first_seen[key] = next(self.sequence)
+        else:
+            item = self._rank_item(key, old)
+            for scope in self._scopes(old):
+                self.rankings[scope].discard(item)
+        self.entries[key] = entry
+        item = self._rank_item(key, entry)
+        for scope in self._scopes(entry):
+            ranking = self.rankings.get(scope)
+            if ranking is None:
+                ranking = self.rankings[scope] = Ranking()
+            ranking.add(item)
+        self.version += 1
+        return (old['count'] if old else 0), entry
+
+    def remove(self, key: str) -> Optional[Tuple[int, Dict]]:
+        """Drop one user (see update)"""
+        old = self.entries.get(key)
+        if old is None:
+            return None
+        item = self._rank_item(key, old)
+        for scope in self._scopes(old):
+            self._discard(scope, item)
+        del self.entries[key]
+        del self.first_seen[key]
+        self.version += 1
+        return old['count'], dict(old, count=0, last_warning=None)
+
+    def _discard(self, scope: str, item: Tuple[int, int, str]):
+        ranking = self.rankings[scope]
+        ranking.discard(item)
+        if not ranking:
+            del self.rankings[scope]
+
+    def load(self, data: Dict):
+        """Index the contents of a warnings file (either layout), e.g. a bot's in-memory warnings"""
+        for key, warnings in normalize_warnings(data).items():
+            self.update(key, warnings)
+
+    def top(self, guild_id=None, limit: Optional[int] = 10) -> List[Dict]:
+        """Most warned users of a guild (or of all guilds), as summaries"""
+        ranking = self.rankings.get(str(guild_id) if guild_id else ALL_GUILDS)
+        if ranking is None:
+            return []
+        return [self.entries[key] for key in ranking.keys(limit)]
+
+    def count(self, guild_id, user_id) -> int:
+        entry = self.entries.get(f"{guild_id}:{user_id}")
+        return entry['count'] if entry else 0
+
+    def users(self, guild_id=None) -> int:
+        """Number of users with a warnings entry in a guild (or in all guilds)"""
+        return len(self.rankings.get(str(guild_id) if guild_id else ALL_GUILDS, ()))
+
+
+class WarningsReader:
+    """Keeps a WarningIndex in step with warnings files, re-reading only the files that changed"""
+
+    def __init__(self, paths: Iterable[str], index: Optional[WarningIndex] = None):
+        self.paths = list(paths)  # unsharded paths; shard files are picked up next to them
+        self.index = index or WarningIndex()
+        self.signatures = {}  # format: {file: signature}
+        self.contents = {}  # format: {file: {"guild_id:user_id": [warnings]}}
+
+    def files(self) -> List[str]:
+        return [path for base in self.paths for path in state_files(base)]
+
+    def refresh(self, force: bool = False) -> List[Tuple[int, Dict]]:
+        """
+        Re-read changed files and update the index
+
+        Args:
+            force: Re-read every file even if its signature is unchanged
+
+        Returns:
+            (previous count, summary) for every user whose summary changed
+        """
+        files = self.files()
+        touched = {}  # keys in file order, so new users with equal counts rank in file order
+        for path in set(self.contents) - set(files):  # e.g. the unsharded file once shard files exist
+            touched.update(dict.fromkeys(self.contents.pop(path)))
+            self.signatures.pop(path, None)
+        for path in files:
+            signature = file_signature(path)
+            if not force and path in self.signatures and signature == self.signatures[path]:
+                continue
+            try:
+                contents = read_warnings_file(path) if signature is not None else {}
+            except (OSError, ValueError):
+                continue  # caught mid-write - keep the previous contents and retry next time
+            touched.update(dict.fromkeys(self.contents.get(path, ())))
+            touched.update(dict.fromkeys(contents))
+            self.contents[path] = contents
+            self.signatures[path] = signature
+
+        changes = []
+        for key in touched:
+            found = [self.contents[path][key] for path in files if key in self.contents.get(path, ())]
+            change = self.index.update(key, [w for warnings in found for w in warnings] if found else None)
+            if change is not None:
+                changes.append(change)
+        return changes
@@ -3,18 +3,31 @@ Guardify Web Dashboard
 Simple web interface for viewing bot statistics and logs
 """
 
-from flask import Flask, render_template, jsonify, session, redirect, url_for, request
+from flask import Flask, Response, render_template, jsonify, session, redirect, url_for, request
 import json
 import os
+import time
 from datetime import datetime
 from collections import Counter
-import requests
 from functools import wraps
 
+from stats_cache import StatsCache
+from case_index import CaseIndex, CursorError, parse_time
+from rollups import RollupReader, RESOLUTIONS
+from live_events import EventHub, STREAMS_FULL_RETRY_SECONDS
+from oauth_guilds import GuildListCache, create_http_session
+
 app = Flask(__name__)
-app.secret_key = os.urandom(24)  # For session management
 
 LOGS_DIR = "forensics_logs"
+# Live streams per worker process - kept below its thread count (gunicorn.conf.py) so the
+# other threads stay free for /api/stats, /api/cases and logins
+MAX_STREAMS = int(os.environ.get('GUARDIFY_DASHBOARD_STREAMS',
+                                 max(1, int(os.environ.get('GUARDIFY_DASHBOARD_THREADS', 8)) // 2)))
+stats_cache = StatsCache(LOGS_DIR)
+event_hub = EventHub(stats_cache, max_streams=MAX_STREAMS)
+case_index = CaseIndex(os.path.join(LOGS_DIR, "abuse_evidence.jsonl"))
+rollups = RollupReader(os.path.join(LOGS_DIR, "rollups.json"))
 
 # Load config
 with open('config.json', 'r') as f:
@@ -23,9 +36,17 @@ with open('config.json', 'r') as f:
     DISCORD_CLIENT_SECRET = config.get('discord_client_secret')
     DASHBOARD_URL = config.get('dashboard_url', 'http://localhost:5000')
 
+# For session management - every worker process must use the same key, so set
+# DASHBOARD_SECRET_KEY (or dashboard_secret_key in config.json) in production
+app.secret_key = os.environ.get('DASHBOARD_SECRET_KEY') or config.get('dashboard_secret_key') or os.urandom(24)
+
 DISCORD_API_BASE = 'https://discord.com/api/v10'
 OAUTH2_REDIRECT_URI = f'{DASHBOARD_URL}/callback'
 
+# One keep-alive connection pool for all Discord API calls
+discord_http = create_http_session()
+guild_lists = GuildListCache(DISCORD_API_BASE, http=discord_http)
+
 
 def login_required(f):
     """Decorator to require Discord login."""
@@ -38,95 +59,29 @@ def login_required(f):
 
 
 def get_user_guilds():
-    """Get guilds the logged-in user is in."""
+    """Get guilds the logged-in user is in (cached per session for a minute)."""
     if 'access_token' not in session:
         return []
     
-    headers = {
-        'Authorization': f"Bearer {session['access_token']}"
-    }
-    
-    response = requests.get(f'{DISCORD_API_BASE}/users/@me/guilds', headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    return []
+    return guild_lists.get(session['access_token'])
+
+
+def guild_access_denied(guild_id):
+    """True if a logged-in user asks for a guild they are not in."""
+    if guild_id and 'user' in session:
+        guild_ids = [str(g['id']) for g in get_user_guilds()]
+        return str(guild_id) not in guild_ids
+    return False
 
 
 def get_statistics(guild_id=None):
-    """Get bot statistics from logs."""
-    log_file = os.path.join(LOGS_DIR, "abuse_evidence.jsonl")
-    
-    if not os.path.exists(log_file):
-        return {
-            "total_cases": 0,
-            "severity_breakdown": {"low": 0, "medium": 0, "high": 0},
-            "unique_users": 0,
-            "unique_guilds": 0,
-            "recent_cases": []
-        }
-    
-    cases = []
-    users = set()
-    guilds = set()
-    severity_count = {"low": 0, "medium": 0, "high": 0}
-    
-    with open(log_file, 'r', encoding='utf-8') as f:
-        for line in f:
-            try:
-                record = json.loads(line)
-                
-                # Filter by guild if specified
-                if guild_id and str(record.get('guild_id')) != str(guild_id):
-                    continue
-                
-                cases.append(record)
-                users.add(record.get('author_id'))
-                if record.get('guild_id'):
-                    guilds.add(record.get('guild_id'))
-                
-                severity = record.get('analysis', {}).get('severity', 'low')
-                severity_count[severity] += 1
-            except:
-                continue
-    
-    # Get 10 most recent cases
-    recent_cases = sorted(cases, key=lambda x: x.get('logged_at', ''), reverse=True)[:10]
-    
-    return {
-        "total_cases": len(cases),
-        "severity_breakdown": severity_count,
-        "unique_users": len(users),
-        "unique_guilds": len(guilds),
-        "recent_cases": recent_cases
-    }
+    """Get bot statistics from logs (precomputed, refreshed when the evidence log changes)."""
+    return stats_cache.get_statistics(guild_id)
 
 
 def get_warnings(guild_id=None):
-    """Get warning statistics."""
-    warnings_file = os.path.join(LOGS_DIR, "warnings.json")
-    
-    if not os.path.exists(warnings_file):
-        return []
-    
-    with open(warnings_file, 'r') as f:
-        warnings = json.load(f)
-    
-    warning_list = []
-    for key, warns in warnings.items():
-        g_id, user_id = key.split(':')
-        
-        # Filter by guild if specified
-        if guild_id and str(g_id) != str(guild_id):
-            continue
-        
-        warning_list.append({
-            "user_id": user_id,
-            "guild_id": g_id,
-            "count": len(warns),
-            "last_warning": warns[-1]['timestamp'] if warns else None
-        })
-    
-    return sorted(warning_list, key=lambda x: x['count'], reverse=True)
+    """Get warning statistics (cached until either bot's warnings file changes)."""
+    return stats_cache.get_warnings(guild_id)
 
 
 @app.route('/')
@@ -170,7 +125,7 @@ def callback():
         'Content-Type': 'application/x-www-form-urlencoded'
     }
     
-    response = requests.post(f'{DISCORD_API_BASE}/oauth2/token', data=data, headers=headers)
+    response = discord_http.post(f'{DISCORD_API_BASE}/oauth2/token', data=data, headers=headers)
     
     if response.status_code != 200:
         return redirect(url_for('index'))
@@ -183,7 +138,7 @@ def callback():
         'Authorization': f"Bearer {token_data['access_token']}"
     }
     
-    user_response = requests.get(f'{DISCORD_API_BASE}/users/@me', headers=headers)
+    user_response = discord_http.get(f'{DISCORD_API_BASE}/users/@me', headers=headers)
     
     if user_response.status_code == 200:
         session['user'] = user_response.json()
@@ -194,6 +149,8 @@ def callback():
 @app.route('/logout')
 def logout():
     """Logout user."""
+    if 'access_token' in session:
+        guild_lists.invalidate(session['access_token'])
     session.clear()
     return redirect(url_for('index'))
 
@@ -231,23 +188,97 @@ def dashboard(guild_id=None):
 def api_stats(guild_id=None):
     """API endpoint for statistics."""
     # If guild_id provided and user logged in, verify access
-    if guild_id and 'user' in session:
-        user_guilds = get_user_guilds()
-        guild_ids = [str(g['id']) for g in user_guilds]
-        
-        if str(guild_id) not in guild_ids:
-            return jsonify({"error": "Access denied"}), 403
+    if guild_access_denied(guild_id):
+        return jsonify({"error": "Access denied"}), 403
+    
+    # Cached per guild until the logs change - unchanged polls get 304 Not Modified
+    body, etag = stats_cache.get_response(guild_id)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
+@app.route('/api/cases')
+def api_cases():
+    """Browse one guild's cases newest first, one page per request (follow next_cursor for more)."""
+    # Cases hold raw message content - only for logged-in members of the guild
+    if 'user' not in session:
+        return jsonify({"error": "Login required"}), 401
+    guild_id = request.args.get('guild')
+    if not guild_id:
+        return jsonify({"error": "guild is required"}), 400
+    if guild_access_denied(guild_id):
+        return jsonify({"error": "Access denied"}), 403
+    
+    try:
+        page = case_index.query(
+            guild_id=guild_id,
+            user_id=request.args.get('user'),
+            severity=request.args.get('severity'),
+            category=request.args.get('category'),
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            keyword=request.args.get('q'),
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', 50, type=int)
+        )
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(page)
+
+
+@app.route('/api/timeseries')
+def api_timeseries():
+    """Case, category, severity, warning and mute counts over time, from the bot's rollups."""
+    guild_id = request.args.get('guild')
+    if guild_access_denied(guild_id):
+        return jsonify({"error": "Access denied"}), 403
+    
+    resolution = request.args.get('resolution')
+    if resolution and resolution not in RESOLUTIONS:
+        return jsonify({"error": f"resolution must be one of {', '.join(RESOLUTIONS)}"}), 400
+    
+    end = parse_time(request.args['end']) if request.args.get('end') else None
+    start = parse_time(request.args['start']) if request.args.get('start') else None
+    if start is None:
+        days = request.args.get('days', 30, type=float)
+        start = (end or time.time()) - days * 86400
+    return jsonify(rollups.query(guild_id, start=start, end=end, resolution=resolution,
+                                 metrics=request.args.getlist('metric') or None))
+
+
+@app.route('/api/stream')
+@app.route('/api/stream/<guild_id>')
+def api_stream(guild_id=None):
+    """Server-sent events with a guild's new cases, warning count changes and mutes as they happen."""
+    # Case events carry raw message content - only for logged-in members of the guild
+    if 'user' not in session:
+        return jsonify({"error": "Login required"}), 401
+    guild_id = guild_id or request.args.get('guild')
+    if not guild_id:
+        return jsonify({"error": "guild is required"}), 400
+    if guild_access_denied(guild_id):
+        return jsonify({"error": "Access denied"}), 403
     
-    stats = get_statistics(guild_id)
-    warnings = get_warnings(guild_id)
+    # Each stream holds a worker thread - past the cap the dashboard falls back to polling /api/stats
+    if not event_hub.admit():
+        response = jsonify({"error": "Too many live streams, retry later", "retry": STREAMS_FULL_RETRY_SECONDS})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(STREAMS_FULL_RETRY_SECONDS)
+        return response
     
-    return jsonify({
-        "stats": stats,
-        "warnings": warnings[:10]  # Top 10 warned users
-    })
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    response = Response(event_hub.stream(guild_id, last_id, admitted=True), mimetype='text/event-stream')
+    response.call_on_close(event_hub.release)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # don't let a reverse proxy hold events back
+    return response
 
 
 if __name__ == '__main__':
+    # Development server - in production run: gunicorn -c gunicorn.conf.py wsgi:app
     # Create templates folder
     os.makedirs('templates', exist_ok=True)
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=int(os.environ.get('PORT', 5000)),
+            threaded=True)
@@ -0,0 +1,10 @@
+"""
+WSGI entry point for the web dashboard
+
+Production:
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from web_dashboard import app
+
+application = app